@@ -0,0 +1,166 @@
+"""
+Асинхронный клиент для API объявлений Avito.
+
+Повторяет набор методов conftest.APIClient, но работает поверх asyncio/aiohttp:
+запросы выполняются конкурентно через общий пул keep-alive соединений,
+а число одновременных запросов ограничено семафором.
+
+Вместо фиксированного предела можно передать controller (AIMDController):
+тогда предел подстраивается по задержкам и ошибкам ответов. rate_limiter
+(TokenBucket) дополнительно ограничивает частоту запросов.
+"""
+import asyncio
+import json
+import time
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+import aiohttp
+
+from concurrency import AIMDController, AsyncConcurrencyLimiter, TokenBucket
+
+DEFAULT_CONCURRENCY = 20
+
+
+class AsyncResponse:
+    """
+    Прочитанный ответ сервера.
+
+    Интерфейс совместим с requests.Response в той части, которую используют тесты:
+    status_code, headers, text, content, json().
+    """
+
+    def __init__(self, method: str, url: str, status_code: int,
+                 headers: Dict[str, str], content: bytes, elapsed: float):
+        self.method = method
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.elapsed = elapsed
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+    def __repr__(self) -> str:
+        return f"<AsyncResponse [{self.status_code}] {self.method} {self.url}>"
+
+
+class AsyncAPIClient:
+    """Асинхронный клиент для работы с API Avito."""
+
+    def __init__(self, base_url: str, concurrency: int = DEFAULT_CONCURRENCY,
+                 timeout: float = 30.0, controller: Optional[AIMDController] = None,
+                 rate_limiter: Optional[TokenBucket] = None):
+        self.base_url = base_url
+        self.concurrency = controller.maximum if controller is not None else concurrency
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.controller = controller
+        self.rate_limiter = rate_limiter
+        self._limiter: Optional[Union[asyncio.Semaphore, AsyncConcurrencyLimiter]] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self) -> "AsyncAPIClient":
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def open(self) -> None:
+        """Создание сессии и пула соединений (вызывается внутри event loop)."""
+        if self._session is not None:
+            return
+        connector = aiohttp.TCPConnector(limit=self.concurrency, keepalive_timeout=60)
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=self.timeout,
+            headers={
+                "Content-Type": "application/json",
+                "Accept": "application/json"
+            }
+        )
+        if self.controller is not None:
+            self._limiter = AsyncConcurrencyLimiter(self.controller)
+        else:
+            self._limiter = asyncio.Semaphore(self.concurrency)
+
+    async def close(self) -> None:
+        """Закрытие сессии и всех соединений пула."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None:
+            raise RuntimeError("AsyncAPIClient не открыт: используйте 'async with' или open()")
+        return self._session
+
+    async def request(self, method: str, path: str, **kwargs) -> AsyncResponse:
+        """Выполнение запроса с учётом ограничения конкурентности и частоты."""
+        session = self.session
+        url = f"{self.base_url}{path}"
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire_async()
+        async with self._limiter:
+            started = time.monotonic()
+            try:
+                async with session.request(method, url, **kwargs) as response:
+                    content = await response.read()
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                if self.controller is not None:
+                    self.controller.record(started, None)
+                raise
+            elapsed = time.monotonic() - started
+            if self.controller is not None:
+                self.controller.record(started, response.status)
+        return AsyncResponse(method, url, response.status, dict(response.headers),
+                             content, elapsed)
+
+    async def create_item(self, data: Dict[str, Any]) -> AsyncResponse:
+        """Создание объявления POST /api/1/item"""
+        return await self.request("POST", "/api/1/item", json=data)
+
+    async def get_item(self, item_id: str) -> AsyncResponse:
+        """Получение объявления по ID GET /api/1/item/{id}"""
+        return await self.request("GET", f"/api/1/item/{item_id}")
+
+    async def get_seller_items(self, seller_id: int) -> AsyncResponse:
+        """Получение всех объявлений продавца GET /api/1/{sellerID}/item"""
+        return await self.request("GET", f"/api/1/{seller_id}/item")
+
+    async def get_statistic(self, item_id: str) -> AsyncResponse:
+        """Получение статистики объявления GET /api/1/statistic/{id}"""
+        return await self.request("GET", f"/api/1/statistic/{item_id}")
+
+    async def delete_item(self, item_id: str) -> AsyncResponse:
+        """Удаление объявления DELETE /api/2/item/{id}"""
+        return await self.request("DELETE", f"/api/2/item/{item_id}")
+
+    async def create_items(self, items: Iterable[Dict[str, Any]]) -> List[AsyncResponse]:
+        """Пакетное создание объявлений. Порядок ответов совпадает с порядком данных."""
+        return await asyncio.gather(*(self.create_item(data) for data in items))
+
+    async def get_items(self, item_ids: Iterable[str]) -> List[AsyncResponse]:
+        """Пакетное получение объявлений по ID."""
+        return await asyncio.gather(*(self.get_item(item_id) for item_id in item_ids))
+
+    async def get_statistics(self, item_ids: Iterable[str]) -> List[AsyncResponse]:
+        """Пакетное получение статистики объявлений."""
+        return await asyncio.gather(*(self.get_statistic(item_id) for item_id in item_ids))
+
+    async def delete_items(self, item_ids: Iterable[str]) -> List[AsyncResponse]:
+        """
+        Пакетное удаление объявлений.
+        Ошибки соединения не прерывают пакет: они возвращаются на месте ответа.
+        """
+        return await asyncio.gather(*(self.delete_item(item_id) for item_id in item_ids),
+                                    return_exceptions=True)
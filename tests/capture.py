@@ -0,0 +1,351 @@
+"""
+Выборочная запись запросов при долгой нагрузке в фиксированном объёме памяти.
+
+Адаптер CaptureAdapter монтируется в сессию APIClient поверх уже
+смонтированных адаптеров и передаёт каждый обмен в RequestCapture, которая
+хранит полностью (метод, URL, заголовки, тела, код, время) только:
+
+- неуспешные запросы (код >= 400 или ошибка транспорта) — первые failures_cap;
+- top_k самых медленных запросов каждого эндпоинта (куча по времени);
+- равномерную выборку остальных — reservoir sampling (алгоритм R) на
+  reservoir_size записей.
+
+Эндпоинты группируются по шаблону (http_timing.endpoint_template), тела
+обрезаются до body_limit байт, поэтому память ограничена независимо от числа
+запросов и длительности прогона. Запись собирается только для запроса, который
+попадает хотя бы в одну из групп: остальные стоят счётчика и одного сравнения.
+
+В конце dump() пишет JSONL (по записи на строку), который можно повторить
+против любого стенда:
+
+    python -m loadgen --api-url local --duration 3600 --capture capture.jsonl
+    python -m capture capture.jsonl --api-url local
+
+Записи повторяются в исходном порядке отправки (по seq), а не по группам
+файла. Запросы с обрезанным телом не повторяются: отправить их точно нельзя.
+Объявления, созданные повтором POST /api/1/item, регистрируются в
+CleanupQueue и удаляются после повтора, как и после нагрузки loadgen.
+"""
+import argparse
+import base64
+import heapq
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import BaseAdapter
+
+from cleanup import CleanupQueue, cli_targets
+from conftest import BASE_URL, LOCAL_TARGET
+from http_timing import endpoint_template
+
+FAILURES_CAP = 1000
+TOP_K = 10
+RESERVOIR_SIZE = 500
+BODY_LIMIT = 16 * 1024
+
+KIND_FAILURE = "failure"
+KIND_SLOWEST = "slowest"
+KIND_SAMPLE = "sample"
+KINDS = (KIND_FAILURE, KIND_SLOWEST, KIND_SAMPLE)
+
+# Заголовки, которые requests выставляет сам при повторе
+_REPLAY_SKIP_HEADERS = {"host", "content-length", "transfer-encoding", "connection"}
+
+
+def _encode_body(body: Any, limit: int) -> Dict[str, Any]:
+    """Тело для JSONL: текст UTF-8 или base64, обрезанное до limit байт."""
+    if body is None:
+        return {"body": None}
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    elif not isinstance(body, (bytes, bytearray)):
+        # Потоковое тело (файл, генератор) не сохраняется
+        return {"body": None, "body_truncated": True}
+    encoded: Dict[str, Any] = {"body_size": len(body)}
+    if len(body) > limit:
+        body = body[:limit]
+        encoded["body_truncated"] = True
+    try:
+        encoded["body"] = body.decode("utf-8")
+    except UnicodeDecodeError:
+        encoded["body"] = base64.b64encode(body).decode("ascii")
+        encoded["body_encoding"] = "base64"
+    return encoded
+
+
+def _decode_body(part: Dict[str, Any]) -> Optional[bytes]:
+    body = part.get("body")
+    if body is None:
+        return None
+    if part.get("body_encoding") == "base64":
+        return base64.b64decode(body)
+    return body.encode("utf-8")
+
+
+def is_failure(status: Optional[int]) -> bool:
+    """Неуспешный обмен: ошибка транспорта или код >= 400 (как в отчёте loadgen)."""
+    return status is None or status >= 400
+
+
+@dataclass
+class _Decision:
+    """Куда попадает запрос; решается под блокировкой до сборки записи."""
+
+    seq: int
+    failure: bool = False
+    slowest: bool = False
+    sample_slot: Optional[int] = None
+
+    @property
+    def keep(self) -> bool:
+        return self.failure or self.slowest or self.sample_slot is not None
+
+
+class RequestCapture:
+    """Неудачные, самые медленные и случайные запросы в ограниченном объёме памяти."""
+
+    def __init__(self, failures_cap: int = FAILURES_CAP, top_k: int = TOP_K,
+                 reservoir_size: int = RESERVOIR_SIZE, body_limit: int = BODY_LIMIT,
+                 seed: Optional[int] = None):
+        self.failures_cap = failures_cap
+        self.top_k = top_k
+        self.reservoir_size = reservoir_size
+        self.body_limit = body_limit
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.seen = 0
+        self.failures: List[Dict[str, Any]] = []
+        self.failures_seen = 0
+        # Куча (мс, seq, запись): в вершине — самый быстрый из сохранённых
+        self.slowest: Dict[str, List[Tuple[float, int, Dict[str, Any]]]] = {}
+        self.sample: List[Dict[str, Any]] = []
+        self.sample_seen = 0
+
+    def install(self, session: requests.Session) -> None:
+        for prefix in ("http://", "https://"):
+            session.mount(prefix, CaptureAdapter(self, session.get_adapter(prefix)))
+
+    def _decide(self, endpoint: str, status: Optional[int], elapsed_ms: float) -> _Decision:
+        with self._lock:
+            self.seen += 1
+            decision = _Decision(self.seen)
+            if is_failure(status):
+                self.failures_seen += 1
+                decision.failure = len(self.failures) < self.failures_cap
+            else:
+                self.sample_seen += 1
+                if len(self.sample) < self.reservoir_size:
+                    decision.sample_slot = len(self.sample)
+                    self.sample.append({})
+                else:
+                    slot = self._random.randrange(self.sample_seen)
+                    if slot < self.reservoir_size:
+                        decision.sample_slot = slot
+            heap = self.slowest.get(endpoint)
+            decision.slowest = self.top_k > 0 and (
+                heap is None or len(heap) < self.top_k or elapsed_ms > heap[0][0])
+            return decision
+
+    def _store(self, decision: _Decision, endpoint: str, record: Dict[str, Any]) -> None:
+        with self._lock:
+            if decision.failure and len(self.failures) < self.failures_cap:
+                self.failures.append(record)
+            if decision.sample_slot is not None:
+                self.sample[decision.sample_slot] = record
+            if decision.slowest:
+                heap = self.slowest.setdefault(endpoint, [])
+                entry = (record["elapsed_ms"], decision.seq, record)
+                if len(heap) < self.top_k:
+                    heapq.heappush(heap, entry)
+                elif entry[0] > heap[0][0]:
+                    heapq.heapreplace(heap, entry)
+
+    def observe(self, request: requests.PreparedRequest, response: Optional[requests.Response],
+                started_at: float, elapsed: float, error: Optional[BaseException] = None) -> None:
+        """Учесть обмен; запись собирается, только если она будет сохранена."""
+        endpoint = endpoint_template(request.url)
+        status = response.status_code if response is not None else None
+        elapsed_ms = elapsed * 1000
+        decision = self._decide(endpoint, status, elapsed_ms)
+        if not decision.keep:
+            return
+        parts = urlsplit(request.url)
+        record: Dict[str, Any] = {
+            "seq": decision.seq,
+            "started_at": started_at,
+            "endpoint": endpoint,
+            "method": request.method,
+            "url": request.url,
+            "path": parts.path + (f"?{parts.query}" if parts.query else ""),
+            "status": status,
+            "elapsed_ms": elapsed_ms,
+            "error": f"{type(error).__name__}: {error}" if error is not None else None,
+            "request": {"headers": dict(request.headers), **_encode_body(request.body, self.body_limit)},
+            "response": None,
+        }
+        if response is not None:
+            record["ttfb_ms"] = response.elapsed.total_seconds() * 1000
+            # stream=True: тело не читается, чтобы не менять поведение вызывающего кода
+            content = response.content if response._content_consumed else None
+            record["response"] = {"headers": dict(response.headers), **_encode_body(content, self.body_limit)}
+        self._store(decision, endpoint, record)
+
+    def records(self) -> List[Dict[str, Any]]:
+        """Сохранённые записи без повторов: неудачные, самые медленные, выборка."""
+        with self._lock:
+            groups = [
+                (KIND_FAILURE, list(self.failures)),
+                (KIND_SLOWEST, [r for heap in self.slowest.values()
+                                for _, _, r in sorted(heap, key=lambda e: (-e[0], e[1]))]),
+                (KIND_SAMPLE, sorted((r for r in self.sample if r), key=lambda r: r["seq"])),
+            ]
+        result, taken = [], set()
+        for kind, group in groups:
+            for record in group:
+                if record["seq"] not in taken:
+                    taken.add(record["seq"])
+                    result.append({"kind": kind, **record})
+        return result
+
+    def dump(self, path: str) -> int:
+        """Записать JSONL; возвращает число записей."""
+        records = self.records()
+        with open(path, "w", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        return len(records)
+
+    def summary(self) -> str:
+        with self._lock:
+            slowest = sum(len(heap) for heap in self.slowest.values())
+            return (f"Запросов {self.seen}: неудачных сохранено {len(self.failures)} из {self.failures_seen}, "
+                    f"самых медленных {slowest} ({len(self.slowest)} эндпоинтов), "
+                    f"выборка {sum(1 for r in self.sample if r)} из {self.sample_seen}")
+
+
+class CaptureAdapter(BaseAdapter):
+    """Адаптер requests: передача обменов в RequestCapture поверх вложенного адаптера."""
+
+    def __init__(self, capture: RequestCapture, inner: BaseAdapter):
+        super().__init__()
+        self.capture = capture
+        self.inner = inner
+
+    def send(self, request: requests.PreparedRequest, stream: bool = False, **kwargs) -> requests.Response:
+        started_at = time.time()
+        started = time.perf_counter()
+        try:
+            response = self.inner.send(request, stream=stream, **kwargs)
+            if not stream:
+                response.content
+        except Exception as e:
+            self.capture.observe(request, None, started_at, time.perf_counter() - started, e)
+            raise
+        self.capture.observe(request, response, started_at, time.perf_counter() - started)
+        return response
+
+    def close(self) -> None:
+        self.inner.close()
+
+
+def load_records(path: str) -> List[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+@dataclass
+class ReplayResult:
+    """Повтор одной записи: исходные и новые код и время."""
+
+    record: Dict[str, Any]
+    status: Optional[int] = None
+    elapsed_ms: Optional[float] = None
+    error: Optional[str] = None
+    skipped: bool = False
+
+
+def _created_id(response: requests.Response) -> Optional[str]:
+    try:
+        item_id = response.json().get("id")
+    except (ValueError, AttributeError):
+        return None
+    return item_id if isinstance(item_id, str) and item_id else None
+
+
+def replay(records: Iterable[Dict[str, Any]], base_url: str,
+           session: Optional[requests.Session] = None, timeout: float = 30.0,
+           cleanup: Optional[CleanupQueue] = None) -> List[ReplayResult]:
+    """
+    Повторить записи против base_url в порядке исходной отправки (seq);
+    обрезанные тела пропускаются. Объявления, созданные повтором, передаются
+    в cleanup.
+    """
+    session = session or requests.Session()
+    base_url = base_url.rstrip("/")
+    results = []
+    for record in sorted(records, key=lambda r: r["seq"]):
+        result = ReplayResult(record)
+        results.append(result)
+        if record["request"].get("body_truncated"):
+            result.skipped = True
+            continue
+        headers = {k: v for k, v in record["request"]["headers"].items()
+                   if k.lower() not in _REPLAY_SKIP_HEADERS}
+        started = time.perf_counter()
+        try:
+            response = session.request(record["method"], base_url + record["path"], headers=headers,
+                                        data=_decode_body(record["request"]), timeout=timeout)
+        except requests.RequestException as e:
+            result.error = type(e).__name__
+        else:
+            result.status = response.status_code
+            if (cleanup is not None and record["method"] == "POST" and response.status_code == 200
+                    and record["endpoint"] == "/api/1/item"):
+                item_id = _created_id(response)
+                if item_id:
+                    cleanup.register(base_url, item_id)
+        result.elapsed_ms = (time.perf_counter() - started) * 1000
+    return results
+
+
+def format_replay(results: List[ReplayResult]) -> str:
+    header = f"{'kind':<9}{'method':<8}{'endpoint':<28}{'было':>14}{'стало':>14}"
+    lines = [header, "-" * len(header)]
+    for r in results:
+        record = r.record
+
+        def outcome(status: Optional[int], error: Optional[str], ms: Optional[float]) -> str:
+            code = str(status) if status is not None else (error or "-").split(":")[0]
+            return f"{code} {ms:.0f}мс" if ms is not None else code
+
+        before = outcome(record["status"], record.get("error"), record["elapsed_ms"])
+        after = "пропущен" if r.skipped else outcome(r.status, r.error, r.elapsed_ms)
+        lines.append(f"{record['kind']:<9}{record['method']:<8}{record['endpoint']:<28}{before:>14}{after:>14}")
+    changed = sum(1 for r in results if not r.skipped and r.status != r.record["status"])
+    lines.append(f"Повторено {sum(1 for r in results if not r.skipped)} из {len(results)}, "
+                 f"код ответа изменился у {changed}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Повтор запросов, сохранённых loadgen --capture")
+    parser.add_argument("path", help="JSONL-файл записи")
+    parser.add_argument("--api-url", default=BASE_URL,
+                        help=f"Базовый URL API или '{LOCAL_TARGET}' для локальной замены")
+    parser.add_argument("--kinds", nargs="+", choices=KINDS, default=list(KINDS))
+    args = parser.parse_args(argv)
+
+    records = [r for r in load_records(args.path) if r["kind"] in args.kinds]
+    with cli_targets(args.api_url) as ([base_url], cleanup):
+        results = replay(records, base_url, cleanup=cleanup)
+    print(format_replay(results))
+
+
+if __name__ == "__main__":
+    main()
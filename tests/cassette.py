@@ -0,0 +1,310 @@
+"""
+Запись и воспроизведение трафика APIClient (кассеты).
+
+--cassette-mode=record: запросы идут в реальный сервис, каждая пара
+запрос/ответ сохраняется в кассету (JSONL). Если кассета уже была, новые
+ответы сравниваются со старыми и расхождения выводятся в конце сессии.
+
+--cassette-mode=replay: сеть не используется, ответы берутся из кассеты
+по отпечатку запроса: id теста, метод, путь, тело и порядковый номер
+одинакового запроса внутри теста.
+
+Динамические значения нормализуются в пределах теста: sellerID заменяются
+токенами <seller:N> в порядке появления (в ответе подставляется sellerID
+текущего запуска), ID объявлений в путях — токенами <item:N>. Для сравнения
+ответов дополнительно скрываются id и createdAt. Normalizer и parse_json
+используются и при сравнении стендов (fanout).
+"""
+import difflib
+import hashlib
+import json
+import re
+import threading
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+MODE_OFF = "off"
+MODE_RECORD = "record"
+MODE_REPLAY = "replay"
+MODES = (MODE_OFF, MODE_RECORD, MODE_REPLAY)
+DEFAULT_CASSETTE = Path(__file__).resolve().parent / "cassettes" / "api.jsonl"
+
+SELLER_KEYS = ("sellerID", "sellerId")
+SELLER_PATH_RE = re.compile(r"^(/api/1/)(-?\d+)(/item)$")
+ITEM_PATH_RE = re.compile(r"^(/api/\d/(?:item|statistic)/)([^/]+)$")
+TOKEN_RE = re.compile(r"^<seller:(\d+)>$")
+
+
+class CassetteMiss(requests.ConnectionError):
+    """В кассете нет ответа на запрос (нужно перезаписать кассету)."""
+
+
+class Normalizer:
+    """Токены динамических значений в пределах одного теста."""
+
+    def __init__(self):
+        self.sellers: Dict[int, str] = {}
+        self.items: Dict[str, str] = {}
+        self.occurrences: Dict[str, int] = {}
+
+    def seller_token(self, value: int) -> str:
+        return self.sellers.setdefault(value, f"<seller:{len(self.sellers)}>")
+
+    def item_token(self, value: str) -> str:
+        return self.items.setdefault(value, f"<item:{len(self.items)}>")
+
+    def seller_value(self, token: str) -> Any:
+        for value, known in self.sellers.items():
+            if known == token:
+                return value
+        return token
+
+    def path(self, path: str) -> str:
+        match = SELLER_PATH_RE.match(path)
+        if match:
+            return f"{match.group(1)}{self.seller_token(int(match.group(2)))}{match.group(3)}"
+        match = ITEM_PATH_RE.match(path)
+        if match:
+            return f"{match.group(1)}{self.item_token(match.group(2))}"
+        return path
+
+    def sellers_to_tokens(self, data: Any) -> Any:
+        """sellerID -> <seller:N>; id объявлений регистрируются для путей."""
+        if isinstance(data, list):
+            return [self.sellers_to_tokens(v) for v in data]
+        if not isinstance(data, dict):
+            return data
+        result = {}
+        for key, value in data.items():
+            if key in SELLER_KEYS and isinstance(value, int) and not isinstance(value, bool):
+                result[key] = self.seller_token(value)
+            else:
+                if key == "id" and isinstance(value, str):
+                    self.item_token(value)
+                result[key] = self.sellers_to_tokens(value)
+        return result
+
+    def tokens_to_sellers(self, data: Any) -> Any:
+        if isinstance(data, list):
+            return [self.tokens_to_sellers(v) for v in data]
+        if isinstance(data, dict):
+            return {k: self.tokens_to_sellers(v) for k, v in data.items()}
+        if isinstance(data, str) and TOKEN_RE.match(data):
+            return self.seller_value(data)
+        return data
+
+    def for_diff(self, data: Any) -> Any:
+        """Дополнительно скрывает id и createdAt для сравнения ответов."""
+        if isinstance(data, list):
+            return [self.for_diff(v) for v in data]
+        if not isinstance(data, dict):
+            return data
+        result = {}
+        for key, value in data.items():
+            if key == "id" and isinstance(value, str):
+                result[key] = self.item_token(value)
+            elif key == "createdAt":
+                result[key] = "<createdAt>"
+            else:
+                result[key] = self.for_diff(value)
+        return result
+
+
+def parse_json(content: Optional[bytes]) -> Tuple[bool, Any]:
+    """(True, данные), если тело — JSON; иначе (False, None)."""
+    if not content:
+        return False, None
+    try:
+        return True, json.loads(content)
+    except ValueError:
+        return False, None
+
+
+class Cassette:
+    """Индексированное хранилище записанных взаимодействий."""
+
+    def __init__(self, path: Path, mode: str):
+        self.path = Path(path)
+        self.mode = mode
+        self._lock = threading.Lock()
+        self.index: Dict[str, Dict[str, Any]] = {}
+        self.recorded: List[Dict[str, Any]] = []
+        self.drift: List[str] = []
+        self.misses: List[str] = []
+        self.current_test = "<session>"
+        self._normalizers: Dict[str, Normalizer] = {}
+        if self.path.exists():
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self.index[entry["fp"]] = entry
+
+    def start_test(self, nodeid: str) -> None:
+        self.current_test = nodeid
+        self._normalizers[nodeid] = Normalizer()
+
+    def _normalizer(self) -> Normalizer:
+        return self._normalizers.setdefault(self.current_test, Normalizer())
+
+    def fingerprint(self, request: requests.PreparedRequest) -> Tuple[str, Dict[str, Any]]:
+        normalizer = self._normalizer()
+        path = normalizer.path(urlsplit(request.url).path)
+        body = request.body.encode("utf-8") if isinstance(request.body, str) else request.body
+        is_json, data = parse_json(body)
+        normalized_body = normalizer.sellers_to_tokens(data) if is_json else (body or b"").decode("utf-8", "replace")
+        key = json.dumps([self.current_test, request.method, path, normalized_body],
+                         ensure_ascii=False, sort_keys=True)
+        occurrence = normalizer.occurrences.get(key, 0)
+        normalizer.occurrences[key] = occurrence + 1
+        fp = hashlib.sha1(f"{key}#{occurrence}".encode("utf-8")).hexdigest()
+        return fp, {"method": request.method, "path": path, "body": normalized_body}
+
+    def record(self, request: requests.PreparedRequest, response: requests.Response) -> None:
+        fp, normalized_request = self.fingerprint(request)
+        normalizer = self._normalizer()
+        is_json, data = parse_json(response.content)
+        entry = {
+            "fp": fp,
+            "test": self.current_test,
+            "request": normalized_request,
+            "response": {
+                "status": response.status_code,
+                "content_type": response.headers.get("Content-Type"),
+                "json": normalizer.sellers_to_tokens(data) if is_json else None,
+                "text": None if is_json else response.text,
+            },
+        }
+        with self._lock:
+            previous = self.index.get(fp)
+            if previous is not None:
+                self._compare(previous, entry)
+            self.recorded.append(entry)
+
+    def _compare(self, previous: Dict[str, Any], entry: Dict[str, Any]) -> None:
+        def view(e: Dict[str, Any]) -> List[str]:
+            response = e["response"]
+            body = Normalizer().for_diff(response["json"]) if response["json"] is not None else response["text"]
+            return json.dumps({"status": response["status"], "body": body},
+                              ensure_ascii=False, indent=2, sort_keys=True).splitlines()
+
+        old, new = view(previous), view(entry)
+        if old != new:
+            request = entry["request"]
+            header = f"{entry['test']}: {request['method']} {request['path']}"
+            diff = difflib.unified_diff(old, new, "кассета", "сервис", lineterm="")
+            self.drift.append(header + "\n" + "\n".join(diff))
+
+    def replay(self, request: requests.PreparedRequest) -> requests.Response:
+        fp, normalized_request = self.fingerprint(request)
+        entry = self.index.get(fp)
+        if entry is None:
+            message = (f"{self.current_test}: {normalized_request['method']} "
+                       f"{normalized_request['path']} нет в кассете {self.path}")
+            self.misses.append(message)
+            raise CassetteMiss(message, request=request)
+
+        stored = entry["response"]
+        normalizer = self._normalizer()
+        if stored["json"] is not None:
+            # id объявлений из записанного ответа регистрируются для следующих путей
+            normalizer.sellers_to_tokens(stored["json"])
+            content = json.dumps(normalizer.tokens_to_sellers(stored["json"]), ensure_ascii=False).encode("utf-8")
+        else:
+            content = (stored["text"] or "").encode("utf-8")
+
+        response = requests.Response()
+        response.status_code = stored["status"]
+        response._content = content
+        # Тело уже прочитано: iter_content (stream=True) отдаёт его из памяти
+        response._content_consumed = True
+        response.headers = CaseInsensitiveDict()
+        if stored["content_type"]:
+            response.headers["Content-Type"] = stored["content_type"]
+        response.encoding = "utf-8"
+        response.url = request.url
+        response.request = request
+        response.elapsed = timedelta(0)
+        return response
+
+    def save(self) -> None:
+        """Запись кассеты (только в режиме record)."""
+        if self.mode != MODE_RECORD:
+            return
+        # Записи тестов, которые в этот раз не запускались, сохраняются
+        recorded_tests = {entry["test"] for entry in self.recorded}
+        kept = [entry for entry in self.index.values() if entry["test"] not in recorded_tests]
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for entry in kept + self.recorded:
+                f.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+        tmp_path.replace(self.path)
+
+
+class CassetteAdapter(BaseAdapter):
+    """Адаптер requests: запись через вложенный адаптер или воспроизведение."""
+
+    def __init__(self, cassette: Cassette, inner: BaseAdapter):
+        super().__init__()
+        self.cassette = cassette
+        self.inner = inner
+
+    def send(self, request: requests.PreparedRequest, stream: bool = False, **kwargs) -> requests.Response:
+        if self.cassette.mode == MODE_REPLAY:
+            return self.cassette.replay(request)
+        response = self.inner.send(request, stream=False, **kwargs)
+        self.cassette.record(request, response)
+        return response
+
+    def close(self) -> None:
+        self.inner.close()
+
+
+class CassettePlugin:
+    """Pytest-плагин: привязка запросов к тестам, сохранение кассеты и отчёт."""
+
+    def __init__(self, path: Path, mode: str):
+        self.cassette = Cassette(path, mode)
+
+    @property
+    def mode(self) -> str:
+        return self.cassette.mode
+
+    def install(self, session: requests.Session) -> None:
+        """Подключение кассеты поверх уже смонтированных адаптеров сессии."""
+        for prefix in ("http://", "https://"):
+            session.mount(prefix, CassetteAdapter(self.cassette, session.get_adapter(prefix)))
+
+    def pytest_collection_modifyitems(self, items) -> None:
+        skip = pytest.mark.skip(reason="Трафик AsyncAPIClient не записывается в кассету")
+        for item in items:
+            if "async_api_client" in getattr(item, "fixturenames", ()):
+                item.add_marker(skip)
+
+    def pytest_runtest_logstart(self, nodeid: str) -> None:
+        self.cassette.start_test(nodeid)
+
+    def pytest_sessionfinish(self) -> None:
+        self.cassette.save()
+
+    def pytest_terminal_summary(self, terminalreporter) -> None:
+        cassette = self.cassette
+        terminalreporter.section(f"Кассета ({cassette.mode})")
+        if cassette.mode == MODE_RECORD:
+            terminalreporter.write_line(f"Записано взаимодействий: {len(cassette.recorded)} -> {cassette.path}")
+            if cassette.drift:
+                terminalreporter.write_line(f"Ответы сервиса изменились ({len(cassette.drift)}):")
+                for diff in cassette.drift:
+                    terminalreporter.write_line(diff)
+        else:
+            terminalreporter.write_line(f"Взаимодействий в кассете: {len(cassette.index)}")
+            for miss in cassette.misses:
+                terminalreporter.write_line(f"Нет в кассете: {miss}")
@@ -0,0 +1,308 @@
+"""
+Отложенное конкурентное удаление созданных объявлений.
+
+APIClient сообщает очереди о каждом созданном объявлении (register), очередь
+записывает его в журнал на диске и удаляет в фоновом пуле потоков: по окончании
+каждого теста (flush) и окончательно в конце сессии (close).
+
+Журнал — append-only JSONL отдельный для каждого процесса. Процесс держит
+блокировку своего журнала, поэтому журнал без блокировки означает, что его
+процесс завершился, не удалив всё (например, упал). Такие журналы подбираются
+при следующем запуске (replay), и оставшиеся объявления удаляются.
+
+С registry (ItemRegistry) очередь не держит свой словарь ожидающих удаления:
+объявления, уже учтённые в реестре, удаляются по registry.ids() при drain/close
+(не при flush — реестр нужен для сверки до конца нагрузки). Так длительный
+прогон хранит каждое объявление один раз, в компактном реестре.
+
+CLI-инструменты получают стенды и очередь через cli_targets: локальная
+замена запускается сама, журнал ведётся только для удалённых стендов.
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple, Union
+
+import requests
+
+from item_registry import ItemRegistry
+from local_server import LOCAL_TARGET, LocalAPIServer
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+DEFAULT_WORKERS = 8
+DELETE_TIMEOUT = 10.0
+# Удаления из реестра ставятся в пул порциями: без Future на каждое объявление сразу
+REGISTRY_BATCH = 1000
+JOURNAL_GLOB = "journal-*.jsonl"
+DEFAULT_JOURNAL_DIR = Path(__file__).resolve().parent.parent / ".pytest_cache" / "d" / "cleanup"
+
+# Статусы, после которых объявление удалять больше не нужно
+GONE_STATUSES = (200, 400, 404)
+
+
+def _try_lock(file) -> bool:
+    """Неблокирующая эксклюзивная блокировка открытого файла."""
+    try:
+        if fcntl is not None:
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            file.seek(0)
+            msvcrt.locking(file.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        return False
+    return True
+
+
+def _read_pending(path: Path) -> Dict[str, str]:
+    """Объявления из журнала, созданные, но не удалённые: {id: base_url}."""
+    pending: Dict[str, str] = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # недописанная строка упавшего процесса
+            if entry.get("op") == "create":
+                pending[entry["id"]] = entry["url"]
+            elif entry.get("op") == "delete":
+                pending.pop(entry["id"], None)
+    return pending
+
+
+class CleanupJournal:
+    """Журнал созданных и удалённых объявлений текущего процесса."""
+
+    def __init__(self, directory: Union[str, Path]):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.path = self.directory / f"journal-{os.getpid()}-{uuid.uuid4().hex[:8]}.jsonl"
+        self._lock = threading.Lock()
+        self._file = open(self.path, "a", encoding="utf-8")
+        _try_lock(self._file)
+
+    def _append(self, entry: Dict[str, str]) -> None:
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+    def record_created(self, base_url: str, item_id: str) -> None:
+        self._append({"op": "create", "url": base_url, "id": item_id})
+
+    def record_deleted(self, item_id: str) -> None:
+        self._append({"op": "delete", "id": item_id})
+
+    def claim_orphans(self) -> Iterator[Tuple[Path, Dict[str, str]]]:
+        """
+        Журналы завершившихся процессов (их блокировка свободна) и их неудалённые
+        объявления. Блокировка журнала держится, пока вызывающий код переносит
+        объявления к себе; затем журнал удаляется — так два одновременных запуска
+        не подберут один журнал дважды.
+        """
+        for path in sorted(self.directory.glob(JOURNAL_GLOB)):
+            if path == self.path:
+                continue
+            try:
+                f = open(path, encoding="utf-8")
+            except FileNotFoundError:
+                continue  # подобран другим процессом
+            with f:
+                if not _try_lock(f):
+                    continue
+                try:
+                    claimed = os.fstat(f.fileno()).st_ino == os.stat(path).st_ino
+                except FileNotFoundError:
+                    claimed = False
+                if not claimed:
+                    continue  # удалён другим процессом, пока ждали блокировку
+                yield path, _read_pending(path)
+                path.unlink(missing_ok=True)
+
+    def close(self, pending: Dict[str, str]) -> None:
+        """Закрытие журнала: без неудалённых объявлений файл удаляется, иначе сжимается."""
+        with self._lock:
+            self._file.close()
+            if not pending:
+                self.path.unlink(missing_ok=True)
+                return
+            tmp_path = self.path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for item_id, base_url in pending.items():
+                    f.write(json.dumps({"op": "create", "url": base_url, "id": item_id},
+                                       ensure_ascii=False) + "\n")
+            os.replace(tmp_path, self.path)
+
+
+class CleanupQueue:
+    """Очередь фонового удаления объявлений."""
+
+    def __init__(self, journal: Optional[CleanupJournal] = None, workers: int = DEFAULT_WORKERS,
+                 registry: Optional[ItemRegistry] = None):
+        self.journal = journal
+        self.registry = registry
+        # Стенд объявлений реестра: реестр не хранит base_url
+        self._registry_url: Optional[str] = None
+        self._executor = ThreadPoolExecutor(workers, thread_name_prefix="cleanup")
+        self._local = threading.local()
+        self._lock = threading.RLock()
+        self._pending: Dict[str, str] = {}
+        self._new: List[Tuple[str, str]] = []
+        self._futures: Set[Future] = set()
+        self._closed = False
+        self.deleted = 0
+        self.failed = 0
+
+    def register(self, base_url: str, item_id: str) -> None:
+        """Регистрация созданного объявления (удаление — при flush/close)."""
+        if not item_id:
+            return
+        if self.journal is not None:
+            self.journal.record_created(base_url, item_id)
+        with self._lock:
+            if self.registry is not None and self._registry_url in (None, base_url) and item_id in self.registry:
+                self._registry_url = base_url
+                return
+            self._pending[item_id] = base_url
+            self._new.append((base_url, item_id))
+
+    def mark_deleted(self, item_id: str) -> None:
+        """Объявление уже удалено (например, самим тестом)."""
+        with self._lock:
+            known = self._pending.pop(item_id, None) is not None
+        if not known and self.registry is not None and self._registry_url is not None:
+            known = self.registry.discard(item_id)
+        if known and self.journal is not None:
+            self.journal.record_deleted(item_id)
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+            session.headers.update({"Accept": "application/json"})
+        return session
+
+    def _delete(self, base_url: str, item_id: str) -> None:
+        try:
+            response = self._session().delete(f"{base_url}/api/2/item/{item_id}",
+                                               timeout=DELETE_TIMEOUT)
+        except requests.RequestException:
+            with self._lock:
+                self.failed += 1
+            return
+        if response.status_code in GONE_STATUSES:
+            with self._lock:
+                self.deleted += 1
+            self.mark_deleted(item_id)
+        else:
+            with self._lock:
+                self.failed += 1
+
+    def flush(self) -> None:
+        """Запуск фонового удаления объявлений, зарегистрированных с прошлого flush."""
+        with self._lock:
+            if self._closed:
+                return
+            batch, self._new = self._new, []
+            for base_url, item_id in batch:
+                future = self._executor.submit(self._delete, base_url, item_id)
+                self._futures.add(future)
+                future.add_done_callback(self._discard)
+
+    def _discard(self, future: Future) -> None:
+        with self._lock:
+            self._futures.discard(future)
+
+    def drain(self, timeout: Optional[float] = None) -> None:
+        """Удаление всех зарегистрированных объявлений с ожиданием завершения."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        self.flush()
+        with self._lock:
+            futures = list(self._futures)
+        wait(futures, timeout=timeout)
+        if self.registry is not None and self._registry_url is not None and not self._closed:
+            self._drain_registry(deadline)
+
+    def _drain_registry(self, deadline: Optional[float]) -> None:
+        batch: List[Future] = []
+        for item_id in self.registry.ids():
+            batch.append(self._executor.submit(self._delete, self._registry_url, item_id))
+            if len(batch) < REGISTRY_BATCH:
+                continue
+            wait(batch, timeout=None if deadline is None else max(0.0, deadline - time.monotonic()))
+            batch = []
+            if deadline is not None and time.monotonic() >= deadline:
+                return
+        wait(batch, timeout=None if deadline is None else max(0.0, deadline - time.monotonic()))
+
+    def replay(self) -> int:
+        """Перенос неудалённых объявлений из журналов завершившихся процессов в очередь."""
+        if self.journal is None:
+            return 0
+        count = 0
+        for _, pending in self.journal.claim_orphans():
+            # register записывает объявления в свой журнал до удаления чужого
+            for item_id, base_url in pending.items():
+                self.register(base_url, item_id)
+                count += 1
+        self.flush()
+        return count
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Финальное удаление и закрытие журнала."""
+        self.drain(timeout)
+        with self._lock:
+            self._closed = True
+        self._executor.shutdown(wait=True)
+        if self.journal is not None:
+            with self._lock:
+                pending = dict(self._pending)
+            if self.registry is not None and self._registry_url is not None:
+                pending.update(dict.fromkeys(self.registry.ids(), self._registry_url))
+            self.journal.close(pending)
+
+    @property
+    def pending_count(self) -> int:
+        registered = len(self.registry) if self.registry is not None and self._registry_url is not None else 0
+        return len(self._pending) + registered
+
+
+@contextmanager
+def cli_targets(*targets: str, registry: Optional[ItemRegistry] = None,
+                journal_dir: Union[str, Path] = DEFAULT_JOURNAL_DIR) -> Iterator[Tuple[List[str], CleanupQueue]]:
+    """
+    Стенды и очередь удаления CLI-инструмента: (base_url стендов, очередь).
+
+    Вместо LOCAL_TARGET запускается LocalAPIServer. Если среди стендов есть
+    удалённый, очередь ведёт журнал в journal_dir и сначала удаляет
+    объявления прежних упавших запусков. После работы печатается число
+    удаляемых объявлений и очередь закрывается (при исключении объявления
+    остаются в журнале до следующего запуска); серверы останавливаются всегда.
+    """
+    servers: List[LocalAPIServer] = []
+    try:
+        base_urls = []
+        for target in targets:
+            if target == LOCAL_TARGET:
+                servers.append(LocalAPIServer().start())
+                base_urls.append(servers[-1].base_url)
+            else:
+                base_urls.append(target.rstrip("/"))
+        remote = len(servers) < len(targets)
+        cleanup = CleanupQueue(CleanupJournal(journal_dir) if remote else None, registry=registry)
+        cleanup.replay()
+        yield base_urls, cleanup
+        print(f"Удаление созданных объявлений ({cleanup.pending_count})...", flush=True)
+        cleanup.close()
+    finally:
+        for server in servers:
+            server.stop()
@@ -0,0 +1,200 @@
+"""
+Адаптивное ограничение конкурентности (AIMD) и ограничение частоты (token bucket).
+
+AIMDController подбирает допустимое число одновременных запросов по их
+результатам. Результаты собираются окнами размером с текущий предел: если
+в окне доля перегрузок (429, 5xx, ошибки соединения) не выше error_target
+и p90 задержки не выше latency_target, предел растёт на increase
+(в начале — удваивается, как slow start в TCP), иначе умножается на decrease.
+Запросы, начатые до последнего уменьшения, в решениях не учитываются:
+их задержка отражает уже снятую нагрузку.
+
+Контроллер общий для потоков и asyncio: ConcurrencyLimiter ограничивает
+потоки (loadgen), AsyncConcurrencyLimiter — корутины (AsyncAPIClient).
+
+TokenBucket выдаёт моменты отправки с фиксированной частотой; burst
+задаёт, сколько пропущенных слотов можно наверстать. С burst=math.inf
+отставание не сбрасывается никогда — открытая модель нагрузки, в которой
+задержка считается от запланированного момента (coordinated omission).
+"""
+import asyncio
+import math
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+OVERLOAD_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class AIMDController:
+    """Предел конкурентности: аддитивный рост, мультипликативное снижение."""
+
+    def __init__(self, initial: int = 4, minimum: int = 1, maximum: int = 64,
+                 increase: float = 1.0, decrease: float = 0.5,
+                 latency_target: float = 1.0, error_target: float = 0.05,
+                 slow_start: bool = True, clock: Callable[[], float] = time.monotonic):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_target = latency_target
+        self.error_target = error_target
+        self.slow_start = slow_start
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._limit = float(min(max(initial, minimum), maximum))
+        self._last_decrease = -math.inf
+        self._window_start = clock()
+        self._latencies: List[float] = []
+        self._overloads = 0
+        self.peak_limit = self.limit
+        self.decreases = 0
+        self.best_throughput = 0.0
+        self.best_throughput_limit = self.limit
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def record(self, started: float, status: Optional[int]) -> None:
+        """
+        Результат запроса, начатого в момент started (по тем же часам).
+        status=None — ошибка соединения или таймаут.
+        """
+        now = self._clock()
+        with self._lock:
+            if started < self._last_decrease:
+                return
+            self._latencies.append(now - started)
+            if status is None or status in OVERLOAD_STATUSES:
+                self._overloads += 1
+            if len(self._latencies) >= max(self.limit, 1):
+                self._close_window(now)
+
+    def _close_window(self, now: float) -> None:
+        count = len(self._latencies)
+        ordered = sorted(self._latencies)
+        p90 = ordered[min(count - 1, math.ceil(count * 0.9) - 1)]
+        overloaded = self._overloads / count > self.error_target or p90 > self.latency_target
+
+        if overloaded:
+            self._limit = max(float(self.minimum), self._limit * self.decrease)
+            self.slow_start = False
+            self._last_decrease = now
+            self.decreases += 1
+        else:
+            elapsed = now - self._window_start
+            if elapsed > 0 and count / elapsed > self.best_throughput:
+                self.best_throughput = count / elapsed
+                self.best_throughput_limit = self.limit
+            grown = self._limit * 2 if self.slow_start else self._limit + self.increase
+            self._limit = min(float(self.maximum), grown)
+            self.peak_limit = max(self.peak_limit, self.limit)
+        self._window_start = now
+        self._latencies = []
+        self._overloads = 0
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "peak_limit": self.peak_limit,
+            "decreases": self.decreases,
+            "best_throughput": self.best_throughput,
+            "best_throughput_limit": self.best_throughput_limit,
+        }
+
+
+class ConcurrencyLimiter:
+    """Ограничение числа одновременных запросов из потоков по пределу контроллера."""
+
+    def __init__(self, controller: AIMDController):
+        self.controller = controller
+        self.in_flight = 0
+        self._condition = threading.Condition()
+
+    def acquire(self) -> None:
+        with self._condition:
+            while self.in_flight >= self.controller.limit:
+                self._condition.wait()
+            self.in_flight += 1
+
+    def release(self) -> None:
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def __enter__(self) -> "ConcurrencyLimiter":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.release()
+
+
+class AsyncConcurrencyLimiter:
+    """Ограничение числа одновременных корутин по пределу контроллера."""
+
+    def __init__(self, controller: AIMDController):
+        self.controller = controller
+        self.in_flight = 0
+        self._condition: Optional[asyncio.Condition] = None
+
+    async def acquire(self) -> None:
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < self.controller.limit)
+            self.in_flight += 1
+
+    async def release(self) -> None:
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    async def __aenter__(self) -> "AsyncConcurrencyLimiter":
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.release()
+
+
+class TokenBucket:
+    """Моменты отправки с частотой rate в секунду и запасом burst слотов."""
+
+    def __init__(self, rate: float, burst: float = 1, start: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.interval = 1.0 / rate
+        self.burst = burst
+        self._clock = clock
+        self._next = clock() if start is None else start
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """
+        Следующий слот (момент отправки). Если бакет отстал больше чем на
+        burst слотов, пропущенные слоты сверх этого отбрасываются.
+        """
+        with self._lock:
+            if math.isinf(self.burst):
+                slot = self._next
+            else:
+                slot = max(self._next, self._clock() - (self.burst - 1) * self.interval)
+            self._next = slot + self.interval
+            return slot
+
+    def acquire(self) -> float:
+        """Ожидание слота в потоке; возвращает запланированный момент."""
+        slot = self.reserve()
+        delay = slot - self._clock()
+        if delay > 0:
+            time.sleep(delay)
+        return slot
+
+    async def acquire_async(self) -> float:
+        """Ожидание слота в корутине; возвращает запланированный момент."""
+        slot = self.reserve()
+        delay = slot - self._clock()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return slot
@@ -1,19 +1,94 @@
 import pytest
+import pytest_asyncio
 import requests
+import os
 import random
 import time
-from typing import Generator, Dict, Any, List
+from collections import OrderedDict
+from typing import AsyncGenerator, Generator, Dict, Any, Iterable, Iterator, List, Optional, Sequence
+
+from async_client import AsyncAPIClient
+from cassette import DEFAULT_CASSETTE, MODE_OFF, MODE_REPLAY, MODES, CassettePlugin
+from cleanup import CleanupJournal, CleanupQueue
+from faults import FaultInjector
+from http_budget import (DEFAULT_MS as DEFAULT_BUDGET_MS, DEFAULT_REQUESTS as DEFAULT_BUDGET_REQUESTS,
+                         MODE_FAIL as BUDGET_FAIL, MODES as BUDGET_MODES, Budget, HttpBudgetPlugin,
+                         poll_retry)
+from item_pool import DEFAULT_POOL_SIZE, ItemPool
+from item_registry import ItemRegistry
+from json_stream import iter_array
+from local_server import LOCAL_TARGET, LocalAPIServer
+from perf import DEFAULT_DB as DEFAULT_PERF_DB, DEFAULT_MIN_EFFECT
+from perf_plugin import PerfPlugin, perf_selected
+from polling import DEFAULT_TIMEOUT, LAG_STATS, LagStats, eventually
+from response_cache import SELLER_ITEMS, ResponseCache
+from scheduling import SCHEDULE_HISTORY, SCHEDULES, SchedulingPlugin
+from schemas import SchemaValidationError, load_validators
+import seller_ids
+from timing_plugin import HttpTimingPlugin
 
 BASE_URL = "https://qa-internship.avito.com"
+STREAM_CHUNK_SIZE = 16 * 1024
 SELLER_ID_MIN = 111111
 SELLER_ID_MAX = 999999
+# Инструменты нагрузки берут sellerID из верхней части диапазона со своим курсором:
+# их расход (тысячи продавцов за прогон) не исчерпывает диапазон тестов
+LOAD_SELLER_ID_MIN = 500000
+LOAD_SELLER_IDS_STATE = seller_ids.DEFAULT_STATE_PATH.with_name("load.json")
+# Таймауты HTTP-запросов APIClient, секунды: без них одно зависшее соединение
+# останавливает весь прогон
+DEFAULT_HTTP_TIMEOUT = 30.0
+CONNECT_TIMEOUT = 5.0
+
+
+class TimeoutSession(requests.Session):
+    """Сессия requests с таймаутом по умолчанию для запросов, где он не указан."""
+    
+    def __init__(self, timeout):
+        super().__init__()
+        self.timeout = timeout
+    
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return super().request(method, url, **kwargs)
 
 class APIClient:
-    """Клиент для работы с API Avito."""
+    """
+    Клиент для работы с API Avito.
+    
+    Если передана очередь cleanup, каждое созданное объявление регистрируется
+    в ней и будет удалено в фоне (см. cleanup.CleanupQueue).
+    
+    Если передан registry, созданные объявления учитываются в компактном
+    реестре для последующей сверки (см. item_registry.py), удалённые — снимаются.
     
-    def __init__(self, base_url: str):
+    Методы wait_* ждут, пока созданные объявления станут видны при чтении,
+    и записывают наблюдаемую задержку в lag_stats (см. polling.py).
+    
+    Если передан cache, GET-запросы чтения идут через него (см. response_cache.py);
+    создание сбрасывает список продавца, удаление — объявление, его статистику
+    и список продавца-владельца.
+    
+    timeout — таймаут чтения каждого запроса (соединения — не больше CONNECT_TIMEOUT).
+    """
+    
+    # Сколько последних созданных объявлений помнить для замера задержки
+    # и поиска продавца-владельца при инвалидации кэша
+    CREATED_AT_LIMIT = 10000
+    
+    def __init__(self, base_url: str, cleanup: Optional[CleanupQueue] = None,
+                 poll_timeout: float = DEFAULT_TIMEOUT, lag_stats: Optional[LagStats] = None,
+                 cache: Optional[ResponseCache] = None, timeout: float = DEFAULT_HTTP_TIMEOUT,
+                 registry: Optional[ItemRegistry] = None):
         self.base_url = base_url
-        self.session = requests.Session()
+        self.cleanup = cleanup
+        self.registry = registry
+        self.poll_timeout = poll_timeout
+        self.lag_stats = LAG_STATS if lag_stats is None else lag_stats
+        self.cache = cache
+        self._created_at: "OrderedDict[str, float]" = OrderedDict()
+        self._item_sellers: "OrderedDict[str, int]" = OrderedDict()
+        self.session = TimeoutSession((min(CONNECT_TIMEOUT, timeout), timeout))
         self.session.headers.update({
             "Content-Type": "application/json",
             "Accept": "application/json"
@@ -21,30 +96,220 @@ class APIClient:
     
     def create_item(self, data: Dict[str, Any]) -> requests.Response:
         """Создание объявления POST /api/1/item"""
-        return self.session.post(f"{self.base_url}/api/1/item", json=data)
+        response = self.session.post(f"{self.base_url}/api/1/item", json=data)
+        if response.status_code == 200:
+            try:
+                item_id = response.json().get("id")
+            except (ValueError, AttributeError):
+                item_id = None
+            if item_id:
+                self._remember_created(item_id)
+                # Сначала реестр: очередь удаления с registry не дублирует учтённые в нём объявления
+                if self.registry is not None:
+                    self.registry.register(item_id, data)
+                if self.cleanup is not None:
+                    self.cleanup.register(self.base_url, item_id)
+                if self.cache is not None and isinstance(data, dict):
+                    self._remember_seller(item_id, data.get("sellerID"))
+            if self.cache is not None and isinstance(data, dict):
+                self.cache.invalidate(f"{self.base_url}/api/1/{data.get('sellerID')}/item")
+        return response
+    
+    def _get(self, url: str) -> requests.Response:
+        if self.cache is None:
+            return self.session.get(url)
+        return self.cache.fetch(self.session, url)
     
     def get_item(self, item_id: str) -> requests.Response:
         """Получение объявления по ID GET /api/1/item/{id}"""
-        return self.session.get(f"{self.base_url}/api/1/item/{item_id}")
+        return self._get(f"{self.base_url}/api/1/item/{item_id}")
     
     def get_seller_items(self, seller_id: int) -> requests.Response:
         """Получение всех объявлений продавца GET /api/1/{sellerID}/item"""
-        return self.session.get(f"{self.base_url}/api/1/{seller_id}/item")
+        return self._get(f"{self.base_url}/api/1/{seller_id}/item")
+    
+    def iter_seller_items(self, seller_id: int, fields: Optional[Sequence[str]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Потоковое получение объявлений продавца GET /api/1/{sellerID}/item.
+        
+        Объявления разбираются по мере чтения ответа; fields оставляет в них
+        только указанные поля. Если перебор прерван, остаток ответа не читается.
+        При статусе, отличном от 200, выбрасывается requests.HTTPError.
+        """
+        response = self.session.get(f"{self.base_url}/api/1/{seller_id}/item", stream=True)
+        try:
+            if response.status_code != 200:
+                raise requests.HTTPError(
+                    f"GET /api/1/{seller_id}/item: статус {response.status_code}: {response.text}",
+                    response=response)
+            for item in iter_array(response.iter_content(STREAM_CHUNK_SIZE)):
+                if fields is not None and isinstance(item, dict):
+                    item = {field: item[field] for field in fields if field in item}
+                yield item
+        finally:
+            response.close()
+    
+    def find_seller_items(self, seller_id: int, item_ids: Iterable[str],
+                          fields: Optional[Sequence[str]] = ("id",)) -> Dict[str, Dict[str, Any]]:
+        """
+        Поиск объявлений в списке продавца: {id: объявление} для найденных.
+        Чтение ответа прекращается, как только найдены все item_ids.
+        """
+        wanted = set(item_ids)
+        found: Dict[str, Dict[str, Any]] = {}
+        if not wanted:
+            return found
+        if fields is not None and "id" not in fields:
+            fields = ("id", *fields)
+        for item in self.iter_seller_items(seller_id, fields):
+            item_id = item.get("id")
+            if item_id in wanted and item_id not in found:
+                found[item_id] = item
+                if len(found) == len(wanted):
+                    break
+        return found
     
     def get_statistic(self, item_id: str) -> requests.Response:
         """Получение статистики объявления GET /api/1/statistic/{id}"""
-        return self.session.get(f"{self.base_url}/api/1/statistic/{item_id}")
+        return self._get(f"{self.base_url}/api/1/statistic/{item_id}")
     
     def delete_item(self, item_id: str) -> requests.Response:
         """Удаление объявления DELETE /api/2/item/{id}"""
-        return self.session.delete(f"{self.base_url}/api/2/item/{item_id}")
+        response = self.session.delete(f"{self.base_url}/api/2/item/{item_id}")
+        if self.cleanup is not None and response.status_code == 200:
+            self.cleanup.mark_deleted(item_id)
+        if self.registry is not None and response.status_code == 200:
+            self.registry.discard(item_id)
+        if self.cache is not None:
+            self._invalidate_item(item_id)
+        return response
+    
+    def _remember_seller(self, item_id: str, seller_id: Any) -> None:
+        self._item_sellers[item_id] = seller_id
+        if len(self._item_sellers) > self.CREATED_AT_LIMIT:
+            self._item_sellers.popitem(last=False)
+    
+    def _invalidate_item(self, item_id: str) -> None:
+        """Сброс кэша объявления, его статистики и списка продавца-владельца."""
+        for path in (f"/api/1/item/{item_id}", f"/api/1/statistic/{item_id}", f"/api/2/statistic/{item_id}"):
+            self.cache.invalidate(self.base_url + path)
+        seller_id = self._item_sellers.pop(item_id, None)
+        if seller_id is None:
+            # Владелец неизвестен (объявление создано не этим клиентом)
+            self.cache.invalidate_endpoint(SELLER_ITEMS)
+        else:
+            self.cache.invalidate(f"{self.base_url}/api/1/{seller_id}/item")
+    
+    def validate(self, response: requests.Response) -> Any:
+        """
+        Проверка ответа по схеме из postman_collection.json.
+        Возвращает разобранное тело ответа (None для пустого тела).
+        """
+        errors = load_validators().response_errors(response)
+        if errors:
+            raise SchemaValidationError(
+                f"{response.request.method} {response.url}: ответ не соответствует схеме:\n" + "\n".join(errors))
+        return response.json() if response.content else None
+    
+    def _remember_created(self, item_id: str) -> None:
+        self._created_at[item_id] = time.monotonic()
+        if len(self._created_at) > self.CREATED_AT_LIMIT:
+            self._created_at.popitem(last=False)
+    
+    def _record_lag(self, endpoint: str, item_id: str, observed_at: float) -> None:
+        created_at = self._created_at.pop(item_id, None)
+        if created_at is not None:
+            self.lag_stats.record(endpoint, observed_at - created_at)
+    
+    def wait_until(self, probe, timeout: Optional[float] = None,
+                   message: str = "условие не выполнилось"):
+        """
+        Повторение probe с экспоненциальной паузой, пока она не вернёт значение
+        (не None/False) или не перестанет выбрасывать AssertionError.
+        Повторные проверки не входят в бюджет HTTP-запросов теста.
+        """
+        first = True
+        
+        def attempt():
+            nonlocal first
+            if first:
+                first = False
+                return probe()
+            with poll_retry():
+                return probe()
+        
+        return eventually(attempt, self.poll_timeout if timeout is None else timeout, message=message)
+    
+    def wait_for_item(self, item_id: str, timeout: Optional[float] = None) -> requests.Response:
+        """Ожидание, пока GET /api/1/item/{id} вернёт 200. Возвращает этот ответ."""
+        def probe() -> Optional[requests.Response]:
+            sent_at = time.monotonic()
+            response = self.get_item(item_id)
+            if response.status_code != 200:
+                return None
+            self._record_lag("GET /api/1/item/{id}", item_id, sent_at)
+            return response
+        
+        return self.wait_until(probe, timeout, f"объявление {item_id} не стало доступно")
+    
+    def wait_for_seller_items(self, seller_id: int, item_ids: Iterable[str], timeout: Optional[float] = None,
+                              fields: Optional[Sequence[str]] = ("id",)) -> Dict[str, Dict[str, Any]]:
+        """
+        Ожидание, пока все item_ids появятся в списке продавца. Видимость всех
+        объявлений проверяется одним потоковым запросом списка, который
+        прерывается, как только найдены все ожидаемые. Возвращает {id: объявление}.
+        """
+        pending = set(item_ids)
+        found: Dict[str, Dict[str, Any]] = {}
+        
+        def probe() -> Optional[Dict[str, Dict[str, Any]]]:
+            sent_at = time.monotonic()
+            try:
+                visible = self.find_seller_items(seller_id, pending, fields)
+            except (requests.HTTPError, ValueError, AttributeError):
+                return None
+            for item_id in visible:
+                self._record_lag("GET /api/1/{sellerID}/item", item_id, sent_at)
+            found.update(visible)
+            pending.difference_update(visible)
+            assert not pending, f"не видны: {', '.join(sorted(pending))}"
+            return found
+        
+        return self.wait_until(probe, timeout, f"объявления продавца {seller_id} не стали доступны")
 
 
 def generate_unique_seller_id() -> int:
-    """Генерация уникального sellerID с использованием timestamp и random."""
-    timestamp = int(time.time() * 1000) % 800000
-    random_part = random.randint(0, 88888)
-    return SELLER_ID_MIN + (timestamp + random_part) % 888888
+    """
+    Генерация уникального sellerID.
+    
+    ID выдаются аллокатором seller_ids и не пересекаются между воркерами
+    и процессами, а также между запусками (см. seller_ids.SellerIdAllocator).
+    Тесты получают ID из [SELLER_ID_MIN, LOAD_SELLER_ID_MIN), инструменты
+    нагрузки после use_load_seller_ids() — из [LOAD_SELLER_ID_MIN, SELLER_ID_MAX].
+    """
+    return seller_ids.default_allocator(SELLER_ID_MIN, LOAD_SELLER_ID_MIN - 1).allocate()
+
+
+def use_load_seller_ids() -> None:
+    """
+    sellerID процесса — из диапазона инструментов нагрузки. Пройдя его, курсор
+    сразу начинает заново: объявления нагрузки удаляются после каждого прогона,
+    а сверка (verify_sellers) не считает чужие объявления в списке расхождением.
+    """
+    seller_ids.configure(LOAD_SELLER_ID_MIN, SELLER_ID_MAX, LOAD_SELLER_IDS_STATE, wrap=lambda: True)
+
+
+def seller_ids_recyclable(journal_dir) -> bool:
+    """
+    Можно ли начать диапазон sellerID тестов заново: объявления прежних запусков
+    удалены. Недоудалённые объявления из журналов завершившихся процессов
+    удаляются сейчас; False — если удалить удалось не всё. Объявления текущих
+    запусков не мешают: их sellerID — в конце диапазона.
+    """
+    queue = CleanupQueue(CleanupJournal(journal_dir))
+    queue.replay()
+    queue.close()
+    return queue.pending_count == 0
 
 
 def generate_random_seller_id() -> int:
@@ -73,10 +338,185 @@ def create_valid_item_data(seller_id: int = None, name: str = "Тестовый
         "contacts": contacts
     }
 
+def pytest_addoption(parser):
+    """Опции командной строки."""
+    parser.addoption(
+        "--api-url",
+        default=os.environ.get("API_URL", BASE_URL),
+        help=f"Базовый URL API или '{LOCAL_TARGET}' для локальной замены сервиса "
+             f"(также переменная окружения API_URL). По умолчанию {BASE_URL}"
+    )
+    parser.addoption(
+        "--item-pool-size",
+        type=int,
+        default=DEFAULT_POOL_SIZE,
+        help="Число объявлений в общем пуле для тестов только на чтение"
+    )
+    parser.addoption(
+        "--poll-timeout",
+        type=float,
+        default=DEFAULT_TIMEOUT,
+        help="Сколько секунд ждать видимости созданных объявлений (APIClient.wait_*)"
+    )
+    parser.addoption(
+        "--http-timeout",
+        type=float,
+        default=DEFAULT_HTTP_TIMEOUT,
+        help="Таймаут чтения HTTP-запросов APIClient, секунды"
+    )
+    parser.addoption(
+        "--response-cache",
+        action="store_true",
+        default=False,
+        help="Кэшировать GET-ответы APIClient с инвалидацией при записи (см. response_cache.py)"
+    )
+    parser.addoption(
+        "--http-timings",
+        default=None,
+        metavar="PATH",
+        help="Записывать замеры каждого HTTP-запроса APIClient в PATH (.jsonl или .csv)"
+    )
+    parser.addoption(
+        "--cassette-mode",
+        choices=MODES,
+        default=os.environ.get("CASSETTE_MODE", MODE_OFF),
+        help="record — записать трафик APIClient в кассету, replay — воспроизвести без сети "
+             "(также переменная окружения CASSETTE_MODE)"
+    )
+    parser.addoption(
+        "--cassette",
+        default=str(DEFAULT_CASSETTE),
+        metavar="PATH",
+        help="Файл кассеты для --cassette-mode"
+    )
+    parser.addoption(
+        "--perf-db",
+        default=str(DEFAULT_PERF_DB),
+        metavar="PATH",
+        help="Хранилище результатов perf-тестов (SQLite)"
+    )
+    parser.addoption(
+        "--perf-save",
+        action="store_true",
+        default=False,
+        help="Сохранить результаты perf-тестов в --perf-db"
+    )
+    parser.addoption(
+        "--perf-baseline",
+        action="store_true",
+        default=False,
+        help="Сохранить результаты perf-тестов как эталон для стенда"
+    )
+    parser.addoption(
+        "--perf-compare",
+        action="store_true",
+        default=False,
+        help="Сравнить результаты perf-тестов с эталоном; регрессия — ненулевой код завершения"
+    )
+    parser.addoption(
+        "--perf-min-effect",
+        type=float,
+        default=DEFAULT_MIN_EFFECT,
+        help="Минимальный значимый рост медианы задержки, считающийся регрессией (доля)"
+    )
+    parser.addoption(
+        "--http-budget-mode",
+        choices=BUDGET_MODES,
+        default=BUDGET_FAIL,
+        help="Превышение бюджета HTTP-запросов теста: fail — ошибка (по числу запросов; время — предупреждение), "
+             "warn — предупреждение, off — только сводка"
+    )
+    parser.addoption(
+        "--http-budget-requests",
+        type=int,
+        default=DEFAULT_BUDGET_REQUESTS,
+        help="Бюджет запросов APIClient на тест без маркера http_budget"
+    )
+    parser.addoption(
+        "--http-budget-ms",
+        type=float,
+        default=DEFAULT_BUDGET_MS,
+        help="Бюджет времени в HTTP на тест без маркера http_budget, мс"
+    )
+    parser.addoption(
+        "--schedule",
+        choices=SCHEDULES,
+        default=SCHEDULE_HISTORY,
+        help="history — сначала smoke и недавно падавшие тесты по истории прогонов, file — порядок файлов"
+    )
+    parser.addoption(
+        "--no-smoke-abort",
+        action="store_true",
+        default=False,
+        help="Не прерывать прогон, когда smoke-тесты показывают, что стенд недоступен"
+    )
+
+
+@pytest.fixture(scope="session")
+def local_api_server() -> Generator[LocalAPIServer, None, None]:
+    """Фикстура локальной замены API на случайном свободном порту."""
+    with LocalAPIServer() as server:
+        yield server
+
+
 @pytest.fixture(scope="session")
-def api_client() -> Generator[APIClient, None, None]:
-    """Фикстура для создания API клиента на всю сессию."""
-    client = APIClient(BASE_URL)
+def api_base_url(request) -> str:
+    """Базовый URL тестируемого API с учётом --api-url / API_URL."""
+    api_url = request.config.getoption("--api-url")
+    if api_url == LOCAL_TARGET:
+        return request.getfixturevalue("local_api_server").base_url
+    return api_url.rstrip("/")
+
+
+cleanup_queue_key = pytest.StashKey[CleanupQueue]()
+response_cache_key = pytest.StashKey[ResponseCache]()
+
+
+@pytest.fixture(scope="session")
+def cleanup_queue(request, api_base_url: str) -> Generator[CleanupQueue, None, None]:
+    """
+    Фикстура очереди фонового удаления созданных объявлений.
+    
+    Для удалённого API объявления записываются в журнал в кэше pytest;
+    объявления, оставшиеся после упавшего запуска, удаляются при следующем.
+    Локальная замена API хранит данные в памяти, журнал для неё не ведётся.
+    """
+    journal = None
+    cache = getattr(request.config, "cache", None)
+    if (cache is not None and request.config.getoption("--api-url") != LOCAL_TARGET
+            and request.config.getoption("--cassette-mode") != MODE_REPLAY):
+        journal = CleanupJournal(cache.mkdir("cleanup"))
+    
+    queue = CleanupQueue(journal)
+    queue.replay()
+    request.config.stash[cleanup_queue_key] = queue
+    yield queue
+    queue.close()
+
+
+@pytest.fixture(scope="session")
+def api_client(request, api_base_url: str, cleanup_queue: CleanupQueue) -> Generator[APIClient, None, None]:
+    """
+    Фикстура для создания API клиента на всю сессию.
+    Созданные через клиент объявления удаляются в фоне после окончания теста.
+    В режиме воспроизведения кассеты удалять нечего: сервис не используется.
+    """
+    cassette_plugin = request.config.pluginmanager.get_plugin("cassette")
+    replay = cassette_plugin is not None and cassette_plugin.mode == MODE_REPLAY
+    cache = None
+    if request.config.getoption("--response-cache"):
+        cache = request.config.stash[response_cache_key] = ResponseCache()
+    client = APIClient(api_base_url, cleanup=None if replay else cleanup_queue,
+                       poll_timeout=request.config.getoption("--poll-timeout"), cache=cache,
+                       timeout=request.config.getoption("--http-timeout"))
+    timing_plugin = request.config.pluginmanager.get_plugin("http_timing")
+    if timing_plugin is not None:
+        timing_plugin.instrument(client.session)
+    if cassette_plugin is not None:
+        cassette_plugin.install(client.session)
+    budget_plugin = request.config.pluginmanager.get_plugin("http_budget")
+    if budget_plugin is not None:
+        budget_plugin.install(client.session)
     yield client
 
 
@@ -92,12 +532,41 @@ def valid_item_data(unique_seller_id: int) -> Dict[str, Any]:
     return create_valid_item_data(seller_id=unique_seller_id)
 
 
+@pytest.fixture(scope="session")
+def item_pool(request, api_base_url: str) -> Generator[ItemPool, None, None]:
+    """
+    Фикстура общего пула объявлений на всю сессию.
+    Объявления создаются и удаляются пакетом конкурентных запросов.
+    """
+    pool = ItemPool(api_base_url, size=request.config.getoption("--item-pool-size")).populate()
+    yield pool
+    pool.teardown()
+
+
+def _uses_private_items(request) -> bool:
+    # Пул создаётся через AsyncAPIClient, трафик которого не попадает в кассету
+    if request.config.pluginmanager.get_plugin("cassette") is not None:
+        return True
+    return request.node.get_closest_marker("private_items") is not None
+
+
 @pytest.fixture
-def created_item(api_client: APIClient, unique_seller_id: int) -> Generator[Dict[str, Any], None, None]:
+def created_item(request, api_client: APIClient, unique_seller_id: int) -> Generator[Dict[str, Any], None, None]:
     """
     Фикстура для создания объявления и получения его данных.
     Возвращает данные созданного объявления.
+    
+    По умолчанию объявление берётся из общего пула (item_pool). Тесты, изменяющие
+    объявление, должны иметь маркер private_items — тогда создаётся собственное.
     """
+    if not _uses_private_items(request):
+        try:
+            item = request.getfixturevalue("item_pool").lease_item()
+        except LookupError as e:
+            pytest.fail(f"Не удалось создать объявление: {e}")
+        yield item
+        return
+    
     item_data = create_valid_item_data(seller_id=unique_seller_id)
     response = api_client.create_item(item_data)
     
@@ -106,18 +575,43 @@ def created_item(api_client: APIClient, unique_seller_id: int) -> Generator[Dict
     created = response.json()
     created["_request_data"] = item_data
     
+    # Удаление — через очередь cleanup_queue после окончания теста
     yield created
+
+
+@pytest.fixture
+def item_with_statistics(request, api_client: APIClient, unique_seller_id: int) -> Dict[str, Any]:
+    """
+    Объявление с ненулевой статистикой.
+    Без маркера private_items берётся из общего пула.
+    """
+    if not _uses_private_items(request):
+        try:
+            return request.getfixturevalue("item_pool").lease_item(with_statistics=True)
+        except LookupError as e:
+            pytest.fail(f"Не удалось создать объявление: {e}")
     
-    # Cleanup
-    try:
-        api_client.delete_item(created.get("id", ""))
-    except Exception:
-        pass
+    item_data = create_valid_item_data(seller_id=unique_seller_id, name="Товар со статистикой",
+                                       price=1500, likes=5, view_count=10, contacts=2)
+    response = api_client.create_item(item_data)
+    
+    assert response.status_code == 200, f"Не удалось создать объявление: {response.text}"
+    
+    created = response.json()
+    created["_request_data"] = item_data
+    return created
 
 
 @pytest.fixture
-def multiple_items(api_client: APIClient, unique_seller_id: int) -> Generator[List[Dict[str, Any]], None, None]:
-    """Фикстура для создания нескольких объявлений одного продавца."""
+def multiple_items(request, api_client: APIClient, unique_seller_id: int) -> Generator[List[Dict[str, Any]], None, None]:
+    """
+    Фикстура для создания нескольких объявлений одного продавца.
+    Без маркера private_items объявления берутся из общего пула.
+    """
+    if not _uses_private_items(request):
+        yield request.getfixturevalue("item_pool").lease_seller_items()
+        return
+    
     items = []
     
     for i in range(3):
@@ -133,19 +627,162 @@ def multiple_items(api_client: APIClient, unique_seller_id: int) -> Generator[Li
             created["_request_data"] = item_data
             items.append(created)
     
+    # Удаление — через очередь cleanup_queue после окончания теста
+    yield items
+
+@pytest.fixture
+def perf_benchmark(request):
+    """
+    Замер задержки вызова для perf-тестов (см. perf_plugin.py):
+    perf_benchmark(name, call, rounds=100, warmup=5) -> perf.Measurement.
+    """
+    cassette_plugin = request.config.pluginmanager.get_plugin("cassette")
+    if cassette_plugin is not None and cassette_plugin.mode == MODE_REPLAY:
+        pytest.skip("Замеры производительности не имеют смысла при воспроизведении кассеты")
+    return request.config.pluginmanager.get_plugin("perf").benchmark
+
+
+@pytest.fixture
+def fault_injector(request, api_client: APIClient) -> Generator[FaultInjector, None, None]:
+    """
+    Внедрение сбоев в транспорт api_client на время теста (см. faults.py).
+    Правила берутся из маркера faults и добавляются через fault_injector.add.
+    Правила маркера создаются один раз при декорировании, поэтому каждому
+    запуску теста достаются их копии с обнулёнными счётчиками.
+    """
+    marker = request.node.get_closest_marker("faults")
+    rules = [rule.fresh() for rule in marker.args] if marker else []
+    seed = marker.kwargs.get("seed") if marker else None
+    injector = FaultInjector(rules, seed=seed)
+    injector.install(api_client.session)
+    yield injector
+    injector.uninstall()
+
+
+@pytest.fixture(autouse=True)
+def _faults_from_marker(request) -> None:
+    """Подключение fault_injector к тестам с маркером faults."""
+    if request.node.get_closest_marker("faults") is not None:
+        request.getfixturevalue("fault_injector")
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def async_api_client(api_base_url: str) -> AsyncGenerator[AsyncAPIClient, None]:
+    """Фикстура асинхронного API клиента на всю сессию (общий пул соединений)."""
+    async with AsyncAPIClient(api_base_url) as client:
+        yield client
+
+
+@pytest_asyncio.fixture(loop_scope="session")
+async def async_multiple_items(async_api_client: AsyncAPIClient,
+                               unique_seller_id: int) -> AsyncGenerator[List[Dict[str, Any]], None]:
+    """
+    Асинхронный аналог multiple_items: объявления создаются и удаляются
+    одним пакетом конкурентных запросов.
+    """
+    items_data = [
+        create_valid_item_data(seller_id=unique_seller_id, name=f"Товар {i+1}", price=1000 * (i + 1))
+        for i in range(3)
+    ]
+    responses = await async_api_client.create_items(items_data)
+    
+    items = []
+    for item_data, response in zip(items_data, responses):
+        if response.status_code == 200:
+            created = response.json()
+            created["_request_data"] = item_data
+            items.append(created)
+    
     yield items
     
     # Cleanup
-    for item in items:
-        try:
-            api_client.delete_item(item.get("id", ""))
-        except Exception:
-            pass
+    await async_api_client.delete_items([item.get("id", "") for item in items])
+
+@pytest.hookimpl(trylast=True)
+def pytest_runtest_teardown(item):
+    """Фоновое удаление объявлений, созданных тестом."""
+    queue = item.config.stash.get(cleanup_queue_key, None)
+    if queue is not None:
+        queue.flush()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    """Исчерпанный диапазон sellerID пропускает тест с причиной, а не роняет весь прогон."""
+    outcome = yield
+    report = outcome.get_result()
+    if (call.when != "teardown" and call.excinfo is not None
+            and call.excinfo.errisinstance(seller_ids.SellerIdsExhausted)):
+        path, lineno, _ = item.reportinfo()
+        report.outcome = "skipped"
+        report.longrepr = (str(path), (lineno or 0) + 1, f"Skipped: {call.excinfo.value}")
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    """Итог очистки созданных объявлений, задержка чтения после записи и кэш ответов."""
+    queue = config.stash.get(cleanup_queue_key, None)
+    if queue is not None and (queue.deleted or queue.failed):
+        terminalreporter.write_line(
+            f"Очистка: удалено объявлений {queue.deleted}, ошибок {queue.failed}, "
+            f"осталось в журнале {queue.pending_count}"
+        )
+    if len(LAG_STATS):
+        terminalreporter.write_line("Задержка чтения после записи:")
+        for line in LAG_STATS.summary_lines():
+            terminalreporter.write_line(f"  {line}")
+    cache = config.stash.get(response_cache_key, None)
+    if cache is not None and cache.counters:
+        terminalreporter.write_line(f"Кэш ответов: сэкономлено запросов {cache.hits}")
+        for line in cache.summary_lines():
+            terminalreporter.write_line(f"  {line}")
+
 
 def pytest_configure(config):
-    """Добавление маркеров."""
+    """Добавление маркеров, настройка аллокатора sellerID и плагинов (хронометрия, кассета, perf, бюджет HTTP, порядок тестов)."""
     config.addinivalue_line("markers", "positive: Позитивные тест-кейсы")
     config.addinivalue_line("markers", "negative: Негативные тест-кейсы")
     config.addinivalue_line("markers", "integration: Интеграционные тест-кейсы")
     config.addinivalue_line("markers", "smoke: Smoke тесты")
     config.addinivalue_line("markers", "boundary: Тесты граничных значений")
+    config.addinivalue_line("markers", "private_items: Тест изменяет объявления и не использует общий пул")
+    config.addinivalue_line("markers", "faults(*rules, seed=None): Сбои транспорта api_client (faults.FaultRule)")
+    config.addinivalue_line("markers", "perf: Замеры производительности с проверкой регрессий")
+    config.addinivalue_line("markers", "http_budget(requests=None, ms=None): Бюджет HTTP-запросов APIClient на тест")
+    
+    cassette_mode = config.getoption("--cassette-mode")
+    if cassette_mode != MODE_OFF:
+        config.pluginmanager.register(
+            CassettePlugin(config.getoption("--cassette"), cassette_mode), "cassette"
+        )
+    
+    config.pluginmanager.register(PerfPlugin(
+        config.getoption("--perf-db"),
+        config.getoption("--api-url").rstrip("/"),
+        save=config.getoption("--perf-save"),
+        baseline=config.getoption("--perf-baseline"),
+        compare_baseline=config.getoption("--perf-compare"),
+        min_effect=config.getoption("--perf-min-effect"),
+        selected=perf_selected(config.getoption("markexpr")),
+    ), "perf")
+    
+    config.pluginmanager.register(HttpBudgetPlugin(
+        Budget(config.getoption("--http-budget-requests"), config.getoption("--http-budget-ms")),
+        config.getoption("--http-budget-mode"),
+    ), "http_budget")
+    
+    if getattr(config, "cache", None) is not None:
+        config.pluginmanager.register(SchedulingPlugin(
+            config,
+            config.getoption("--schedule"),
+            smoke_abort=not config.getoption("--no-smoke-abort"),
+            target=config.getoption("--api-url"),
+        ), "scheduling")
+    
+    timings_path = config.getoption("--http-timings")
+    if timings_path:
+        config.pluginmanager.register(HttpTimingPlugin(timings_path), "http_timing")
+    
+    if getattr(config, "cache", None) is not None:
+        journal_dir = config.cache.mkdir("cleanup")
+        seller_ids.configure(SELLER_ID_MIN, LOAD_SELLER_ID_MIN - 1, config.cache.mkdir("seller_ids") / "state.json",
+                             wrap=lambda: seller_ids_recyclable(journal_dir))
@@ -0,0 +1,369 @@
+"""
+Массовая проверка согласованности чтения после записи.
+
+TC-006 и TC-027 проверяют одно объявление. Здесь конкурентно создаются
+тысячи объявлений со случайной статистикой, и каждое сразу после создания
+проверяется через GET /api/1/statistic/{id} и GET /api/1/item/{id}; список
+продавца опрашивается с первого созданного объявления, одно чтение списка
+проверяет все его объявления. Запись и чтение идут конвейером: в работе
+одновременно не больше in_flight объявлений (создание и проверки), чтения
+повторяются с экспоненциальной паузой до совпадения данных или истечения
+timeout. Время до согласованности считается от ответа на создание до
+отправки первого согласованного чтения.
+
+По каждому представлению в отчёте: доля совпавших с первого чтения,
+сошедшихся позже, так и не появившихся, с неверными данными в конце и с
+неверными данными в промежутке (видны, но не те значения — самое опасное
+расхождение), и распределение времени от ответа на создание до первого
+согласованного чтения.
+
+Запуск (из каталога tests):
+    python -m consistency --api-url local --items 5000
+    python -m consistency --items 2000 --per-seller 100 --timeout 30 --json consistency.json
+Код возврата 1, если найдены несогласованности.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import aiohttp
+
+from async_client import AsyncAPIClient, AsyncResponse
+from cleanup import CleanupQueue, cli_targets
+from concurrency import AIMDController
+from conftest import BASE_URL, LOCAL_TARGET, create_valid_item_data, generate_unique_seller_id, use_load_seller_ids
+from histogram import LatencyHistogram
+from item_fields import item_mismatch, statistic_mismatch
+from polling import Backoff
+
+VIEW_STATISTIC = "statistic"
+VIEW_ITEM = "item"
+VIEW_SELLER = "seller_items"
+VIEWS = (VIEW_STATISTIC, VIEW_ITEM, VIEW_SELLER)
+
+OK = "ok"
+MISSING = "missing"
+MISMATCH = "mismatch"
+ERROR = "error"
+
+DEFAULT_ITEMS = 2000
+DEFAULT_PER_SELLER = 50
+DEFAULT_TIMEOUT = 10.0
+# Больше одновременных объявлений, чем запросов, — чтения ждут в очереди клиента,
+# и время до согласованности растёт за счёт клиента, а не сервиса
+DEFAULT_IN_FLIGHT = 64
+STATISTIC_MAX = 1_000_000
+
+
+def generate_items(count: int, rng: random.Random, per_seller: int = DEFAULT_PER_SELLER) -> List[Dict[str, Any]]:
+    """Тела создания: по per_seller объявлений на продавца, случайные цена и статистика."""
+    bodies = []
+    seller_id = None
+    for index in range(count):
+        if index % per_seller == 0:
+            seller_id = generate_unique_seller_id()
+        bodies.append(create_valid_item_data(
+            seller_id=seller_id, name=f"Согласованность {index}", price=rng.randint(0, 10 ** 7),
+            likes=rng.randint(0, STATISTIC_MAX), view_count=rng.randint(0, STATISTIC_MAX),
+            contacts=rng.randint(0, STATISTIC_MAX)))
+    return bodies
+
+
+def _first(data: Any) -> Any:
+    """GET item/statistic отвечают списком из одного элемента."""
+    return data[0] if isinstance(data, list) and data else data
+
+
+def _state(response: Optional[AsyncResponse], check: Callable[[Any], List[str]]) -> Tuple[str, List[str]]:
+    if response is None or response.status_code >= 500:
+        return ERROR, []
+    if response.status_code == 404:
+        return MISSING, []
+    if response.status_code != 200:
+        return MISMATCH, [f"status {response.status_code}"]
+    try:
+        fields = check(_first(response.json()))
+    except ValueError:
+        return MISMATCH, ["body"]
+    return (MISMATCH, fields) if fields else (OK, [])
+
+
+@dataclass
+class Observation:
+    """Итог ожидания согласованности одного объявления в одном представлении."""
+
+    state: str
+    lag: Optional[float] = None
+    attempts: int = 1
+    saw_wrong: bool = False
+    fields: List[str] = field(default_factory=list)
+
+
+@dataclass
+class ViewStats:
+    """Итоги по представлению."""
+
+    checked: int = 0
+    immediate: int = 0
+    converged: int = 0
+    missing: int = 0
+    mismatched: int = 0
+    transient: int = 0
+    errors: int = 0
+    reads: int = 0
+    lag: LatencyHistogram = field(default_factory=LatencyHistogram)
+    fields: Counter = field(default_factory=Counter)
+
+    def add(self, observation: Observation) -> None:
+        self.checked += 1
+        self.reads += observation.attempts
+        self.fields.update(observation.fields)
+        if observation.state == OK:
+            self.transient += observation.saw_wrong
+            self.lag.record(observation.lag)
+            if observation.attempts == 1:
+                self.immediate += 1
+            else:
+                self.converged += 1
+        elif observation.state == MISSING:
+            self.missing += 1
+        elif observation.state == MISMATCH:
+            self.mismatched += 1
+        else:
+            self.errors += 1
+
+    @property
+    def inconsistent(self) -> int:
+        return self.missing + self.mismatched + self.transient
+
+    @property
+    def mismatch_rate(self) -> float:
+        return (self.mismatched + self.transient) / self.checked if self.checked else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"checked": self.checked, "immediate": self.immediate, "converged": self.converged,
+                "missing": self.missing, "mismatched": self.mismatched, "transient": self.transient,
+                "errors": self.errors, "reads": self.reads, "mismatch_rate": self.mismatch_rate,
+                "fields": dict(self.fields), "lag": self.lag.to_dict()}
+
+
+@dataclass
+class ConsistencyReport:
+    requested: int = 0
+    created: int = 0
+    create_errors: int = 0
+    sellers: int = 0
+    elapsed: float = 0.0
+    views: Dict[str, ViewStats] = field(default_factory=lambda: {view: ViewStats() for view in VIEWS})
+
+    @property
+    def failed(self) -> bool:
+        return any(stats.inconsistent for stats in self.views.values())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"requested": self.requested, "created": self.created, "create_errors": self.create_errors,
+                "sellers": self.sellers, "elapsed": self.elapsed,
+                "views": {view: stats.to_dict() for view, stats in self.views.items()}}
+
+
+async def _fetch(call: Callable[[], Awaitable[AsyncResponse]]) -> Optional[AsyncResponse]:
+    try:
+        return await call()
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        return None
+
+
+def _sent_at(response: Optional[AsyncResponse]) -> float:
+    """Момент отправки чтения: задержка считается до него, без ожидания в очереди клиента."""
+    return time.monotonic() - (response.elapsed if response is not None else 0.0)
+
+
+async def wait_consistent(call: Callable[[], Awaitable[AsyncResponse]], check: Callable[[Any], List[str]],
+                          created_at: float, deadline: float, backoff: Backoff) -> Observation:
+    """Повторные чтения до совпадения данных или deadline (time.monotonic)."""
+    delays = backoff.delays()
+    attempts, saw_wrong, fields = 0, False, []
+    while True:
+        attempts += 1
+        response = await _fetch(call)
+        sent_at = _sent_at(response)
+        state, wrong = _state(response, check)
+        if state == OK:
+            return Observation(OK, max(0.0, sent_at - created_at), attempts, saw_wrong, fields)
+        if state == MISMATCH:
+            saw_wrong, fields = True, wrong
+        now = time.monotonic()
+        if now >= deadline:
+            return Observation(state, None, attempts, saw_wrong, fields)
+        await asyncio.sleep(min(next(delays), deadline - now))
+
+
+async def wait_seller_consistent(client: AsyncAPIClient, seller_id: int,
+                                 created: Dict[str, Tuple[Dict[str, Any], float]],
+                                 finished: Callable[[], bool], timeout: float,
+                                 backoff: Backoff) -> List[Observation]:
+    """
+    Опрос списка продавца, пока его объявления ещё создаются и пока каждое
+    не появится в списке с верными данными или не истечёт его timeout.
+    created пополняется по мере создания; finished() — создание завершено.
+    """
+    observations: Dict[str, Observation] = {}
+    reads: Counter = Counter()
+    wrong: Dict[str, List[str]] = {}
+    delays = backoff.delays()
+    while not (finished() and len(observations) == len(created)):
+        response = await _fetch(lambda: client.get_seller_items(seller_id))
+        sent_at = _sent_at(response)
+        listed = {}
+        if response is not None and response.status_code == 200:
+            try:
+                listed = {item.get("id"): item for item in response.json() if isinstance(item, dict)}
+            except (ValueError, TypeError, AttributeError):
+                listed = {}
+        for item_id, (body, created_at) in list(created.items()):
+            if item_id in observations or sent_at < created_at:
+                continue
+            reads[item_id] += 1
+            fields = item_mismatch(body, listed[item_id]) if item_id in listed else None
+            if fields == []:
+                observations[item_id] = Observation(OK, sent_at - created_at, reads[item_id], item_id in wrong,
+                                                    wrong.get(item_id, []))
+            elif fields:
+                wrong[item_id] = fields
+            if item_id not in observations and sent_at >= created_at + timeout:
+                state = MISMATCH if item_id in wrong else (MISSING if response is not None else ERROR)
+                observations[item_id] = Observation(state, None, reads[item_id], item_id in wrong,
+                                                    wrong.get(item_id, []))
+        if not (finished() and len(observations) == len(created)):
+            await asyncio.sleep(next(delays))
+    return list(observations.values())
+
+
+async def check_consistency(base_url: str, items: int = DEFAULT_ITEMS, seed: Optional[int] = None,
+                            per_seller: int = DEFAULT_PER_SELLER, timeout: float = DEFAULT_TIMEOUT,
+                            in_flight: int = DEFAULT_IN_FLIGHT, controller: Optional[AIMDController] = None,
+                            cleanup: Optional[CleanupQueue] = None) -> ConsistencyReport:
+    """Создание items объявлений и проверка их согласованности во всех представлениях."""
+    bodies = generate_items(items, random.Random(seed), per_seller)
+    report = ConsistencyReport(requested=len(bodies))
+    remaining = Counter(body["sellerID"] for body in bodies)
+    report.sellers = len(remaining)
+    created: Dict[int, Dict[str, Tuple[Dict[str, Any], float]]] = {seller: {} for seller in remaining}
+    seller_checks: List[asyncio.Task] = []
+    backoff = Backoff(initial=0.01, maximum=0.5)
+    own_cleanup = cleanup is None
+    if own_cleanup:
+        cleanup = CleanupQueue()
+    controller = controller or AIMDController(initial=8, maximum=64)
+    started = time.perf_counter()
+
+    async def check_seller(seller_id: int) -> None:
+        observations = await wait_seller_consistent(client, seller_id, created[seller_id],
+                                                    lambda: remaining[seller_id] == 0, timeout, backoff)
+        for observation in observations:
+            report.views[VIEW_SELLER].add(observation)
+
+    async def create_and_check(body: Dict[str, Any], gate: asyncio.Semaphore) -> None:
+        seller_id = body["sellerID"]
+        async with gate:
+            response = await _fetch(lambda: client.create_item(body))
+            created_at = time.monotonic()
+            item_id = None
+            if response is not None and response.status_code == 200:
+                try:
+                    item_id = response.json().get("id")
+                except (ValueError, AttributeError):
+                    item_id = None
+            if item_id:
+                report.created += 1
+                cleanup.register(client.base_url, item_id)
+                if not created[seller_id]:
+                    seller_checks.append(asyncio.create_task(check_seller(seller_id)))
+                created[seller_id][item_id] = (body, created_at)
+            else:
+                report.create_errors += 1
+            remaining[seller_id] -= 1
+            if not item_id:
+                return
+            deadline = created_at + timeout
+            statistic, item = await asyncio.gather(
+                wait_consistent(lambda: client.get_statistic(item_id), lambda s: statistic_mismatch(body, s),
+                                created_at, deadline, backoff),
+                wait_consistent(lambda: client.get_item(item_id), lambda i: item_mismatch(body, i),
+                                created_at, deadline, backoff))
+            report.views[VIEW_STATISTIC].add(statistic)
+            report.views[VIEW_ITEM].add(item)
+
+    try:
+        async with AsyncAPIClient(base_url, controller=controller) as client:
+            gate = asyncio.Semaphore(in_flight)
+            await asyncio.gather(*(create_and_check(body, gate) for body in bodies))
+            await asyncio.gather(*seller_checks)
+        report.elapsed = time.perf_counter() - started
+    finally:
+        if own_cleanup:
+            cleanup.close()
+    return report
+
+
+def format_consistency(report: ConsistencyReport) -> str:
+    lines = [f"Создано {report.created} из {report.requested} (ошибок {report.create_errors}), "
+             f"продавцов {report.sellers}, {report.elapsed:.1f} с",
+             "",
+             f"{'представление':<15}{'проверено':>10}{'сразу':>8}{'позже':>8}{'не видно':>10}{'неверно':>9}"
+             f"{'врем.':>7}{'ошибки':>8}{'расх. %':>9}{'p50 мс':>9}{'p99 мс':>9}{'max мс':>9}",
+             "-" * 111]
+    for view, stats in report.views.items():
+        if stats.lag.total_count:
+            pct = stats.lag.percentiles([50, 99])
+            lag = f"{pct[50] / 1000:>9.1f}{pct[99] / 1000:>9.1f}{stats.lag.max_value / 1000:>9.1f}"
+        else:
+            lag = f"{'-':>9}{'-':>9}{'-':>9}"
+        lines.append(f"{view:<15}{stats.checked:>10}{stats.immediate:>8}{stats.converged:>8}{stats.missing:>10}"
+                     f"{stats.mismatched:>9}{stats.transient:>7}{stats.errors:>8}"
+                     f"{stats.mismatch_rate * 100:>9.2f}{lag}")
+    for view, stats in report.views.items():
+        if stats.fields:
+            fields = ", ".join(f"{name} {count}" for name, count in stats.fields.most_common())
+            lines.append(f"Неверные поля ({view}): {fields}")
+    lines.append("")
+    lines.append("сразу — совпало с первого чтения; позже — после повторов (время до согласованности — p50/p99/max); "
+                 "врем. — сначала видны неверные данные")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Проверка согласованности чтения после записи")
+    parser.add_argument("--api-url", default=BASE_URL,
+                        help=f"Базовый URL API или '{LOCAL_TARGET}' для локальной замены")
+    parser.add_argument("--items", type=int, default=DEFAULT_ITEMS)
+    parser.add_argument("--per-seller", type=int, default=DEFAULT_PER_SELLER, help="Объявлений на продавца")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT,
+                        help="Сколько секунд ждать согласованности каждого объявления")
+    parser.add_argument("--in-flight", type=int, default=DEFAULT_IN_FLIGHT,
+                        help="Объявлений в работе одновременно (создание и проверки)")
+    parser.add_argument("--concurrency", type=int, default=64, help="Верхний предел конкурентности запросов")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--json", dest="json_path", default=None, help="Сохранить результаты в JSON")
+    args = parser.parse_args(argv)
+    use_load_seller_ids()
+
+    with cli_targets(args.api_url) as ([base_url], cleanup):
+        report = asyncio.run(check_consistency(
+            base_url, args.items, args.seed, args.per_seller, args.timeout, args.in_flight,
+            AIMDController(initial=8, maximum=args.concurrency), cleanup))
+
+    print(format_consistency(report))
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report.to_dict(), f, ensure_ascii=False, indent=2)
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,441 @@
+"""
+Многопроцессный генератор нагрузки.
+
+Один процесс Python упирается в одно ядро (GIL, кодирование и разбор JSON),
+поэтому координатор запускает N процессов-воркеров. Каждый воркер берёт
+sellerID блоками из общего курсора seller_ids (диапазон и файл состояния
+инструментов нагрузки, см. conftest.use_load_seller_ids), поэтому ID не
+пересекаются ни между воркерами, ни с тестами и другими запусками. У воркера
+свои сессии APIClient и общая спецификация нагрузки (WorkloadSpec): смесь
+эндпоинтов loadgen с весами, длительность, число потоков и, при
+необходимости, частоту (открытая модель).
+
+Раз в интервал воркер отправляет координатору по pipe компактный снимок:
+коды ответов, ошибки и разреженные корзины гистограммы задержек по
+эндпоинтам. Корзины у всех гистограмм одинаковые, поэтому координатор
+объединяет снимки без потерь: перцентили итога — те же, что дала бы одна
+гистограмма всех запросов. По мере поступления интервалов выводится живая
+сводка: пропускная способность, p50/p99 и доля ошибок.
+
+Запуск (из каталога tests):
+    python -m distributed_load --api-url local --workers 4 --duration 10
+    python -m distributed_load --workers 8 --mix get_item=8 create=1 seller_items=1 --rate 2000
+    python -m distributed_load --spec workload.json --json distributed.json
+
+Воркеры запускаются методом spawn: координатор может держать потоки
+(локальная замена API), а fork процесса с потоками небезопасен.
+"""
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import random
+import threading
+import time
+from collections import Counter
+from multiprocessing.connection import Connection, wait
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+
+from cleanup import DEFAULT_JOURNAL_DIR, CleanupJournal, CleanupQueue
+from concurrency import TokenBucket
+from conftest import BASE_URL, LOCAL_TARGET, APIClient, use_load_seller_ids
+from histogram import LatencyHistogram
+from loadgen import ENDPOINTS, EndpointResult, Seed, format_report
+
+DEFAULT_INTERVAL = 1.0
+DEFAULT_MIX = {"get_item": 6, "seller_items": 2, "statistic": 1, "create": 1}
+# Сколько ждать, пока все воркеры создадут начальные данные, секунд
+READY_TIMEOUT = 120.0
+
+
+class WorkloadSpec:
+    """
+    Общая для всех воркеров спецификация нагрузки.
+    rate — суммарная частота запросов всех воркеров (None — без ограничения).
+    """
+
+    def __init__(self, mix: Optional[Dict[str, float]] = None, duration: float = 10.0,
+                 concurrency: int = 8, rate: Optional[float] = None, interval: float = DEFAULT_INTERVAL):
+        self.mix = dict(DEFAULT_MIX if mix is None else mix)
+        unknown = set(self.mix) - set(ENDPOINTS)
+        if unknown:
+            raise ValueError(f"Неизвестные эндпоинты в смеси: {', '.join(sorted(unknown))}")
+        if not self.mix or sum(self.mix.values()) <= 0:
+            raise ValueError("Смесь эндпоинтов пуста")
+        self.duration = duration
+        self.concurrency = concurrency
+        self.rate = rate
+        self.interval = interval
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "mix": self.mix,
+            "duration": self.duration,
+            "concurrency": self.concurrency,
+            "rate": self.rate,
+            "interval": self.interval,
+        }
+
+    def for_worker(self, workers: int) -> "WorkloadSpec":
+        """Спецификация одного воркера из workers: суммарная частота делится поровну."""
+        data = self.to_dict()
+        if self.rate:
+            data["rate"] = self.rate / workers
+        return WorkloadSpec.from_dict(data)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "WorkloadSpec":
+        return cls(**{key: data[key] for key in ("mix", "duration", "concurrency", "rate", "interval")
+                      if key in data})
+
+
+def encode_snapshot(results: Dict[str, EndpointResult]) -> Dict[str, Any]:
+    """Компактный снимок интервала для передачи по pipe."""
+    return {
+        name: {
+            "statuses": dict(result.statuses),
+            "errors": dict(result.errors),
+            "histogram": result.histogram.to_dict(),
+        }
+        for name, result in results.items()
+    }
+
+
+def decode_snapshot(data: Dict[str, Any]) -> Dict[str, EndpointResult]:
+    results = {}
+    for name, snapshot in data.items():
+        result = EndpointResult(name, ENDPOINTS[name][0])
+        result.statuses.update(snapshot["statuses"])
+        result.errors.update(snapshot["errors"])
+        result.histogram = LatencyHistogram.from_dict(snapshot["histogram"])
+        results[name] = result
+    return results
+
+
+def _merge_into(target: Dict[str, EndpointResult], source: Dict[str, EndpointResult]) -> None:
+    for name, result in source.items():
+        if name in target:
+            target[name].merge(result)
+        else:
+            target[name] = EndpointResult(name, result.template).merge(result)
+
+
+class _IntervalRecorder:
+    """Результаты текущего интервала; потоки нагрузки пишут, отправитель забирает."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._results: Dict[str, EndpointResult] = {}
+
+    def record(self, name: str, latency: float, status: Optional[int], error: Optional[str]) -> None:
+        with self._lock:
+            result = self._results.get(name)
+            if result is None:
+                result = self._results[name] = EndpointResult(name, ENDPOINTS[name][0])
+            result.histogram.record(latency)
+            if error is not None:
+                result.errors[error] += 1
+            else:
+                result.statuses[status] += 1
+
+    def take(self) -> Dict[str, EndpointResult]:
+        with self._lock:
+            results, self._results = self._results, {}
+            return results
+
+
+def _run_load(base_url: str, spec: WorkloadSpec, seed: Seed, cleanup: CleanupQueue,
+              recorder: _IntervalRecorder, start: float, rng_seed: int) -> List[threading.Thread]:
+    """Запуск потоков нагрузки воркера; возвращает потоки."""
+    deadline = start + spec.duration
+    names = list(spec.mix)
+    weights = [spec.mix[name] for name in names]
+    pacer = (TokenBucket(spec.rate, burst=math.inf, start=start, clock=time.perf_counter)
+             if spec.rate else None)
+
+    def worker(thread_index: int) -> None:
+        client = APIClient(base_url, cleanup=cleanup)
+        rng = random.Random(rng_seed * 1000 + thread_index)
+        while True:
+            name = rng.choices(names, weights)[0]
+            status = error = None
+            try:
+                call = ENDPOINTS[name][1](client, seed)
+            except Exception as e:  # подготовка запроса, например выдача sellerID
+                call, error = None, type(e).__name__
+            if pacer is not None:
+                scheduled = pacer.reserve()
+                if scheduled >= deadline:
+                    break
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            else:
+                scheduled = time.perf_counter()
+                if scheduled >= deadline:
+                    break
+            if call is not None:
+                try:
+                    status = call().status_code
+                except requests.RequestException as e:
+                    error = type(e).__name__
+            recorder.record(name, time.perf_counter() - scheduled, status, error)
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(spec.concurrency)]
+    for thread in threads:
+        thread.start()
+    return threads
+
+
+def _worker_main(index: int, base_url: str, spec_data: Dict[str, Any], conn: Connection,
+                 ready: Any, journal_dir: Optional[str]) -> None:
+    """Процесс-воркер: начальные данные, нагрузка, снимки по интервалам."""
+    spec = WorkloadSpec.from_dict(spec_data)
+    use_load_seller_ids()
+    cleanup = CleanupQueue(CleanupJournal(journal_dir) if journal_dir else None)
+    try:
+        try:
+            seed = Seed(APIClient(base_url, cleanup=cleanup))
+        except BaseException:
+            ready.abort()
+            raise
+        ready.wait(READY_TIMEOUT)
+
+        recorder = _IntervalRecorder()
+        start = time.perf_counter()
+        threads = _run_load(base_url, spec, seed, cleanup, recorder, start, index)
+        interval = 0
+        while any(thread.is_alive() for thread in threads):
+            boundary = start + (interval + 1) * spec.interval
+            delay = boundary - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            conn.send({"worker": index, "interval": interval, "endpoints": encode_snapshot(recorder.take())})
+            interval += 1
+        for thread in threads:
+            thread.join()
+        last = recorder.take()
+        if last:
+            conn.send({"worker": index, "interval": interval, "endpoints": encode_snapshot(last)})
+        cleanup.close()
+        conn.send({"worker": index, "done": True, "elapsed": time.perf_counter() - start})
+    except BaseException as e:
+        conn.send({"worker": index, "done": True, "error": f"{type(e).__name__}: {e}"})
+        cleanup.close()
+    finally:
+        conn.close()
+
+
+class DistributedResult:
+    """Итог по всем воркерам: суммы по эндпоинтам и по интервалам."""
+
+    def __init__(self, spec: WorkloadSpec, workers: int):
+        self.spec = spec
+        self.workers = workers
+        self.totals: Dict[str, EndpointResult] = {}
+        self.intervals: Dict[int, Dict[str, EndpointResult]] = {}
+        self.worker_requests: Counter = Counter()
+        self.errors: Dict[int, str] = {}
+        self.elapsed = 0.0
+
+    def add(self, worker: int, interval: int, results: Dict[str, EndpointResult]) -> None:
+        _merge_into(self.totals, results)
+        _merge_into(self.intervals.setdefault(interval, {}), results)
+        self.worker_requests[worker] += sum(r.requests for r in results.values())
+
+    @property
+    def requests(self) -> int:
+        return sum(r.requests for r in self.totals.values())
+
+    def results(self) -> List[EndpointResult]:
+        """Итог по эндпоинтам в порядке смеси; elapsed — общее время нагрузки."""
+        results = [self.totals[name] for name in self.spec.mix if name in self.totals]
+        for result in results:
+            result.elapsed = self.elapsed
+        return results
+
+    def combined(self) -> EndpointResult:
+        """Все эндпоинты вместе."""
+        total = EndpointResult("all", "все эндпоинты")
+        for result in self.totals.values():
+            total.merge(result)
+        total.elapsed = self.elapsed
+        return total
+
+    def to_dict(self) -> Dict[str, Any]:
+        intervals = []
+        for index in sorted(self.intervals):
+            combined = EndpointResult("all", "")
+            for result in self.intervals[index].values():
+                combined.merge(result)
+            intervals.append({
+                "interval": index,
+                "requests": combined.requests,
+                "failed": combined.failed,
+                "percentiles_us": {str(p): v for p, v in combined.histogram.percentiles().items()},
+            })
+        return {
+            "spec": self.spec.to_dict(),
+            "workers": self.workers,
+            "elapsed": self.elapsed,
+            "worker_requests": {str(k): v for k, v in sorted(self.worker_requests.items())},
+            "errors": {str(k): v for k, v in self.errors.items()},
+            "endpoints": [r.to_dict() for r in self.results()],
+            "intervals": intervals,
+        }
+
+
+def format_interval(index: int, interval: float, results: Dict[str, EndpointResult], workers: int) -> str:
+    """Строка живой сводки по одному интервалу."""
+    combined = EndpointResult("all", "")
+    for result in results.values():
+        combined.merge(result)
+    pct = combined.histogram.percentiles((50.0, 99.0))
+    error_rate = combined.failed / combined.requests * 100 if combined.requests else 0.0
+    return (f"[{(index + 1) * interval:>6.1f} с] воркеров {workers:<3} rps {combined.requests / interval:>9.1f}"
+            f"  p50 {pct[50.0] / 1000:>8.2f} мс  p99 {pct[99.0] / 1000:>8.2f} мс  ошибок {error_rate:>5.2f}%")
+
+
+def run(base_url: str, spec: WorkloadSpec, workers: int = os.cpu_count() or 1,
+        progress: Optional[Callable[[str], None]] = None, journal_dir: Optional[str] = None) -> DistributedResult:
+    """
+    Нагрузка из workers процессов. Живая сводка по интервалам передаётся
+    в progress; интервал выводится, когда его прислали все работающие воркеры.
+    """
+    context = multiprocessing.get_context("spawn")
+    ready = context.Barrier(workers + 1)
+    worker_spec = spec.for_worker(workers).to_dict()
+    connections: Dict[Connection, int] = {}
+    processes = []
+    for index in range(workers):
+        receiver, sender = context.Pipe(duplex=False)
+        process = context.Process(target=_worker_main, name=f"load-worker-{index}", daemon=True,
+                                  args=(index, base_url, worker_spec, sender, ready, journal_dir))
+        process.start()
+        sender.close()
+        connections[receiver] = index
+        processes.append(process)
+
+    result = DistributedResult(spec, workers)
+    pending: Dict[int, Dict[str, EndpointResult]] = {}
+    reported: Dict[int, int] = {index: -1 for index in range(workers)}
+    shown = -1
+
+    def show_ready() -> None:
+        nonlocal shown
+        while pending:
+            next_index = shown + 1
+            # Интервал готов, если его прислали все ещё работающие воркеры
+            if reported and min(reported.values()) < next_index:
+                break
+            if next_index in pending:
+                if progress is not None:
+                    progress(format_interval(next_index, spec.interval, pending[next_index], workers))
+                del pending[next_index]
+            shown = next_index
+
+    try:
+        try:
+            ready.wait(READY_TIMEOUT)
+        except threading.BrokenBarrierError:
+            pass  # причина придёт сообщением об ошибке от воркера
+        while connections:
+            for conn in wait(list(connections)):
+                index = connections[conn]
+                try:
+                    message = conn.recv()
+                except EOFError:
+                    result.errors.setdefault(index, "процесс завершился без итога")
+                    message = {"done": True}
+                if message.get("done"):
+                    if "error" in message:
+                        result.errors[index] = message["error"]
+                    result.elapsed = max(result.elapsed, message.get("elapsed", 0.0))
+                    del connections[conn]
+                    reported.pop(index, None)
+                    conn.close()
+                    continue
+                snapshot = decode_snapshot(message["endpoints"])
+                result.add(index, message["interval"], snapshot)
+                _merge_into(pending.setdefault(message["interval"], {}), snapshot)
+                reported[index] = max(reported.get(index, -1), message["interval"])
+            show_ready()
+        reported.clear()
+        show_ready()
+    finally:
+        for process in processes:
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
+    return result
+
+
+def _parse_mix(values: List[str]) -> Dict[str, float]:
+    mix = {}
+    for value in values:
+        name, _, weight = value.partition("=")
+        mix[name] = float(weight) if weight else 1.0
+    return mix
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Многопроцессный генератор нагрузки на API объявлений")
+    parser.add_argument("--api-url", default=BASE_URL,
+                        help=f"Базовый URL API или '{LOCAL_TARGET}' для локальной замены")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Число процессов")
+    parser.add_argument("--spec", default=None, help="Спецификация нагрузки в JSON (WorkloadSpec)")
+    parser.add_argument("--mix", nargs="+", default=None, metavar="ENDPOINT=WEIGHT",
+                        help=f"Смесь эндпоинтов: {', '.join(ENDPOINTS)}")
+    parser.add_argument("--duration", type=float, default=None, help="Секунд нагрузки")
+    parser.add_argument("--concurrency", type=int, default=None, help="Потоков в каждом воркере")
+    parser.add_argument("--rate", type=float, default=None,
+                        help="Суммарная частота запросов в секунду (открытая модель)")
+    parser.add_argument("--interval", type=float, default=None, help="Интервал живой сводки, секунд")
+    parser.add_argument("--json", dest="json_path", default=None, help="Сохранить результаты в JSON")
+    args = parser.parse_args(argv)
+
+    spec_data: Dict[str, Any] = {}
+    if args.spec:
+        with open(args.spec, encoding="utf-8") as f:
+            spec_data = json.load(f)
+    if args.mix:
+        spec_data["mix"] = _parse_mix(args.mix)
+    for key in ("duration", "concurrency", "interval"):
+        if getattr(args, key) is not None:
+            spec_data[key] = getattr(args, key)
+    if args.rate is not None:
+        spec_data["rate"] = args.rate
+    spec = WorkloadSpec.from_dict(spec_data)
+
+    server = None
+    base_url = args.api_url.rstrip("/")
+    if args.api_url == LOCAL_TARGET:
+        from local_server import LocalAPIServer
+        server = LocalAPIServer().start()
+        base_url = server.base_url
+
+    print(f"Воркеров {args.workers}, потоков в каждом {spec.concurrency}, {spec.duration:g} с, "
+          f"смесь {', '.join(f'{k}={v:g}' for k, v in spec.mix.items())}", flush=True)
+    try:
+        result = run(base_url, spec, args.workers, progress=lambda line: print(line, flush=True),
+                     journal_dir=None if server else str(DEFAULT_JOURNAL_DIR))
+    finally:
+        if server is not None:
+            server.stop()
+
+    print()
+    print(format_report(result.results() + [result.combined()]))
+    print("Запросов по воркерам: " + " ".join(f"{k}:{v}" for k, v in sorted(result.worker_requests.items())))
+    for index, error in sorted(result.errors.items()):
+        print(f"Воркер {index}: {error}")
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(result.to_dict(), f, ensure_ascii=False, indent=2)
+    return 1 if result.errors else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
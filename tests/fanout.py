@@ -0,0 +1,446 @@
+"""
+Сравнение нескольких стендов API: одинаковые запросы и разбор расхождений.
+
+Сценарий (по умолчанию — жизненный цикл объявления как TC-031 плюс
+невалидные запросы и несуществующие ID) выполняется по шагам на всех
+стендах сразу: у каждого стенда свой APIClient, sellerID и созданные
+объявления, запросы шага отправляются параллельно. Ответы нормализуются —
+ID объявлений и sellerID заменяются токенами <item:N>/<seller:N>, createdAt
+скрывается, sellerId приводится к sellerID (BUG-004), списки сортируются —
+и структурно сравниваются с первым стендом. Чтения только что созданного
+объявления ждут его видимости (конечная согласованность не считается
+расхождением). --fuzz N добавляет N случайных тел POST /api/1/item из
+fuzz.generate_case.
+
+В отчёте — статусы по шагам, расхождения по путям JSON и задержки
+эндпоинтов на каждом стенде. С --suite вместо сценария на всех стендах
+параллельно запускается pytest (у каждого свой каталог кэша) и
+сравниваются итоги тестов.
+
+Запуск (из каталога tests):
+    python -m fanout --target remote=https://qa-internship.avito.com --target local
+    python -m fanout --target https://stand-a --target https://stand-b --fuzz 200 --seed 1 --json fanout.json
+    python -m fanout --suite --target remote=https://qa-internship.avito.com --target local -- -m smoke
+Код возврата 1, если есть расхождения.
+"""
+import argparse
+import json
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ElementTree
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+import requests
+
+from cassette import Normalizer, parse_json
+from cleanup import CleanupQueue, cli_targets
+from conftest import (BASE_URL, LOCAL_TARGET, APIClient, create_valid_item_data, generate_unique_seller_id,
+                      use_load_seller_ids)
+from fuzz import generate_case
+from histogram import LatencyHistogram
+from http_timing import endpoint_template
+
+SELLER = "{seller}"
+ITEM = "{item}"
+MISSING_ITEM_ID = "00000000-0000-0000-0000-000000000000"
+MAX_DIFFS = 20
+SETTLE_TIMEOUT = 10.0
+
+
+@dataclass
+class Step:
+    """
+    Запрос сценария. В path подставляются {seller} — sellerID стенда и
+    {item} — последнее созданное на стенде объявление; значения "{seller}"
+    в теле заменяются на sellerID. creates — ответ шага задаёт {item} для
+    следующих шагов; settle — ждать, пока это объявление станет видно в ответе.
+    """
+
+    name: str
+    method: str
+    path: str
+    body: Any = None
+    creates: bool = False
+    settle: bool = False
+
+
+def _valid_body(**overrides: Any) -> Dict[str, Any]:
+    return {**create_valid_item_data(seller_id=0, name="Сравнение стендов", price=1500), "sellerID": SELLER,
+            **overrides}
+
+
+DEFAULT_STEPS = [
+    Step("create", "POST", "/api/1/item", _valid_body(), creates=True),
+    Step("get_item", "GET", "/api/1/item/{item}", settle=True),
+    Step("seller_items", "GET", "/api/1/{seller}/item", settle=True),
+    Step("statistic", "GET", "/api/1/statistic/{item}", settle=True),
+    Step("statistic_v2", "GET", "/api/2/statistic/{item}", settle=True),
+    Step("create_without_name", "POST", "/api/1/item",
+         {k: v for k, v in _valid_body().items() if k != "name"}),
+    Step("create_negative_price", "POST", "/api/1/item", _valid_body(price=-1)),
+    Step("create_string_price", "POST", "/api/1/item", _valid_body(price="1500")),
+    Step("create_nested_statistics", "POST", "/api/1/item",
+         {"sellerID": SELLER, "name": "Сравнение стендов", "price": 1500,
+          "statistics": {"likes": 1, "viewCount": 2, "contacts": 3}}),
+    Step("get_missing_item", "GET", f"/api/1/item/{MISSING_ITEM_ID}"),
+    Step("get_invalid_id", "GET", "/api/1/item/not-an-id"),
+    Step("statistic_missing", "GET", f"/api/1/statistic/{MISSING_ITEM_ID}"),
+    Step("seller_items_invalid", "GET", "/api/1/abc/item"),
+    Step("delete", "DELETE", "/api/2/item/{item}"),
+    Step("get_deleted", "GET", "/api/1/item/{item}"),
+]
+
+
+def fuzz_steps(count: int, seed: Optional[int] = None) -> List[Step]:
+    """Случайные тела POST /api/1/item (одинаковые для всех стендов)."""
+    rng = random.Random(seed)
+    steps = []
+    for index in range(count):
+        payload, tags = generate_case(rng)
+        steps.append(Step(f"fuzz-{index} ({', '.join(tags)})", "POST", "/api/1/item", payload))
+    return steps
+
+
+# --- Нормализация и сравнение ----------------------------------------------
+
+def _canonical(data: Any) -> Any:
+    """sellerId -> sellerID (BUG-004), списки — в детерминированном порядке."""
+    if isinstance(data, dict):
+        return {("sellerID" if key == "sellerId" else key): _canonical(value) for key, value in data.items()}
+    if isinstance(data, list):
+        items = [_canonical(value) for value in data]
+        return sorted(items, key=lambda v: json.dumps(v, ensure_ascii=False, sort_keys=True))
+    return data
+
+
+def _mask_strings(data: Any, replacements: Dict[str, str]) -> Any:
+    """Замена известных ID внутри строк (например, в текстах ошибок)."""
+    if isinstance(data, dict):
+        return {key: _mask_strings(value, replacements) for key, value in data.items()}
+    if isinstance(data, list):
+        return [_mask_strings(value, replacements) for value in data]
+    if isinstance(data, str) and replacements:
+        pattern = "|".join(re.escape(value) for value in sorted(replacements, key=len, reverse=True))
+        return re.sub(pattern, lambda m: replacements[m.group(0)], data)
+    return data
+
+
+def normalize(normalizer: Normalizer, status: Optional[int], content: Optional[bytes],
+              error: Optional[str] = None) -> Dict[str, Any]:
+    """Ответ в сравнимом виде: статус и тело с токенами вместо динамических значений."""
+    if error is not None:
+        return {"status": None, "error": error}
+    is_json, data = parse_json(content)
+    if is_json:
+        data = normalizer.for_diff(normalizer.sellers_to_tokens(data))
+    else:
+        data = (content or b"").decode("utf-8", errors="replace")
+    replacements = {**{item: token for item, token in normalizer.items.items()},
+                    **{str(seller): token for seller, token in normalizer.sellers.items()}}
+    return {"status": status, "body": _canonical(_mask_strings(data, replacements))}
+
+
+def _show(value: Any, limit: int = 80) -> str:
+    text = json.dumps(value, ensure_ascii=False)
+    return text if len(text) <= limit else text[:limit] + "…"
+
+
+def structural_diff(expected: Any, actual: Any, path: str = "$") -> List[str]:
+    """Различия двух JSON-значений по путям: типы, ключи, длины списков, значения."""
+    if type(expected) is not type(actual):
+        return [f"{path}: {_show(expected)} != {_show(actual)}"]
+    if isinstance(expected, dict):
+        diffs = []
+        for key in expected.keys() | actual.keys():
+            child = f"{path}.{key}"
+            if key not in actual:
+                diffs.append(f"{child}: нет поля")
+            elif key not in expected:
+                diffs.append(f"{child}: лишнее поле {_show(actual[key])}")
+            else:
+                diffs.extend(structural_diff(expected[key], actual[key], child))
+        return sorted(diffs)
+    if isinstance(expected, list):
+        diffs = []
+        if len(expected) != len(actual):
+            diffs.append(f"{path}: длина {len(expected)} != {len(actual)}")
+        for index, (left, right) in enumerate(zip(expected, actual)):
+            diffs.extend(structural_diff(left, right, f"{path}[{index}]"))
+        return diffs
+    if expected != actual:
+        return [f"{path}: {_show(expected)} != {_show(actual)}"]
+    return []
+
+
+# --- Выполнение сценария ----------------------------------------------------
+
+class Target:
+    """Стенд: свой клиент, продавец, созданные объявления и задержки."""
+
+    def __init__(self, name: str, base_url: str, cleanup: Optional[CleanupQueue] = None):
+        self.name = name
+        self.base_url = base_url
+        self.client = APIClient(base_url, cleanup=cleanup)
+        self.seller_id = generate_unique_seller_id()
+        self.item_id: Optional[str] = None
+        self.normalizer = Normalizer()
+        self.latency: Dict[str, LatencyHistogram] = {}
+
+    def _substitute(self, value: Any) -> Any:
+        if value == SELLER:
+            return self.seller_id
+        if isinstance(value, dict):
+            return {key: self._substitute(v) for key, v in value.items()}
+        if isinstance(value, list):
+            return [self._substitute(v) for v in value]
+        return value
+
+    def _send(self, method: str, path: str, body: Any) -> requests.Response:
+        url = self.base_url + path
+        started = time.perf_counter()
+        response = self.client.session.request(method, url, **({} if body is None else {"json": body}))
+        key = f"{method} {endpoint_template(url)}"
+        self.latency.setdefault(key, LatencyHistogram()).record(time.perf_counter() - started)
+        return response
+
+    def _settled(self, step: Step, response: requests.Response) -> bool:
+        return response.status_code == 200 and (ITEM in step.path or self.item_id in response.text)
+
+    def execute(self, step: Step) -> Dict[str, Any]:
+        """Выполнение шага; ответ — в нормализованном виде."""
+        if ITEM in step.path and self.item_id is None:
+            return {"status": None, "error": "нет созданного объявления"}
+        path = step.path.replace(SELLER, str(self.seller_id)).replace(ITEM, self.item_id or "")
+        body = self._substitute(step.body)
+        def probe() -> Optional[requests.Response]:
+            retry = self._send(step.method, path, body)
+            return retry if self._settled(step, retry) else None
+
+        try:
+            response = self._send(step.method, path, body)
+            if step.settle and self.item_id is not None and not self._settled(step, response):
+                try:
+                    response = self.client.wait_until(probe, SETTLE_TIMEOUT)
+                except AssertionError:
+                    pass
+        except requests.RequestException as e:
+            return normalize(self.normalizer, None, None, type(e).__name__)
+        self._track(step, response)
+        return normalize(self.normalizer, response.status_code, response.content)
+
+    def _track(self, step: Step, response: requests.Response) -> None:
+        cleanup = self.client.cleanup
+        if step.method == "POST" and response.status_code == 200:
+            is_json, data = parse_json(response.content)
+            item_id = data.get("id") if is_json and isinstance(data, dict) else None
+            if item_id:
+                if step.creates:
+                    self.item_id = item_id
+                if cleanup is not None:
+                    cleanup.register(self.base_url, item_id)
+        elif step.method == "DELETE" and response.status_code == 200 and cleanup is not None:
+            cleanup.mark_deleted(self.item_id)
+
+
+@dataclass
+class StepResult:
+    step: Step
+    responses: Dict[str, Dict[str, Any]]
+    diffs: Dict[str, List[str]] = field(default_factory=dict)
+
+    @property
+    def diverged(self) -> bool:
+        return any(self.diffs.values())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"step": self.step.name, "method": self.step.method, "path": self.step.path,
+                "responses": self.responses, "diffs": self.diffs}
+
+
+def compare_responses(responses: Dict[str, Dict[str, Any]]) -> Dict[str, List[str]]:
+    """Расхождения каждого стенда с первым (эталонным)."""
+    names = list(responses)
+    reference = responses[names[0]]
+    return {name: structural_diff(reference, responses[name])[:MAX_DIFFS] for name in names[1:]}
+
+
+def run_steps(targets: Sequence[Target], steps: Sequence[Step]) -> List[StepResult]:
+    """Шаги по очереди, каждый — параллельно на всех стендах."""
+    results = []
+    with ThreadPoolExecutor(len(targets), thread_name_prefix="fanout") as pool:
+        for step in steps:
+            futures = [(target.name, pool.submit(target.execute, step)) for target in targets]
+            responses = {name: future.result() for name, future in futures}
+            results.append(StepResult(step, responses, compare_responses(responses)))
+    return results
+
+
+def format_steps(targets: Sequence[Target], results: Sequence[StepResult]) -> str:
+    names = [target.name for target in targets]
+    width = max(len("шаг"), *(len(r.step.name) for r in results)) + 2
+    column = max(8, *(len(name) + 2 for name in names))
+    lines = [f"{'шаг':<{width}}" + "".join(f"{name:>{column}}" for name in names) + "  итог",
+             "-" * (width + column * len(names) + 6)]
+    for result in results:
+        statuses = "".join(f"{str(result.responses[n].get('status') or result.responses[n].get('error')):>{column}}"
+                           for n in names)
+        lines.append(f"{result.step.name:<{width}}{statuses}  {'РАСХОЖДЕНИЕ' if result.diverged else 'ok'}")
+    divergent = [r for r in results if r.diverged]
+    for result in divergent:
+        lines.append("")
+        lines.append(f"{result.step.name}: {result.step.method} {result.step.path}")
+        for name, diffs in result.diffs.items():
+            for diff in diffs:
+                lines.append(f"  {names[0]} -> {name}: {diff}")
+    lines.append("")
+    lines.append(f"Шагов {len(results)}, с расхождениями {len(divergent)}")
+    return "\n".join(lines)
+
+
+def format_latency(targets: Sequence[Target]) -> str:
+    """p50/p90 задержки эндпоинтов по стендам, мс."""
+    endpoints = sorted({key for target in targets for key in target.latency})
+    if not endpoints:
+        return ""
+    width = max(len("эндпоинт"), *(len(key) for key in endpoints)) + 2
+    column = max(14, *(len(target.name) + 2 for target in targets))
+    lines = [f"{'эндпоинт':<{width}}" + "".join(f"{target.name:>{column}}" for target in targets),
+             f"{'':<{width}}" + "".join(f"{'p50 / p90 мс':>{column}}" for _ in targets)]
+    for key in endpoints:
+        cells = []
+        for target in targets:
+            histogram = target.latency.get(key)
+            if histogram is None or not histogram.total_count:
+                cells.append(f"{'-':>{column}}")
+                continue
+            pct = histogram.percentiles([50, 90])
+            cells.append(f"{f'{pct[50] / 1000:.1f} / {pct[90] / 1000:.1f}':>{column}}")
+        lines.append(f"{key:<{width}}" + "".join(cells))
+    return "\n".join(lines)
+
+
+# --- Прогон pytest на нескольких стендах ------------------------------------
+
+def junit_outcomes(path: Path) -> Dict[str, Tuple[str, float]]:
+    """Итоги тестов из JUnit XML: {класс::тест: (исход, секунды)}."""
+    outcomes = {}
+    for case in ElementTree.parse(path).getroot().iter("testcase"):
+        outcome = "passed"
+        for child in case:
+            if child.tag in ("failure", "error", "skipped"):
+                outcome = {"failure": "failed", "error": "error", "skipped": "skipped"}[child.tag]
+                break
+        outcomes[f"{case.get('classname')}::{case.get('name')}"] = (outcome, float(case.get("time") or 0))
+    return outcomes
+
+
+def run_suite(targets: Dict[str, str], pytest_args: Sequence[str] = (),
+              workdir: Optional[str] = None) -> Dict[str, Dict[str, Tuple[str, float]]]:
+    """Параллельный pytest на каждом стенде; итоги тестов по стендам."""
+    root = Path(__file__).resolve().parent.parent
+    workdir = Path(workdir or tempfile.mkdtemp(prefix="fanout-"))
+    processes = {}
+    for name, url in targets.items():
+        junit = workdir / f"{name}.xml"
+        command = [sys.executable, "-m", "pytest", f"--api-url={url}", "-q",
+                   f"--junitxml={junit}", "-o", f"cache_dir={workdir / f'cache-{name}'}", *pytest_args]
+        log = open(workdir / f"{name}.log", "w", encoding="utf-8")
+        processes[name] = (subprocess.Popen(command, cwd=root, stdout=log, stderr=subprocess.STDOUT), junit, log)
+    outcomes = {}
+    for name, (process, junit, log) in processes.items():
+        process.wait()
+        log.close()
+        outcomes[name] = junit_outcomes(junit) if junit.exists() else {}
+    return outcomes
+
+
+def format_suite(outcomes: Dict[str, Dict[str, Tuple[str, float]]]) -> Tuple[str, int]:
+    """Сводка по стендам и тесты с разными исходами; второе значение — число таких тестов."""
+    names = list(outcomes)
+    lines = [f"{'стенд':<16}{'passed':>8}{'failed':>8}{'error':>8}{'skipped':>9}{'время с':>10}"]
+    for name in names:
+        counts = {kind: 0 for kind in ("passed", "failed", "error", "skipped")}
+        for outcome, _ in outcomes[name].values():
+            counts[outcome] += 1
+        total = sum(seconds for _, seconds in outcomes[name].values())
+        lines.append(f"{name:<16}{counts['passed']:>8}{counts['failed']:>8}{counts['error']:>8}"
+                     f"{counts['skipped']:>9}{total:>10.1f}")
+    tests = sorted({test for result in outcomes.values() for test in result})
+    divergent = [test for test in tests
+                 if len({outcomes[name].get(test, ("нет", 0))[0] for name in names}) > 1]
+    if divergent:
+        lines.append("")
+        lines.append("Разные исходы:")
+        for test in divergent:
+            cells = ", ".join(f"{name}={outcomes[name].get(test, ('нет', 0))[0]}" for name in names)
+            lines.append(f"  {test}: {cells}")
+    return "\n".join(lines), len(divergent)
+
+
+def parse_target(value: str) -> Tuple[str, str]:
+    """'имя=URL', 'URL' (имя — хост) или 'local'."""
+    if value == LOCAL_TARGET:
+        return LOCAL_TARGET, LOCAL_TARGET
+    name, sep, url = value.partition("=")
+    if not sep:
+        url, name = value, urlsplit(value).hostname or value
+    return name, url.rstrip("/")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Сравнение стендов API объявлений Avito")
+    parser.add_argument("--target", action="append", default=[],
+                        help=f"Стенд: имя=URL, URL или '{LOCAL_TARGET}' (не меньше двух; первый — эталон)")
+    parser.add_argument("--fuzz", type=int, default=0, help="Добавить столько случайных тел POST /api/1/item")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--suite", action="store_true",
+                        help="Запустить pytest на всех стендах и сравнить итоги тестов (аргументы pytest — после --)")
+    parser.add_argument("--json", dest="json_path", default=None, help="Сохранить результаты в JSON")
+    parser.add_argument("pytest_args", nargs="*", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    use_load_seller_ids()
+
+    targets = dict(parse_target(value) for value in (args.target or [f"remote={BASE_URL}", LOCAL_TARGET]))
+    if len(targets) < 2:
+        parser.error("нужно не меньше двух стендов с разными именами")
+
+    if args.suite:
+        print(f"pytest на стендах: {', '.join(targets)}...", flush=True)
+        outcomes = run_suite(targets, args.pytest_args)
+        report, divergent = format_suite(outcomes)
+        print(report)
+        if args.json_path:
+            with open(args.json_path, "w", encoding="utf-8") as f:
+                json.dump(outcomes, f, ensure_ascii=False, indent=2)
+        return 1 if divergent else 0
+
+    with cli_targets(*targets.values()) as (urls, cleanup):
+        base_urls = dict(zip(targets, urls))
+        stands = [Target(name, url, cleanup) for name, url in base_urls.items()]
+        steps = DEFAULT_STEPS + fuzz_steps(args.fuzz, args.seed)
+        results = run_steps(stands, steps)
+
+    print()
+    print("\n".join(f"{target.name}: {target.base_url}" for target in stands))
+    print()
+    print(format_steps(stands, results))
+    print()
+    print(format_latency(stands))
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump({"targets": base_urls, "steps": [r.to_dict() for r in results],
+                       "latency": {t.name: {k: h.to_dict() for k, h in t.latency.items()} for t in stands}},
+                      f, ensure_ascii=False, indent=2)
+    return 1 if any(r.diverged for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,314 @@
+"""
+Внедрение сбоев в транспорт APIClient.
+
+FaultInjectionAdapter монтируется в requests.Session поверх уже
+смонтированных адаптеров (как кассета) и по правилам FaultRule для
+выбранных эндпоинтов добавляет задержку из распределения, отвечает 5xx
+сериями, обрывает соединение до или после отправки запроса, имитирует
+таймаут и отдаёт тело медленно или не полностью. Сбои соблюдают таймаут
+запроса так же, как настоящий сокет: задержка дольше таймаута чтения
+превращается в ReadTimeout по его истечении.
+
+В тестах правила задаются маркером или фикстурой fault_injector:
+
+    @pytest.mark.faults(FaultRule("GET /api/1/item/{id}", status=503, burst=2))
+    def test_retry(api_client): ...
+
+    def test_slow(api_client, fault_injector):
+        fault_injector.add(FaultRule("GET /api/1/{sellerID}/item", latency=lognormal(0.05, 0.5)))
+
+Случайность воспроизводима: зерно задаётся в маркере (seed=...) или инжектору.
+Фикстура берёт копии правил маркера (FaultRule.fresh), поэтому счётчики times
+и burst начинаются заново для каждого запуска теста (параметризация, повторы).
+
+Адаптер монтируется внешним: внедрённые задержки, синтетические 5xx и обрывы
+не доходят до адаптеров под ним — их нет в --http-timings, HTTP-бюджете теста
+и кассете (в режиме записи сбои в неё не попадают); считает их только
+FaultInjector.injected.
+"""
+import copy
+import json
+import math
+import random
+import threading
+import time
+from collections import Counter
+from typing import Callable, Iterator, List, Optional, Tuple, Union
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3.exceptions import ProtocolError, ReadTimeoutError
+
+from http_timing import endpoint_template
+
+RESET_BEFORE = "before"
+RESET_AFTER = "after"
+# Сколько висит запрос с сбоем timeout, если у запроса нет таймаута
+DEFAULT_STALL = 60.0
+BODY_CHUNK_SIZE = 1024
+
+Distribution = Callable[[random.Random], float]
+Timeout = Union[None, float, Tuple[Optional[float], Optional[float]]]
+
+
+def fixed(seconds: float) -> Distribution:
+    return lambda rng: seconds
+
+
+def uniform(low: float, high: float) -> Distribution:
+    return lambda rng: rng.uniform(low, high)
+
+
+def lognormal(median: float, sigma: float) -> Distribution:
+    """Логнормальная задержка: типичная форма распределения времени ответа с хвостом."""
+    return lambda rng: rng.lognormvariate(math.log(median), sigma)
+
+
+def _read_timeout(timeout: Timeout) -> Optional[float]:
+    if isinstance(timeout, tuple):
+        return timeout[1]
+    return timeout
+
+
+class FaultRule:
+    """
+    Правило сбоя для запросов к эндпоинту.
+
+    endpoint — "METHOD /шаблон" (как в http_timing), только шаблон или None
+    для всех запросов. Правило срабатывает с вероятностью probability и затем
+    действует ещё на burst - 1 следующих подходящих запросов; times
+    ограничивает общее число срабатываний. Сбои одного срабатывания:
+        latency   — задержка ответа из распределения (секунды);
+        status    — синтетический ответ с этим статусом без обращения к сервису;
+        reset     — "before": обрыв до отправки, "after": запрос выполнен, ответ потерян;
+        timeout   — ответ не приходит до истечения таймаута чтения;
+        slow_body — тело отдаётся со скоростью slow_body байт/с;
+        truncate  — соединение обрывается после этой доли тела (0..1).
+    """
+
+    def __init__(self, endpoint: Optional[str] = None, probability: float = 1.0, burst: int = 1,
+                 times: Optional[int] = None, latency: Optional[Distribution] = None,
+                 status: Optional[int] = None, reset: Optional[str] = None, timeout: bool = False,
+                 slow_body: Optional[float] = None, truncate: Optional[float] = None):
+        if reset not in (None, RESET_BEFORE, RESET_AFTER):
+            raise ValueError(f"reset: ожидалось '{RESET_BEFORE}' или '{RESET_AFTER}', получено {reset!r}")
+        self.endpoint = endpoint
+        self.probability = probability
+        self.burst = burst
+        self.times = times
+        self.latency = latency
+        self.status = status
+        self.reset = reset
+        self.timeout = timeout
+        self.slow_body = slow_body
+        self.truncate = truncate
+        self.fired = 0
+        self._burst_left = 0
+
+    def fresh(self) -> "FaultRule":
+        """Копия правила без сработавших сбоев и незаконченной серии."""
+        rule = copy.copy(self)
+        rule.fired = 0
+        rule._burst_left = 0
+        return rule
+
+    def matches(self, method: str, url: str) -> bool:
+        if self.endpoint is None:
+            return True
+        template = endpoint_template(url)
+        if " " in self.endpoint:
+            return self.endpoint == f"{method} {template}"
+        return self.endpoint == template
+
+    def trigger(self, rng: random.Random) -> bool:
+        """Срабатывание на очередном подходящем запросе (с учётом серии)."""
+        if self._burst_left > 0:
+            self._burst_left -= 1
+            return True
+        if self.times is not None and self.fired >= self.times:
+            return False
+        if rng.random() >= self.probability:
+            return False
+        self.fired += 1
+        self._burst_left = self.burst - 1
+        return True
+
+    def __repr__(self) -> str:
+        faults = [f"{name}={getattr(self, name)!r}" for name in
+                  ("status", "reset", "timeout", "slow_body", "truncate") if getattr(self, name)]
+        if self.latency is not None:
+            faults.append("latency")
+        return f"FaultRule({self.endpoint!r}, {', '.join(faults)})"
+
+
+class _FaultyBody:
+    """
+    Тело ответа вместо urllib3-ответа: медленная отдача и обрыв.
+    Ошибки — те же, что у urllib3, requests превращает их в свои исключения.
+    """
+
+    def __init__(self, content: bytes, url: str, rate: Optional[float], cut: Optional[int],
+                 read_timeout: Optional[float], sleep: Callable[[float], None]):
+        self._content = content
+        self._url = url
+        self._rate = rate
+        self._cut = cut
+        self._read_timeout = read_timeout
+        self._sleep = sleep
+        self._pos = 0
+
+    def stream(self, chunk_size: int = BODY_CHUNK_SIZE, decode_content: bool = True) -> Iterator[bytes]:
+        chunk_size = chunk_size or BODY_CHUNK_SIZE
+        while True:
+            chunk = self.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+    def read(self, amt: Optional[int] = None, **kwargs) -> bytes:
+        end = len(self._content) if amt is None else min(len(self._content), self._pos + amt)
+        if self._cut is not None and end > self._cut:
+            end = self._cut
+            if end == self._pos:
+                raise ProtocolError("Connection broken: IncompleteRead",
+                                    ConnectionResetError("соединение оборвано внедрённым сбоем"))
+        chunk = self._content[self._pos:end]
+        if chunk and self._rate:
+            gap = len(chunk) / self._rate
+            if self._read_timeout is not None and gap > self._read_timeout:
+                self._sleep(self._read_timeout)
+                raise ReadTimeoutError(None, self._url, "Read timed out. (внедрённый сбой)")
+            self._sleep(gap)
+        self._pos = end
+        return chunk
+
+    def close(self) -> None:
+        pass
+
+    def release_conn(self) -> None:
+        pass
+
+
+class FaultInjectionAdapter(BaseAdapter):
+    """Адаптер requests: сбои по правилам поверх вложенного адаптера."""
+
+    def __init__(self, injector: "FaultInjector", inner: BaseAdapter):
+        super().__init__()
+        self.injector = injector
+        self.inner = inner
+
+    def send(self, request: requests.PreparedRequest, stream: bool = False, timeout: Timeout = None,
+             **kwargs) -> requests.Response:
+        rule = self.injector.match(request)
+        if rule is None:
+            return self.inner.send(request, stream=stream, timeout=timeout, **kwargs)
+        injector = self.injector
+        read_timeout = _read_timeout(timeout)
+
+        if rule.reset == RESET_BEFORE:
+            injector.count(rule, "reset")
+            raise requests.ConnectionError(ConnectionResetError("соединение сброшено до отправки"),
+                                           request=request)
+        if rule.latency is not None:
+            delay = rule.latency(injector.rng)
+            injector.count(rule, "latency")
+            if read_timeout is not None and delay > read_timeout:
+                injector.sleep(read_timeout)
+                raise requests.ReadTimeout(f"внедрённая задержка {delay:.3f} с дольше таймаута", request=request)
+            injector.sleep(delay)
+        if rule.timeout:
+            injector.count(rule, "timeout")
+            injector.sleep(DEFAULT_STALL if read_timeout is None else read_timeout)
+            raise requests.ReadTimeout("ответ не получен (внедрённый сбой)", request=request)
+        if rule.status is not None:
+            injector.count(rule, f"status {rule.status}")
+            return self._synthetic(request, rule.status)
+
+        response = self.inner.send(request, stream=stream, timeout=timeout, **kwargs)
+        if rule.reset == RESET_AFTER:
+            injector.count(rule, "reset")
+            response.close()
+            raise requests.ConnectionError(ConnectionResetError("соединение сброшено до получения ответа"),
+                                           request=request)
+        if rule.slow_body is not None or rule.truncate is not None:
+            injector.count(rule, "body")
+            content = response.content
+            cut = None if rule.truncate is None else int(len(content) * rule.truncate)
+            response.raw = _FaultyBody(content, request.url, rule.slow_body, cut, read_timeout, injector.sleep)
+            response._content = False
+            response._content_consumed = False
+            if not stream:
+                response.content  # ошибки тела — при отправке, как у обычного запроса
+        return response
+
+    @staticmethod
+    def _synthetic(request: requests.PreparedRequest, status: int) -> requests.Response:
+        response = requests.Response()
+        response.status_code = status
+        response.reason = "Injected Fault"
+        response.url = request.url
+        response.request = request
+        response.headers = CaseInsensitiveDict({"Content-Type": "application/json"})
+        response._content = json.dumps({"result": "внедрённый сбой", "status": str(status)}).encode("utf-8")
+        response._content_consumed = True
+        return response
+
+    def close(self) -> None:
+        self.inner.close()
+
+
+class FaultInjector:
+    """Набор правил и счётчики сработавших сбоев; подключается к сессиям requests."""
+
+    def __init__(self, rules: Optional[List[FaultRule]] = None, seed: Optional[int] = None,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.rules: List[FaultRule] = list(rules or [])
+        self.rng = random.Random(seed)
+        self.sleep = sleep
+        self.injected: Counter = Counter()
+        self._lock = threading.Lock()
+        self._installed: List[Tuple[requests.Session, str, BaseAdapter]] = []
+
+    def add(self, rule: FaultRule) -> FaultRule:
+        with self._lock:
+            self.rules.append(rule)
+        return rule
+
+    def clear(self) -> None:
+        with self._lock:
+            self.rules.clear()
+
+    def match(self, request: requests.PreparedRequest) -> Optional[FaultRule]:
+        """Первое сработавшее правило для запроса."""
+        with self._lock:
+            for rule in self.rules:
+                if rule.matches(request.method, request.url) and rule.trigger(self.rng):
+                    return rule
+        return None
+
+    def count(self, rule: FaultRule, kind: str) -> None:
+        with self._lock:
+            self.injected[(rule.endpoint or "*", kind)] += 1
+
+    def install(self, session: requests.Session) -> None:
+        """Подключение поверх уже смонтированных адаптеров сессии."""
+        for prefix in ("http://", "https://"):
+            inner = session.get_adapter(prefix)
+            self._installed.append((session, prefix, inner))
+            session.mount(prefix, FaultInjectionAdapter(self, inner))
+
+    def uninstall(self) -> None:
+        """Возврат адаптеров, которые были до install."""
+        while self._installed:
+            session, prefix, inner = self._installed.pop()
+            session.mount(prefix, inner)
+
+    def __enter__(self) -> "FaultInjector":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.uninstall()
+
+    def summary_lines(self) -> List[str]:
+        return [f"{endpoint}: {kind} x{count}" for (endpoint, kind), count in sorted(self.injected.items())]
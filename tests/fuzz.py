@@ -0,0 +1,455 @@
+"""
+Фаззинг POST /api/1/item.
+
+Генератор берёт валидное тело create_valid_item_data и применяет к нему 1–3
+случайные мутации: удаление полей, неверные типы, границы int32 и за ними,
+вложенный объект statistics (BUG-001), отрицательная статистика (BUG-002),
+unicode и управляющие символы, очень длинные строки, лишние поля, не-объект
+на верхнем уровне. Случаи отправляются конкурентно через AsyncAPIClient
+с адаптивной конкурентностью (AIMDController).
+
+Оракул вычисляет ожидаемый по документации статус (200 или 400) и известное
+отклонение сервиса (BUG-001, BUG-002). Ответ классифицируется:
+    ok               — статус совпал с ожидаемым;
+    known_bug        — совпал с задокументированным отклонением;
+    accepted_invalid — невалидное тело принято (дыра в валидации);
+    rejected_valid   — валидное тело отклонено;
+    server_error     — 5xx;
+    unexpected       — прочие статусы и ошибки соединения.
+Для каждой группы одинаковых расхождений один случай сжимается до
+минимального воспроизводящего тела (жадное упрощение с повторной отправкой).
+
+Запуск (из каталога tests):
+    python -m fuzz --api-url local --cases 20000 --seed 1
+    python -m fuzz --cases 5000 --concurrency 32 --out fuzz-failures.jsonl
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import aiohttp
+
+from async_client import AsyncAPIClient
+from cleanup import CleanupQueue, cli_targets
+from concurrency import AIMDController
+from conftest import BASE_URL, LOCAL_TARGET, SELLER_ID_MAX, SELLER_ID_MIN, create_valid_item_data
+from item_fields import STATISTIC_FIELDS
+
+INT32_MAX = 2147483647
+INT32_MIN = -2147483648
+FIELDS = ("sellerID", "name", "price") + STATISTIC_FIELDS
+
+OK = "ok"
+KNOWN_BUG = "known_bug"
+ACCEPTED_INVALID = "accepted_invalid"
+REJECTED_VALID = "rejected_valid"
+SERVER_ERROR = "server_error"
+UNEXPECTED = "unexpected"
+FAILURE_CATEGORIES = (ACCEPTED_INVALID, REJECTED_VALID, SERVER_ERROR, UNEXPECTED)
+
+BATCH_SIZE = 500
+DEFAULT_SHRINK_GROUPS = 20
+DEFAULT_SHRINK_BUDGET = 200
+
+INT_BOUNDARIES = (-1, 0, 1, INT32_MAX, INT32_MAX + 1, INT32_MIN, INT32_MIN - 1, 2 ** 63, 10 ** 30)
+WRONG_TYPES = ("numeric_string", "text", "float_integral", "float_fraction", "bool", "null", "list", "object")
+UNICODE_NAMES = ("Товар 🚗", "مرحبا", "a​b", "é́́", "‮реверс", "𝔘𝔫𝔦𝔠𝔬𝔡𝔢")
+HUGE_LENGTHS = (1_000, 10_000, 100_000, 1_000_000)
+HUGE_WEIGHTS = (8, 4, 2, 1)
+
+
+def _is_int(value: Any) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+class Expectation:
+    """Ожидаемый по документации статус и известное отклонение сервиса."""
+
+    __slots__ = ("status", "bug", "bug_status")
+
+    def __init__(self, status: int, bug: Optional[str] = None, bug_status: Optional[int] = None):
+        self.status = status
+        self.bug = bug
+        self.bug_status = bug_status
+
+
+def expected_outcome(payload: Any) -> Expectation:
+    """Оракул: статус по документации для тела запроса."""
+    if not isinstance(payload, dict) or not payload:
+        return Expectation(400)
+    seller_id = payload.get("sellerID")
+    if not _is_int(seller_id) or not 0 < seller_id <= INT32_MAX:
+        return Expectation(400)
+    name = payload.get("name")
+    if not isinstance(name, str) or not name:
+        return Expectation(400)
+    price = payload.get("price")
+    if not _is_int(price) or not 0 <= price <= INT32_MAX:
+        return Expectation(400)
+
+    top_level = [payload.get(field) for field in STATISTIC_FIELDS]
+    if all(_is_int(v) and 0 <= v <= INT32_MAX for v in top_level):
+        return Expectation(200)
+    if all(_is_int(v) and abs(v) <= INT32_MAX for v in top_level):
+        # Отрицательная статистика: по документации 400, сервис принимает
+        return Expectation(400, "BUG-002", 200)
+    nested = payload.get("statistics")
+    if (all(v is None for v in top_level) and isinstance(nested, dict)
+            and all(_is_int(nested.get(f)) and 0 <= nested[f] <= INT32_MAX for f in STATISTIC_FIELDS)):
+        # Формат из документации: сервис его не принимает
+        return Expectation(200, "BUG-001", 400)
+    return Expectation(400)
+
+
+def classify(expectation: Expectation, status: Optional[int]) -> str:
+    if status == expectation.status:
+        return OK
+    if expectation.bug is not None and status == expectation.bug_status:
+        return KNOWN_BUG
+    if status is None:
+        return UNEXPECTED
+    if status >= 500:
+        return SERVER_ERROR
+    if expectation.status == 400 and status == 200:
+        return ACCEPTED_INVALID
+    if expectation.status == 200 and status == 400:
+        return REJECTED_VALID
+    return UNEXPECTED
+
+
+# --- Генерация ---------------------------------------------------------------
+
+def _wrong_type(value: Any, kind: str) -> Any:
+    return {
+        "numeric_string": str(value),
+        "text": "abc",
+        "float_integral": float(value) if _is_int(value) else 1.0,
+        "float_fraction": (value if _is_int(value) else 1) + 0.5,
+        "bool": True,
+        "null": None,
+        "list": [value],
+        "object": {"value": value},
+    }[kind]
+
+
+def _mutate(payload: Dict[str, Any], rng: random.Random) -> Tuple[Any, str]:
+    """Одна случайная мутация; возвращает новое тело и её метку."""
+    kind = rng.choice(("missing", "wrong_type", "boundary", "nested_statistics", "negative_statistics",
+                       "name", "extra_key", "top_level"))
+    field = rng.choice(FIELDS)
+    mutated = dict(payload)
+    if kind == "missing":
+        mutated.pop(field, None)
+        return mutated, f"missing:{field}"
+    if kind == "wrong_type":
+        type_kind = rng.choice(WRONG_TYPES)
+        mutated[field] = _wrong_type(mutated.get(field, 1), type_kind)
+        return mutated, f"wrong_type:{field}:{type_kind}"
+    if kind == "boundary":
+        field = rng.choice(("sellerID", "price") + STATISTIC_FIELDS)
+        mutated[field] = rng.choice(INT_BOUNDARIES)
+        return mutated, f"boundary:{field}"
+    if kind == "nested_statistics":
+        statistics = {f: mutated.pop(f, 0) for f in STATISTIC_FIELDS}
+        if rng.random() < 0.3:
+            mutated.update(statistics)  # и вложенный объект, и поля верхнего уровня
+        mutated["statistics"] = statistics
+        return mutated, "nested_statistics"
+    if kind == "negative_statistics":
+        field = rng.choice(STATISTIC_FIELDS)
+        mutated[field] = -rng.randint(1, INT32_MAX)
+        return mutated, f"negative:{field}"
+    if kind == "name":
+        name_kind = rng.choice(("empty", "whitespace", "unicode", "control", "huge"))
+        if name_kind == "empty":
+            mutated["name"] = ""
+        elif name_kind == "whitespace":
+            mutated["name"] = " \t "
+        elif name_kind == "unicode":
+            mutated["name"] = rng.choice(UNICODE_NAMES)
+        elif name_kind == "control":
+            mutated["name"] = rng.choice(("\x00", "a\nb", "\x1b[31m", "﻿"))
+        else:
+            mutated["name"] = "я" * rng.choices(HUGE_LENGTHS, HUGE_WEIGHTS)[0]
+        return mutated, f"name:{name_kind}"
+    if kind == "extra_key":
+        mutated[rng.choice(("id", "createdAt", "sellerId", "unknown", ""))] = rng.choice((1, "x", None))
+        return mutated, "extra_key"
+    return rng.choice(([payload], "item", 42, None, {})), "top_level"
+
+
+def generate_case(rng: random.Random) -> Tuple[Any, List[str]]:
+    """Тело запроса из валидного с 1–3 мутациями и метки мутаций."""
+    payload: Any = create_valid_item_data(
+        seller_id=rng.randint(SELLER_ID_MIN, SELLER_ID_MAX), name="Фаззинг",
+        price=rng.randint(0, 100000), likes=rng.randint(0, 100),
+        view_count=rng.randint(0, 1000), contacts=rng.randint(0, 50))
+    tags = []
+    for _ in range(rng.choice((1, 1, 1, 2, 2, 3))):
+        if not isinstance(payload, dict):
+            break
+        payload, tag = _mutate(payload, rng)
+        tags.append(tag)
+    return payload, tags
+
+
+# --- Сжатие ------------------------------------------------------------------
+
+def complexity(value: Any) -> int:
+    """Мера сложности тела: кандидат при сжатии должен быть строго проще."""
+    if isinstance(value, dict):
+        return 1 + sum(1 + len(k) + complexity(v) for k, v in value.items())
+    if isinstance(value, list):
+        return 1 + sum(complexity(v) for v in value)
+    if isinstance(value, str):
+        return 1 + len(value)
+    if isinstance(value, bool) or value is None:
+        return 1
+    if isinstance(value, int):
+        return 1 + abs(value).bit_length()
+    return 3
+
+
+def shrink_candidates(value: Any) -> Iterator[Any]:
+    """Упрощения значения: сначала самые грубые."""
+    if isinstance(value, dict):
+        for key in value:
+            yield {k: v for k, v in value.items() if k != key}
+        for key, item in value.items():
+            for candidate in shrink_candidates(item):
+                yield {**value, key: candidate}
+    elif isinstance(value, list):
+        if value:
+            yield []
+        for i in range(len(value)):
+            yield value[:i] + value[i + 1:]
+        for i, item in enumerate(value):
+            for candidate in shrink_candidates(item):
+                yield value[:i] + [candidate] + value[i + 1:]
+    elif isinstance(value, str):
+        if len(value) > 1:
+            yield value[:len(value) // 2]
+            yield value[:1]
+        if value and value != "a":
+            yield "a"
+        if value:
+            yield ""
+    elif isinstance(value, bool):
+        if value:
+            yield False
+    elif isinstance(value, int):
+        if value != 0:
+            yield 0
+            sign = 1 if value > 0 else -1
+            if abs(value) > 1:
+                yield sign
+                yield sign * (abs(value) // 2)
+    elif isinstance(value, float):
+        yield 0
+        if value != int(value):
+            yield float(int(value))
+
+
+async def shrink(payload: Any, still_fails: Callable[[Any], Any],
+                 budget: int = DEFAULT_SHRINK_BUDGET) -> Tuple[Any, int]:
+    """Жадное сжатие: первое упрощение, которое всё ещё воспроизводит расхождение."""
+    current = payload
+    attempts = 0
+    improved = True
+    while improved and attempts < budget:
+        improved = False
+        current_complexity = complexity(current)
+        for candidate in shrink_candidates(current):
+            if complexity(candidate) >= current_complexity:
+                continue
+            attempts += 1
+            if await still_fails(candidate):
+                current = candidate
+                improved = True
+                break
+            if attempts >= budget:
+                break
+    return current, attempts
+
+
+# --- Прогон ------------------------------------------------------------------
+
+class Failure:
+    """Группа одинаковых расхождений с минимальным воспроизводящим телом."""
+
+    def __init__(self, category: str, expected: int, status: Optional[int], tags: Tuple[str, ...],
+                 payload: Any):
+        self.category = category
+        self.expected = expected
+        self.status = status
+        self.tags = tags
+        self.payload = payload
+        self.count = 0
+        self.minimal: Any = None
+        self.shrink_attempts = 0
+
+    @property
+    def key(self) -> Tuple:
+        return (self.category, self.expected, self.status, self.tags)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "category": self.category,
+            "expected": self.expected,
+            "status": self.status,
+            "tags": list(self.tags),
+            "count": self.count,
+            "payload": self.payload,
+            "minimal": self.minimal,
+        }
+
+
+class FuzzReport:
+    """Итоги прогона: распределение по категориям и группы расхождений."""
+
+    def __init__(self):
+        self.categories: Counter = Counter()
+        self.bugs: Counter = Counter()
+        self.failures: Dict[Tuple, Failure] = {}
+        self.elapsed = 0.0
+
+    @property
+    def total(self) -> int:
+        return sum(self.categories.values())
+
+    @property
+    def rate(self) -> float:
+        return self.total / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def failed(self) -> int:
+        return sum(self.categories[c] for c in FAILURE_CATEGORIES)
+
+    def add(self, payload: Any, tags: List[str], expectation: Expectation, status: Optional[int]) -> None:
+        category = classify(expectation, status)
+        self.categories[category] += 1
+        if category == KNOWN_BUG:
+            self.bugs[expectation.bug] += 1
+        if category in FAILURE_CATEGORIES:
+            # Метки без конкретного значения: группа — вид мутации и поле
+            group_tags = tuple(sorted(set(tags)))
+            failure = Failure(category, expectation.status, status, group_tags, payload)
+            failure = self.failures.setdefault(failure.key, failure)
+            failure.count += 1
+
+
+def _preview(payload: Any, limit: int = 200) -> str:
+    text = json.dumps(payload, ensure_ascii=False)
+    return text if len(text) <= limit else text[:limit] + f"... ({len(text)} символов)"
+
+
+def format_report(report: FuzzReport) -> str:
+    lines = [f"Случаев: {report.total} за {report.elapsed:.1f} с ({report.rate:.0f}/с)"]
+    for category, count in report.categories.most_common():
+        lines.append(f"  {category:<18}{count:>8}")
+    for bug, count in sorted(report.bugs.items()):
+        lines.append(f"  известный {bug}: {count}")
+    if report.failures:
+        lines.append("")
+        lines.append(f"Расхождения с оракулом ({len(report.failures)} групп):")
+        for failure in sorted(report.failures.values(), key=lambda f: -f.count):
+            lines.append(f"- {failure.category}: ожидался {failure.expected}, получен {failure.status} "
+                         f"x{failure.count} [{', '.join(failure.tags)}]")
+            if failure.minimal is not None:
+                lines.append(f"  минимальное тело: {_preview(failure.minimal)}")
+            else:
+                lines.append(f"  тело: {_preview(failure.payload)}")
+    return "\n".join(lines)
+
+
+class _Sender:
+    """Отправка тел и регистрация созданных объявлений на удаление."""
+
+    def __init__(self, client: AsyncAPIClient, cleanup: CleanupQueue):
+        self.client = client
+        self.cleanup = cleanup
+
+    async def send(self, payload: Any) -> Optional[int]:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        try:
+            response = await self.client.request("POST", "/api/1/item", data=body)
+        except (aiohttp.ClientError, asyncio.TimeoutError):  # ошибка соединения или таймаут — отдельная категория
+            return None
+        if response.status_code == 200:
+            try:
+                self.cleanup.register(self.client.base_url, response.json().get("id"))
+            except (ValueError, AttributeError):
+                pass
+        return response.status_code
+
+
+async def fuzz(base_url: str, cases: int = 1000, seed: Optional[int] = None,
+               controller: Optional[AIMDController] = None, cleanup: Optional[CleanupQueue] = None,
+               shrink_groups: int = DEFAULT_SHRINK_GROUPS,
+               shrink_budget: int = DEFAULT_SHRINK_BUDGET) -> FuzzReport:
+    """Прогон cases случайных тел и сжатие расхождений."""
+    rng = random.Random(seed)
+    own_cleanup = cleanup is None
+    if own_cleanup:
+        cleanup = CleanupQueue()
+    controller = controller or AIMDController(initial=8, maximum=64)
+    report = FuzzReport()
+    started = time.perf_counter()
+    try:
+        async with AsyncAPIClient(base_url, controller=controller) as client:
+            sender = _Sender(client, cleanup)
+            for offset in range(0, cases, BATCH_SIZE):
+                batch = [generate_case(rng) for _ in range(min(BATCH_SIZE, cases - offset))]
+                statuses = await asyncio.gather(*(sender.send(payload) for payload, _ in batch))
+                for (payload, tags), status in zip(batch, statuses):
+                    report.add(payload, tags, expected_outcome(payload), status)
+                cleanup.flush()
+            report.elapsed = time.perf_counter() - started
+
+            for failure in list(report.failures.values())[:shrink_groups]:
+                if failure.status is None:
+                    continue
+
+                async def still_fails(candidate: Any, failure: Failure = failure) -> bool:
+                    expectation = expected_outcome(candidate)
+                    status = await sender.send(candidate)
+                    return (classify(expectation, status) == failure.category
+                            and (expectation.status, status) == (failure.expected, failure.status))
+
+                failure.minimal, failure.shrink_attempts = await shrink(failure.payload, still_fails, shrink_budget)
+    finally:
+        if own_cleanup:
+            cleanup.close()
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Фаззинг POST /api/1/item")
+    parser.add_argument("--api-url", default=BASE_URL,
+                        help=f"Базовый URL API или '{LOCAL_TARGET}' для локальной замены")
+    parser.add_argument("--cases", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=None, help="Зерно генератора для воспроизводимости")
+    parser.add_argument("--concurrency", type=int, default=64, help="Верхний предел конкурентности")
+    parser.add_argument("--out", default=None, help="Сохранить расхождения в JSONL")
+    args = parser.parse_args(argv)
+
+    seed = args.seed if args.seed is not None else random.randrange(2 ** 32)
+    print(f"Зерно: {seed}", flush=True)
+    with cli_targets(args.api_url) as ([base_url], cleanup):
+        report = asyncio.run(fuzz(base_url, args.cases, seed,
+                                  AIMDController(initial=8, maximum=args.concurrency), cleanup))
+
+    print(format_report(report))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            for failure in report.failures.values():
+                f.write(json.dumps(failure.to_dict(), ensure_ascii=False) + "\n")
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,119 @@
+"""
+Гистограмма задержек в стиле HdrHistogram.
+
+Значения хранятся в микросекундах в лог-линейных корзинах: до 256 мкс — точно,
+дальше каждая степень двойки делится на 128 корзин, что даёт относительную
+погрешность не хуже 1% на всём диапазоне. Корзины хранятся разреженно,
+поэтому гистограмму дёшево сериализовать и объединять (merge).
+"""
+import math
+from typing import Dict, Iterable, Optional, Tuple
+
+SUB_BUCKET_BITS = 8
+SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS
+
+DEFAULT_PERCENTILES = (50.0, 90.0, 99.0, 99.9)
+
+
+def _bucket_index(value: int) -> int:
+    if value < SUB_BUCKET_COUNT:
+        return value
+    shift = value.bit_length() - SUB_BUCKET_BITS
+    return (shift << (SUB_BUCKET_BITS - 1)) + (value >> shift)
+
+
+def _bucket_range(index: int) -> Tuple[int, int]:
+    """Границы значений [low, high] корзины."""
+    if index < SUB_BUCKET_COUNT:
+        return index, index
+    shift = (index >> (SUB_BUCKET_BITS - 1)) - 1
+    low = (index - (shift << (SUB_BUCKET_BITS - 1))) << shift
+    return low, low + (1 << shift) - 1
+
+
+class LatencyHistogram:
+    """Гистограмма задержек с поддержкой перцентилей и объединения."""
+
+    def __init__(self):
+        self.counts: Dict[int, int] = {}
+        self.total_count = 0
+        self.total_sum = 0
+        self.min_value: Optional[int] = None
+        self.max_value = 0
+
+    def record_value(self, value_us: int, count: int = 1) -> None:
+        """Запись значения в микросекундах."""
+        value_us = max(0, int(value_us))
+        index = _bucket_index(value_us)
+        self.counts[index] = self.counts.get(index, 0) + count
+        self.total_count += count
+        self.total_sum += value_us * count
+        if self.min_value is None or value_us < self.min_value:
+            self.min_value = value_us
+        if value_us > self.max_value:
+            self.max_value = value_us
+
+    def record(self, seconds: float) -> None:
+        """Запись длительности в секундах."""
+        self.record_value(round(seconds * 1_000_000))
+
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        """Объединение без потери точности: корзины совпадают у всех гистограмм."""
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.total_count += other.total_count
+        self.total_sum += other.total_sum
+        if other.min_value is not None and (self.min_value is None or other.min_value < self.min_value):
+            self.min_value = other.min_value
+        self.max_value = max(self.max_value, other.max_value)
+        return self
+
+    def value_at_percentile(self, percentile: float) -> int:
+        """Значение (мкс), не меньше которого percentile процентов записей."""
+        return self.percentiles([percentile])[percentile]
+
+    def percentiles(self, percentiles: Iterable[float] = DEFAULT_PERCENTILES) -> Dict[float, int]:
+        """Несколько перцентилей за один проход по корзинам."""
+        wanted = sorted(percentiles)
+        result = {p: self.max_value for p in wanted}
+        if not self.total_count:
+            return {p: 0 for p in wanted}
+        targets = [(p, max(1, math.ceil(self.total_count * p / 100.0))) for p in wanted]
+        position = 0
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            while position < len(targets) and seen >= targets[position][1]:
+                p = targets[position][0]
+                result[p] = min(_bucket_range(index)[1], self.max_value)
+                position += 1
+            if position == len(targets):
+                break
+        return result
+
+    @property
+    def mean(self) -> float:
+        return self.total_sum / self.total_count if self.total_count else 0.0
+
+    def to_dict(self) -> Dict:
+        """Компактное представление для передачи между процессами и сохранения."""
+        return {
+            "counts": [[index, count] for index, count in self.counts.items()],
+            "total_count": self.total_count,
+            "total_sum": self.total_sum,
+            "min": self.min_value,
+            "max": self.max_value,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "LatencyHistogram":
+        histogram = cls()
+        histogram.counts = {int(index): int(count) for index, count in data["counts"]}
+        histogram.total_count = data["total_count"]
+        histogram.total_sum = data["total_sum"]
+        histogram.min_value = data["min"]
+        histogram.max_value = data["max"]
+        return histogram
+
+    def __len__(self) -> int:
+        return self.total_count
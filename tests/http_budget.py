@@ -0,0 +1,199 @@
+"""
+Бюджет HTTP-запросов на тест.
+
+Адаптер HttpBudgetAdapter монтируется в сессию APIClient поверх уже
+смонтированных адаптеров и считает запросы и время, проведённое в HTTP
+(отправка и чтение тела), для текущего теста — включая setup и teardown
+его фикстур. Бюджет задаётся маркером или общим значением по умолчанию
+(--http-budget-requests, --http-budget-ms):
+
+    @pytest.mark.http_budget(requests=4, ms=800)
+    def test_lifecycle(api_client): ...
+
+Превышение (--http-budget-mode): fail — ошибка в teardown теста, warn —
+предупреждение HttpBudgetWarning, off — только сводка. Ошибкой бывает только
+превышение числа запросов: время в HTTP зависит от стенда и сети, поэтому
+его превышение и в режиме fail — предупреждение. В конце сессии выводятся
+самые дорогие по числу запросов и времени тесты.
+
+Повторные проверки ожидания согласованности (APIClient.wait_until) считаются
+отдельно и в бюджет не входят: их число и время определяются задержкой
+стенда и --poll-timeout, а не самим тестом.
+
+Учитывается только трафик APIClient: ответы из кэша ответов в сеть не
+ходят и не считаются; фоновое удаление объявлений идёт своей сессией.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+
+MODE_FAIL = "fail"
+MODE_WARN = "warn"
+MODE_OFF = "off"
+MODES = (MODE_FAIL, MODE_WARN, MODE_OFF)
+MARKER = "http_budget"
+# Общий бюджет щедрый: он ловит разрастание, а не обычные тесты
+DEFAULT_REQUESTS = 100
+DEFAULT_MS = 30000.0
+SUMMARY_SIZE = 10
+
+_polling = threading.local()
+
+
+class HttpBudgetWarning(pytest.PytestWarning):
+    """Тест превысил бюджет HTTP-запросов."""
+
+
+@dataclass(frozen=True)
+class Budget:
+    """Предел числа запросов и суммарного времени в HTTP (мс); None — без предела."""
+
+    requests: Optional[int] = None
+    ms: Optional[float] = None
+
+    def overruns(self, usage: "Usage") -> List[str]:
+        problems = []
+        if self.requests is not None and usage.requests > self.requests:
+            problems.append(f"запросов {usage.requests} > {self.requests}")
+        if self.ms is not None and usage.ms > self.ms:
+            problems.append(f"время в HTTP {usage.ms:.0f} мс > {self.ms:.0f} мс")
+        return problems
+
+    def fails(self, usage: "Usage") -> bool:
+        """Превышение, которое в режиме fail роняет тест: только число запросов."""
+        return self.requests is not None and usage.requests > self.requests
+
+    def __str__(self) -> str:
+        return (f"{'-' if self.requests is None else self.requests} / "
+                f"{'-' if self.ms is None else f'{self.ms:.0f}'}")
+
+
+@dataclass
+class Usage:
+    """Потрачено тестом: число запросов, время в HTTP (мс) и повторные проверки ожидания."""
+
+    requests: int = 0
+    ms: float = 0.0
+    retries: int = 0
+
+
+@contextmanager
+def poll_retry() -> Iterator[None]:
+    """Запросы внутри блока — повторные проверки ожидания: в бюджет не входят."""
+    previous = getattr(_polling, "retry", False)
+    _polling.retry = True
+    try:
+        yield
+    finally:
+        _polling.retry = previous
+
+
+class HttpBudgetAdapter(BaseAdapter):
+    """Адаптер requests: учёт запросов и времени поверх вложенного адаптера."""
+
+    def __init__(self, plugin: "HttpBudgetPlugin", inner: BaseAdapter):
+        super().__init__()
+        self.plugin = plugin
+        self.inner = inner
+
+    def send(self, request: requests.PreparedRequest, stream: bool = False, **kwargs) -> requests.Response:
+        started = time.perf_counter()
+        try:
+            response = self.inner.send(request, stream=stream, **kwargs)
+            if not stream:
+                response.content
+            return response
+        finally:
+            self.plugin.spend(time.perf_counter() - started)
+
+    def close(self) -> None:
+        self.inner.close()
+
+
+class HttpBudgetPlugin:
+    """Pytest-плагин: учёт HTTP-трафика тестов и проверка бюджета."""
+
+    def __init__(self, default: Budget, mode: str = MODE_FAIL):
+        self.default = default
+        self.mode = mode
+        self._lock = threading.Lock()
+        self.current: Optional[Usage] = None
+        self.usage: Dict[str, Usage] = {}
+        self.budgets: Dict[str, Budget] = {}
+        self.overruns: Dict[str, List[str]] = {}
+
+    def install(self, session: requests.Session) -> None:
+        for prefix in ("http://", "https://"):
+            session.mount(prefix, HttpBudgetAdapter(self, session.get_adapter(prefix)))
+
+    def spend(self, seconds: float) -> None:
+        with self._lock:
+            if self.current is None:
+                return
+            if getattr(_polling, "retry", False):
+                self.current.retries += 1
+            else:
+                self.current.requests += 1
+                self.current.ms += seconds * 1000
+
+    def budget_for(self, item) -> Budget:
+        marker = item.get_closest_marker(MARKER)
+        if marker is None:
+            return self.default
+        return Budget(**marker.kwargs)
+
+    def pytest_runtest_logstart(self, nodeid: str) -> None:
+        with self._lock:
+            self.current = self.usage[nodeid] = Usage()
+
+    def pytest_runtest_logfinish(self) -> None:
+        with self._lock:
+            self.current = None
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_makereport(self, item, call):
+        outcome = yield
+        report = outcome.get_result()
+        if call.when != "teardown" or self.mode == MODE_OFF:
+            return
+        budget = self.budgets[item.nodeid] = self.budget_for(item)
+        problems = budget.overruns(self.usage[item.nodeid])
+        if not problems:
+            return
+        self.overruns[item.nodeid] = problems
+        message = f"Превышен бюджет HTTP ({budget}): {', '.join(problems)}"
+        if self.mode == MODE_WARN or not budget.fails(self.usage[item.nodeid]):
+            item.warn(HttpBudgetWarning(message))
+        elif report.passed:
+            report.outcome = "failed"
+            report.longrepr = message
+
+    def heaviest(self, size: int = SUMMARY_SIZE) -> List[Tuple[str, Usage]]:
+        """Самые дорогие тесты: по числу запросов, при равенстве — по времени."""
+        used = [(nodeid, usage) for nodeid, usage in self.usage.items() if usage.requests]
+        return sorted(used, key=lambda kv: (kv[1].requests, kv[1].ms), reverse=True)[:size]
+
+    def pytest_terminal_summary(self, terminalreporter) -> None:
+        heaviest = self.heaviest()
+        if not heaviest:
+            return
+        write = terminalreporter.write_line
+        terminalreporter.section("HTTP-бюджет")
+        total = Usage(sum(u.requests for u in self.usage.values()), sum(u.ms for u in self.usage.values()),
+                      sum(u.retries for u in self.usage.values()))
+        write(f"Всего: запросов {total.requests}, время в HTTP {total.ms / 1000:.1f} с, "
+              f"повторных проверок ожидания {total.retries}; бюджет по умолчанию (запросов / мс): {self.default}")
+        width = max(len("тест"), *(len(nodeid) for nodeid, _ in heaviest)) + 2
+        write(f"{'тест':<{width}}{'запросов':>10}{'HTTP мс':>10}{'повторов':>10}{'бюджет':>14}")
+        for nodeid, usage in heaviest:
+            budget = self.budgets.get(nodeid, self.default)
+            write(f"{nodeid:<{width}}{usage.requests:>10}{usage.ms:>10.1f}{usage.retries:>10}{str(budget):>14}",
+                  red=nodeid in self.overruns)
+        for nodeid, problems in self.overruns.items():
+            write(f"Превышение: {nodeid}: {', '.join(problems)}", red=True)
@@ -0,0 +1,149 @@
+"""
+Поэтапная хронометрия HTTP-запросов APIClient.
+
+TimingAdapter монтируется в requests.Session и для каждого запроса замеряет
+этапы: DNS, установку соединения (TCP + TLS), время до первого байта (TTFB)
+и полное время с чтением тела. Для разрешения имён и соединения используются
+подклассы соединений urllib3, которые пишут замеры в thread-local состояние:
+запрос requests выполняется синхронно в одном потоке, так что адаптер
+однозначно связывает замеры соединения со своим запросом.
+"""
+import re
+import socket
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+ENDPOINT_TEMPLATES = [
+    (re.compile(r"^/api/1/item$"), "/api/1/item"),
+    (re.compile(r"^/api/1/item/[^/]*$"), "/api/1/item/{id}"),
+    (re.compile(r"^/api/1/statistic/[^/]*$"), "/api/1/statistic/{id}"),
+    (re.compile(r"^/api/2/statistic/[^/]*$"), "/api/2/statistic/{id}"),
+    (re.compile(r"^/api/2/item/[^/]*$"), "/api/2/item/{id}"),
+    (re.compile(r"^/api/1/[^/]+/item$"), "/api/1/{sellerID}/item"),
+]
+
+_state = threading.local()
+
+
+def endpoint_template(url: str) -> str:
+    """
+    Шаблон эндпоинта по URL или пути: /api/1/item/abc -> /api/1/item/{id}.
+    Пути вне API группируются в "{other}", чтобы не плодить ключи.
+    """
+    path = urlsplit(url).path
+    for pattern, template in ENDPOINT_TEMPLATES:
+        if pattern.match(path):
+            return template
+    return "{other}"
+
+
+def _reset_state() -> None:
+    _state.dns = 0.0
+    _state.connect = 0.0
+
+
+class _TimedConnectionMixin:
+    """Замер разрешения имени и установки соединения."""
+
+    def _new_conn(self):
+        started = time.perf_counter()
+        dns_host = self._dns_host
+        try:
+            addresses = socket.getaddrinfo(dns_host, self.port, 0, socket.SOCK_STREAM)
+        except OSError:
+            addresses = None
+        resolved = time.perf_counter()
+        _state.dns = getattr(_state, "dns", 0.0) + resolved - started
+        if addresses:
+            self._dns_host = addresses[0][4][0]
+        try:
+            return super()._new_conn()
+        finally:
+            self._dns_host = dns_host
+
+    def connect(self):
+        started = time.perf_counter()
+        dns_before = getattr(_state, "dns", 0.0)
+        try:
+            super().connect()
+        finally:
+            dns_spent = getattr(_state, "dns", 0.0) - dns_before
+            _state.connect = getattr(_state, "connect", 0.0) + time.perf_counter() - started - dns_spent
+
+
+class TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimingAdapter(HTTPAdapter):
+    """
+    Адаптер requests, передающий замеры каждого запроса в callback.
+
+    Для обычных (не stream) запросов тело читается внутри адаптера, чтобы
+    замерить полное время; для stream=True полное время равно TTFB.
+    """
+
+    def __init__(self, on_record: Callable[[Dict[str, Any]], None], **kwargs):
+        self.on_record = on_record
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": TimedHTTPConnectionPool,
+            "https": TimedHTTPSConnectionPool,
+        }
+
+    def send(self, request: requests.PreparedRequest, stream: bool = False, **kwargs) -> requests.Response:
+        _reset_state()
+        started_at = time.time()
+        started = time.perf_counter()
+        response = super().send(request, stream=stream, **kwargs)
+        ttfb = time.perf_counter() - started
+        bytes_in = None
+        if not stream:
+            bytes_in = len(response.content)
+        total = time.perf_counter() - started
+
+        body = request.body or b""
+        self.on_record({
+            "start": started_at,
+            "method": request.method,
+            "endpoint": endpoint_template(request.url),
+            "status": response.status_code,
+            "bytes_out": len(body.encode("utf-8") if isinstance(body, str) else body),
+            "bytes_in": bytes_in,
+            "dns_ms": round(_state.dns * 1000, 3),
+            "connect_ms": round(_state.connect * 1000, 3),
+            "ttfb_ms": round(ttfb * 1000, 3),
+            "total_ms": round(total * 1000, 3),
+        })
+        return response
+
+
+def instrument(session: requests.Session, on_record: Callable[[Dict[str, Any]], None],
+               adapter_kwargs: Optional[Dict[str, Any]] = None) -> TimingAdapter:
+    """Подключение хронометрии ко всем http/https запросам сессии."""
+    adapter = TimingAdapter(on_record, **(adapter_kwargs or {}))
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return adapter
@@ -0,0 +1,39 @@
+"""
+Поля объявления в запросах и ответах API и сверка прочитанного с отправленным.
+
+Ожидаемые значения задаются телом создания (POST /api/1/item): sellerID,
+name, price и поля статистики на верхнем уровне. В ответах продавец
+приходит в sellerId (BUG-004), статистика — во вложенном statistics.
+Поля, которых нет в ожидаемом теле (например, name у реестра объявлений),
+не сравниваются.
+"""
+from typing import Any, Dict, List
+
+STATISTIC_FIELDS = ("likes", "viewCount", "contacts")
+
+
+def response_seller_id(item: Dict[str, Any]) -> Any:
+    """sellerID из ответа: sellerId (BUG-004) или sellerID, если ошибку исправят."""
+    return item.get("sellerId", item.get("sellerID"))
+
+
+def statistic_mismatch(expected: Dict[str, Any], statistic: Any) -> List[str]:
+    """Поля статистики, отличающиеся от отправленных."""
+    if not isinstance(statistic, dict):
+        return ["statistics"]
+    return [name for name in STATISTIC_FIELDS if statistic.get(name) != expected[name]]
+
+
+def item_mismatch(expected: Dict[str, Any], item: Any) -> List[str]:
+    """Поля объявления, отличающиеся от отправленных."""
+    if not isinstance(item, dict):
+        return ["item"]
+    fields = [name for name in ("name", "price") if name in expected and item.get(name) != expected[name]]
+    if response_seller_id(item) != expected["sellerID"]:
+        fields.append("sellerID")
+    statistic = item.get("statistics")
+    if isinstance(statistic, dict):
+        fields.extend(f"statistics.{name}" for name in statistic_mismatch(expected, statistic))
+    else:
+        fields.append("statistics")
+    return fields
@@ -0,0 +1,118 @@
+"""
+Пул заранее созданных объявлений для тестов, которые только читают данные.
+
+Объявления создаются один раз на сессию пакетом конкурентных запросов
+(AsyncAPIClient) и удаляются пакетом в конце. Объявления сгруппированы
+по продавцам, чтобы тесты списка продавца тоже могли брать данные из пула.
+Тесты, изменяющие данные, должны получать собственные объявления
+(маркер private_items).
+
+Конкурентность пакетных запросов подбирает AIMDController: создание и
+удаление пула используют один контроллер, так что удаление начинается
+с предела, найденного при создании.
+"""
+import asyncio
+import copy
+import itertools
+from typing import Any, Dict, List, Optional
+
+from async_client import AsyncAPIClient
+from concurrency import AIMDController
+from item_fields import STATISTIC_FIELDS
+
+DEFAULT_POOL_SIZE = 12
+ITEMS_PER_SELLER = 3
+MAX_CONCURRENCY = 64
+
+
+class ItemPool:
+    """Общий набор объявлений, выдаваемых тестам только для чтения."""
+
+    def __init__(self, base_url: str, size: int = DEFAULT_POOL_SIZE,
+                 items_per_seller: int = ITEMS_PER_SELLER,
+                 controller: Optional[AIMDController] = None):
+        self.base_url = base_url
+        self.size = size
+        self.items_per_seller = items_per_seller
+        self.controller = controller or AIMDController(initial=8, maximum=MAX_CONCURRENCY)
+        self.groups: List[List[Dict[str, Any]]] = []
+        self._item_cycle = None
+        self._group_cycle = None
+
+    def _build_items_data(self) -> List[Dict[str, Any]]:
+        # Импорт здесь: conftest сам импортирует этот модуль
+        from conftest import create_valid_item_data, generate_unique_seller_id
+
+        items_data = []
+        seller_id = None
+        for i in range(self.size):
+            position = i % self.items_per_seller
+            if position == 0:
+                seller_id = generate_unique_seller_id()
+            items_data.append(create_valid_item_data(
+                seller_id=seller_id,
+                name=f"Товар {position + 1}",
+                price=1000 * (position + 1),
+                likes=(i * 5) % 50,
+                view_count=(i * 10) % 100,
+                contacts=(i * 2) % 20
+            ))
+        return items_data
+
+    async def _create(self, items_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        async with AsyncAPIClient(self.base_url, controller=self.controller) as client:
+            responses = await client.create_items(items_data)
+        created_items = []
+        for item_data, response in zip(items_data, responses):
+            if response.status_code == 200:
+                created = response.json()
+                created["_request_data"] = item_data
+                created_items.append(created)
+        return created_items
+
+    async def _delete(self, item_ids: List[str]) -> None:
+        async with AsyncAPIClient(self.base_url, controller=self.controller) as client:
+            await client.delete_items(item_ids)
+
+    def populate(self) -> "ItemPool":
+        """Пакетное создание объявлений пула."""
+        created_items = asyncio.run(self._create(self._build_items_data()))
+
+        by_seller: Dict[int, List[Dict[str, Any]]] = {}
+        for item in created_items:
+            by_seller.setdefault(item["_request_data"]["sellerID"], []).append(item)
+        self.groups = list(by_seller.values())
+        self._item_cycle = itertools.cycle(created_items) if created_items else None
+        self._group_cycle = itertools.cycle(self.groups) if self.groups else None
+        return self
+
+    @property
+    def items(self) -> List[Dict[str, Any]]:
+        return [item for group in self.groups for item in group]
+
+    def lease_item(self, with_statistics: bool = False) -> Dict[str, Any]:
+        """
+        Объявление из пула (копия: изменения теста не влияют на пул).
+        with_statistics=True — только объявления с ненулевой статистикой.
+        """
+        if self._item_cycle is None:
+            raise LookupError("Пул объявлений пуст: не удалось создать ни одного объявления")
+        for _ in range(len(self.items)):
+            item = next(self._item_cycle)
+            if not with_statistics or all(item["_request_data"][field] for field in STATISTIC_FIELDS):
+                return copy.deepcopy(item)
+        raise LookupError("В пуле нет объявлений с ненулевой статистикой")
+
+    def lease_seller_items(self) -> List[Dict[str, Any]]:
+        """Все объявления одного продавца из пула."""
+        if self._group_cycle is None:
+            return []
+        return copy.deepcopy(next(self._group_cycle))
+
+    def teardown(self) -> None:
+        """Пакетное удаление всех объявлений пула."""
+        item_ids = [item["id"] for item in self.items]
+        if item_ids:
+            asyncio.run(self._delete(item_ids))
+        self.groups = []
+        self._item_cycle = self._group_cycle = None
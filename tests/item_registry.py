@@ -0,0 +1,321 @@
+"""
+Компактный реестр созданных объявлений для длительных прогонов.
+
+Фикстуры хранят объявление как полный ответ и словарь _request_data — сотни
+байт на объявление. ItemRegistry хранит те же проверяемые поля (ID, sellerID,
+цена, статистика, момент создания) по столбцам в array, без объекта на
+объявление:
+
+- ID формата UUID — 16 байт в общем bytearray; поиск по ID за O(1) через
+  открытую адресацию в array('q') номеров строк. ID другого формата
+  интернируются и хранятся в словаре;
+- индекс продавца — array('q') номеров строк его объявлений, в порядке создания;
+- удаление помечает строку, не сдвигая столбцы и не трогая индекс продавца:
+  удалённые и перенесённые к другому продавцу строки отсеиваются при чтении,
+  поэтому удаление — O(1); повторная регистрация того же ID обновляет строку.
+
+Около 100 байт на объявление: миллионы объявлений soak-прогона помещаются в
+сотни мегабайт, а не в гигабайты. Записи ItemRecord собираются только при
+чтении. Реестр потокобезопасен.
+
+    registry = ItemRegistry()
+    client = APIClient(base_url, registry=registry)
+    ...
+    problems = verify_sellers(client, registry)
+    cleanup = CleanupQueue(registry=registry)  # удаление по registry.ids()
+"""
+import sys
+import threading
+import time
+import uuid
+from array import array
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional
+
+from item_fields import STATISTIC_FIELDS, item_mismatch
+
+ID_SIZE = 16
+INITIAL_CAPACITY = 1024
+# Заполнение индекса не выше 2/3: цепочки проб остаются короткими
+MAX_LOAD_NUM, MAX_LOAD_DEN = 2, 3
+EMPTY = -1
+_INT64_MIN, _INT64_MAX = -(1 << 63), (1 << 63) - 1
+
+
+class ItemRecord(NamedTuple):
+    """Объявление из реестра (собирается при чтении, не хранится)."""
+
+    id: str
+    seller_id: int
+    price: int
+    likes: int
+    view_count: int
+    contacts: int
+    created_at: float
+
+    @property
+    def statistics(self) -> Dict[str, int]:
+        return {"likes": self.likes, "viewCount": self.view_count, "contacts": self.contacts}
+
+    @property
+    def body(self) -> Dict[str, Any]:
+        """Зарегистрированные поля в виде тела создания (для item_fields.item_mismatch)."""
+        return {"sellerID": self.seller_id, "price": self.price, **self.statistics}
+
+
+def _int64(value: Any) -> Optional[int]:
+    if isinstance(value, bool) or not isinstance(value, int) or not _INT64_MIN <= value <= _INT64_MAX:
+        return None
+    return value
+
+
+def _uuid_bytes(item_id: str) -> Optional[bytes]:
+    """16 байт UUID, если ID записан в каноническом виде (иначе ID не восстановить точно)."""
+    if len(item_id) != 36:
+        return None
+    try:
+        value = uuid.UUID(item_id)
+    except ValueError:
+        return None
+    return value.bytes if str(value) == item_id else None
+
+
+class ItemRegistry:
+    """Объявления по столбцам с индексом по ID и по продавцу."""
+
+    def __init__(self, capacity: int = INITIAL_CAPACITY):
+        self._lock = threading.Lock()
+        self._ids = bytearray()
+        self._sellers = array("q")
+        self._prices = array("q")
+        self._likes = array("q")
+        self._views = array("q")
+        self._contacts = array("q")
+        self._created = array("d")
+        self._alive = bytearray()
+        size = 1
+        while size < capacity:
+            size *= 2
+        self._index = array("q", [EMPTY]) * size
+        self._uuid_count = 0
+        # ID не в формате UUID: интернированная строка -> строка и обратно
+        self._other: Dict[str, int] = {}
+        self._other_names: Dict[int, str] = {}
+        self._by_seller: Dict[int, array] = {}
+        # Неудалённые объявления продавца: в _by_seller остаются и удалённые строки
+        self._seller_counts: Dict[int, int] = {}
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, item_id: str) -> bool:
+        with self._lock:
+            row = self._find(item_id)
+            return row != EMPTY and bool(self._alive[row])
+
+    @property
+    def rows(self) -> int:
+        """Число строк, включая удалённые."""
+        return len(self._alive)
+
+    def _slot(self, key: bytes, index: array) -> int:
+        """Слот индекса для key: занятый этим ID или первый свободный."""
+        mask = len(index) - 1
+        slot = int.from_bytes(key[:8], "little") & mask
+        while True:
+            row = index[slot]
+            if row == EMPTY or self._ids[row * ID_SIZE:(row + 1) * ID_SIZE] == key:
+                return slot
+            slot = (slot + 1) & mask
+
+    def _find(self, item_id: str) -> int:
+        key = _uuid_bytes(item_id)
+        if key is None:
+            return self._other.get(item_id, EMPTY)
+        return self._index[self._slot(key, self._index)]
+
+    def _grow(self) -> None:
+        index = array("q", [EMPTY]) * (len(self._index) * 2)
+        for row in range(len(self._alive)):
+            if row not in self._other_names:
+                key = bytes(self._ids[row * ID_SIZE:(row + 1) * ID_SIZE])
+                index[self._slot(key, index)] = row
+        self._index = index
+
+    def register(self, item_id: str, body: Dict[str, Any], created_at: Optional[float] = None) -> bool:
+        """
+        Учесть созданное объявление по телу запроса создания (формат
+        create_valid_item_data). Тела с нецелыми полями (фаззинг) не учитываются:
+        возвращается False.
+        """
+        if not isinstance(body, dict):
+            return False
+        values = [_int64(body.get(name)) for name in ("sellerID", "price", *STATISTIC_FIELDS)]
+        if None in values:
+            return False
+        seller_id, price, likes, views, contacts = values
+        created_at = time.time() if created_at is None else created_at
+        key = _uuid_bytes(item_id)
+        with self._lock:
+            if key is None:
+                row = self._other.get(item_id, EMPTY)
+            else:
+                if (self._uuid_count + 1) * MAX_LOAD_DEN > len(self._index) * MAX_LOAD_NUM:
+                    self._grow()
+                slot = self._slot(key, self._index)
+                row = self._index[slot]
+            if row == EMPTY:
+                row = len(self._alive)
+                if key is None:
+                    item_id = sys.intern(item_id)
+                    self._other[item_id] = row
+                    self._other_names[row] = item_id
+                    self._ids.extend(bytes(ID_SIZE))
+                else:
+                    self._index[slot] = row
+                    self._uuid_count += 1
+                    self._ids.extend(key)
+                for column, value in ((self._sellers, seller_id), (self._prices, price), (self._likes, likes),
+                                      (self._views, views), (self._contacts, contacts)):
+                    column.append(value)
+                self._created.append(created_at)
+                self._alive.append(1)
+                self._count += 1
+                self._by_seller.setdefault(seller_id, array("q")).append(row)
+                self._seller_counts[seller_id] = self._seller_counts.get(seller_id, 0) + 1
+                return True
+            if self._alive[row]:
+                self._uncount_seller(self._sellers[row])
+            if self._sellers[row] != seller_id:
+                # Строка в индексе прежнего продавца остаётся и отсеивается при чтении
+                self._sellers[row] = seller_id
+                self._by_seller.setdefault(seller_id, array("q")).append(row)
+            self._prices[row], self._likes[row], self._views[row], self._contacts[row] = price, likes, views, contacts
+            self._created[row] = created_at
+            if not self._alive[row]:
+                self._alive[row] = 1
+                self._count += 1
+            self._seller_counts[seller_id] = self._seller_counts.get(seller_id, 0) + 1
+            return True
+
+    def _uncount_seller(self, seller_id: int) -> None:
+        left = self._seller_counts[seller_id] - 1
+        if left:
+            self._seller_counts[seller_id] = left
+        else:
+            del self._seller_counts[seller_id]
+
+    def discard(self, item_id: str) -> bool:
+        """Отметить объявление удалённым; False, если его нет."""
+        with self._lock:
+            row = self._find(item_id)
+            if row == EMPTY or not self._alive[row]:
+                return False
+            self._alive[row] = 0
+            self._count -= 1
+            self._uncount_seller(self._sellers[row])
+            return True
+
+    def _id(self, row: int) -> str:
+        name = self._other_names.get(row)
+        if name is not None:
+            return name
+        return str(uuid.UUID(bytes=bytes(self._ids[row * ID_SIZE:(row + 1) * ID_SIZE])))
+
+    def _record(self, row: int) -> ItemRecord:
+        return ItemRecord(self._id(row), self._sellers[row], self._prices[row], self._likes[row],
+                          self._views[row], self._contacts[row], self._created[row])
+
+    def get(self, item_id: str) -> Optional[ItemRecord]:
+        with self._lock:
+            row = self._find(item_id)
+            if row == EMPTY or not self._alive[row]:
+                return None
+            return self._record(row)
+
+    def seller_items(self, seller_id: int) -> List[ItemRecord]:
+        """Ожидаемый список продавца в порядке создания."""
+        with self._lock:
+            seen = set()
+            records = []
+            for row in self._by_seller.get(seller_id, ()):
+                # Строка могла быть удалена, перенесена к другому продавцу и вернуться
+                if self._alive[row] and self._sellers[row] == seller_id and row not in seen:
+                    seen.add(row)
+                    records.append(self._record(row))
+            return records
+
+    def sellers(self) -> List[int]:
+        """Продавцы, у которых есть неудалённые объявления."""
+        with self._lock:
+            return list(self._seller_counts)
+
+    def ids(self) -> Iterator[str]:
+        """ID неудалённых объявлений; строки собираются по одной, без копии реестра."""
+        for row in range(len(self._alive)):
+            if self._alive[row]:
+                yield self._id(row)
+
+    def __iter__(self) -> Iterator[ItemRecord]:
+        for row in range(len(self._alive)):
+            if self._alive[row]:
+                yield self._record(row)
+
+    def nbytes(self) -> int:
+        """Объём столбцов и индексов без накладных расходов словарей продавцов."""
+        columns = (self._sellers, self._prices, self._likes, self._views, self._contacts, self._created,
+                   self._index, *self._by_seller.values())
+        return (len(self._ids) + len(self._alive)
+                + sum(column.itemsize * len(column) for column in columns))
+
+
+def _seller_problems(client: Any, registry: ItemRegistry, seller_id: int) -> List[str]:
+    """Расхождения списка продавца с реестром при одном чтении списка."""
+    response = client.get_seller_items(seller_id)
+    if response.status_code != 200:
+        return [f"status {response.status_code}"]
+    try:
+        listed = {item.get("id"): item for item in response.json() if isinstance(item, dict)}
+    except (ValueError, TypeError, AttributeError):
+        return ["тело ответа не список объявлений"]
+    problems = []
+    for record in registry.seller_items(seller_id):
+        if record.id not in listed:
+            problems.append(f"{record.id}: нет в списке")
+            continue
+        fields = item_mismatch(record.body, listed[record.id])
+        if fields:
+            problems.append(f"{record.id}: {', '.join(fields)}")
+    return problems
+
+
+def verify_sellers(client: Any, registry: ItemRegistry, sellers: Optional[List[int]] = None,
+                   timeout: Optional[float] = None) -> Dict[int, List[str]]:
+    """
+    Сверка списков продавцов (GET /api/1/{sellerID}/item) с реестром.
+    client — APIClient; возвращает расхождения по продавцам (пустой словарь —
+    всё совпало). Лишние объявления в списке не считаются расхождением: продавца
+    могли использовать вне прогона.
+
+    Список с расхождениями перечитывается (client.wait_until) — только что
+    созданное объявление может появиться в списке не сразу. Все продавцы делят
+    один срок timeout (по умолчанию client.poll_timeout): после него каждый
+    оставшийся продавец читается один раз.
+    """
+    timeout = client.poll_timeout if timeout is None else timeout
+    deadline = time.monotonic() + timeout
+    problems: Dict[int, List[str]] = {}
+    for seller_id in registry.sellers() if sellers is None else sellers:
+        last: List[str] = []
+
+        def probe() -> bool:
+            nonlocal last
+            last = _seller_problems(client, registry, seller_id)
+            return not last
+
+        try:
+            client.wait_until(probe, max(0.0, deadline - time.monotonic()),
+                              f"список продавца {seller_id} не совпал с реестром")
+        except AssertionError:
+            problems[seller_id] = last
+    return problems
@@ -0,0 +1,95 @@
+"""
+Потоковый разбор JSON-массива верхнего уровня.
+
+Элементы массива разбираются по мере поступления фрагментов тела ответа
+(json.JSONDecoder.raw_decode по буферу), разобранная часть буфера
+отбрасывается — память не зависит от длины массива, а первый элемент
+доступен до получения всего ответа.
+"""
+import codecs
+import json
+from typing import Any, Iterable, Iterator
+
+WHITESPACE = " \t\n\r"
+# Символы, которыми может продолжаться число из предыдущего фрагмента
+NUMBER_TAIL = "0123456789.eE+-"
+# Сжимать буфер, когда разобранная часть длиннее этого порога
+COMPACT_THRESHOLD = 64 * 1024
+
+_decoder = json.JSONDecoder()
+
+
+class _Buffer:
+    """Текстовый буфер поверх фрагментов байтов с инкрементальным UTF-8."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self.text = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        """Чтение следующего фрагмента; False, если тело закончилось."""
+        if self.eof:
+            return False
+        if self.pos > COMPACT_THRESHOLD:
+            self.text = self.text[self.pos:]
+            self.pos = 0
+        for chunk in self._chunks:
+            if chunk:
+                self.text += self._utf8.decode(chunk)
+                return True
+        self.text += self._utf8.decode(b"", final=True)
+        self.eof = True
+        return False
+
+    def next_char(self) -> str:
+        """Первый непробельный символ (без сдвига позиции); "" в конце тела."""
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.fill():
+                return ""
+
+
+def _number_may_continue(text: str, end: int) -> bool:
+    """Остаток буфера после числа состоит только из символов его продолжения."""
+    return all(char in NUMBER_TAIL for char in text[end:])
+
+
+def iter_array(chunks: Iterable[bytes]) -> Iterator[Any]:
+    """Элементы JSON-массива из последовательности фрагментов тела."""
+    buffer = _Buffer(chunks)
+    if buffer.next_char() != "[":
+        raise ValueError("ожидался JSON-массив")
+    buffer.pos += 1
+    if buffer.next_char() == "]":
+        return
+    while True:
+        if buffer.next_char() == "":
+            raise ValueError("JSON-массив не завершён")
+        while True:
+            try:
+                value, end = _decoder.raw_decode(buffer.text, buffer.pos)
+            except json.JSONDecodeError:
+                if buffer.fill():
+                    continue
+                raise
+            # Число, за которым в буфере только его возможное продолжение
+            # ("12." или "1e" на границе фрагмента), дочитывается и разбирается заново
+            if (isinstance(value, (int, float)) and not isinstance(value, bool)
+                    and _number_may_continue(buffer.text, end) and buffer.fill()):
+                continue
+            break
+        buffer.pos = end
+        yield value
+
+        separator = buffer.next_char()
+        buffer.pos += 1
+        if separator == "]":
+            return
+        if separator != ",":
+            raise ValueError(f"ожидалась ',' или ']', получено {separator!r}")
@@ -0,0 +1,351 @@
+"""
+Генератор нагрузки на API объявлений.
+
+Использует тот же APIClient и create_valid_item_data, что и функциональные тесты.
+Каждый эндпоинт нагружается по очереди в течение заданного времени: либо с
+фиксированной конкурентностью (закрытая модель), либо с фиксированной частотой
+запросов (открытая модель, задержка считается от запланированного момента
+отправки, чтобы не терять очередь — coordinated omission).
+
+Запуск (из каталога tests):
+    python -m loadgen --api-url local --duration 10 --concurrency 16
+    python -m loadgen --endpoints get_item statistic --rate 200 --duration 30
+    python -m loadgen --api-url local --validate
+    python -m loadgen --api-url local --adaptive --concurrency 64
+
+С --validate каждый ответ проверяется по схеме из postman_collection.json
+(см. schemas.py); несоответствия считаются ошибками (колонка invalid).
+
+С --adaptive число одновременных запросов подбирает AIMDController
+(concurrency.py) в пределах --concurrency: так находится максимальная
+устойчивая пропускная способность без ручного подбора числа потоков.
+
+С --capture PATH неудачные, самые медленные и случайные запросы сохраняются
+целиком в ограниченном объёме памяти (capture.py) и в конце пишутся в JSONL
+для повтора: python -m capture PATH --api-url local.
+
+С --verify все созданные нагрузкой объявления учитываются в компактном реестре
+(item_registry.py) и после нагрузки, до удаления, сверяются со списками их
+продавцов; при расхождениях код возврата 1. Удаление идёт по реестру, без
+отдельного списка ID в очереди очистки.
+"""
+import argparse
+import json
+import math
+import threading
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+
+from capture import RequestCapture
+from cleanup import CleanupQueue, cli_targets
+from concurrency import AIMDController, ConcurrencyLimiter, TokenBucket
+from conftest import (BASE_URL, LOCAL_TARGET, APIClient, create_valid_item_data, generate_unique_seller_id,
+                      use_load_seller_ids)
+from histogram import DEFAULT_PERCENTILES, LatencyHistogram
+from item_registry import ItemRegistry, verify_sellers
+from schemas import load_validators
+
+SEED_ITEMS = 20
+
+
+class Seed:
+    """
+    Заранее созданные данные для эндпоинтов чтения и продавцы потоков нагрузки:
+    создание берёт один sellerID на поток, а не на каждый запрос, иначе
+    нагрузка расходовала бы диапазон sellerID с частотой запросов.
+    """
+
+    def __init__(self, client: APIClient, size: int = SEED_ITEMS):
+        self.seller_id = generate_unique_seller_id()
+        self._local = threading.local()
+        self.item_ids: List[str] = []
+        for i in range(size):
+            response = client.create_item(create_valid_item_data(
+                seller_id=self.seller_id, name=f"Нагрузка {i}", price=100 + i))
+            if response.status_code == 200:
+                self.item_ids.append(response.json()["id"])
+        if not self.item_ids:
+            raise RuntimeError("Не удалось создать объявления для нагрузки")
+        self._counter = 0
+
+    def next_item_id(self) -> str:
+        self._counter += 1
+        return self.item_ids[self._counter % len(self.item_ids)]
+
+    def thread_seller_id(self) -> int:
+        """sellerID текущего потока нагрузки (выдаётся при первом обращении)."""
+        seller_id = getattr(self._local, "seller_id", None)
+        if seller_id is None:
+            seller_id = self._local.seller_id = generate_unique_seller_id()
+        return seller_id
+
+
+# Операция получает клиента и seed, выполняет неизмеряемую подготовку
+# и возвращает измеряемый вызов.
+Operation = Callable[[APIClient, Seed], Callable[[], requests.Response]]
+
+
+def _op_create(client: APIClient, seed: Seed) -> Callable[[], requests.Response]:
+    data = create_valid_item_data(seller_id=seed.thread_seller_id(), name="Нагрузка")
+    return lambda: client.create_item(data)
+
+
+def _op_get_item(client: APIClient, seed: Seed) -> Callable[[], requests.Response]:
+    item_id = seed.next_item_id()
+    return lambda: client.get_item(item_id)
+
+
+def _op_seller_items(client: APIClient, seed: Seed) -> Callable[[], requests.Response]:
+    return lambda: client.get_seller_items(seed.seller_id)
+
+
+def _op_statistic(client: APIClient, seed: Seed) -> Callable[[], requests.Response]:
+    item_id = seed.next_item_id()
+    return lambda: client.get_statistic(item_id)
+
+
+def _op_delete(client: APIClient, seed: Seed) -> Callable[[], requests.Response]:
+    response = client.create_item(create_valid_item_data(seller_id=seed.seller_id, name="Удаление"))
+    item_id = response.json().get("id", "") if response.status_code == 200 else ""
+    return lambda: client.delete_item(item_id)
+
+
+ENDPOINTS: Dict[str, tuple] = {
+    "create": ("POST /api/1/item", _op_create),
+    "get_item": ("GET /api/1/item/{id}", _op_get_item),
+    "seller_items": ("GET /api/1/{sellerID}/item", _op_seller_items),
+    "statistic": ("GET /api/1/statistic/{id}", _op_statistic),
+    "delete": ("DELETE /api/2/item/{id}", _op_delete),
+}
+
+
+class EndpointResult:
+    """Результаты нагрузки одного эндпоинта."""
+
+    def __init__(self, name: str, template: str):
+        self.name = name
+        self.template = template
+        self.histogram = LatencyHistogram()
+        self.statuses: Counter = Counter()
+        self.errors: Counter = Counter()
+        self.invalid = 0
+        self.elapsed = 0.0
+        self.controller: Optional[Dict[str, Any]] = None
+
+    def merge(self, other: "EndpointResult") -> "EndpointResult":
+        self.histogram.merge(other.histogram)
+        self.statuses.update(other.statuses)
+        self.errors.update(other.errors)
+        self.invalid += other.invalid
+        return self
+
+    @property
+    def requests(self) -> int:
+        return sum(self.statuses.values()) + sum(self.errors.values())
+
+    @property
+    def failed(self) -> int:
+        return (sum(c for s, c in self.statuses.items() if s >= 400) + sum(self.errors.values())
+                + self.invalid)
+
+    @property
+    def throughput(self) -> float:
+        return self.requests / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def error_rate(self) -> float:
+        return self.failed / self.requests if self.requests else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "endpoint": self.name,
+            "template": self.template,
+            "elapsed": self.elapsed,
+            "requests": self.requests,
+            "throughput": self.throughput,
+            "error_rate": self.error_rate,
+            "statuses": {str(k): v for k, v in self.statuses.items()},
+            "errors": dict(self.errors),
+            "invalid": self.invalid,
+            "controller": self.controller,
+            "percentiles_us": {str(p): v for p, v in self.histogram.percentiles().items()},
+            "histogram": self.histogram.to_dict(),
+        }
+
+
+def run_endpoint(base_url: str, endpoint: str, duration: float, concurrency: int = 8,
+                 rate: Optional[float] = None, seed: Optional[Seed] = None,
+                 cleanup: Optional[CleanupQueue] = None, validate: bool = False,
+                 controller: Optional[AIMDController] = None,
+                 capture: Optional[RequestCapture] = None,
+                 registry: Optional[ItemRegistry] = None) -> EndpointResult:
+    """
+    Нагрузка одного эндпоинта в течение duration секунд.
+    Созданные объявления регистрируются в cleanup и удаляются после нагрузки.
+    При validate ответы проверяются по схеме (вне замера задержки).
+    С controller одновременно выполняется не больше controller.limit запросов
+    из concurrency потоков. С capture запросы нагрузки проходят через запись,
+    с registry созданные объявления учитываются в реестре.
+    """
+    template, operation = ENDPOINTS[endpoint]
+    own_cleanup = cleanup is None
+    if own_cleanup:
+        cleanup = CleanupQueue(registry=registry)
+    if seed is None:
+        seed = Seed(APIClient(base_url, cleanup=cleanup, registry=registry))
+
+    start = time.perf_counter()
+    deadline = start + duration
+    # Открытая модель: отставание от расписания не сбрасывается (burst=inf)
+    pacer = TokenBucket(rate, burst=math.inf, start=start, clock=time.perf_counter) if rate else None
+    limiter = ConcurrencyLimiter(controller) if controller is not None else None
+    results = [EndpointResult(endpoint, template) for _ in range(concurrency)]
+    validators = load_validators() if validate else None
+
+    def worker(result: EndpointResult) -> None:
+        client = APIClient(base_url, cleanup=cleanup, registry=registry)
+        if capture is not None:
+            capture.install(client.session)
+        while True:
+            call = operation(client, seed)
+            if pacer is not None:
+                scheduled = pacer.reserve()
+                if scheduled >= deadline:
+                    break
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            else:
+                scheduled = time.perf_counter()
+                if scheduled >= deadline:
+                    break
+            if limiter is not None:
+                limiter.acquire()
+                if pacer is None:
+                    # Закрытая модель: ожидание свободного слота — не задержка сервиса
+                    scheduled = time.perf_counter()
+            sent = time.monotonic()
+            try:
+                response = call()
+            except requests.RequestException as e:
+                response = None
+                result.errors[type(e).__name__] += 1
+            else:
+                result.statuses[response.status_code] += 1
+            finally:
+                if limiter is not None:
+                    controller.record(sent, response.status_code if response is not None else None)
+                    limiter.release()
+            result.histogram.record(time.perf_counter() - scheduled)
+            if validators is not None and response is not None and validators.response_errors(response):
+                result.invalid += 1
+
+    threads = [threading.Thread(target=worker, args=(r,), daemon=True) for r in results]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    total = EndpointResult(endpoint, template)
+    for result in results:
+        total.merge(result)
+    total.elapsed = time.perf_counter() - start
+    if controller is not None:
+        total.controller = controller.summary()
+    if own_cleanup:
+        cleanup.close()
+    return total
+
+
+def format_report(results: List[EndpointResult]) -> str:
+    """Текстовая таблица: пропускная способность, ошибки и перцентили (мс)."""
+    header = (f"{'endpoint':<28}{'req':>8}{'rps':>10}{'err%':>7}"
+              + "".join(f"{'p' + format(p, 'g'):>9}" for p in DEFAULT_PERCENTILES)
+              + f"{'max':>9}  statuses")
+    lines = [header, "-" * len(header)]
+    for r in results:
+        pct = r.histogram.percentiles()
+        statuses = " ".join(f"{k}:{v}" for k, v in sorted(r.statuses.items()))
+        errors = " ".join(f"{k}:{v}" for k, v in sorted(r.errors.items()))
+        if r.invalid:
+            errors += f" invalid:{r.invalid}"
+        lines.append(
+            f"{r.template:<28}{r.requests:>8}{r.throughput:>10.1f}{r.error_rate * 100:>7.2f}"
+            + "".join(f"{pct[p] / 1000:>9.2f}" for p in DEFAULT_PERCENTILES)
+            + f"{r.histogram.max_value / 1000:>9.2f}  {statuses} {errors}".rstrip()
+        )
+    for r in results:
+        if r.controller:
+            c = r.controller
+            lines.append(f"{r.template}: предел конкурентности {c['limit']} (пик {c['peak_limit']}, "
+                         f"снижений {c['decreases']}), лучшая пропускная способность "
+                         f"{c['best_throughput']:.1f} rps при {c['best_throughput_limit']}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Генератор нагрузки на API объявлений Avito")
+    parser.add_argument("--api-url", default=BASE_URL,
+                        help=f"Базовый URL API или '{LOCAL_TARGET}' для локальной замены")
+    parser.add_argument("--endpoints", nargs="+", choices=list(ENDPOINTS), default=list(ENDPOINTS))
+    parser.add_argument("--duration", type=float, default=10.0, help="Секунд на эндпоинт")
+    parser.add_argument("--concurrency", type=int, default=8,
+                        help="Число потоков (с --adaptive — верхний предел конкурентности)")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="Подбирать конкурентность по задержкам и ошибкам (AIMD)")
+    parser.add_argument("--latency-target", type=float, default=1.0,
+                        help="Целевой p90 задержки для --adaptive, секунд")
+    parser.add_argument("--rate", type=float, default=None,
+                        help="Запросов в секунду (открытая модель); без опции — максимум")
+    parser.add_argument("--validate", action="store_true",
+                        help="Проверять ответы по схемам из postman_collection.json")
+    parser.add_argument("--json", dest="json_path", default=None, help="Сохранить результаты в JSON")
+    parser.add_argument("--capture", dest="capture_path", default=None,
+                        help="Сохранить неудачные, самые медленные и случайные запросы в JSONL")
+    parser.add_argument("--verify", action="store_true",
+                        help="Сверить созданные объявления со списками продавцов перед удалением")
+    args = parser.parse_args(argv)
+    use_load_seller_ids()
+
+    # С --verify ожидающие удаления объявления хранятся только в реестре
+    registry = ItemRegistry() if args.verify else None
+    capture = RequestCapture() if args.capture_path else None
+    problems: Dict[int, List[str]] = {}
+    verified_sellers = 0
+    with cli_targets(args.api_url, registry=registry) as ([base_url], cleanup):
+        seed = Seed(APIClient(base_url, cleanup=cleanup, registry=registry))
+        results = []
+        for endpoint in args.endpoints:
+            print(f"Нагрузка {ENDPOINTS[endpoint][0]} ({args.duration:g} с)...", flush=True)
+            controller = None
+            if args.adaptive:
+                controller = AIMDController(maximum=args.concurrency, latency_target=args.latency_target)
+            results.append(run_endpoint(base_url, endpoint, args.duration,
+                                        args.concurrency, args.rate, seed, cleanup,
+                                        args.validate, controller, capture, registry))
+        if registry is not None:
+            verified_sellers = len(registry.sellers())
+            print(f"Сверка {len(registry)} объявлений ({verified_sellers} продавцов)...", flush=True)
+            problems = verify_sellers(APIClient(base_url), registry)
+
+    print()
+    print(format_report(results))
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump([r.to_dict() for r in results], f, ensure_ascii=False, indent=2)
+    if capture is not None:
+        capture.dump(args.capture_path)
+        print(capture.summary())
+    if registry is not None:
+        print(f"Сверка: расхождений у {len(problems)} продавцов из {verified_sellers}")
+        for seller_id, seller_problems in list(problems.items())[:10]:
+            print(f"  {seller_id}: {'; '.join(seller_problems[:3])}")
+        if problems:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,310 @@
+"""
+Локальная in-process замена API объявлений Avito.
+
+Реализует все эндпоинты, которые использует APIClient, и воспроизводит
+задокументированное поведение реального сервиса:
+    - BUG-001: поля статистики принимаются только на верхнем уровне JSON;
+    - BUG-002: отрицательная статистика принимается;
+    - BUG-003: для некорректного ID возвращается 400, а не 404;
+    - BUG-004: в запросе sellerID, в ответе sellerId.
+
+Ответы GET содержат ETag и поддерживают условные запросы (If-None-Match -> 304).
+
+Задержку распространения записи можно смоделировать параметром
+visibility_delay: созданное объявление видно при чтении не сразу.
+
+Запуск отдельно (например, как цель для бенчмарков):
+    python -m local_server --port 8080 --visibility-delay 0.2
+"""
+import argparse
+import hashlib
+import json
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+from item_fields import STATISTIC_FIELDS
+
+LOCAL_TARGET = "local"
+INT32_MAX = 2147483647
+
+UUID_RE = re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$")
+
+
+class ValidationError(Exception):
+    """Ошибка валидации запроса (ответ 400)."""
+
+
+class NotFoundError(Exception):
+    """Ресурс не найден (ответ 404)."""
+
+
+def _is_int(value: Any) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+class LocalItemService:
+    """
+    Потокобезопасное хранилище объявлений с логикой валидации сервиса.
+    Созданные объявления становятся видны при чтении через visibility_delay секунд.
+    """
+
+    def __init__(self, visibility_delay: float = 0.0):
+        self.visibility_delay = visibility_delay
+        self._lock = threading.Lock()
+        self._items: Dict[str, Dict[str, Any]] = {}
+        self._by_seller: Dict[int, Dict[str, None]] = {}
+        self._visible_at: Dict[str, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def _check_id(self, item_id: str) -> str:
+        # BUG-003: некорректный идентификатор — 400 вместо 404
+        if not UUID_RE.match(item_id):
+            raise ValidationError("передан некорректный идентификатор объявления")
+        return item_id
+
+    def create_item(self, data: Any) -> Dict[str, Any]:
+        if not isinstance(data, dict) or not data:
+            raise ValidationError("некорректные данные объявления")
+
+        seller_id = data.get("sellerID")
+        if not _is_int(seller_id) or not 0 < seller_id <= INT32_MAX:
+            raise ValidationError("поле sellerID обязательно")
+
+        name = data.get("name")
+        if not isinstance(name, str) or not name:
+            raise ValidationError("поле name обязательно")
+
+        price = data.get("price")
+        if not _is_int(price) or not 0 <= price <= INT32_MAX:
+            raise ValidationError("поле price обязательно")
+
+        # BUG-001: вложенный объект statistics игнорируется
+        statistics = {}
+        for field in STATISTIC_FIELDS:
+            value = data.get(field)
+            # BUG-002: отрицательные значения не отклоняются
+            if not _is_int(value) or abs(value) > INT32_MAX:
+                raise ValidationError(f"поле {field} обязательно")
+            statistics[field] = value
+
+        item = {
+            "id": str(uuid.uuid4()),
+            "sellerId": seller_id,
+            "name": name,
+            "price": price,
+            "statistics": statistics,
+            "createdAt": datetime.now(timezone.utc).isoformat(),
+        }
+        with self._lock:
+            self._items[item["id"]] = item
+            self._by_seller.setdefault(seller_id, {})[item["id"]] = None
+            if self.visibility_delay > 0:
+                self._visible_at[item["id"]] = time.monotonic() + self.visibility_delay
+        return item
+
+    def _is_visible(self, item_id: str) -> bool:
+        visible_at = self._visible_at.get(item_id)
+        if visible_at is None:
+            return True
+        if time.monotonic() < visible_at:
+            return False
+        self._visible_at.pop(item_id, None)
+        return True
+
+    def get_item(self, item_id: str) -> Dict[str, Any]:
+        item = self._items.get(self._check_id(item_id))
+        if item is None or not self._is_visible(item_id):
+            raise NotFoundError(f"item {item_id} not found")
+        return item
+
+    def get_seller_items(self, seller_id: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            item_ids = list(self._by_seller.get(seller_id, ()))
+        return [self._items[item_id] for item_id in item_ids
+                if item_id in self._items and self._is_visible(item_id)]
+
+    def get_statistic(self, item_id: str) -> Dict[str, int]:
+        return self.get_item(item_id)["statistics"]
+
+    def delete_item(self, item_id: str) -> None:
+        with self._lock:
+            item = self._items.pop(self._check_id(item_id), None)
+            if item is None:
+                raise NotFoundError(f"item {item_id} not found")
+            self._by_seller.get(item["sellerId"], {}).pop(item_id, None)
+            self._visible_at.pop(item_id, None)
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    """Маршрутизация HTTP-запросов в LocalItemService."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    service: LocalItemService
+
+    ROUTES = [
+        ("POST", re.compile(r"^/api/1/item$"), "_create_item"),
+        ("GET", re.compile(r"^/api/1/item/([^/]+)$"), "_get_item"),
+        ("GET", re.compile(r"^/api/1/statistic/([^/]+)$"), "_get_statistic"),
+        ("GET", re.compile(r"^/api/2/statistic/([^/]+)$"), "_get_statistic"),
+        ("GET", re.compile(r"^/api/1/([^/]+)/item$"), "_get_seller_items"),
+        ("DELETE", re.compile(r"^/api/2/item/([^/]+)$"), "_delete_item"),
+    ]
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        self._dispatch("GET")
+
+    def do_POST(self) -> None:
+        self._dispatch("POST")
+
+    def do_DELETE(self) -> None:
+        self._dispatch("DELETE")
+
+    def _dispatch(self, method: str) -> None:
+        path = self.path.split("?", 1)[0]
+        body = self._read_body()
+
+        allowed = False
+        for route_method, pattern, handler_name in self.ROUTES:
+            match = pattern.match(path)
+            if not match:
+                continue
+            if route_method != method:
+                allowed = True
+                continue
+            try:
+                status, payload = getattr(self, handler_name)(*match.groups(), body=body)
+            except ValidationError as e:
+                status, payload = 400, self._error(400, str(e))
+            except NotFoundError as e:
+                status, payload = 404, self._error(404, str(e))
+            self._send(status, payload, etag=method == "GET" and status == 200)
+            return
+
+        if allowed:
+            self._send(405, self._error(405, "method not allowed"))
+        else:
+            self._send(404, self._error(404, "not found"))
+
+    def _read_body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    @staticmethod
+    def _error(status: int, message: str) -> Dict[str, Any]:
+        # Формат тел ошибок — как в примерах postman_collection.json
+        if status == 404:
+            return {"result": message, "status": str(status)}
+        return {"result": {"message": message, "messages": {}}, "status": str(status)}
+
+    def _send(self, status: int, payload: Optional[Any], etag: bool = False) -> None:
+        content = b"" if payload is None else json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        headers = {}
+        if etag:
+            headers["ETag"] = '"' + hashlib.sha1(content).hexdigest() + '"'
+            if self.headers.get("If-None-Match") == headers["ETag"]:
+                status, payload, content = 304, None, b""
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        if payload is not None:
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def _create_item(self, body: bytes) -> Tuple[int, Any]:
+        try:
+            data = json.loads(body) if body else None
+        except ValueError:
+            raise ValidationError("некорректный JSON")
+        return 200, self.service.create_item(data)
+
+    def _get_item(self, item_id: str, body: bytes) -> Tuple[int, Any]:
+        return 200, [self.service.get_item(item_id)]
+
+    def _get_statistic(self, item_id: str, body: bytes) -> Tuple[int, Any]:
+        return 200, [self.service.get_statistic(item_id)]
+
+    def _get_seller_items(self, seller_id: str, body: bytes) -> Tuple[int, Any]:
+        try:
+            seller = int(seller_id)
+        except ValueError:
+            raise ValidationError("передан некорректный идентификатор продавца")
+        return 200, self.service.get_seller_items(seller)
+
+    def _delete_item(self, item_id: str, body: bytes) -> Tuple[int, Any]:
+        self.service.delete_item(item_id)
+        return 200, None
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Очередь по умолчанию (5) переполняется при пакетных запросах
+    request_queue_size = 1024
+
+
+class LocalAPIServer:
+    """HTTP-сервер с LocalItemService, работающий в фоновом потоке."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0,
+                 service: Optional[LocalItemService] = None):
+        self.service = service if service is not None else LocalItemService()
+        handler = type("RequestHandler", (_RequestHandler,), {"service": self.service})
+        self._httpd = _HTTPServer((host, port), handler)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "LocalAPIServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, args=(0.05,),
+                                        name="local-api-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "LocalAPIServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Локальная замена API объявлений Avito")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--visibility-delay", type=float, default=0.0,
+                        help="Через сколько секунд созданное объявление видно при чтении")
+    args = parser.parse_args()
+
+    server = LocalAPIServer(args.host, args.port, LocalItemService(args.visibility_delay))
+    print(f"Локальный API запущен: {server.base_url}")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
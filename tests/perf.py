@@ -0,0 +1,390 @@
+"""
+Хранилище результатов бенчмарков и проверка регрессий производительности.
+
+Результаты каждого прогона (тесты с маркером perf, loadgen, distributed_load,
+scenarios) сохраняются в SQLite: по каждому эндпоинту или сценарию —
+гистограмма задержек, перцентили, число запросов и ошибок, пропускная
+способность; прогон помечается коммитом и целевым стендом. Прогон можно
+отметить как эталонный (baseline).
+
+Сравнение с эталоном — статистическое: задержки кандидата и эталона
+сравниваются U-критерием Манна-Уитни (точно по корзинам гистограмм, с
+поправкой на совпадения), для отношения медиан строится
+непараметрический доверительный интервал. Регрессия — значимое (p < alpha)
+увеличение медианы больше чем на min_effect. Пропускная способность
+выводится для справки.
+
+Запуск (из каталога tests):
+    python -m perf list --db perf.sqlite
+    python -m perf import loadgen.json --db perf.sqlite --target https://qa-internship.avito.com
+    python -m perf mark-baseline 3 --db perf.sqlite
+    python -m perf compare --db perf.sqlite            # последний прогон против эталона
+    python -m perf compare --baseline 3 --candidate 5 --min-effect 0.05
+Код возврата compare — 1 при регрессиях.
+"""
+import argparse
+import json
+import math
+import os
+import sqlite3
+import subprocess
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from histogram import LatencyHistogram, _bucket_range
+
+DEFAULT_DB = Path(__file__).resolve().parent.parent / ".pytest_cache" / "d" / "perf" / "results.sqlite"
+DEFAULT_ALPHA = 0.01
+DEFAULT_MIN_EFFECT = 0.10
+DEFAULT_CONFIDENCE = 0.95
+
+KIND_ENDPOINT = "endpoint"
+KIND_SCENARIO = "scenario"
+KIND_TEST = "test"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    commit_sha TEXT,
+    target TEXT NOT NULL,
+    label TEXT,
+    baseline INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS measurements (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    requests INTEGER NOT NULL,
+    errors INTEGER NOT NULL,
+    elapsed REAL NOT NULL,
+    p50_us INTEGER,
+    p90_us INTEGER,
+    p99_us INTEGER,
+    histogram TEXT NOT NULL,
+    PRIMARY KEY (run_id, name)
+);
+"""
+_RUN_KEYS = ("id", "created_at", "commit", "target", "label", "baseline")
+
+
+class Measurement:
+    """Задержки одного эндпоинта, сценария или perf-теста в прогоне."""
+
+    def __init__(self, name: str, histogram: LatencyHistogram, kind: str = KIND_ENDPOINT,
+                 requests: Optional[int] = None, errors: int = 0, elapsed: float = 0.0):
+        self.name = name
+        self.kind = kind
+        self.histogram = histogram
+        self.requests = len(histogram) if requests is None else requests
+        self.errors = errors
+        self.elapsed = elapsed
+
+    @property
+    def throughput(self) -> float:
+        return self.requests / self.elapsed if self.elapsed else 0.0
+
+
+def current_commit() -> Optional[str]:
+    """Коммит рабочей копии (или PERF_COMMIT из окружения CI)."""
+    if os.environ.get("PERF_COMMIT"):
+        return os.environ["PERF_COMMIT"]
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=Path(__file__).resolve().parent, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+
+class PerfStore:
+    """SQLite-хранилище прогонов."""
+
+    def __init__(self, path: Any = DEFAULT_DB):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path))
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "PerfStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def save_run(self, measurements: List[Measurement], target: str, commit: Optional[str] = None,
+                 label: Optional[str] = None, baseline: bool = False) -> int:
+        """Сохранение прогона; возвращает его номер."""
+        with self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO runs (created_at, commit_sha, target, label, baseline) VALUES (?, ?, ?, ?, ?)",
+                (datetime.now(timezone.utc).isoformat(timespec="seconds"), commit, target, label, int(baseline)))
+            run_id = cursor.lastrowid
+            for m in measurements:
+                pct = m.histogram.percentiles((50.0, 90.0, 99.0))
+                self._conn.execute(
+                    "INSERT INTO measurements VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (run_id, m.name, m.kind, m.requests, m.errors, m.elapsed, pct[50.0], pct[90.0], pct[99.0],
+                     json.dumps(m.histogram.to_dict(), separators=(",", ":"))))
+        return run_id
+
+    def mark_baseline(self, run_id: int) -> None:
+        with self._conn:
+            if not self._conn.execute("UPDATE runs SET baseline = 1 WHERE id = ?", (run_id,)).rowcount:
+                raise LookupError(f"Прогон {run_id} не найден")
+
+    def runs(self, target: Optional[str] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        query = "SELECT id, created_at, commit_sha, target, label, baseline FROM runs"
+        params: Tuple = ()
+        if target is not None:
+            query += " WHERE target = ?"
+            params = (target,)
+        rows = self._conn.execute(query + " ORDER BY id DESC LIMIT ?", params + (limit,)).fetchall()
+        return [dict(zip(_RUN_KEYS, row)) for row in rows]
+
+    def run(self, run_id: int) -> Dict[str, Any]:
+        row = self._conn.execute("SELECT id, created_at, commit_sha, target, label, baseline FROM runs "
+                                 "WHERE id = ?", (run_id,)).fetchone()
+        if row is None:
+            raise LookupError(f"Прогон {run_id} не найден")
+        return dict(zip(_RUN_KEYS, row))
+
+    def latest_run(self, target: Optional[str] = None) -> Optional[int]:
+        runs = self.runs(target, limit=1)
+        return runs[0]["id"] if runs else None
+
+    def baseline_run(self, target: str, before: Optional[int] = None) -> Optional[int]:
+        """Последний эталонный прогон стенда, а без эталонов — предыдущий прогон."""
+        limit = before if before is not None else 2 ** 62
+        row = self._conn.execute(
+            "SELECT id FROM runs WHERE target = ? AND baseline = 1 AND id < ? ORDER BY id DESC LIMIT 1",
+            (target, limit)).fetchone()
+        if row is None:
+            row = self._conn.execute("SELECT id FROM runs WHERE target = ? AND id < ? ORDER BY id DESC LIMIT 1",
+                                     (target, limit)).fetchone()
+        return row[0] if row else None
+
+    def measurements(self, run_id: int) -> Dict[str, Measurement]:
+        rows = self._conn.execute(
+            "SELECT name, kind, requests, errors, elapsed, histogram FROM measurements WHERE run_id = ?",
+            (run_id,)).fetchall()
+        return {name: Measurement(name, LatencyHistogram.from_dict(json.loads(histogram)), kind,
+                                  requests, errors, elapsed)
+                for name, kind, requests, errors, elapsed, histogram in rows}
+
+
+# --- Статистика --------------------------------------------------------------
+
+def mann_whitney_greater(baseline: LatencyHistogram, candidate: LatencyHistogram) -> float:
+    """
+    Односторонний U-критерий Манна-Уитни: p-значение гипотезы, что задержки
+    кандидата стохастически больше. Значения одной корзины считаются равными;
+    нормальное приближение с поправкой на совпадения и непрерывность.
+    """
+    n_b, n_c = len(baseline), len(candidate)
+    if not n_b or not n_c:
+        return 1.0
+    n = n_b + n_c
+    u = 0.0
+    below = 0
+    ties = 0.0
+    for index in sorted(set(baseline.counts) | set(candidate.counts)):
+        b = baseline.counts.get(index, 0)
+        c = candidate.counts.get(index, 0)
+        u += c * (below + 0.5 * b)
+        below += b
+        t = b + c
+        ties += t ** 3 - t
+    mean = n_b * n_c / 2.0
+    variance = n_b * n_c / 12.0 * ((n + 1) - ties / (n * (n - 1))) if n > 1 else 0.0
+    if variance <= 0:
+        return 1.0 if u <= mean else 0.0
+    z = (u - mean - 0.5) / math.sqrt(variance)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def _value_at_rank(histogram: LatencyHistogram, rank: int) -> int:
+    """Значение (мкс) rank-го по порядку измерения, 1 <= rank <= len."""
+    seen = 0
+    for index in sorted(histogram.counts):
+        seen += histogram.counts[index]
+        if seen >= rank:
+            return min(_bucket_range(index)[1], histogram.max_value)
+    return histogram.max_value
+
+
+def quantile_ci(histogram: LatencyHistogram, quantile: float,
+                confidence: float = DEFAULT_CONFIDENCE) -> Tuple[int, int, int]:
+    """
+    Квантиль и непараметрический доверительный интервал для него по порядковым
+    статистикам (биномиальное распределение ранга, нормальное приближение).
+    """
+    n = len(histogram)
+    if not n:
+        return 0, 0, 0
+    z = _normal_quantile(0.5 + confidence / 2)
+    spread = z * math.sqrt(n * quantile * (1 - quantile))
+    low_rank = max(1, math.floor(n * quantile - spread))
+    high_rank = min(n, math.ceil(n * quantile + spread) + 1)
+    point = _value_at_rank(histogram, max(1, math.ceil(n * quantile)))
+    return point, _value_at_rank(histogram, low_rank), _value_at_rank(histogram, high_rank)
+
+
+def _normal_quantile(p: float) -> float:
+    """Квантиль стандартного нормального распределения (бисекция по erfc)."""
+    low, high = -10.0, 10.0
+    for _ in range(100):
+        mid = (low + high) / 2
+        if 0.5 * math.erfc(-mid / math.sqrt(2)) < p:
+            low = mid
+        else:
+            high = mid
+    return (low + high) / 2
+
+
+class Comparison:
+    """Сравнение одного измерения кандидата с эталоном."""
+
+    def __init__(self, name: str, baseline: Measurement, candidate: Measurement, quantile: float,
+                 confidence: float, alpha: float, min_effect: float):
+        self.name = name
+        self.baseline = baseline
+        self.candidate = candidate
+        base, base_low, base_high = quantile_ci(baseline.histogram, quantile, confidence)
+        cand, cand_low, cand_high = quantile_ci(candidate.histogram, quantile, confidence)
+        self.baseline_value = base
+        self.candidate_value = cand
+        self.ratio = cand / base if base else math.inf
+        # Консервативный интервал отношения: крайние точки интервалов обеих сторон
+        self.ratio_low = cand_low / base_high if base_high else math.inf
+        self.ratio_high = cand_high / base_low if base_low else math.inf
+        self.p_slower = mann_whitney_greater(baseline.histogram, candidate.histogram)
+        self.p_faster = mann_whitney_greater(candidate.histogram, baseline.histogram)
+        self.regression = self.p_slower < alpha and self.ratio > 1 + min_effect
+        self.improvement = self.p_faster < alpha and self.ratio < 1 - min_effect
+
+    @property
+    def throughput_change(self) -> Optional[float]:
+        if not self.baseline.throughput or not self.candidate.throughput:
+            return None
+        return self.candidate.throughput / self.baseline.throughput - 1
+
+
+def compare(baseline: Dict[str, Measurement], candidate: Dict[str, Measurement], quantile: float = 0.5,
+            confidence: float = DEFAULT_CONFIDENCE, alpha: float = DEFAULT_ALPHA,
+            min_effect: float = DEFAULT_MIN_EFFECT) -> List[Comparison]:
+    """Сравнение общих для двух прогонов измерений."""
+    return [Comparison(name, baseline[name], candidate[name], quantile, confidence, alpha, min_effect)
+            for name in sorted(set(baseline) & set(candidate))
+            if len(baseline[name].histogram) and len(candidate[name].histogram)]
+
+
+def format_comparison(comparisons: List[Comparison]) -> str:
+    """Таблица: медианы (мс), отношение с интервалом, p-значение, пропускная способность."""
+    header = (f"{'measurement':<34}{'base':>9}{'cand':>9}{'ratio':>8}{'CI':>16}{'p':>10}{'rps Δ':>9}  итог")
+    lines = [header, "-" * len(header)]
+    for c in comparisons:
+        verdict = "РЕГРЕССИЯ" if c.regression else "ускорение" if c.improvement else "ok"
+        throughput = c.throughput_change
+        lines.append(
+            f"{c.name:<34}{c.baseline_value / 1000:>9.2f}{c.candidate_value / 1000:>9.2f}{c.ratio:>8.2f}"
+            f"{f'[{c.ratio_low:.2f}, {c.ratio_high:.2f}]':>16}{c.p_slower:>10.2g}"
+            f"{'' if throughput is None else format(throughput * 100, '+.0f') + '%':>9}  {verdict}")
+    return "\n".join(lines)
+
+
+# --- Импорт результатов генераторов нагрузки ---------------------------------
+
+def _endpoint_measurement(data: Dict[str, Any]) -> Measurement:
+    errors = sum(c for s, c in data.get("statuses", {}).items() if int(s) >= 400)
+    errors += sum(data.get("errors", {}).values()) + data.get("invalid", 0)
+    return Measurement(data["template"], LatencyHistogram.from_dict(data["histogram"]), KIND_ENDPOINT,
+                       data["requests"], errors, data["elapsed"])
+
+
+def import_results(path: str) -> List[Measurement]:
+    """Измерения из JSON loadgen (--json), distributed_load или scenarios."""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, list):  # loadgen
+        return [_endpoint_measurement(d) for d in data]
+    if "endpoints" in data:  # distributed_load
+        return [_endpoint_measurement(d) for d in data["endpoints"]]
+    if "operations" in data:  # scenarios
+        measurements = [_endpoint_measurement(d) for d in data["operations"]]
+        for name, scenario in data.get("scenarios", {}).items():
+            measurements.append(Measurement(
+                f"scenario {name}", LatencyHistogram.from_dict(scenario["duration_histogram"]), KIND_SCENARIO,
+                scenario["completed"] + scenario["failed"], scenario["failed"], data["elapsed"]))
+        return measurements
+    raise ValueError(f"{path}: неизвестный формат результатов")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Хранилище результатов бенчмарков и проверка регрессий")
+    parser.add_argument("--db", default=str(DEFAULT_DB), help="Файл SQLite")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = commands.add_parser("list", help="Последние прогоны")
+    list_parser.add_argument("--target", default=None)
+
+    import_parser = commands.add_parser("import", help="Сохранить JSON loadgen/distributed_load/scenarios")
+    import_parser.add_argument("path")
+    import_parser.add_argument("--target", required=True, help="Стенд, на котором получены результаты")
+    import_parser.add_argument("--label", default=None)
+    import_parser.add_argument("--baseline", action="store_true", help="Отметить как эталон")
+
+    baseline_parser = commands.add_parser("mark-baseline", help="Отметить прогон как эталон")
+    baseline_parser.add_argument("run", type=int)
+
+    compare_parser = commands.add_parser("compare", help="Сравнить прогон с эталоном")
+    compare_parser.add_argument("--candidate", type=int, default=None, help="По умолчанию — последний прогон")
+    compare_parser.add_argument("--baseline", type=int, default=None,
+                                help="По умолчанию — последний эталон того же стенда")
+    compare_parser.add_argument("--quantile", type=float, default=0.5)
+    compare_parser.add_argument("--alpha", type=float, default=DEFAULT_ALPHA)
+    compare_parser.add_argument("--min-effect", type=float, default=DEFAULT_MIN_EFFECT,
+                                help="Минимальный относительный рост задержки, считающийся регрессией")
+    args = parser.parse_args(argv)
+
+    with PerfStore(args.db) as store:
+        if args.command == "list":
+            for run in store.runs(args.target):
+                mark = " (эталон)" if run["baseline"] else ""
+                print(f"{run['id']:>5}  {run['created_at']}  {run['commit'] or '-':<10} {run['target']}"
+                      f"  {run['label'] or ''}{mark}")
+            return 0
+        if args.command == "import":
+            run_id = store.save_run(import_results(args.path), args.target, current_commit(), args.label,
+                                    args.baseline)
+            print(f"Сохранён прогон {run_id}")
+            return 0
+        if args.command == "mark-baseline":
+            store.mark_baseline(args.run)
+            return 0
+
+        candidate_id = args.candidate if args.candidate is not None else store.latest_run()
+        if candidate_id is None:
+            print("В хранилище нет прогонов")
+            return 2
+        candidate_run = store.run(candidate_id)
+        baseline_id = (args.baseline if args.baseline is not None
+                       else store.baseline_run(candidate_run["target"], before=candidate_id))
+        if baseline_id is None:
+            print(f"Нет эталона для стенда {candidate_run['target']}")
+            return 2
+        comparisons = compare(store.measurements(baseline_id), store.measurements(candidate_id),
+                              args.quantile, alpha=args.alpha, min_effect=args.min_effect)
+    print(f"Прогон {candidate_id} против эталона {baseline_id} (квантиль {args.quantile:g}, "
+          f"alpha {args.alpha:g}, порог {args.min_effect:.0%})")
+    print(format_comparison(comparisons))
+    return 1 if any(c.regression for c in comparisons) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,131 @@
+"""
+Pytest-плагин бенчмарков (маркер perf).
+
+Тесты с маркером perf замеряют задержку через фикстуру perf_benchmark:
+вызов выполняется warmup раз без замера и rounds раз с записью в
+гистограмму. В конце сессии выводится сводка, а с --perf-save /
+--perf-baseline результаты сохраняются в хранилище perf.PerfStore,
+помеченные коммитом и стендом (--api-url). С --perf-compare результаты
+сравниваются с эталоном того же стенда; регрессия завершает сессию
+с ненулевым кодом, даже если все тесты прошли.
+
+Замеры шлют сотни запросов и создают объявления, поэтому perf-тесты
+выполняются только по запросу: с -m perf или с одной из опций
+--perf-save / --perf-baseline / --perf-compare; иначе они пропускаются.
+"""
+import re
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import pytest
+
+from histogram import LatencyHistogram
+from perf import (DEFAULT_MIN_EFFECT, KIND_TEST, Comparison, Measurement, PerfStore, compare, current_commit,
+                  format_comparison)
+
+DEFAULT_ROUNDS = 100
+DEFAULT_WARMUP = 5
+MARKER = "perf"
+
+
+def perf_selected(markexpr: str) -> bool:
+    """Выбраны ли perf-тесты выражением -m (perf без not перед ним)."""
+    return re.search(r"(?<!not )\bperf\b", markexpr or "") is not None
+
+
+class PerfPlugin:
+    """Сбор замеров perf-тестов, сохранение и сравнение с эталоном."""
+
+    def __init__(self, db_path: str, target: str, save: bool = False, baseline: bool = False,
+                 compare_baseline: bool = False, min_effect: float = DEFAULT_MIN_EFFECT,
+                 selected: bool = False):
+        self.db_path = db_path
+        self.target = target
+        self.save = save or baseline or compare_baseline
+        self.baseline = baseline
+        self.compare_baseline = compare_baseline
+        self.min_effect = min_effect
+        self.enabled = self.save or selected
+        self.measurements: Dict[str, Measurement] = {}
+        self.run_id: Optional[int] = None
+        self.baseline_id: Optional[int] = None
+        self.comparisons: List[Comparison] = []
+
+    def benchmark(self, name: str, call: Callable[[], Any], rounds: int = DEFAULT_ROUNDS,
+                  warmup: int = DEFAULT_WARMUP) -> Measurement:
+        """
+        Замер вызова call под именем name. Ответы со статусом >= 400
+        считаются ошибками. Повторный замер того же имени дополняет его.
+        """
+        for _ in range(warmup):
+            call()
+        histogram = LatencyHistogram()
+        errors = 0
+        started = time.perf_counter()
+        for _ in range(rounds):
+            sent = time.perf_counter()
+            response = call()
+            histogram.record(time.perf_counter() - sent)
+            if getattr(response, "status_code", 200) >= 400:
+                errors += 1
+        measurement = Measurement(name, histogram, KIND_TEST, rounds, errors, time.perf_counter() - started)
+        previous = self.measurements.get(name)
+        if previous is not None:
+            previous.histogram.merge(histogram)
+            previous.requests += measurement.requests
+            previous.errors += measurement.errors
+            previous.elapsed += measurement.elapsed
+            return previous
+        self.measurements[name] = measurement
+        return measurement
+
+    def pytest_collection_modifyitems(self, items) -> None:
+        if self.enabled:
+            return
+        skip = pytest.mark.skip(reason="замеры выполняются с -m perf или --perf-save/--perf-baseline/--perf-compare")
+        for item in items:
+            if item.get_closest_marker(MARKER) is not None:
+                item.add_marker(skip)
+
+    @property
+    def regressions(self) -> List[Comparison]:
+        return [c for c in self.comparisons if c.regression]
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_sessionfinish(self, session) -> None:
+        if not self.measurements or not self.save:
+            return
+        with PerfStore(self.db_path) as store:
+            self.run_id = store.save_run(list(self.measurements.values()), self.target, current_commit(),
+                                         label="pytest", baseline=self.baseline)
+            if self.compare_baseline:
+                self.baseline_id = store.baseline_run(self.target, before=self.run_id)
+                if self.baseline_id is not None:
+                    self.comparisons = compare(store.measurements(self.baseline_id), self.measurements,
+                                               min_effect=self.min_effect)
+        if self.regressions and session.exitstatus == 0:
+            session.exitstatus = pytest.ExitCode.TESTS_FAILED
+
+    def pytest_terminal_summary(self, terminalreporter) -> None:
+        if not self.measurements:
+            return
+        write = terminalreporter.write_line
+        terminalreporter.section("Производительность")
+        width = max(len(name) for name in self.measurements) + 2
+        write(f"{'замер':<{width}}{'n':>6}{'p50 мс':>9}{'p90 мс':>9}{'p99 мс':>9}{'rps':>9}{'ошибок':>8}")
+        for name, m in sorted(self.measurements.items()):
+            pct = m.histogram.percentiles((50.0, 90.0, 99.0))
+            write(f"{name:<{width}}{m.requests:>6}{pct[50.0] / 1000:>9.2f}{pct[90.0] / 1000:>9.2f}"
+                  f"{pct[99.0] / 1000:>9.2f}{m.throughput:>9.1f}{m.errors:>8}")
+        if self.run_id is not None:
+            write(f"Сохранено: прогон {self.run_id} ({self.target}) -> {self.db_path}")
+        if self.compare_baseline:
+            if self.baseline_id is None:
+                write(f"Эталона для {self.target} нет: текущий прогон станет точкой сравнения")
+                return
+            write(f"Сравнение с эталоном {self.baseline_id}:")
+            for line in format_comparison(self.comparisons).splitlines():
+                write(line)
+            for c in self.regressions:
+                write(f"РЕГРЕССИЯ {c.name}: медиана {c.baseline_value / 1000:.2f} -> "
+                      f"{c.candidate_value / 1000:.2f} мс (x{c.ratio:.2f}, p={c.p_slower:.2g})", red=True)
@@ -0,0 +1,105 @@
+"""
+Ожидание согласованности чтения после записи.
+
+eventually() повторяет проверку с экспоненциальной паузой и случайным разбросом
+(jitter), пока она не выполнится или не истечёт время. Первая проверка
+выполняется сразу, поэтому видимые данные не ждут ни одной лишней паузы.
+
+LagStats собирает наблюдаемую задержку распространения: время от ответа на
+создание объявления до отправки первого запроса, в ответе на который оно видно.
+"""
+import random
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional, TypeVar
+
+from histogram import LatencyHistogram
+
+DEFAULT_TIMEOUT = 10.0
+
+T = TypeVar("T")
+
+
+class PollTimeout(AssertionError):
+    """Условие не выполнилось до истечения времени ожидания."""
+
+
+class Backoff:
+    """
+    Паузы между проверками: initial, initial * factor, ... не больше maximum.
+    Каждая пауза случайно уменьшается не более чем на долю jitter, чтобы
+    параллельные ожидания не опрашивали сервис синхронно.
+    """
+
+    def __init__(self, initial: float = 0.02, factor: float = 2.0, maximum: float = 0.5,
+                 jitter: float = 0.5, rng: Optional[random.Random] = None):
+        self.initial = initial
+        self.factor = factor
+        self.maximum = maximum
+        self.jitter = jitter
+        self._rng = rng or random.Random()
+
+    def delays(self) -> Iterator[float]:
+        interval = self.initial
+        while True:
+            yield interval * (1.0 - self.jitter * self._rng.random())
+            interval = min(interval * self.factor, self.maximum)
+
+
+def eventually(probe: Callable[[], Optional[T]], timeout: float = DEFAULT_TIMEOUT,
+               backoff: Optional[Backoff] = None, message: str = "условие не выполнилось",
+               clock: Callable[[], float] = time.monotonic,
+               sleep: Callable[[float], None] = time.sleep) -> T:
+    """
+    Повторение probe до успеха. Неуспех — None, False или AssertionError;
+    любое другое значение возвращается. По истечении timeout — PollTimeout
+    с последней ошибкой проверки.
+    """
+    backoff = backoff or Backoff()
+    deadline = clock() + timeout
+    delays = backoff.delays()
+    attempts = 0
+    while True:
+        attempts += 1
+        last_error = None
+        try:
+            result = probe()
+        except AssertionError as e:
+            last_error = e
+            result = None
+        if result is not None and result is not False:
+            return result
+        remaining = deadline - clock()
+        if remaining <= 0:
+            details = f": {last_error}" if last_error else ""
+            raise PollTimeout(f"{message} за {timeout:g} с ({attempts} проверок){details}") from last_error
+        sleep(min(next(delays), remaining))
+
+
+class LagStats:
+    """Гистограммы задержки чтения после записи по эндпоинтам чтения."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histograms: Dict[str, LatencyHistogram] = {}
+
+    def record(self, endpoint: str, seconds: float) -> None:
+        with self._lock:
+            histogram = self.histograms.setdefault(endpoint, LatencyHistogram())
+            histogram.record(max(0.0, seconds))
+
+    def __len__(self) -> int:
+        return sum(len(h) for h in self.histograms.values())
+
+    def summary_lines(self) -> List[str]:
+        """Строки отчёта: число замеров, p50/p99/max в миллисекундах."""
+        lines = []
+        with self._lock:
+            for endpoint, histogram in sorted(self.histograms.items()):
+                pct = histogram.percentiles((50.0, 99.0))
+                lines.append(f"{endpoint}: n={len(histogram)} p50={pct[50.0] / 1000:.1f} мс "
+                             f"p99={pct[99.0] / 1000:.1f} мс max={histogram.max_value / 1000:.1f} мс")
+        return lines
+
+
+LAG_STATS = LagStats()
@@ -0,0 +1,167 @@
+"""
+Кэш GET-ответов APIClient (read-through) с инвалидацией при записи.
+
+Кэшируются только ответы 200 эндпоинтов чтения, у каждого эндпоинта свой TTL.
+Вытеснение — LRU с ограничением по числу записей и суммарному размеру тел.
+Ответы с ошибкой (в том числе 404) не кэшируются: объявление, которого ещё
+нет, может появиться в следующем запросе.
+
+Если сервер отдаёт ETag или Last-Modified, устаревшая запись не удаляется,
+а перепроверяется условным запросом (If-None-Match / If-Modified-Since):
+ответ 304 продлевает запись без передачи тела.
+
+Ответ, запрошенный до инвалидации, в кэш не попадает: иначе запись,
+выполненная во время запроса, была бы перекрыта устаревшими данными.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+import requests
+
+from http_timing import endpoint_template
+
+ITEM = "GET /api/1/item/{id}"
+STATISTIC = "GET /api/1/statistic/{id}"
+STATISTIC_V2 = "GET /api/2/statistic/{id}"
+SELLER_ITEMS = "GET /api/1/{sellerID}/item"
+
+# TTL записей по эндпоинтам, секунды
+DEFAULT_TTLS = {
+    ITEM: 30.0,
+    STATISTIC: 10.0,
+    STATISTIC_V2: 10.0,
+    SELLER_ITEMS: 10.0,
+}
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_MAX_BYTES = 8 * 1024 * 1024
+# Накладные расходы на запись сверх тела ответа (заголовки, объекты), байт
+ENTRY_OVERHEAD = 512
+
+
+class _Entry:
+    __slots__ = ("endpoint", "response", "expires", "size")
+
+    def __init__(self, endpoint: str, response: requests.Response, expires: float):
+        self.endpoint = endpoint
+        self.response = response
+        self.expires = expires
+        self.size = len(response.content) + ENTRY_OVERHEAD
+
+
+class ResponseCache:
+    """LRU-кэш ответов с TTL по эндпоинтам и счётчиками попаданий."""
+
+    def __init__(self, ttls: Optional[Dict[str, float]] = None, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 max_bytes: int = DEFAULT_MAX_BYTES, clock: Callable[[], float] = time.monotonic):
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._generation = 0
+        self.counters: Dict[str, Dict[str, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def _count(self, endpoint: str, counter: str) -> None:
+        counters = self.counters.setdefault(endpoint, {"hits": 0, "misses": 0, "revalidated": 0})
+        counters[counter] += 1
+
+    def fetch(self, session: requests.Session, url: str) -> requests.Response:
+        """GET url из кэша или из сети с сохранением ответа."""
+        endpoint = f"GET {endpoint_template(url)}"
+        ttl = self.ttls.get(endpoint, 0.0)
+        if ttl <= 0:
+            return session.get(url)
+
+        headers = {}
+        with self._lock:
+            generation = self._generation
+            entry = self._entries.get(url)
+            if entry is not None:
+                if entry.expires > self._clock():
+                    self._entries.move_to_end(url)
+                    self._count(endpoint, "hits")
+                    return entry.response
+                cached_headers = entry.response.headers
+                if "ETag" in cached_headers:
+                    headers["If-None-Match"] = cached_headers["ETag"]
+                if "Last-Modified" in cached_headers:
+                    headers["If-Modified-Since"] = cached_headers["Last-Modified"]
+
+        response = session.get(url, headers=headers) if headers else session.get(url)
+
+        with self._lock:
+            current = generation == self._generation
+            if response.status_code == 304 and entry is not None:
+                self._count(endpoint, "revalidated")
+                if current:
+                    entry.expires = self._clock() + ttl
+                    self._entries.move_to_end(url)
+                return entry.response
+            self._count(endpoint, "misses")
+            if current:
+                self._discard(url)
+                if response.status_code == 200:
+                    self._store(url, _Entry(endpoint, response, self._clock() + ttl))
+        return response
+
+    def _store(self, url: str, entry: _Entry) -> None:
+        if entry.size > self.max_bytes:
+            return
+        self._entries[url] = entry
+        self._bytes += entry.size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.size
+
+    def _discard(self, url: str) -> None:
+        entry = self._entries.pop(url, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def invalidate(self, url: str) -> None:
+        """Удаление записи по URL."""
+        with self._lock:
+            self._generation += 1
+            self._discard(url)
+
+    def invalidate_endpoint(self, endpoint: str) -> None:
+        """Удаление всех записей эндпоинта (например, всех списков продавцов)."""
+        with self._lock:
+            self._generation += 1
+            for url in [url for url, entry in self._entries.items() if entry.endpoint == endpoint]:
+                self._discard(url)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._bytes = 0
+
+    @property
+    def hits(self) -> int:
+        return sum(c["hits"] for c in self.counters.values())
+
+    @property
+    def misses(self) -> int:
+        return sum(c["misses"] for c in self.counters.values())
+
+    def summary_lines(self) -> List[str]:
+        """Строки отчёта по эндпоинтам: попадания, промахи, перепроверки."""
+        lines = []
+        for endpoint, c in sorted(self.counters.items()):
+            total = c["hits"] + c["misses"] + c["revalidated"]
+            ratio = c["hits"] / total * 100 if total else 0.0
+            lines.append(f"{endpoint}: попаданий {c['hits']}, промахов {c['misses']}, "
+                         f"перепроверок {c['revalidated']} ({ratio:.0f}% без запроса)")
+        return lines
@@ -0,0 +1,469 @@
+"""
+Сценарная нагрузка: виртуальные пользователи с реалистичной смесью действий.
+
+Нагрузка одного эндпоинта не воспроизводит продовую смесь: конкуренция за
+кэш и БД проявляется только при чередовании записей и чтений разных
+пользователей. Здесь нагрузка описывается декларативно (JSON или YAML):
+сценарии с весами, каждый — последовательность шагов (как TC-031:
+создание → получение → список продавца → статистика → удаление) или цепь
+Маркова с вероятностями переходов между операциями, и время раздумий
+между шагами из распределения.
+
+    users: 1000
+    duration: 60
+    ramp_up: 10
+    think_time: {distribution: lognormal, median: 0.5, sigma: 0.6}
+    scenarios:
+      lifecycle:
+        weight: 1
+        steps: [create, get_item, seller_items, statistic, delete]
+      browse:
+        weight: 5
+        markov:
+          start: seller_items
+          transitions:
+            seller_items: {get_item: 0.7, statistic: 0.2}
+            get_item: {statistic: 0.4, seller_items: 0.3}
+            statistic: {get_item: 0.5}
+
+Недостающая до 1 вероятность — завершение сценария. У каждого виртуального
+пользователя своё состояние: sellerID и созданные им объявления; чтение
+чужих объявлений идёт из общего каталога созданных всеми пользователями.
+Пользователи — корутины поверх одного AsyncAPIClient, поэтому один процесс
+держит тысячи пользователей. Шаг с ошибкой прерывает сценарий.
+
+Запуск (из каталога tests):
+    python -m scenarios --api-url local --users 200 --duration 20
+    python -m scenarios --spec workload.yaml --json scenarios.json
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional
+
+from async_client import AsyncAPIClient, AsyncResponse
+from cleanup import CleanupQueue, cli_targets
+from conftest import BASE_URL, LOCAL_TARGET, create_valid_item_data, generate_unique_seller_id, use_load_seller_ids
+from faults import Distribution, fixed, lognormal, uniform
+from histogram import LatencyHistogram
+from loadgen import ENDPOINTS, EndpointResult, format_report
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+END = "end"
+MAX_MARKOV_STEPS = 100
+# Сколько объявлений держать в общем каталоге для чтения чужих объявлений
+CATALOG_SIZE = 10000
+DEFAULT_CONNECTIONS = 100
+
+DEFAULT_WORKLOAD: Dict[str, Any] = {
+    "users": 100,
+    "duration": 30.0,
+    "ramp_up": 5.0,
+    "think_time": {"distribution": "lognormal", "median": 0.5, "sigma": 0.6},
+    "scenarios": {
+        "lifecycle": {
+            "weight": 1,
+            "steps": ["create", "get_item", "seller_items", "statistic", "delete"],
+        },
+        "browse": {
+            "weight": 4,
+            "markov": {
+                "start": "seller_items",
+                "transitions": {
+                    "seller_items": {"get_item": 0.7, "statistic": 0.2},
+                    "get_item": {"statistic": 0.4, "seller_items": 0.3},
+                    "statistic": {"get_item": 0.5},
+                },
+            },
+        },
+        "sell": {
+            "weight": 1,
+            "steps": ["create", "get_item", "statistic"],
+        },
+    },
+}
+
+
+def parse_distribution(spec: Any) -> Distribution:
+    """Распределение времени раздумий: число (секунды) или {distribution: ..., параметры}."""
+    if isinstance(spec, (int, float)):
+        return fixed(float(spec))
+    kind = spec.get("distribution")
+    if kind == "fixed":
+        return fixed(float(spec["seconds"]))
+    if kind == "uniform":
+        return uniform(float(spec["low"]), float(spec["high"]))
+    if kind == "lognormal":
+        return lognormal(float(spec["median"]), float(spec["sigma"]))
+    if kind == "exponential":
+        mean = float(spec["mean"])
+        return lambda rng: rng.expovariate(1.0 / mean)
+    raise ValueError(f"Неизвестное распределение времени раздумий: {kind!r}")
+
+
+class VirtualUser:
+    """Состояние виртуального пользователя: свой продавец и свои объявления."""
+
+    def __init__(self, index: int, seller_id: int, rng: random.Random):
+        self.index = index
+        self.seller_id = seller_id
+        self.rng = rng
+        self.items: List[str] = []
+
+
+class _Catalog:
+    """Объявления, созданные всеми пользователями: id -> sellerID."""
+
+    def __init__(self, limit: int = CATALOG_SIZE):
+        self.limit = limit
+        self.items: Dict[str, int] = {}
+        self._ids: List[str] = []
+
+    def add(self, item_id: str, seller_id: int) -> None:
+        if len(self._ids) >= self.limit:
+            return
+        self.items[item_id] = seller_id
+        self._ids.append(item_id)
+
+    def remove(self, item_id: str) -> None:
+        if self.items.pop(item_id, None) is not None:
+            self._ids.remove(item_id)
+
+    def choice(self, rng: random.Random) -> Optional[str]:
+        return rng.choice(self._ids) if self._ids else None
+
+
+class Scenario:
+    """Сценарий: фиксированная последовательность шагов или цепь Маркова."""
+
+    def __init__(self, name: str, weight: float = 1.0, steps: Optional[List[str]] = None,
+                 markov: Optional[Dict[str, Any]] = None, think_time: Any = None):
+        if (steps is None) == (markov is None):
+            raise ValueError(f"Сценарий {name}: нужно задать ровно одно из steps и markov")
+        self.name = name
+        self.weight = float(weight)
+        self.steps = list(steps) if steps is not None else None
+        self.think_time = parse_distribution(think_time) if think_time is not None else None
+        self.start: Optional[str] = None
+        self.transitions: Dict[str, List[tuple]] = {}
+        if markov is not None:
+            self.start = markov["start"]
+            for state, targets in markov.get("transitions", {}).items():
+                total = sum(targets.values())
+                if total > 1.0 + 1e-9:
+                    raise ValueError(f"Сценарий {name}: сумма вероятностей из {state} больше 1")
+                self.transitions[state] = [(t, float(p)) for t, p in targets.items()] + [(END, 1.0 - total)]
+        for operation in self.operations():
+            if operation not in OPERATIONS:
+                raise ValueError(f"Сценарий {name}: неизвестная операция {operation!r}")
+
+    def operations(self) -> List[str]:
+        if self.steps is not None:
+            return self.steps
+        states = {self.start} | set(self.transitions)
+        for targets in self.transitions.values():
+            states.update(t for t, _ in targets if t != END)
+        return sorted(states)
+
+    def walk(self, rng: random.Random) -> Iterator[str]:
+        """Операции одного прохождения сценария."""
+        if self.steps is not None:
+            yield from self.steps
+            return
+        state = self.start
+        for _ in range(MAX_MARKOV_STEPS):
+            yield state
+            targets = self.transitions.get(state)
+            if not targets:
+                return
+            state = rng.choices([t for t, _ in targets], [p for _, p in targets])[0]
+            if state == END:
+                return
+
+
+class Workload:
+    """Декларативное описание сценарной нагрузки."""
+
+    def __init__(self, scenarios: Dict[str, Dict[str, Any]], users: int = 100, duration: float = 30.0,
+                 ramp_up: float = 0.0, think_time: Any = 0.0):
+        if not scenarios:
+            raise ValueError("Нагрузка без сценариев")
+        self.scenarios = [Scenario(name, **spec) for name, spec in scenarios.items()]
+        self.users = users
+        self.duration = duration
+        self.ramp_up = ramp_up
+        self.think_time = parse_distribution(think_time)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Workload":
+        return cls(**{key: data[key] for key in ("scenarios", "users", "duration", "ramp_up", "think_time")
+                      if key in data})
+
+    @classmethod
+    def load(cls, path: str) -> "Workload":
+        """Загрузка из JSON или YAML (по расширению; YAML требует PyYAML)."""
+        text = Path(path).read_text(encoding="utf-8")
+        if path.endswith((".yaml", ".yml")):
+            if yaml is None:
+                raise RuntimeError("Для YAML-спецификаций нужен PyYAML: pip install pyyaml")
+            return cls.from_dict(yaml.safe_load(text))
+        return cls.from_dict(json.loads(text))
+
+    def choose(self, rng: random.Random) -> Scenario:
+        return rng.choices(self.scenarios, [s.weight for s in self.scenarios])[0]
+
+
+# --- Операции ----------------------------------------------------------------
+# Операция выполняет запрос от имени пользователя и обновляет его состояние.
+# None — операцию не к чему применить (например, удалять нечего).
+
+class _Context:
+    def __init__(self, client: AsyncAPIClient, catalog: _Catalog, cleanup: CleanupQueue):
+        self.client = client
+        self.catalog = catalog
+        self.cleanup = cleanup
+
+
+Operation = Callable[[_Context, VirtualUser], Awaitable[Optional[AsyncResponse]]]
+
+
+def _target_item(ctx: _Context, user: VirtualUser) -> Optional[str]:
+    # Последнее своё объявление — продолжение потока «создал и смотрит»;
+    # у пользователя без объявлений — чужое из каталога
+    if user.items:
+        return user.items[-1]
+    return ctx.catalog.choice(user.rng)
+
+
+async def _op_create(ctx: _Context, user: VirtualUser) -> Optional[AsyncResponse]:
+    response = await ctx.client.create_item(create_valid_item_data(
+        seller_id=user.seller_id, name=f"Сценарий {user.index}", price=user.rng.randint(100, 100000)))
+    if response.status_code == 200:
+        item_id = response.json().get("id")
+        if item_id:
+            ctx.cleanup.register(ctx.client.base_url, item_id)
+            user.items.append(item_id)
+            ctx.catalog.add(item_id, user.seller_id)
+    return response
+
+
+async def _op_get_item(ctx: _Context, user: VirtualUser) -> Optional[AsyncResponse]:
+    item_id = _target_item(ctx, user)
+    return await ctx.client.get_item(item_id) if item_id else None
+
+
+async def _op_seller_items(ctx: _Context, user: VirtualUser) -> Optional[AsyncResponse]:
+    if user.items:
+        return await ctx.client.get_seller_items(user.seller_id)
+    item_id = ctx.catalog.choice(user.rng)
+    seller_id = ctx.catalog.items.get(item_id, user.seller_id) if item_id else user.seller_id
+    return await ctx.client.get_seller_items(seller_id)
+
+
+async def _op_statistic(ctx: _Context, user: VirtualUser) -> Optional[AsyncResponse]:
+    item_id = _target_item(ctx, user)
+    return await ctx.client.get_statistic(item_id) if item_id else None
+
+
+async def _op_delete(ctx: _Context, user: VirtualUser) -> Optional[AsyncResponse]:
+    if not user.items:
+        return None
+    item_id = user.items.pop()
+    ctx.catalog.remove(item_id)
+    response = await ctx.client.delete_item(item_id)
+    if response.status_code == 200:
+        ctx.cleanup.mark_deleted(item_id)
+    return response
+
+
+OPERATIONS: Dict[str, Operation] = {
+    "create": _op_create,
+    "get_item": _op_get_item,
+    "seller_items": _op_seller_items,
+    "statistic": _op_statistic,
+    "delete": _op_delete,
+}
+
+
+# --- Прогон ------------------------------------------------------------------
+
+class ScenarioStats:
+    """Итоги сценария: завершённые и прерванные прохождения, их длительность."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.completed = 0
+        self.failed = 0
+        self.failed_steps: Counter = Counter()
+        self.duration = LatencyHistogram()
+
+
+class ScenarioResult:
+    """Итоги прогона: задержки по операциям и статистика сценариев."""
+
+    def __init__(self):
+        self.operations: Dict[str, EndpointResult] = {
+            name: EndpointResult(name, ENDPOINTS[name][0]) for name in OPERATIONS}
+        self.scenarios: Dict[str, ScenarioStats] = {}
+        self.skipped: Counter = Counter()
+        self.users = 0
+        self.elapsed = 0.0
+
+    def results(self) -> List[EndpointResult]:
+        results = [r for r in self.operations.values() if r.requests]
+        for result in results:
+            result.elapsed = self.elapsed
+        return results
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "users": self.users,
+            "elapsed": self.elapsed,
+            "operations": [r.to_dict() for r in self.results()],
+            "skipped": dict(self.skipped),
+            "scenarios": {
+                name: {
+                    "completed": s.completed,
+                    "failed": s.failed,
+                    "failed_steps": dict(s.failed_steps),
+                    "duration_percentiles_us": {str(p): v for p, v in s.duration.percentiles().items()},
+                    "duration_histogram": s.duration.to_dict(),
+                }
+                for name, s in self.scenarios.items()
+            },
+        }
+
+
+async def _run_user(ctx: _Context, workload: Workload, user: VirtualUser, result: ScenarioResult,
+                    start_at: float, deadline: float) -> None:
+    await asyncio.sleep(max(0.0, start_at - time.monotonic()))
+    while time.monotonic() < deadline:
+        scenario = workload.choose(user.rng)
+        stats = result.scenarios.setdefault(scenario.name, ScenarioStats(scenario.name))
+        think_time = scenario.think_time or workload.think_time
+        started = time.monotonic()
+        failed_step = None
+        for step_index, operation in enumerate(scenario.walk(user.rng)):
+            if step_index:
+                pause = think_time(user.rng)
+                if time.monotonic() + pause >= deadline:
+                    return
+                await asyncio.sleep(pause)
+            sent = time.perf_counter()
+            op_result = result.operations[operation]
+            try:
+                response = await OPERATIONS[operation](ctx, user)
+            except Exception as e:  # транспорт, таймаут или неожиданное тело ответа (например, не JSON)
+                op_result.errors[type(e).__name__] += 1
+                op_result.histogram.record(time.perf_counter() - sent)
+                failed_step = operation
+                break
+            if response is None:
+                result.skipped[operation] += 1
+                continue
+            op_result.histogram.record(time.perf_counter() - sent)
+            op_result.statuses[response.status_code] += 1
+            if response.status_code >= 400:
+                failed_step = operation
+                break
+        if failed_step is None:
+            stats.completed += 1
+            stats.duration.record(time.monotonic() - started)
+        else:
+            stats.failed += 1
+            stats.failed_steps[failed_step] += 1
+        await asyncio.sleep(min(think_time(user.rng), max(0.0, deadline - time.monotonic())))
+
+
+async def run_workload(base_url: str, workload: Workload, seed: Optional[int] = None,
+                       cleanup: Optional[CleanupQueue] = None,
+                       connections: int = DEFAULT_CONNECTIONS) -> ScenarioResult:
+    """
+    Прогон нагрузки: workload.users пользователей запускаются равномерно
+    за ramp_up секунд и работают до истечения duration.
+    """
+    rng = random.Random(seed)
+    own_cleanup = cleanup is None
+    if own_cleanup:
+        cleanup = CleanupQueue()
+    result = ScenarioResult()
+    result.users = workload.users
+    try:
+        async with AsyncAPIClient(base_url, concurrency=connections) as client:
+            ctx = _Context(client, _Catalog(), cleanup)
+            start = time.monotonic()
+            deadline = start + workload.duration
+            users = [VirtualUser(i, generate_unique_seller_id(), random.Random(rng.random()))
+                     for i in range(workload.users)]
+            step = workload.ramp_up / workload.users if workload.users else 0.0
+            await asyncio.gather(*(_run_user(ctx, workload, user, result, start + i * step, deadline)
+                                   for i, user in enumerate(users)))
+            result.elapsed = time.monotonic() - start
+    finally:
+        if own_cleanup:
+            cleanup.close()
+    return result
+
+
+def format_scenarios(result: ScenarioResult) -> str:
+    """Таблица сценариев: прохождения, прерывания, длительность (с)."""
+    header = f"{'scenario':<20}{'done':>8}{'failed':>8}{'p50':>9}{'p99':>9}  прерваны на шаге"
+    lines = [header, "-" * len(header)]
+    for name, s in sorted(result.scenarios.items()):
+        pct = s.duration.percentiles((50.0, 99.0))
+        steps = " ".join(f"{k}:{v}" for k, v in s.failed_steps.most_common())
+        lines.append(f"{name:<20}{s.completed:>8}{s.failed:>8}{pct[50.0] / 1e6:>9.2f}{pct[99.0] / 1e6:>9.2f}"
+                     f"  {steps}".rstrip())
+    if result.skipped:
+        lines.append("Пропущено операций (не к чему применить): "
+                     + " ".join(f"{k}:{v}" for k, v in sorted(result.skipped.items())))
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Сценарная нагрузка на API объявлений Avito")
+    parser.add_argument("--api-url", default=BASE_URL,
+                        help=f"Базовый URL API или '{LOCAL_TARGET}' для локальной замены")
+    parser.add_argument("--spec", default=None, help="Спецификация нагрузки (JSON или YAML)")
+    parser.add_argument("--users", type=int, default=None, help="Число виртуальных пользователей")
+    parser.add_argument("--duration", type=float, default=None, help="Секунд нагрузки")
+    parser.add_argument("--ramp-up", type=float, default=None, help="Секунд на запуск всех пользователей")
+    parser.add_argument("--connections", type=int, default=DEFAULT_CONNECTIONS,
+                        help="Одновременных запросов (пул соединений)")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--json", dest="json_path", default=None, help="Сохранить результаты в JSON")
+    args = parser.parse_args(argv)
+    use_load_seller_ids()
+
+    if args.spec:
+        workload = Workload.load(args.spec)
+    else:
+        workload = Workload.from_dict(DEFAULT_WORKLOAD)
+    for attr, value in (("users", args.users), ("duration", args.duration), ("ramp_up", args.ramp_up)):
+        if value is not None:
+            setattr(workload, attr, value)
+
+    with cli_targets(args.api_url) as ([base_url], cleanup):
+        print(f"Пользователей {workload.users}, {workload.duration:g} с (разгон {workload.ramp_up:g} с), "
+              f"сценарии: {', '.join(f'{s.name}={s.weight:g}' for s in workload.scenarios)}", flush=True)
+        result = asyncio.run(run_workload(base_url, workload, args.seed, cleanup, args.connections))
+
+    print()
+    print(format_report(result.results()))
+    print()
+    print(format_scenarios(result))
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(result.to_dict(), f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
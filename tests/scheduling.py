@@ -0,0 +1,279 @@
+"""
+Планирование порядка тестов по истории прогонов.
+
+История длительностей и падений каждого теста хранится в кэше pytest
+отдельно для каждого стенда --api-url (scheduling/history-<хэш URL>):
+длительности и падения на локальной замене не смешиваются с боевым стендом.
+Хранится экспоненциальное среднее длительности (setup + call + teardown), доля падений и номер прогона последнего падения.
+
+Порядок запуска (--schedule=history, по умолчанию):
+1. smoke-тесты, от быстрых к медленным;
+2. тесты, падавшие в последних RECENT_RUNS прогонах, — сначала чаще
+   падающие, при равенстве быстрые;
+3. остальные в исходном порядке (сохраняется локальность фикстур модулей).
+--schedule=file оставляет порядок файлов.
+
+Раннее прерывание: если smoke-тест упал из-за транспортной ошибки
+(соединение, таймаут) или упали все smoke-тесты, стенд считается
+недоступным и сессия завершается, не дожидаясь медленных тестов.
+Отключается --no-smoke-abort.
+
+С pytest-xdist и --dist loadgroup тесты распределяются по воркерам
+жадным LPT (longest processing time first): самый долгий тест — на
+наименее загруженный воркер. Разбиение задаётся маркерами xdist_group
+lpt-<N>; тесты со своим xdist_group не трогаются. xdist дописывает группу
+к nodeid ("<nodeid>@lpt-0") — в истории хранится nodeid без неё. Отчёты
+smoke-тестов несут число smoke-тестов прогона, поэтому раннее прерывание
+работает и на контроллере xdist, где тесты не собираются.
+"""
+import hashlib
+import statistics
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import aiohttp
+import pytest
+import requests
+
+HISTORY_KEY = "scheduling/history"
+SCHEDULE_HISTORY = "history"
+SCHEDULE_FILE = "file"
+SCHEDULES = (SCHEDULE_HISTORY, SCHEDULE_FILE)
+SMOKE_MARKER = "smoke"
+
+RECENT_RUNS = 3
+EWMA_ALPHA = 0.3
+FORGET_AFTER = 50
+DEFAULT_DURATION = 0.1
+
+TRANSPORT_ERRORS = (requests.ConnectionError, requests.Timeout,
+                    aiohttp.ClientConnectionError, aiohttp.ServerTimeoutError)
+
+
+def base_nodeid(nodeid: str) -> str:
+    """nodeid без суффикса группы xdist ("<nodeid>@<группа>" при --dist loadgroup)."""
+    base, sep, group = nodeid.rpartition("@")
+    if sep and "::" in base and not any(char in group for char in "[]:/"):
+        return base
+    return nodeid
+
+
+def history_key(target: str) -> str:
+    """Ключ кэша истории для стенда (URL в ключе кэша недопустим — берётся хэш)."""
+    digest = hashlib.sha1(target.rstrip("/").encode("utf-8")).hexdigest()[:12]
+    return f"{HISTORY_KEY}-{digest}"
+
+
+@dataclass
+class TestHistory:
+    """История одного теста."""
+
+    __test__ = False
+
+    duration: float
+    fail_rate: float = 0.0
+    last_failed: Optional[int] = None
+    last_seen: int = 0
+    runs: int = 0
+
+    def update(self, duration: float, failed: bool, run: int) -> None:
+        if self.runs:
+            self.duration += EWMA_ALPHA * (duration - self.duration)
+            self.fail_rate += EWMA_ALPHA * (float(failed) - self.fail_rate)
+        else:
+            self.duration, self.fail_rate = duration, float(failed)
+        if failed:
+            self.last_failed = run
+        self.last_seen = run
+        self.runs += 1
+
+
+class History:
+    """История всех тестов и номер текущего прогона."""
+
+    def __init__(self, tests: Optional[Dict[str, TestHistory]] = None, run: int = 0):
+        self.tests = tests or {}
+        self.run = run
+        self._typical = self._median()
+
+    def _median(self) -> float:
+        if not self.tests:
+            return DEFAULT_DURATION
+        return statistics.median(entry.duration for entry in self.tests.values())
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> "History":
+        if not data:
+            return cls()
+        return cls({nodeid: TestHistory(**entry) for nodeid, entry in data.get("tests", {}).items()},
+                   data.get("run", 0))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"run": self.run, "tests": {nodeid: vars(entry) for nodeid, entry in self.tests.items()}}
+
+    def duration(self, nodeid: str) -> float:
+        """Ожидаемая длительность; для новых тестов — медиана известных."""
+        entry = self.tests.get(nodeid)
+        return entry.duration if entry is not None else self._typical
+
+    def recently_failed(self, nodeid: str) -> bool:
+        entry = self.tests.get(nodeid)
+        return (entry is not None and entry.last_failed is not None
+                and self.run - entry.last_failed < RECENT_RUNS)
+
+    def record(self, results: Dict[str, Tuple[float, bool]]) -> None:
+        """Учёт прогона: nodeid -> (длительность, упал ли). Давно не встречавшиеся тесты забываются."""
+        self.run += 1
+        for nodeid, (duration, failed) in results.items():
+            entry = self.tests.setdefault(nodeid, TestHistory(duration))
+            entry.update(duration, failed, self.run)
+        self.tests = {nodeid: entry for nodeid, entry in self.tests.items()
+                      if self.run - entry.last_seen < FORGET_AFTER}
+        self._typical = self._median()
+
+
+def prioritize(nodeids: Sequence[str], smoke: Set[str], history: History) -> List[str]:
+    """Порядок запуска: smoke, недавние падения, остальные в исходном порядке."""
+    def key(indexed: Tuple[int, str]) -> Tuple[Any, ...]:
+        index, nodeid = indexed
+        if nodeid in smoke:
+            return 0, history.duration(nodeid), index
+        if history.recently_failed(nodeid):
+            return 1, -history.tests[nodeid].fail_rate, history.duration(nodeid), index
+        return 2, index
+
+    return [nodeid for _, nodeid in sorted(enumerate(nodeids), key=key)]
+
+
+def lpt_schedule(durations: Dict[str, float], workers: int) -> List[List[str]]:
+    """
+    Разбиение тестов на workers групп жадным LPT: тесты по убыванию
+    длительности, каждый — в наименее загруженную группу. Время самой
+    загруженной группы не больше 4/3 оптимального.
+    """
+    bins: List[List[str]] = [[] for _ in range(workers)]
+    loads = [0.0] * workers
+    for nodeid in sorted(durations, key=lambda n: (-durations[n], n)):
+        target = min(range(workers), key=lambda i: (loads[i], i))
+        bins[target].append(nodeid)
+        loads[target] += durations[nodeid]
+    return bins
+
+
+def makespan(bins: Iterable[Iterable[str]], durations: Dict[str, float]) -> float:
+    return max((sum(durations[n] for n in group) for group in bins), default=0.0)
+
+
+def transport_error(exc: Optional[BaseException]) -> Optional[BaseException]:
+    """Транспортная ошибка в цепочке исключений (стенд недоступен) или None."""
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        if isinstance(exc, TRANSPORT_ERRORS):
+            return exc
+        seen.add(id(exc))
+        exc = exc.__cause__ or exc.__context__
+    return None
+
+
+class SchedulingPlugin:
+    """Сбор истории, переупорядочивание тестов и раннее прерывание по smoke."""
+
+    def __init__(self, config, schedule: str = SCHEDULE_HISTORY, smoke_abort: bool = True, target: str = ""):
+        self.config = config
+        self.history_key = history_key(target)
+        self.schedule = schedule
+        self.smoke_abort = smoke_abort
+        self.worker_input = getattr(config, "workerinput", None)
+        self.history = History.from_dict(config.cache.get(self.history_key, None))
+        self.session = None
+        self.results: Dict[str, List[Any]] = {}
+        self.smoke: Set[str] = set()
+        self.smoke_outcomes: Dict[str, Optional[bool]] = {}
+        self.promoted = (0, 0)
+        self.abort_reason: Optional[str] = None
+
+    def pytest_sessionstart(self, session) -> None:
+        self.session = session
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_collection_modifyitems(self, config, items) -> None:
+        if self.schedule == SCHEDULE_FILE:
+            return
+        by_id = {item.nodeid: item for item in items}
+        smoke = {nodeid for nodeid, item in by_id.items() if item.get_closest_marker(SMOKE_MARKER)}
+        order = prioritize(list(by_id), smoke, self.history)
+        items[:] = [by_id[nodeid] for nodeid in order]
+        if self.worker_input is not None and config.getoption("dist", None) == "loadgroup":
+            self._assign_lpt_groups(items, self.worker_input["workercount"])
+
+    def pytest_collection_finish(self, session) -> None:
+        """Учитываются только тесты, оставшиеся после -m/-k и отбора других плагинов."""
+        nodeids = [item.nodeid for item in session.items]
+        self.smoke = {item.nodeid for item in session.items if item.get_closest_marker(SMOKE_MARKER)}
+        failed = sum(1 for n in nodeids if n not in self.smoke and self.history.recently_failed(base_nodeid(n)))
+        self.promoted = (len(self.smoke), failed)
+
+    def _assign_lpt_groups(self, items, workers: int) -> None:
+        free = {item.nodeid: item for item in items if not item.get_closest_marker("xdist_group")}
+        durations = {nodeid: self.history.duration(nodeid) for nodeid in free}
+        for index, group in enumerate(lpt_schedule(durations, workers)):
+            for nodeid in group:
+                free[nodeid].add_marker(pytest.mark.xdist_group(f"lpt-{index}"))
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_makereport(self, item, call):
+        outcome = yield
+        if item.nodeid not in self.smoke:
+            return
+        # Атрибуты отчёта сериализуются xdist и доходят до контроллера
+        report = outcome.get_result()
+        report.smoke_count = len(self.smoke)
+        error = transport_error(call.excinfo.value) if call.excinfo is not None else None
+        if error is not None:
+            report.transport_error = type(error).__name__
+
+    def pytest_runtest_logreport(self, report) -> None:
+        nodeid = base_nodeid(report.nodeid)
+        entry = self.results.setdefault(nodeid, [0.0, False, False])
+        entry[0] += report.duration
+        entry[1] = entry[1] or report.failed
+        entry[2] = entry[2] or report.when == "call" or report.failed
+        smoke_count = getattr(report, "smoke_count", None)
+        if smoke_count is None or not self.smoke_abort or self.abort_reason is not None:
+            return
+        error = getattr(report, "transport_error", None)
+        if error is not None:
+            self._abort(f"smoke-тест {nodeid}: {error}")
+        elif report.when == "teardown":
+            self.smoke_outcomes[nodeid] = not entry[1] if entry[2] else None
+            executed = [passed for passed in self.smoke_outcomes.values() if passed is not None]
+            if len(self.smoke_outcomes) == smoke_count and executed and not any(executed):
+                self._abort(f"упали все smoke-тесты ({len(executed)})")
+
+    def _abort(self, reason: str) -> None:
+        self.abort_reason = f"стенд недоступен — {reason}"
+        if self.session is not None:
+            self.session.shouldfail = self.abort_reason
+        # Контроллер xdist проверяет свой флаг, а не session.shouldfail
+        dsession = self.config.pluginmanager.getplugin("dsession")
+        if dsession is not None:
+            dsession.shouldstop = self.abort_reason
+
+    def pytest_sessionfinish(self) -> None:
+        if self.worker_input is not None:
+            return
+        ran = {nodeid: (duration, failed) for nodeid, (duration, failed, executed) in self.results.items()
+               if executed}
+        if ran:
+            self.history.record(ran)
+            self.config.cache.set(self.history_key, self.history.to_dict())
+
+    def pytest_terminal_summary(self, terminalreporter) -> None:
+        smoke, failed = self.promoted
+        if self.schedule == SCHEDULE_HISTORY and (smoke or failed):
+            terminalreporter.write_line(
+                f"Порядок: сначала smoke {smoke}, недавно падавшие {failed}; "
+                f"история прогонов: {self.history.run}, тестов {len(self.history.tests)}"
+            )
+        if self.abort_reason:
+            terminalreporter.write_line(f"Прогон прерван: {self.abort_reason}", red=True)
@@ -0,0 +1,264 @@
+"""
+Валидаторы ответов API, сгенерированные из примеров postman_collection.json.
+
+Примеры ответов коллекции разбираются в схемы (по методу, эндпоинту и статусу):
+"<string>" — строка, "<integer>" — целое, массив — по первому элементу, объект —
+обязательные поля примера; объекты со сгенерированными Postman ключами вида
+"culpa_b92" считаются словарями с произвольными ключами. Схемы компилируются
+в Python-функции без интерпретации схемы во время проверки, поэтому проверка
+дешёвая и годится для каждого ответа в нагрузке. На диске по хэшу коллекции
+кэшируются только схемы (JSON): код функций всегда генерируется в памяти, так
+что изменённый или устаревший файл кэша не может выполнить чужой код.
+"""
+import hashlib
+import json
+import re
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+import requests
+
+from http_timing import endpoint_template
+
+GENERATOR_VERSION = "2"
+DEFAULT_COLLECTION = Path(__file__).resolve().parent.parent / "postman_collection.json"
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent.parent / ".pytest_cache" / "d" / "schemas"
+
+PLACEHOLDER_TYPES = {
+    "<string>": "string",
+    "<integer>": "integer",
+    "<long>": "integer",
+    "<number>": "number",
+    "<boolean>": "boolean",
+}
+GENERATED_KEY_RE = re.compile(r"^[a-z]+_[0-9a-f]{2,3}$")
+
+Validator = Callable[[Any], List[str]]
+
+
+class SchemaValidationError(AssertionError):
+    """Ответ не соответствует схеме из коллекции."""
+
+
+def infer_schema(example: Any) -> Dict[str, Any]:
+    """Схема по значению из примера ответа."""
+    if isinstance(example, str):
+        return {"type": PLACEHOLDER_TYPES.get(example, "string")}
+    if isinstance(example, bool):
+        return {"type": "boolean"}
+    if isinstance(example, int):
+        return {"type": "integer"}
+    if isinstance(example, float):
+        return {"type": "number"}
+    if isinstance(example, list):
+        return {"type": "array", "items": infer_schema(example[0]) if example else None}
+    if isinstance(example, dict):
+        if example and all(GENERATED_KEY_RE.match(key) for key in example):
+            return {"type": "map", "values": infer_schema(next(iter(example.values())))}
+        return {"type": "object", "properties": {k: infer_schema(v) for k, v in example.items()}}
+    return {"type": "any"}
+
+
+def _postman_template(url: Dict[str, Any]) -> str:
+    segments = ["{" + s[1:] + "}" if s.startswith(":") else s for s in url.get("path", [])]
+    return "/" + "/".join(segments)
+
+
+def extract_schemas(collection: Dict[str, Any]) -> Dict[str, Optional[Dict[str, Any]]]:
+    """Схемы ответов коллекции: {"METHOD template status": схема или None для пустого тела}."""
+    schemas: Dict[str, Optional[Dict[str, Any]]] = {}
+
+    def walk(node: Dict[str, Any]) -> None:
+        for child in node.get("item", []):
+            if "request" not in child:
+                walk(child)
+                continue
+            request = child["request"]
+            template = _postman_template(request["url"])
+            for example in child.get("response", []):
+                if example.get("code", 0) < 200:
+                    continue
+                body = (example.get("body") or "").strip()
+                key = f"{request['method']} {template} {example['code']}"
+                schemas[key] = infer_schema(json.loads(body)) if body else None
+
+    walk(collection)
+    return schemas
+
+
+class _CodeGenerator:
+    """Генерация исходного кода функций проверки по схемам."""
+
+    def __init__(self):
+        self.lines: List[str] = []
+        self._counter = 0
+
+    def _var(self) -> str:
+        self._counter += 1
+        return f"v{self._counter}"
+
+    def _emit(self, indent: int, line: str) -> None:
+        self.lines.append("    " * indent + line)
+
+    def _node(self, schema: Optional[Dict[str, Any]], var: str, path: str, indent: int) -> None:
+        kind = schema["type"] if schema else "any"
+        if kind == "any":
+            return
+        if kind == "string":
+            self._emit(indent, f"if not isinstance({var}, str):")
+            self._emit(indent + 1, f"errors.append({path} + ': ожидалась строка, получено ' + repr({var}))")
+        elif kind == "integer":
+            self._emit(indent, f"if not isinstance({var}, int) or isinstance({var}, bool):")
+            self._emit(indent + 1, f"errors.append({path} + ': ожидалось целое, получено ' + repr({var}))")
+        elif kind == "number":
+            self._emit(indent, f"if not isinstance({var}, (int, float)) or isinstance({var}, bool):")
+            self._emit(indent + 1, f"errors.append({path} + ': ожидалось число, получено ' + repr({var}))")
+        elif kind == "boolean":
+            self._emit(indent, f"if not isinstance({var}, bool):")
+            self._emit(indent + 1, f"errors.append({path} + ': ожидалось boolean, получено ' + repr({var}))")
+        elif kind == "array":
+            item = self._var()
+            index = self._var()
+            self._emit(indent, f"if not isinstance({var}, list):")
+            self._emit(indent + 1, f"errors.append({path} + ': ожидался массив')")
+            if schema["items"] is not None:
+                self._emit(indent, "else:")
+                self._emit(indent + 1, f"for {index}, {item} in enumerate({var}):")
+                self._node(schema["items"], item, f"{path} + '[' + str({index}) + ']'", indent + 2)
+                self._emit(indent + 2, "pass")
+        elif kind == "map":
+            key = self._var()
+            value = self._var()
+            self._emit(indent, f"if not isinstance({var}, dict):")
+            self._emit(indent + 1, f"errors.append({path} + ': ожидался объект')")
+            self._emit(indent, "else:")
+            self._emit(indent + 1, f"for {key}, {value} in {var}.items():")
+            self._node(schema["values"], value, f"{path} + '.' + str({key})", indent + 2)
+            self._emit(indent + 2, "pass")
+        elif kind == "object":
+            self._emit(indent, f"if not isinstance({var}, dict):")
+            self._emit(indent + 1, f"errors.append({path} + ': ожидался объект')")
+            self._emit(indent, "else:")
+            for name, prop in schema["properties"].items():
+                child = self._var()
+                child_path = f"{path} + {('.' + name)!r}"
+                self._emit(indent + 1, f"{child} = {var}.get({name!r}, MISSING)")
+                self._emit(indent + 1, f"if {child} is MISSING:")
+                self._emit(indent + 2, f"errors.append({child_path} + ': поле отсутствует')")
+                # Ветка else только с проверками: для неизвестного типа _node ничего не выводит
+                start = len(self.lines)
+                self._emit(indent + 1, "else:")
+                self._node(prop, child, child_path, indent + 2)
+                if len(self.lines) == start + 1:
+                    self.lines.pop()
+            self._emit(indent + 1, "pass")
+
+    def function(self, name: str, schema: Optional[Dict[str, Any]]) -> None:
+        self._emit(0, f"def {name}(data):")
+        self._emit(1, "errors = []")
+        self._node(schema, "data", "'$'", 1)
+        self._emit(1, "return errors")
+        self._emit(0, "")
+
+
+def generate_source(schemas: Dict[str, Optional[Dict[str, Any]]]) -> str:
+    """Исходный код модуля с функциями проверки и таблицей VALIDATORS."""
+    generator = _CodeGenerator()
+    generator.lines.append("MISSING = object()")
+    generator.lines.append("")
+    names = {}
+    for number, key in enumerate(sorted(schemas)):
+        names[key] = f"validate_{number}"
+        generator.function(names[key], schemas[key])
+    generator.lines.append("VALIDATORS = {")
+    for key, name in names.items():
+        generator.lines.append(f"    {key!r}: {name},")
+    generator.lines.append("}")
+    return "\n".join(generator.lines) + "\n"
+
+
+class ResponseValidators:
+    """Набор скомпилированных валидаторов ответов."""
+
+    def __init__(self, validators: Dict[str, Validator]):
+        self.validators = validators
+
+    def __len__(self) -> int:
+        return len(self.validators)
+
+    def errors(self, method: str, url: str, status: int, content: bytes) -> List[str]:
+        """Ошибки соответствия ответа схеме. Недокументированный статус не проверяется."""
+        validator = self.validators.get(f"{method} {endpoint_template(url)} {status}")
+        if validator is None:
+            return []
+        if not content:
+            return []
+        try:
+            data = json.loads(content)
+        except ValueError:
+            return ["$: тело ответа не JSON"]
+        return validator(data)
+
+    def response_errors(self, response: Union[requests.Response, Any]) -> List[str]:
+        """Ошибки для requests.Response или AsyncResponse."""
+        method = response.request.method if getattr(response, "request", None) is not None else response.method
+        return self.errors(method, response.url, response.status_code, response.content)
+
+
+def _collection_hash(collection_path: Path) -> str:
+    digest = hashlib.sha256(collection_path.read_bytes())
+    digest.update(GENERATOR_VERSION.encode())
+    return digest.hexdigest()[:16]
+
+
+def _compile(schemas: Dict[str, Optional[Dict[str, Any]]]) -> Dict[str, Validator]:
+    """Функции проверки из схем; исполняется только код, сгенерированный здесь же."""
+    namespace: Dict[str, Any] = {}
+    exec(compile(generate_source(schemas), "<schemas>", "exec"), namespace)
+    return namespace["VALIDATORS"]
+
+
+def _read_cached(cache_file: Path) -> Optional[Dict[str, Validator]]:
+    """Валидаторы по схемам из кэша; None, если файла нет или он повреждён."""
+    try:
+        schemas = json.loads(cache_file.read_text(encoding="utf-8"))
+        if not isinstance(schemas, dict):
+            return None
+        return _compile(schemas)
+    except (OSError, ValueError, KeyError, TypeError, AttributeError, SyntaxError):
+        return None
+
+
+_loaded: Dict[Tuple[Path, Path], ResponseValidators] = {}
+_loaded_lock = threading.Lock()
+
+
+def load_validators(collection_path: Union[str, Path] = DEFAULT_COLLECTION,
+                    cache_dir: Union[str, Path, None] = DEFAULT_CACHE_DIR) -> ResponseValidators:
+    """
+    Валидаторы для коллекции. Схемы берутся из кэша на диске, если хэш
+    коллекции не изменился; в процессе валидаторы загружаются один раз.
+    """
+    collection_path = Path(collection_path)
+    cache_key = (collection_path.resolve(), Path(cache_dir) if cache_dir else Path())
+    with _loaded_lock:
+        if cache_key in _loaded:
+            return _loaded[cache_key]
+
+        compiled = None
+        cache_file = None
+        if cache_dir is not None:
+            cache_file = Path(cache_dir) / f"schemas-{_collection_hash(collection_path)}.json"
+            compiled = _read_cached(cache_file)
+        if compiled is None:
+            collection = json.loads(collection_path.read_text(encoding="utf-8"))
+            schemas = extract_schemas(collection)
+            compiled = _compile(schemas)
+            if cache_file is not None:
+                cache_file.parent.mkdir(parents=True, exist_ok=True)
+                cache_file.write_text(json.dumps(schemas, ensure_ascii=False), encoding="utf-8")
+
+        validators = ResponseValidators(compiled)
+        _loaded[cache_key] = validators
+        return validators
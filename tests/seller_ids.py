@@ -0,0 +1,148 @@
+"""
+Выделение непересекающихся sellerID для параллельных запусков.
+
+Диапазон [SELLER_ID_MIN, SELLER_ID_MAX] раздаётся блоками. Курсор (high-water mark)
+хранится в файле состояния, общем для всех воркеров pytest и процессов нагрузки,
+и сдвигается под файловой блокировкой. Каждый процесс получает свой блок и
+выдаёт из него ID за O(1) без блокировок; блок закончился — берётся следующий.
+
+Так ID не пересекаются ни между воркерами одного запуска, ни между запусками:
+следующий запуск продолжает с места, где остановился предыдущий. Дойдя до конца
+диапазона, курсор возвращается к началу, только если это разрешает wrap() —
+например, объявления прежних запусков уже удалены; иначе повторная выдача тех же
+ID была бы пересечением с ними, и выбрасывается SellerIdsExhausted. Без wrap
+курсор сбрасывается только явно (reset() или pytest --cache-clear).
+"""
+import json
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator, Optional, Union
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+DEFAULT_BLOCK_SIZE = 64
+DEFAULT_STATE_PATH = Path(__file__).resolve().parent.parent / ".pytest_cache" / "d" / "seller_ids" / "state.json"
+
+
+class SellerIdsExhausted(RuntimeError):
+    """Весь диапазон sellerID израсходован (этим процессом или предыдущими запусками)."""
+
+
+@contextmanager
+def _locked(path: Path) -> Iterator[None]:
+    """Эксклюзивная межпроцессная блокировка файла."""
+    lock_path = path.with_suffix(path.suffix + ".lock")
+    with open(lock_path, "a+b") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        else:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class SellerIdAllocator:
+    """Аллокатор sellerID, раздающий процессам непересекающиеся блоки диапазона."""
+
+    def __init__(self, low: int, high: int, state_path: Union[str, Path, None] = None,
+                 block_size: int = DEFAULT_BLOCK_SIZE, wrap: Optional[Callable[[], bool]] = None):
+        if low > high:
+            raise ValueError(f"Пустой диапазон sellerID: [{low}, {high}]")
+        self.low = low
+        self.high = high
+        self.block_size = max(1, min(block_size, high - low + 1))
+        self.state_path = Path(state_path) if state_path else DEFAULT_STATE_PATH
+        # Вызывается под блокировкой файла состояния, когда диапазон пройден
+        self.wrap = wrap
+        self._lock = threading.Lock()
+        self._next = 0
+        self._end = 0
+        self._leased = 0
+
+    @property
+    def capacity(self) -> int:
+        return self.high - self.low + 1
+
+    def _read_cursor(self) -> int:
+        try:
+            state = json.loads(self.state_path.read_text(encoding="utf-8"))
+            cursor = int(state["cursor"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return self.low
+        # high + 1 — диапазон пройден до конца
+        return cursor if self.low <= cursor <= self.high + 1 else self.low
+
+    def _lease_block(self) -> None:
+        """Резервирование следующего блока в общем файле состояния."""
+        if self._leased >= self.capacity:
+            raise SellerIdsExhausted(
+                f"Диапазон sellerID [{self.low}, {self.high}] израсходован процессом {os.getpid()}"
+            )
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        with _locked(self.state_path):
+            start = self._read_cursor()
+            if start > self.high:
+                if self.wrap is None or not self.wrap():
+                    raise SellerIdsExhausted(
+                        f"Диапазон sellerID [{self.low}, {self.high}] пройден предыдущими запусками "
+                        f"({self.state_path}), а их объявления не удалены; сбросьте курсор: "
+                        f"reset() или pytest --cache-clear"
+                    )
+                start = self.low
+            end = min(start + self.block_size, self.high + 1)
+            tmp_path = self.state_path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps({"cursor": end}), encoding="utf-8")
+            os.replace(tmp_path, self.state_path)
+        self._next, self._end = start, end
+        self._leased += end - start
+
+    def allocate(self) -> int:
+        """Следующий уникальный sellerID."""
+        with self._lock:
+            if self._next >= self._end:
+                self._lease_block()
+            seller_id = self._next
+            self._next += 1
+            return seller_id
+
+    def reset(self) -> None:
+        """Сброс сохранённого курсора к началу диапазона."""
+        with _locked(self.state_path):
+            self.state_path.unlink(missing_ok=True)
+        with self._lock:
+            self._next = self._end = self._leased = 0
+
+
+_default_allocator: Optional[SellerIdAllocator] = None
+_default_lock = threading.Lock()
+
+
+def configure(low: int, high: int, state_path: Union[str, Path, None] = None,
+              block_size: int = DEFAULT_BLOCK_SIZE, wrap: Optional[Callable[[], bool]] = None) -> SellerIdAllocator:
+    """Установка аллокатора процесса по умолчанию."""
+    global _default_allocator
+    with _default_lock:
+        _default_allocator = SellerIdAllocator(low, high, state_path, block_size, wrap)
+        return _default_allocator
+
+
+def default_allocator(low: int, high: int) -> SellerIdAllocator:
+    """Аллокатор процесса по умолчанию (создаётся при первом обращении)."""
+    global _default_allocator
+    with _default_lock:
+        if _default_allocator is None:
+            _default_allocator = SellerIdAllocator(low, high)
+        return _default_allocator
@@ -0,0 +1,261 @@
+"""
+Бенчмарк масштабирования GET /api/1/{sellerID}/item по числу объявлений продавца.
+
+Один продавец последовательно наполняется до каждого размера (по умолчанию
+10, 100, 1000, 10000 объявлений) конкурентным созданием через AsyncAPIClient;
+на каждом размере список запрашивается repeats раз и замеряются задержка,
+размер ответа, время разбора JSON на клиенте и время до первого объявления
+при потоковом чтении (APIClient.iter_seller_items).
+
+По медианам строятся две модели: степенная t = a * n^b (b ≈ 1 — линейный рост,
+b > 1 — сверхлинейный) и линейная t = t0 + k * n с коэффициентом детерминации.
+Для каждого отрезка между соседними размерами считается локальный показатель
+степени: отрезки, где он заметно больше 1, и размеры с ошибками отмечаются
+как точки деградации.
+
+Запуск (из каталога tests):
+    python -m seller_scaling --api-url local
+    python -m seller_scaling --sizes 10 100 1000 --repeats 30 --json scaling.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import requests
+
+from async_client import AsyncAPIClient
+from cleanup import CleanupQueue, cli_targets
+from concurrency import AIMDController
+from conftest import (BASE_URL, LOCAL_TARGET, APIClient, create_valid_item_data, generate_unique_seller_id,
+                      use_load_seller_ids)
+from histogram import LatencyHistogram
+
+DEFAULT_SIZES = (10, 100, 1000, 10000)
+DEFAULT_REPEATS = 20
+SEED_BATCH = 1000
+SEED_MAX_CONCURRENCY = 64
+# Локальный показатель степени, начиная с которого рост считается сверхлинейным
+SUPERLINEAR_EXPONENT = 1.2
+
+
+class SizeResult:
+    """Замеры списка продавца для одного числа объявлений."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.latency = LatencyHistogram()
+        self.decode = LatencyHistogram()
+        self.first_item = LatencyHistogram()
+        self.payload_bytes = 0
+        self.returned = 0
+        self.errors: Dict[str, int] = {}
+
+    def add_error(self, error: str) -> None:
+        self.errors[error] = self.errors.get(error, 0) + 1
+
+    @property
+    def median_ms(self) -> float:
+        return self.latency.value_at_percentile(50.0) / 1000
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "size": self.size,
+            "returned": self.returned,
+            "payload_bytes": self.payload_bytes,
+            "latency_us": {str(p): v for p, v in self.latency.percentiles().items()},
+            "decode_us": {str(p): v for p, v in self.decode.percentiles().items()},
+            "first_item_us": {str(p): v for p, v in self.first_item.percentiles().items()},
+            "errors": self.errors,
+        }
+
+
+def fit_power_law(points: Sequence[Tuple[float, float]]) -> Tuple[float, float]:
+    """Коэффициенты (a, b) модели y = a * x^b методом наименьших квадратов в log-log."""
+    logs = [(math.log(x), math.log(y)) for x, y in points if x > 0 and y > 0]
+    if len(logs) < 2:
+        return (math.exp(logs[0][1]) if logs else 0.0), 0.0
+    slope, intercept, _ = _least_squares(logs)
+    return math.exp(intercept), slope
+
+
+def fit_linear(points: Sequence[Tuple[float, float]]) -> Tuple[float, float, float]:
+    """Коэффициенты (t0, k, r2) модели y = t0 + k * x."""
+    slope, intercept, r2 = _least_squares(points)
+    return intercept, slope, r2
+
+
+def _least_squares(points: Sequence[Tuple[float, float]]) -> Tuple[float, float, float]:
+    n = len(points)
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    sxx = sum((x - mean_x) ** 2 for x, _ in points)
+    sxy = sum((x - mean_x) * (y - mean_y) for x, y in points)
+    syy = sum((y - mean_y) ** 2 for _, y in points)
+    slope = sxy / sxx if sxx else 0.0
+    intercept = mean_y - slope * mean_x
+    r2 = (sxy * sxy) / (sxx * syy) if sxx and syy else 1.0
+    return slope, intercept, r2
+
+
+def local_exponents(points: Sequence[Tuple[float, float]]) -> List[Tuple[int, int, float]]:
+    """Показатель степени на каждом отрезке между соседними размерами."""
+    result = []
+    for (x1, y1), (x2, y2) in zip(points, points[1:]):
+        if x1 > 0 and x2 > x1 and y1 > 0 and y2 > 0:
+            result.append((int(x1), int(x2), math.log(y2 / y1) / math.log(x2 / x1)))
+    return result
+
+
+async def _seed(base_url: str, seller_id: int, count: int, start: int,
+                cleanup: CleanupQueue, controller: AIMDController) -> List[str]:
+    """Создание count объявлений продавца пачками; возвращает ID созданных."""
+    created = []
+    async with AsyncAPIClient(base_url, controller=controller) as client:
+        for offset in range(0, count, SEED_BATCH):
+            batch = [create_valid_item_data(seller_id=seller_id, name=f"Масштаб {start + i}", price=start + i)
+                     for i in range(offset, min(offset + SEED_BATCH, count))]
+            for response in await client.create_items(batch):
+                if response.status_code == 200:
+                    item_id = response.json()["id"]
+                    cleanup.register(base_url, item_id)
+                    created.append(item_id)
+    return created
+
+
+def measure(client: APIClient, seller_id: int, size: int, repeats: int) -> SizeResult:
+    """
+    repeats запросов списка продавца: задержка, размер ответа, разбор JSON;
+    и repeats потоковых запросов до первого объявления.
+    """
+    result = SizeResult(size)
+    for _ in range(repeats):
+        started = time.perf_counter()
+        try:
+            response = client.get_seller_items(seller_id)
+        except requests.RequestException as e:
+            result.add_error(type(e).__name__)
+            continue
+        result.latency.record(time.perf_counter() - started)
+        if response.status_code != 200:
+            result.add_error(str(response.status_code))
+            continue
+        started = time.perf_counter()
+        items = json.loads(response.content)
+        result.decode.record(time.perf_counter() - started)
+        result.payload_bytes = len(response.content)
+        result.returned = len(items)
+
+        started = time.perf_counter()
+        stream = client.iter_seller_items(seller_id, fields=("id",))
+        try:
+            next(stream, None)
+            result.first_item.record(time.perf_counter() - started)
+        except (requests.RequestException, ValueError) as e:
+            result.add_error(f"stream:{type(e).__name__}")
+        finally:
+            stream.close()
+    return result
+
+
+def run(base_url: str, sizes: Sequence[int] = DEFAULT_SIZES, repeats: int = DEFAULT_REPEATS,
+        cleanup: Optional[CleanupQueue] = None, progress=None) -> List[SizeResult]:
+    """Наполнение одного продавца до каждого размера и замер списка."""
+    own_cleanup = cleanup is None
+    if own_cleanup:
+        cleanup = CleanupQueue()
+    client = APIClient(base_url)
+    seller_id = generate_unique_seller_id()
+    results = []
+    item_ids: List[str] = []
+    # Конкурентность наполнения подбирается по ответам сервиса
+    controller = AIMDController(initial=8, maximum=SEED_MAX_CONCURRENCY)
+    try:
+        for size in sorted(sizes):
+            if size > len(item_ids):
+                if progress:
+                    progress(f"Создание объявлений: {len(item_ids)} -> {size}...")
+                item_ids += asyncio.run(_seed(base_url, seller_id, size - len(item_ids), len(item_ids),
+                                                 cleanup, controller))
+            # Замер начинается, когда все созданные объявления видны в списке
+            client.wait_for_seller_items(seller_id, item_ids)
+            if progress:
+                progress(f"Замер списка из {len(item_ids)} объявлений ({repeats} запросов)...")
+            results.append(measure(client, seller_id, len(item_ids), repeats))
+    finally:
+        if own_cleanup:
+            cleanup.close()
+    return results
+
+
+def analyze(results: Sequence[SizeResult]) -> Dict[str, Any]:
+    """Модели роста медианной задержки и точки деградации."""
+    points = [(r.size, r.median_ms) for r in results if len(r.latency)]
+    a, b = fit_power_law(points)
+    t0, k, r2 = fit_linear(points) if len(points) >= 2 else (0.0, 0.0, 1.0)
+    segments = local_exponents(points)
+    return {
+        "power_law": {"a_ms": a, "exponent": b},
+        "linear": {"t0_ms": t0, "ms_per_item": k, "r2": r2},
+        "segments": [{"from": x1, "to": x2, "exponent": e} for x1, x2, e in segments],
+        "superlinear_from": next((x1 for x1, _, e in segments if e > SUPERLINEAR_EXPONENT), None),
+        "errors_from": next((r.size for r in results if r.errors), None),
+    }
+
+
+def format_report(results: Sequence[SizeResult], analysis: Dict[str, Any]) -> str:
+    """Таблица замеров по размерам и итоговые модели."""
+    header = (f"{'items':>8}{'returned':>10}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}"
+              f"{'decode ms':>11}{'first ms':>10}{'KiB':>10}{'us/item':>9}  errors")
+    lines = [header, "-" * len(header)]
+    for r in results:
+        pct = r.latency.percentiles((50.0, 99.0))
+        per_item = pct[50.0] / r.size if r.size else 0.0
+        errors = " ".join(f"{k}:{v}" for k, v in sorted(r.errors.items()))
+        lines.append(
+            f"{r.size:>8}{r.returned:>10}{pct[50.0] / 1000:>10.2f}{pct[99.0] / 1000:>10.2f}"
+            f"{r.latency.max_value / 1000:>10.2f}{r.decode.value_at_percentile(50.0) / 1000:>11.2f}"
+            f"{r.first_item.value_at_percentile(50.0) / 1000:>10.2f}"
+            f"{r.payload_bytes / 1024:>10.1f}{per_item:>9.2f}  {errors}".rstrip()
+        )
+
+    power, linear = analysis["power_law"], analysis["linear"]
+    lines.append("")
+    lines.append(f"Степенная модель: p50 = {power['a_ms']:.3f} мс * n^{power['exponent']:.2f}")
+    lines.append(f"Линейная модель:  p50 = {linear['t0_ms']:.2f} мс + {linear['ms_per_item'] * 1000:.2f} мкс * n "
+                 f"(R² = {linear['r2']:.3f})")
+    for segment in analysis["segments"]:
+        lines.append(f"  {segment['from']:>6} -> {segment['to']:<6} показатель {segment['exponent']:.2f}")
+    if analysis["superlinear_from"] is not None:
+        lines.append(f"Сверхлинейный рост начиная с {analysis['superlinear_from']} объявлений")
+    if analysis["errors_from"] is not None:
+        lines.append(f"Ошибки начиная с {analysis['errors_from']} объявлений")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Масштабирование списка объявлений продавца")
+    parser.add_argument("--api-url", default=BASE_URL,
+                        help=f"Базовый URL API или '{LOCAL_TARGET}' для локальной замены")
+    parser.add_argument("--sizes", nargs="+", type=int, default=list(DEFAULT_SIZES))
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS, help="Запросов на размер")
+    parser.add_argument("--json", dest="json_path", default=None, help="Сохранить результаты в JSON")
+    args = parser.parse_args(argv)
+    use_load_seller_ids()
+
+    with cli_targets(args.api_url) as ([base_url], cleanup):
+        results = run(base_url, args.sizes, args.repeats, cleanup, progress=lambda m: print(m, flush=True))
+
+    analysis = analyze(results)
+    print()
+    print(format_report(results, analysis))
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump({"results": [r.to_dict() for r in results], "analysis": analysis},
+                      f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Тесты пакетных операций через асинхронный клиент AsyncAPIClient.
+"""
+import asyncio
+import socket
+
+import aiohttp
+import pytest
+from aiohttp import web
+from aiohttp import test_utils
+
+from async_client import AsyncAPIClient
+from conftest import create_valid_item_data
+
+
+def _stub_app(state: dict) -> web.Application:
+    """Заглушка API: GET /api/1/item/{id} отвечает эхом id с задержкой и считает одновременные запросы."""
+
+    async def get_item(request: web.Request) -> web.Response:
+        state["active"] += 1
+        state["peak"] = max(state["peak"], state["active"])
+        try:
+            await asyncio.sleep(0.01)
+        finally:
+            state["active"] -= 1
+        return web.json_response([{"id": request.match_info["id"]}])
+
+    app = web.Application()
+    app.router.add_get("/api/1/item/{id}", get_item)
+    return app
+
+
+def _closed_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class TestAsyncClientTransport:
+    """Конкурентность, порядок ответов и ошибки соединения без внешнего сервиса."""
+
+    @pytest.mark.asyncio
+    async def test_concurrency_limit_and_order(self):
+        """Одновременно выполняется не больше concurrency запросов; порядок ответов — как у ID."""
+        state = {"active": 0, "peak": 0}
+        async with test_utils.TestServer(_stub_app(state)) as server:
+            async with AsyncAPIClient(str(server.make_url("")).rstrip("/"), concurrency=3) as client:
+                ids = [f"id{i}" for i in range(20)]
+                responses = await client.get_items(ids)
+
+        assert state["peak"] == 3
+        assert [r.json()[0]["id"] for r in responses] == ids
+        assert all(r.ok and r.elapsed > 0 for r in responses)
+        assert '"id": "id0"' in responses[0].text
+
+    @pytest.mark.asyncio
+    async def test_closed_client_and_connection_errors(self):
+        """Без open() клиент не работает; ошибки соединения в delete_items возвращаются на месте ответа."""
+        client = AsyncAPIClient(f"http://127.0.0.1:{_closed_port()}")
+        with pytest.raises(RuntimeError):
+            await client.get_item("a")
+
+        async with client:
+            results = await client.delete_items(["a", "b"])
+        assert [isinstance(r, aiohttp.ClientError) for r in results] == [True, True]
+
+
+
+class TestAsyncClient:
+    """Пакетное создание и чтение объявлений."""
+
+    @pytest.mark.asyncio(loop_scope="session")
+    @pytest.mark.positive
+    async def test_async_multiple_items_in_seller_list(self, async_api_client: AsyncAPIClient,
+                                                       async_multiple_items: list):
+        """Объявления, созданные пакетом, видны в списке продавца."""
+        if not async_multiple_items:
+            pytest.skip("Не удалось создать тестовые объявления")
+
+        seller_id = async_multiple_items[0]["sellerId"]
+        response = await async_api_client.get_seller_items(seller_id)
+
+        assert response.status_code == 200
+        returned_ids = {item["id"] for item in response.json()}
+        assert {item["id"] for item in async_multiple_items}.issubset(returned_ids)
+
+    @pytest.mark.asyncio(loop_scope="session")
+    @pytest.mark.integration
+    async def test_async_batch_create_get_delete(self, async_api_client: AsyncAPIClient,
+                                                 unique_seller_id: int):
+        """Пакетные create_items / get_items / delete_items сохраняют порядок ответов."""
+        items_data = [
+            create_valid_item_data(seller_id=unique_seller_id, name=f"Пакет {i}", price=100 + i)
+            for i in range(5)
+        ]
+
+        created = await async_api_client.create_items(items_data)
+        assert [r.status_code for r in created] == [200] * 5
+        item_ids = [r.json()["id"] for r in created]
+        assert len(set(item_ids)) == 5
+
+        fetched = await async_api_client.get_items(item_ids)
+        for item_data, response in zip(items_data, fetched):
+            assert response.status_code == 200
+            data = response.json()
+            item = data[0] if isinstance(data, list) and data else data
+            assert item["name"] == item_data["name"]
+            assert item["price"] == item_data["price"]
+
+        deleted = await async_api_client.delete_items(item_ids)
+        assert all(r.status_code == 200 for r in deleted)
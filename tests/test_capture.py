@@ -0,0 +1,82 @@
+"""
+Тесты выборочной записи запросов.
+"""
+from datetime import timedelta
+
+import requests
+
+from capture import KIND_FAILURE, KIND_SAMPLE, KIND_SLOWEST, RequestCapture, format_replay, load_records, replay
+from cleanup import CleanupQueue
+from conftest import APIClient, create_valid_item_data
+from local_server import LocalAPIServer
+
+
+def _exchange(path: str, status: int):
+    request = requests.Request("GET", f"http://stand{path}").prepare()
+    response = requests.Response()
+    response.status_code = status
+    response._content = b'{"status": "ok"}'
+    response._content_consumed = True
+    response.elapsed = timedelta(0)
+    return request, response
+
+
+class TestRequestCapture:
+    """Ограниченный объём записей, самые медленные по эндпоинтам, повтор JSONL."""
+
+    def test_memory_is_bounded(self):
+        """Число записей не растёт с числом запросов; самые медленные не теряются."""
+        capture = RequestCapture(failures_cap=5, top_k=3, reservoir_size=20, seed=1)
+        for i in range(5000):
+            status = 500 if i % 100 == 0 else 200
+            path = f"/api/1/item/id{i}" if i % 2 else f"/api/1/statistic/id{i}"
+            capture.observe(*_exchange(path, status), started_at=0.0, elapsed=(i * 7919 % 5000) / 1000)
+
+        assert capture.seen == 5000 and capture.failures_seen == 50
+        assert len(capture.failures) == 5
+        assert len(capture.sample) == 20 and capture.sample_seen == 4950
+        item = sorted(ms for ms, _, _ in capture.slowest["/api/1/item/{id}"])
+        expected = sorted(i * 7919 % 5000 for i in range(1, 5000, 2))[-3:]
+        assert item == [float(ms) for ms in expected]
+        # Выборка равномерна по всему прогону, а не только его начало
+        assert max(r["seq"] for r in capture.sample) > 2500
+        assert len(capture.records()) <= 5 + 3 * 2 + 20
+
+    def test_records_are_deduplicated(self):
+        """Запрос из нескольких групп выгружается один раз с приоритетной группой."""
+        capture = RequestCapture(top_k=1, reservoir_size=10)
+        capture.observe(*_exchange("/api/1/item/a", 404), started_at=0.0, elapsed=1.0)
+        capture.observe(*_exchange("/api/1/item/b", 200), started_at=0.0, elapsed=0.5)
+
+        kinds = [(r["kind"], r["status"]) for r in capture.records()]
+        assert kinds == [(KIND_FAILURE, 404), (KIND_SAMPLE, 200)]
+        assert capture.records()[0]["response"]["body"] == '{"status": "ok"}'
+
+    def test_dump_and_replay(self, tmp_path, local_api_server: LocalAPIServer):
+        """Записанный JSONL повторяется против другого стенда с теми же заголовками и телами."""
+        capture = RequestCapture(body_limit=256)
+        client = APIClient(local_api_server.base_url)
+        capture.install(client.session)
+        client.create_item(create_valid_item_data(name="Запись"))
+        client.create_item(create_valid_item_data(name="x" * 300))
+        client.get_item("missing")
+
+        path = tmp_path / "capture.jsonl"
+        assert capture.dump(str(path)) == 3
+        records = load_records(str(path))
+        assert {r["kind"] for r in records} == {KIND_FAILURE, KIND_SLOWEST}
+        assert records[0]["status"] == 400 and records[0]["path"] == "/api/1/item/missing"
+        assert records[0]["request"]["headers"]["Accept"] == "application/json"
+
+        with LocalAPIServer() as other:
+            cleanup = CleanupQueue()
+            results = replay(records, other.base_url, cleanup=cleanup)
+            # Созданное повтором объявление удаляется, как после нагрузки
+            assert cleanup.pending_count == 1
+            cleanup.close()
+            assert cleanup.deleted == 1 and len(other.service) == 0
+        assert [r.record["seq"] for r in results] == sorted(r["seq"] for r in records)
+        by_status = {r.record["status"]: r for r in results if not r.skipped}
+        assert [r.record["request"]["body_size"] > 256 for r in results if r.skipped] == [True]
+        assert by_status[400].status == 400 and by_status[200].status == 200
+        assert "код ответа изменился у 0" in format_replay(results)
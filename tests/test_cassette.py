@@ -0,0 +1,53 @@
+"""
+Тесты записи и воспроизведения трафика APIClient.
+"""
+import pytest
+from cassette import MODE_RECORD, MODE_REPLAY, CassetteMiss, CassettePlugin
+from conftest import APIClient, create_valid_item_data, generate_unique_seller_id
+from local_server import LocalAPIServer
+
+
+def _scenario(client: APIClient, seller_id: int) -> str:
+    """Создание объявления и чтение его и списка продавца."""
+    created = client.create_item(create_valid_item_data(seller_id=seller_id))
+    assert created.status_code == 200
+    assert created.json()["sellerId"] == seller_id
+    item_id = created.json()["id"]
+
+    item = client.get_item(item_id).json()[0]
+    assert item["sellerId"] == seller_id
+    assert [i["id"] for i in client.get_seller_items(seller_id).json()] == [item_id]
+    return item_id
+
+
+class TestCassette:
+    """Воспроизведение без сети с новыми sellerID."""
+
+    def test_replay_without_server(self, tmp_path):
+        """Записанный сценарий воспроизводится после остановки сервера с другим sellerID."""
+        path = tmp_path / "api.jsonl"
+
+        recorder = CassettePlugin(path, MODE_RECORD)
+        with LocalAPIServer() as server:
+            client = APIClient(server.base_url)
+            recorder.install(client.session)
+            recorder.cassette.start_test("scenario")
+            recorded_id = _scenario(client, generate_unique_seller_id())
+        recorder.cassette.save()
+
+        player = CassettePlugin(path, MODE_REPLAY)
+        client = APIClient(server.base_url)
+        player.install(client.session)
+        player.cassette.start_test("scenario")
+        assert _scenario(client, generate_unique_seller_id()) == recorded_id
+
+    def test_unknown_request_is_reported(self, tmp_path):
+        """Запрос, которого нет в кассете, завершается CassetteMiss."""
+        player = CassettePlugin(tmp_path / "empty.jsonl", MODE_REPLAY)
+        client = APIClient("http://127.0.0.1:9")
+        player.install(client.session)
+        player.cassette.start_test("missing")
+
+        with pytest.raises(CassetteMiss):
+            client.get_item("nonexistent-id-12345")
+        assert player.cassette.misses
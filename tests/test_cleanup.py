@@ -0,0 +1,81 @@
+"""
+Тесты очереди фонового удаления объявлений и журнала очистки.
+"""
+import pytest
+import requests
+
+from cleanup import CleanupJournal, CleanupQueue, cli_targets
+from conftest import APIClient, create_valid_item_data
+from local_server import LOCAL_TARGET, LocalAPIServer
+
+
+class TestCleanupQueue:
+    """Фоновое удаление и восстановление после падения."""
+
+    def test_created_items_deleted_on_close(self, local_api_server: LocalAPIServer, tmp_path):
+        """Все созданные через клиент объявления удаляются, журнал после этого убирается."""
+        queue = CleanupQueue(CleanupJournal(tmp_path))
+        client = APIClient(local_api_server.base_url, cleanup=queue)
+        item_ids = [client.create_item(create_valid_item_data()).json()["id"] for _ in range(5)]
+
+        queue.close()
+
+        assert queue.deleted == 5 and queue.failed == 0
+        assert all(client.get_item(item_id).status_code == 404 for item_id in item_ids)
+        assert not list(tmp_path.glob("journal-*.jsonl"))
+
+    def test_explicitly_deleted_item_not_deleted_again(self, local_api_server: LocalAPIServer, tmp_path):
+        """Объявление, удалённое самим тестом, не удаляется повторно."""
+        queue = CleanupQueue(CleanupJournal(tmp_path))
+        client = APIClient(local_api_server.base_url, cleanup=queue)
+        item_id = client.create_item(create_valid_item_data()).json()["id"]
+
+        assert client.delete_item(item_id).status_code == 200
+        assert queue.pending_count == 0
+
+    def test_journal_replayed_after_crash(self, local_api_server: LocalAPIServer, tmp_path):
+        """Объявления из журнала упавшего процесса удаляются при следующем запуске."""
+        crashed_journal = CleanupJournal(tmp_path)
+        crashed_client = APIClient(local_api_server.base_url, cleanup=CleanupQueue(crashed_journal))
+        item_ids = [crashed_client.create_item(create_valid_item_data()).json()["id"] for _ in range(3)]
+        # "Падение": процесс не успел удалить объявления, блокировка журнала освобождена
+        crashed_journal._file.close()
+
+        next_run = CleanupQueue(CleanupJournal(tmp_path))
+        assert next_run.replay() == 3
+        next_run.close()
+
+        client = APIClient(local_api_server.base_url)
+        assert all(client.get_item(item_id).status_code == 404 for item_id in item_ids)
+        assert not list(tmp_path.glob("journal-*.jsonl"))
+
+    def test_orphan_claimed_once(self, local_api_server: LocalAPIServer, tmp_path):
+        """Пока один запуск переносит журнал упавшего процесса, другой его не видит."""
+        crashed_journal = CleanupJournal(tmp_path)
+        crashed_client = APIClient(local_api_server.base_url, cleanup=CleanupQueue(crashed_journal))
+        crashed_client.create_item(create_valid_item_data())
+        crashed_journal._file.close()
+
+        first, second = CleanupJournal(tmp_path), CleanupJournal(tmp_path)
+        claims = first.claim_orphans()
+        path, pending = next(claims)
+        assert path == crashed_journal.path and len(pending) == 1
+        assert list(second.claim_orphans()) == []
+
+        assert list(claims) == []
+        assert not path.exists()
+        assert list(second.claim_orphans()) == []
+
+    def test_cli_targets(self, local_api_server: LocalAPIServer, tmp_path, capsys):
+        """Локальная замена запускается и останавливается сама, без журнала; созданное удаляется."""
+        with cli_targets(LOCAL_TARGET, local_api_server.base_url + "/", journal_dir=tmp_path) as (urls, cleanup):
+            assert urls[1] == local_api_server.base_url
+            assert cleanup.journal is not None
+        with cli_targets(LOCAL_TARGET) as ([base_url], cleanup):
+            APIClient(base_url, cleanup=cleanup).create_item(create_valid_item_data())
+            assert cleanup.journal is None
+
+        assert "Удаление созданных объявлений (1)" in capsys.readouterr().out
+        assert cleanup.deleted == 1
+        with pytest.raises(requests.ConnectionError):
+            requests.get(base_url, timeout=1)
@@ -0,0 +1,121 @@
+"""
+Тесты адаптивной конкурентности и ограничения частоты.
+"""
+import math
+import threading
+import time
+
+import pytest
+
+from async_client import AsyncAPIClient
+from concurrency import AIMDController, ConcurrencyLimiter, TokenBucket
+from conftest import create_valid_item_data
+from local_server import LocalAPIServer
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _window(controller: AIMDController, clock: _FakeClock, status: int = 200, latency: float = 0.01) -> None:
+    """Окно результатов размером с текущий предел."""
+    for _ in range(controller.limit):
+        started = clock.now
+        clock.now += latency
+        controller.record(started, status)
+
+
+class TestAIMDController:
+    """Рост и снижение предела конкурентности."""
+
+    def test_slow_start_then_additive_increase(self):
+        """Без перегрузки предел удваивается, после первого снижения растёт на 1."""
+        clock = _FakeClock()
+        controller = AIMDController(initial=2, maximum=100, clock=clock)
+
+        limits = []
+        for _ in range(3):
+            _window(controller, clock)
+            limits.append(controller.limit)
+        _window(controller, clock, status=503)
+        limits.append(controller.limit)
+        for _ in range(2):
+            _window(controller, clock)
+            limits.append(controller.limit)
+
+        assert limits == [4, 8, 16, 8, 9, 10]
+        assert (controller.peak_limit, controller.decreases) == (16, 1)
+
+    def test_latency_target_and_stale_results(self):
+        """Медленное окно снижает предел; запросы, начатые до снижения, не учитываются."""
+        clock = _FakeClock()
+        controller = AIMDController(initial=8, latency_target=0.5, clock=clock)
+        stale_start = clock.now
+
+        _window(controller, clock, latency=1.0)
+        assert controller.limit == 4
+        for _ in range(10):
+            controller.record(stale_start, 429)
+        assert controller.limit == 4
+
+    def test_limiter_bounds_threads(self):
+        """Одновременно выполняется не больше limit потоков."""
+        limiter = ConcurrencyLimiter(AIMDController(initial=3, maximum=3))
+        peak = []
+        lock = threading.Lock()
+
+        def worker():
+            with limiter:
+                with lock:
+                    peak.append(limiter.in_flight)
+                time.sleep(0.01)
+
+        threads = [threading.Thread(target=worker) for _ in range(12)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert max(peak) == 3
+
+
+class TestTokenBucket:
+    """Слоты фиксированной частоты."""
+
+    def test_burst_limits_catch_up(self):
+        """После простоя наверстывается не больше burst слотов."""
+        clock = _FakeClock()
+        bucket = TokenBucket(rate=10, burst=3, clock=clock)
+        clock.now = 5.0
+
+        slots = [bucket.reserve() for _ in range(5)]
+
+        assert slots == pytest.approx([4.8, 4.9, 5.0, 5.1, 5.2])
+
+    def test_open_model_keeps_schedule(self):
+        """С burst=inf слоты идут строго по расписанию от start."""
+        clock = _FakeClock()
+        bucket = TokenBucket(rate=4, burst=math.inf, start=1.0, clock=clock)
+        clock.now = 10.0
+
+        assert [bucket.reserve() for _ in range(3)] == [1.0, 1.25, 1.5]
+
+
+class TestAdaptiveAsyncClient:
+    """AsyncAPIClient с контроллером на локальной замене API."""
+
+    @pytest.mark.asyncio
+    async def test_batch_with_controller(self, local_api_server: LocalAPIServer):
+        """Пакет выполняется полностью, предел растёт при здоровых ответах."""
+        controller = AIMDController(initial=2, maximum=32)
+        async with AsyncAPIClient(local_api_server.base_url, controller=controller,
+                                  rate_limiter=TokenBucket(rate=2000, burst=50)) as client:
+            responses = await client.create_items([create_valid_item_data() for _ in range(60)])
+            await client.delete_items([r.json()["id"] for r in responses])
+
+        assert all(r.status_code == 200 for r in responses)
+        assert controller.limit > 2
@@ -0,0 +1,94 @@
+"""
+Тесты массовой проверки согласованности.
+"""
+import threading
+
+import pytest
+
+from consistency import (MISMATCH, OK, VIEW_ITEM, VIEW_SELLER, VIEW_STATISTIC, Observation, ViewStats,
+                         check_consistency, item_mismatch)
+from local_server import LocalAPIServer, LocalItemService
+
+
+class _StaleStatisticService(LocalItemService):
+    """Статистика каждого пятого объявления на первые три чтения отдаётся нулевой (гонка записи)."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._created = 0
+        self._stale = {}
+        self._counter_lock = threading.Lock()
+
+    def create_item(self, data):
+        item = super().create_item(data)
+        with self._counter_lock:
+            self._created += 1
+            if self._created % 5 == 0:
+                self._stale[item["id"]] = 3
+        return item
+
+    def get_statistic(self, item_id):
+        with self._counter_lock:
+            left = self._stale.get(item_id, 0)
+            if left:
+                self._stale[item_id] = left - 1
+        if left:
+            return {"likes": 0, "viewCount": 0, "contacts": 0}
+        return super().get_statistic(item_id)
+
+
+class TestConsistency:
+    """Сравнение отправленного и прочитанного, учёт расхождений."""
+
+    def test_item_mismatch_fields(self):
+        """Сравниваются все поля; sellerId в ответе соответствует sellerID в запросе (BUG-004)."""
+        body = {"sellerID": 111111, "name": "x", "price": 1, "likes": 2, "viewCount": 3, "contacts": 4}
+        item = {"sellerId": 111111, "name": "x", "price": 1,
+                "statistics": {"likes": 2, "viewCount": 3, "contacts": 4}}
+
+        assert item_mismatch(body, item) == []
+        assert item_mismatch(body, {**item, "price": 2, "statistics": {**item["statistics"], "likes": 0}}) == [
+            "price", "statistics.likes"]
+        # Реестр не хранит name — сравниваются только переданные поля
+        registered = {key: value for key, value in body.items() if key != "name"}
+        assert item_mismatch(registered, {**item, "name": "другое"}) == []
+        assert item_mismatch(registered, {**item, "sellerID": 111111, "statistics": None}) == ["statistics"]
+
+    def test_view_stats(self):
+        """Неверные данные, сменившиеся верными, — отдельная категория расхождений."""
+        stats = ViewStats()
+        stats.add(Observation(OK, 0.001))
+        stats.add(Observation(OK, 0.2, attempts=4, saw_wrong=True, fields=["likes"]))
+        stats.add(Observation(MISMATCH, attempts=9, saw_wrong=True, fields=["price"]))
+
+        assert (stats.immediate, stats.converged, stats.transient, stats.mismatched) == (1, 1, 1, 1)
+        assert stats.mismatch_rate == pytest.approx(2 / 3)
+        assert stats.fields == {"likes": 1, "price": 1}
+
+    @pytest.mark.asyncio
+    async def test_consistent_service(self):
+        """Локальная замена с задержкой видимости: всё сходится, задержка измерена."""
+        with LocalAPIServer(service=LocalItemService(visibility_delay=0.05)) as server:
+            report = await check_consistency(server.base_url, items=300, seed=1, per_seller=30, timeout=5)
+            remaining = len(server.service)
+
+        assert report.created == 300 and not report.failed
+        for view in (VIEW_STATISTIC, VIEW_ITEM, VIEW_SELLER):
+            stats = report.views[view]
+            assert stats.checked == 300
+            assert stats.lag.value_at_percentile(50) / 1e6 >= 0.04
+        assert report.views[VIEW_ITEM].converged > 0
+        assert remaining == 0
+
+    @pytest.mark.asyncio
+    async def test_detects_stale_statistics(self):
+        """Устаревшая статистика видна как временное расхождение только в своём представлении."""
+        with LocalAPIServer(service=_StaleStatisticService()) as server:
+            report = await check_consistency(server.base_url, items=200, seed=2, per_seller=20, timeout=5)
+
+        statistic = report.views[VIEW_STATISTIC]
+        assert report.failed
+        assert statistic.transient == 40
+        assert statistic.mismatch_rate == pytest.approx(0.2)
+        assert set(statistic.fields) == {"likes", "viewCount", "contacts"}
+        assert report.views[VIEW_ITEM].inconsistent == 0
@@ -31,7 +31,7 @@ class TestCreateItemPositive:
         # Assert
         assert response.status_code == 200, f"Ожидался статус 200, получен {response.status_code}. Ответ: {response.text}"
         
-        data = response.json()
+        data = api_client.validate(response)
         assert "id" in data and data["id"], "Поле 'id' отсутствует или пустое"
         assert data.get("sellerId") == unique_seller_id, f"sellerId не совпадает"
         assert data.get("name") == "Тестовый товар", "name не совпадает"
@@ -0,0 +1,75 @@
+"""
+Тесты многопроцессного генератора нагрузки.
+"""
+import json
+import random
+
+import pytest
+
+import seller_ids
+from conftest import LOAD_SELLER_ID_MIN, LOAD_SELLER_IDS_STATE, SELLER_ID_MAX
+from distributed_load import WorkloadSpec, decode_snapshot, encode_snapshot, run
+from histogram import LatencyHistogram
+from loadgen import EndpointResult
+from local_server import LocalAPIServer
+
+
+def _shared_cursor() -> int:
+    try:
+        return json.loads(LOAD_SELLER_IDS_STATE.read_text(encoding="utf-8"))["cursor"]
+    except FileNotFoundError:
+        return LOAD_SELLER_ID_MIN
+
+
+class TestDistributedLoad:
+    """Объединение снимков воркеров и прогон на локальной замене."""
+
+    def test_snapshots_merge_losslessly(self):
+        """Объединение снимков воркеров даёт те же перцентили, что одна общая гистограмма."""
+        rng = random.Random(3)
+        reference = LatencyHistogram()
+        merged = EndpointResult("get_item", "GET /api/1/item/{id}")
+        for _ in range(4):
+            part = EndpointResult("get_item", "GET /api/1/item/{id}")
+            for _ in range(500):
+                latency = rng.lognormvariate(-5, 1)
+                part.histogram.record(latency)
+                reference.record(latency)
+                part.statuses[200] += 1
+            part.errors["ReadTimeout"] += 1
+            merged.merge(decode_snapshot(encode_snapshot({"get_item": part}))["get_item"])
+
+        assert merged.histogram.percentiles() == reference.percentiles()
+        assert merged.histogram.total_sum == reference.total_sum
+        assert merged.statuses[200] == 2000
+        assert merged.errors["ReadTimeout"] == 4
+
+    def test_spec_validation(self):
+        """Неизвестный эндпоинт в смеси — ValueError; спецификация переживает сериализацию."""
+        with pytest.raises(ValueError, match="unknown"):
+            WorkloadSpec(mix={"unknown": 1})
+        spec = WorkloadSpec(mix={"get_item": 3, "create": 1}, duration=2, rate=100)
+        assert WorkloadSpec.from_dict(spec.to_dict()).to_dict() == spec.to_dict()
+        # rate — суммарная частота: run() делит её между воркерами, спецификация не меняется
+        assert spec.for_worker(4).rate == 25 and spec.rate == 100
+        assert WorkloadSpec().for_worker(4).rate is None
+
+    def test_run_on_local_server(self):
+        """Все воркеры дают запросы, интервалы выводятся по мере поступления, данные удалены."""
+        lines = []
+        spec = WorkloadSpec(mix={"get_item": 3, "create": 1}, duration=1.0, concurrency=2, interval=0.5)
+        cursor = _shared_cursor()
+        with LocalAPIServer() as server:
+            result = run(server.base_url, spec, workers=2, progress=lines.append)
+            remaining = len(server.service)
+
+        # Воркеры берут блоки sellerID из общего курсора нагрузки (он может пройти круг)
+        leased = (_shared_cursor() - cursor) % (SELLER_ID_MAX - LOAD_SELLER_ID_MIN + 1)
+        assert leased >= 2 * seller_ids.DEFAULT_BLOCK_SIZE
+
+        assert result.errors == {}
+        assert set(result.worker_requests) == {0, 1}
+        assert result.requests == sum(result.worker_requests.values()) > 0
+        assert result.combined().failed == 0
+        assert len(lines) >= 2
+        assert remaining == 0
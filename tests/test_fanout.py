@@ -0,0 +1,99 @@
+"""
+Тесты сравнения стендов.
+"""
+from pathlib import Path
+
+from cassette import Normalizer
+from conftest import LOCAL_TARGET
+from fanout import (DEFAULT_STEPS, Target, format_suite, junit_outcomes, normalize, parse_target, run_steps,
+                    run_suite, structural_diff)
+from local_server import LocalAPIServer, LocalItemService
+
+
+class _LenientPriceService(LocalItemService):
+    """Стенд, где отрицательная цена принимается как 0 (расхождение с эталоном)."""
+
+    def create_item(self, data):
+        if isinstance(data, dict) and isinstance(data.get("price"), int) and data["price"] < 0:
+            data = {**data, "price": 0}
+        return super().create_item(data)
+
+
+class TestFanout:
+    """Нормализация ответов, структурное сравнение и прогон на двух стендах."""
+
+    def test_normalization_hides_dynamic_values(self):
+        """ID, sellerID, createdAt и регистр sellerId не считаются расхождением."""
+        first, second = Normalizer(), Normalizer()
+        left = normalize(first, 200, b'[{"id": "a1", "sellerId": 111111, "createdAt": "2024", "name": "x"}]')
+        right = normalize(second, 200, b'[{"id": "b2", "sellerID": 222222, "createdAt": "2025", "name": "x"}]')
+        assert left == right
+
+        message = normalize(first, 404, b'{"result": {"message": "item a1 not found"}}')
+        assert message["body"]["result"]["message"] == "item <item:0> not found"
+
+    def test_structural_diff_paths(self):
+        """Расхождения указывают путь: поле, тип, длина списка, значение."""
+        diffs = structural_diff({"status": 400, "body": {"a": [1, 2], "b": "x"}},
+                                {"status": 200, "body": {"a": [1], "b": 1, "c": None}})
+
+        assert diffs == ["$.body.a: длина 2 != 1", "$.body.b: \"x\" != 1", "$.body.c: лишнее поле null",
+                         "$.status: 400 != 200"]
+
+    def test_identical_stands_do_not_diverge(self):
+        """Два одинаковых стенда совпадают на всём сценарии, а отличающийся — только на нужном шаге."""
+        with LocalAPIServer() as reference, LocalAPIServer() as same, \
+                LocalAPIServer(service=_LenientPriceService()) as drifted:
+            targets = [Target("reference", reference.base_url), Target("same", same.base_url),
+                       Target("drifted", drifted.base_url)]
+            results = run_steps(targets, DEFAULT_STEPS)
+
+        assert all(r.responses["reference"]["status"] is not None for r in results)
+        assert not any(r.diffs["same"] for r in results)
+        assert [r.step.name for r in results if r.diffs["drifted"]] == ["create_negative_price"]
+        assert "$.status: 400 != 200" in {d for r in results for d in r.diffs["drifted"]}
+        assert all(t.latency for t in targets)
+
+
+class TestFanoutSuite:
+    """Разбор --target, итоги JUnit и параллельный pytest на нескольких стендах."""
+
+    def test_parse_target(self):
+        """Имя берётся из 'имя=URL' или из хоста; завершающий слэш отбрасывается."""
+        assert parse_target(LOCAL_TARGET) == (LOCAL_TARGET, LOCAL_TARGET)
+        assert parse_target("remote=https://qa-internship.avito.com/") == ("remote", "https://qa-internship.avito.com")
+        assert parse_target("https://stand-a:8080/") == ("stand-a", "https://stand-a:8080")
+
+    def test_junit_outcomes_and_format(self, tmp_path):
+        """Исходы из JUnit XML; в сводке — счётчики по стендам и тесты с разными исходами."""
+        junit = tmp_path / "a.xml"
+        junit.write_text(
+            '<testsuites><testsuite>'
+            '<testcase classname="tests.test_x.TestX" name="test_ok" time="0.5"/>'
+            '<testcase classname="tests.test_x.TestX" name="test_bad" time="1.5"><failure message="x"/></testcase>'
+            '<testcase classname="tests.test_x.TestX" name="test_skip" time="0"><skipped/></testcase>'
+            '</testsuite></testsuites>', encoding="utf-8")
+        outcomes = junit_outcomes(junit)
+
+        assert outcomes == {"tests.test_x.TestX::test_ok": ("passed", 0.5),
+                            "tests.test_x.TestX::test_bad": ("failed", 1.5),
+                            "tests.test_x.TestX::test_skip": ("skipped", 0.0)}
+        other = {**outcomes, "tests.test_x.TestX::test_bad": ("passed", 0.2)}
+        del other["tests.test_x.TestX::test_skip"]
+        report, divergent = format_suite({"a": outcomes, "b": other})
+        assert divergent == 2
+        assert "  tests.test_x.TestX::test_bad: a=failed, b=passed" in report.splitlines()
+        assert "  tests.test_x.TestX::test_skip: a=skipped, b=нет" in report.splitlines()
+        assert format_suite({"a": outcomes, "b": outcomes})[1] == 0
+
+    def test_run_suite(self, tmp_path):
+        """pytest запускается на каждом стенде со своим кэшем; итоги собираются по стендам."""
+        selected = f"tests/{Path(__file__).name}::TestFanoutSuite::test_parse_target"
+        outcomes = run_suite({"first": LOCAL_TARGET, "second": LOCAL_TARGET}, [selected], workdir=str(tmp_path))
+
+        for name in ("first", "second"):
+            log = (tmp_path / f"{name}.log").read_text(encoding="utf-8")
+            assert {test: outcome for test, (outcome, _) in outcomes[name].items()} == {
+                "tests.test_fanout.TestFanoutSuite::test_parse_target": "passed"}, log
+            assert (tmp_path / f"cache-{name}").is_dir()
+        assert format_suite(outcomes)[1] == 0
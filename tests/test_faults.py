@@ -0,0 +1,101 @@
+"""
+Тесты внедрения сбоев в транспорт APIClient.
+"""
+import time
+
+import pytest
+import requests
+
+from conftest import APIClient, create_valid_item_data
+from faults import RESET_AFTER, FaultInjector, FaultRule, fixed
+from local_server import LocalAPIServer
+from polling import LagStats
+
+
+@pytest.fixture
+def local_client():
+    with LocalAPIServer() as server:
+        yield server, APIClient(server.base_url, poll_timeout=5.0, lag_stats=LagStats(), timeout=0.2)
+
+
+class TestFaultInjection:
+    """Сбои по правилам и поведение клиента при них."""
+
+    def test_latency_beyond_timeout(self, local_client):
+        """Задержка дольше таймаута чтения — ReadTimeout по истечении таймаута, а не задержки."""
+        server, client = local_client
+        item_id = client.create_item(create_valid_item_data(seller_id=111111)).json()["id"]
+
+        with FaultInjector([FaultRule("GET /api/1/item/{id}", latency=fixed(5.0))]) as injector:
+            injector.install(client.session)
+            started = time.monotonic()
+            with pytest.raises(requests.ReadTimeout):
+                client.get_item(item_id)
+            assert time.monotonic() - started < 1.0
+
+            stalled = injector.add(FaultRule("GET /api/1/{sellerID}/item", timeout=True))
+            with pytest.raises(requests.ReadTimeout):
+                client.get_seller_items(111111)
+            assert stalled.fired == 1
+
+        assert client.get_item(item_id).status_code == 200
+
+    def test_reset_after_send_loses_response(self, local_client):
+        """Обрыв после отправки: клиент видит ошибку, но объявление создано."""
+        server, client = local_client
+        with FaultInjector([FaultRule("POST /api/1/item", reset=RESET_AFTER)]) as injector:
+            injector.install(client.session)
+            with pytest.raises(requests.ConnectionError):
+                client.create_item(create_valid_item_data(seller_id=222222))
+
+        assert len(client.get_seller_items(222222).json()) == 1
+
+    def test_truncated_and_slow_body(self, local_client):
+        """Неполное тело — ChunkedEncodingError (в том числе в потоковом чтении), медленное — таймаут."""
+        server, client = local_client
+        seller_id = 333333
+        for _ in range(3):
+            client.create_item(create_valid_item_data(seller_id=seller_id))
+
+        with FaultInjector([FaultRule("/api/1/{sellerID}/item", truncate=0.5, times=2)]) as injector:
+            injector.install(client.session)
+            with pytest.raises(requests.exceptions.ChunkedEncodingError):
+                client.get_seller_items(seller_id)
+            with pytest.raises(requests.exceptions.ChunkedEncodingError):
+                list(client.iter_seller_items(seller_id))
+            assert len(client.get_seller_items(seller_id).json()) == 3
+
+            injector.add(FaultRule("/api/1/{sellerID}/item", slow_body=10))
+            with pytest.raises(requests.ConnectionError):
+                client.get_seller_items(seller_id)
+
+    def test_probability_is_reproducible(self, local_client):
+        """Одно зерно — одна и та же последовательность сбоев."""
+        server, client = local_client
+        item_id = client.create_item(create_valid_item_data(seller_id=444444)).json()["id"]
+
+        def statuses(seed):
+            with FaultInjector([FaultRule(status=503, probability=0.5)], seed=seed) as injector:
+                injector.install(client.session)
+                return [client.get_item(item_id).status_code for _ in range(20)]
+
+        first = statuses(7)
+        assert first == statuses(7)
+        assert set(first) == {200, 503}
+
+
+@pytest.mark.faults(FaultRule("GET /api/1/item/{id}", status=503, burst=2, times=1))
+def test_marker_burst_of_5xx(api_client, created_item, fault_injector):
+    """Серия 503 из маркера: ожидание объявления переживает серию."""
+    response = api_client.wait_for_item(created_item["id"])
+
+    assert response.status_code == 200
+    assert fault_injector.injected[("GET /api/1/item/{id}", "status 503")] == 2
+
+
+@pytest.mark.parametrize("attempt", [1, 2])
+@pytest.mark.faults(FaultRule("GET /api/1/item/{id}", status=503, times=1))
+def test_marker_rules_fresh_per_run(api_client, fault_injector, attempt):
+    """Каждый запуск теста с маркером получает правила с неизрасходованным times."""
+    assert api_client.get_item("00000000-0000-0000-0000-000000000000").status_code == 503
+    assert fault_injector.rules[0].fired == 1
@@ -0,0 +1,103 @@
+"""
+Тесты фаззера POST /api/1/item: оракул, сжатие и прогон на локальной замене.
+"""
+import asyncio
+import random
+
+import pytest
+
+from conftest import create_valid_item_data
+from fuzz import (ACCEPTED_INVALID, INT32_MAX, KNOWN_BUG, OK, REJECTED_VALID, classify, complexity,
+                  expected_outcome, fuzz, generate_case, shrink)
+from local_server import LocalAPIServer, LocalItemService
+
+
+class _NegativePriceService(LocalItemService):
+    """Сервис с дырой в валидации: отрицательная цена заменяется нулём."""
+
+    def create_item(self, data):
+        if isinstance(data, dict) and isinstance(data.get("price"), int) and data["price"] < 0:
+            data = {**data, "price": 0}
+        return super().create_item(data)
+
+
+class TestOracle:
+    """Ожидаемый статус по документации и известные отклонения."""
+
+    def test_valid_and_invalid(self):
+        """Валидное тело — 200; нарушение любого ограничения — 400."""
+        valid = create_valid_item_data(seller_id=111111)
+        assert expected_outcome(valid).status == 200
+        assert expected_outcome({**valid, "price": INT32_MAX}).status == 200
+
+        for invalid in ({**valid, "price": -1}, {**valid, "price": INT32_MAX + 1}, {**valid, "sellerID": 0},
+                        {**valid, "sellerID": True}, {**valid, "name": ""}, {**valid, "likes": "1"},
+                        {k: v for k, v in valid.items() if k != "contacts"}, [valid], {}):
+            assert expected_outcome(invalid).status == 400, invalid
+
+    def test_known_bugs(self):
+        """BUG-001 и BUG-002 классифицируются как известные, а не как расхождения."""
+        valid = create_valid_item_data(seller_id=111111)
+        negative = expected_outcome({**valid, "likes": -5})
+        assert (negative.status, negative.bug) == (400, "BUG-002")
+        assert classify(negative, 200) == KNOWN_BUG
+
+        nested = {k: v for k, v in valid.items() if k not in ("likes", "viewCount", "contacts")}
+        nested["statistics"] = {"likes": 1, "viewCount": 2, "contacts": 3}
+        expectation = expected_outcome(nested)
+        assert (expectation.status, expectation.bug) == (200, "BUG-001")
+        assert classify(expectation, 400) == KNOWN_BUG
+
+        assert classify(expected_outcome(valid), 400) == REJECTED_VALID
+        assert classify(expected_outcome({**valid, "price": -1}), 200) == ACCEPTED_INVALID
+
+
+class TestShrink:
+    """Жадное сжатие тела до минимального воспроизводящего."""
+
+    def test_shrinks_to_minimal(self):
+        """Остаются только поля, нужные для воспроизведения, значения упрощены."""
+        payload = {"sellerID": 654321, "name": "я" * 1000, "price": -123456, "extra": [1, 2, 3]}
+
+        async def still_fails(candidate):
+            return isinstance(candidate, dict) and isinstance(candidate.get("price"), int) \
+                and candidate["price"] < 0
+
+        minimal, attempts = asyncio.run(shrink(payload, still_fails))
+
+        assert minimal == {"price": -1}
+        assert complexity(minimal) < complexity(payload)
+        assert attempts > 0
+
+    def test_generation_is_reproducible(self):
+        """Одно зерно — одинаковые случаи."""
+        first = [generate_case(random.Random(7)) for _ in range(3)]
+        second = [generate_case(random.Random(7)) for _ in range(3)]
+        assert first == second
+
+
+class TestFuzzLocal:
+    """Прогон на локальной замене сервиса."""
+
+    @pytest.mark.asyncio
+    async def test_reference_service_matches_oracle(self):
+        """Эталонная реализация отличается от оракула только известными багами."""
+        with LocalAPIServer() as server:
+            report = await fuzz(server.base_url, cases=600, seed=1)
+
+        assert report.total == 600
+        assert report.failed == 0, report.failures
+        assert report.categories[OK] > 0
+        assert len(server.service) == 0
+
+    @pytest.mark.asyncio
+    async def test_finds_and_shrinks_validation_hole(self):
+        """Пропущенная проверка цены находится и сжимается до одного отрицательного значения."""
+        with LocalAPIServer(service=_NegativePriceService()) as server:
+            report = await fuzz(server.base_url, cases=600, seed=1)
+
+        holes = [f for f in report.failures.values() if f.category == ACCEPTED_INVALID]
+        assert holes
+        minimal = min((f.minimal for f in holes if f.minimal is not None), key=complexity)
+        assert minimal["price"] == -1
+        assert expected_outcome({**minimal, "price": 0}).status == 200
@@ -20,7 +20,7 @@ class TestGetItemPositive:
         
         assert response.status_code == 200, f"Ожидался статус 200, получен {response.status_code}"
         
-        data = response.json()
+        data = api_client.validate(response)
         # Ответ может быть массивом или объектом
         item = data[0] if isinstance(data, list) and data else data
         
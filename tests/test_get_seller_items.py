@@ -19,15 +19,16 @@ class TestGetSellerItemsPositive:
         seller_id = multiple_items[0]["sellerId"]
         created_ids = {item["id"] for item in multiple_items}
         
-        response = api_client.get_seller_items(seller_id)
+        # Список читается потоково и только до нахождения всех созданных объявлений
+        found = api_client.wait_for_seller_items(seller_id, created_ids, fields=("id", "sellerId"))
         
-        assert response.status_code == 200
+        assert set(found) == created_ids, "Не все созданные объявления найдены"
+        assert all(item["sellerId"] == seller_id for item in found.values())
         
-        data = response.json()
+        # Один полный ответ проверяется по схеме целиком
+        data = api_client.validate(api_client.get_seller_items(seller_id))
         assert isinstance(data, list)
-        
-        returned_ids = {item["id"] for item in data}
-        assert created_ids.issubset(returned_ids), "Не все созданные объявления найдены"
+        assert created_ids.issubset({item["id"] for item in data})
     
     @pytest.mark.positive
     def test_tc023_get_seller_items_no_items(self, api_client: APIClient):
@@ -0,0 +1,42 @@
+"""
+Тесты гистограммы задержек, используемой генератором нагрузки.
+"""
+import random
+
+from histogram import LatencyHistogram
+
+
+class TestLatencyHistogram:
+    """Точность перцентилей и объединение гистограмм."""
+
+    def test_percentiles_within_one_percent(self):
+        """Перцентили отличаются от точных значений не более чем на 1%."""
+        rng = random.Random(42)
+        values = sorted(int(rng.expovariate(1 / 5000)) for _ in range(20000))
+        histogram = LatencyHistogram()
+        for value in values:
+            histogram.record_value(value)
+
+        for p, actual in histogram.percentiles().items():
+            expected = values[max(0, int(len(values) * p / 100) - 1)]
+            assert abs(actual - expected) <= max(1, expected * 0.01), f"p{p}: {actual} vs {expected}"
+        assert histogram.value_at_percentile(100) == values[-1]
+
+    def test_merge_is_lossless(self):
+        """Объединение частей даёт ту же гистограмму, что и запись всех значений сразу."""
+        rng = random.Random(7)
+        values = [rng.randint(0, 10_000_000) for _ in range(5000)]
+        whole = LatencyHistogram()
+        parts = [LatencyHistogram() for _ in range(4)]
+        for i, value in enumerate(values):
+            whole.record_value(value)
+            parts[i % 4].record_value(value)
+
+        merged = LatencyHistogram()
+        for part in parts:
+            merged.merge(LatencyHistogram.from_dict(part.to_dict()))
+
+        assert merged.counts == whole.counts
+        assert merged.percentiles() == whole.percentiles()
+        assert (merged.min_value, merged.max_value, merged.total_count) == \
+            (whole.min_value, whole.max_value, whole.total_count)
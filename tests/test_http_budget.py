@@ -0,0 +1,72 @@
+"""
+Тесты учёта бюджета HTTP-запросов.
+"""
+import pytest
+import requests
+
+from conftest import APIClient
+from http_budget import Budget, HttpBudgetPlugin, Usage, poll_retry
+from local_server import LocalAPIServer
+
+
+class TestHttpBudget:
+    """Подсчёт запросов и времени, проверка пределов."""
+
+    def test_overruns(self):
+        """Превышение считается по каждому заданному пределу; None — без ограничения."""
+        assert Budget(requests=4, ms=800).overruns(Usage(4, 800.0)) == []
+        assert Budget(requests=4, ms=800).overruns(Usage(5, 900.0)) == [
+            "запросов 5 > 4", "время в HTTP 900 мс > 800 мс"]
+        assert Budget().overruns(Usage(10 ** 6, 1e9)) == []
+        # Ошибкой в режиме fail считается только число запросов, время — предупреждение
+        assert Budget(requests=4, ms=800).fails(Usage(5, 0.0))
+        assert not Budget(requests=4, ms=800).fails(Usage(4, 10 ** 6))
+
+    def test_counts_only_current_test(self, local_api_server: LocalAPIServer):
+        """Запросы вне теста не учитываются; тесты ранжируются по числу запросов."""
+        plugin = HttpBudgetPlugin(Budget(requests=2))
+        session = requests.Session()
+        plugin.install(session)
+        url = f"{local_api_server.base_url}/api/1/1/item"
+
+        session.get(url)
+        plugin.pytest_runtest_logstart("light")
+        session.get(url)
+        plugin.pytest_runtest_logfinish()
+        plugin.pytest_runtest_logstart("heavy")
+        for _ in range(3):
+            session.get(url)
+        plugin.pytest_runtest_logfinish()
+
+        assert [(nodeid, usage.requests) for nodeid, usage in plugin.heaviest()] == [("heavy", 3), ("light", 1)]
+        assert plugin.usage["heavy"].ms > 0
+        assert plugin.default.overruns(plugin.usage["heavy"]) == ["запросов 3 > 2"]
+
+    def test_poll_retries_are_not_counted(self, local_api_server: LocalAPIServer):
+        """Повторные проверки ожидания учитываются отдельно и не расходуют бюджет."""
+        plugin = HttpBudgetPlugin(Budget(requests=2))
+        client = APIClient(local_api_server.base_url)
+        plugin.install(client.session)
+        probes = iter([None, None, None, True])
+
+        plugin.pytest_runtest_logstart("polling")
+        client.wait_until(lambda: client.get_seller_items(1) and next(probes), timeout=5)
+        with poll_retry():
+            client.get_seller_items(1)
+        plugin.pytest_runtest_logfinish()
+
+        usage = plugin.usage["polling"]
+        assert (usage.requests, usage.retries) == (1, 4)
+        assert not plugin.default.overruns(usage)
+
+    @pytest.mark.private_items
+    @pytest.mark.http_budget(requests=3)
+    def test_fixture_setup_is_counted(self, request, api_client: APIClient, created_item):
+        """Запросы фикстур засчитываются тесту, который их использует."""
+        plugin = request.config.pluginmanager.get_plugin("http_budget")
+        before = plugin.usage[request.node.nodeid].requests
+        api_client.get_item(created_item["id"])
+
+        assert before >= 1
+        assert plugin.usage[request.node.nodeid].requests == before + 1
+        assert plugin.budget_for(request.node) == Budget(requests=3)
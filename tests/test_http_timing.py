@@ -0,0 +1,37 @@
+"""
+Тесты поэтапной хронометрии HTTP-запросов.
+"""
+from conftest import APIClient, create_valid_item_data
+from http_timing import endpoint_template, instrument
+from local_server import LocalAPIServer
+
+
+class TestHttpTiming:
+    """Замеры адаптера TimingAdapter."""
+
+    def test_endpoint_template(self):
+        """URL сводятся к шаблонам эндпоинтов."""
+        assert endpoint_template("http://host/api/1/item") == "/api/1/item"
+        assert endpoint_template("http://host/api/1/item/abc") == "/api/1/item/{id}"
+        assert endpoint_template("/api/1/123456/item") == "/api/1/{sellerID}/item"
+        assert endpoint_template("/api/2/statistic/abc") == "/api/2/statistic/{id}"
+        assert endpoint_template("/unknown/path") == "{other}"
+
+    def test_records_phases_per_request(self, local_api_server: LocalAPIServer):
+        """Для каждого запроса записываются этапы; соединение переиспользуется."""
+        records = []
+        client = APIClient(local_api_server.base_url)
+        instrument(client.session, records.append)
+
+        item_data = create_valid_item_data()
+        item_id = client.create_item(item_data).json()["id"]
+        client.get_item(item_id)
+
+        create, get = records
+        assert (create["method"], create["endpoint"], create["status"]) == ("POST", "/api/1/item", 200)
+        assert (get["method"], get["endpoint"]) == ("GET", "/api/1/item/{id}")
+        assert create["bytes_out"] > 0 and create["bytes_in"] > 0
+        assert create["connect_ms"] > 0
+        assert get["connect_ms"] == 0 and get["dns_ms"] == 0
+        for record in records:
+            assert 0 < record["ttfb_ms"] <= record["total_ms"]
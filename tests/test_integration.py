@@ -13,6 +13,7 @@ class TestIntegration:
     
     @pytest.mark.integration
     @pytest.mark.smoke
+    @pytest.mark.http_budget(requests=8, ms=3000)
     def test_tc031_full_item_lifecycle(self, api_client: APIClient, unique_seller_id: int):
         """TC-031: Полный жизненный цикл объявления."""
         # Step 1: Создание
@@ -30,9 +31,8 @@ class TestIntegration:
         
         item_id = create_response.json()["id"]
         
-        # Step 2: Получение по ID
-        get_response = api_client.get_item(item_id)
-        assert get_response.status_code == 200
+        # Step 2: Получение по ID (ожидание, пока объявление станет доступно)
+        get_response = api_client.wait_for_item(item_id)
         
         get_data = get_response.json()
         item = get_data[0] if isinstance(get_data, list) and get_data else get_data
@@ -40,17 +40,14 @@ class TestIntegration:
         assert item["name"] == item_data["name"]
         
         # Step 3: Получение в списке продавца
-        seller_response = api_client.get_seller_items(unique_seller_id)
-        assert seller_response.status_code == 200
-        
-        seller_items = seller_response.json()
-        assert any(item.get("id") == item_id for item in seller_items)
+        api_client.wait_for_seller_items(unique_seller_id, [item_id])
         
         # Step 4: Получение статистики
         stat_response = api_client.get_statistic(item_id)
         assert stat_response.status_code == 200
     
     @pytest.mark.integration
+    @pytest.mark.http_budget(requests=10, ms=4000)
     def test_tc032_multiple_items_same_seller(self, api_client: APIClient, unique_seller_id: int):
         """TC-032: Создание нескольких объявлений одним продавцом."""
         created_ids = []
@@ -69,13 +66,10 @@ class TestIntegration:
             assert response.status_code == 200, f"Ошибка создания #{i+1}: {response.text}"
             created_ids.append(response.json()["id"])
         
-        # Проверяем список продавца
-        seller_response = api_client.get_seller_items(unique_seller_id)
-        assert seller_response.status_code == 200
+        # Проверяем список продавца: все объявления видны одним запросом списка
+        found = api_client.wait_for_seller_items(unique_seller_id, created_ids)
         
-        returned_ids = {item["id"] for item in seller_response.json()}
-        for cid in created_ids:
-            assert cid in returned_ids
+        assert set(found) == set(created_ids)
     
     @pytest.mark.integration
     def test_tc033_item_id_uniqueness(self, api_client: APIClient, unique_seller_id: int):
@@ -104,7 +98,7 @@ class TestIntegration:
     def test_tc034_seller_data_isolation(self, api_client: APIClient):
         """TC-034: Изоляция данных между разными продавцами."""
         seller_id_1 = generate_unique_seller_id()
-        seller_id_2 = generate_unique_seller_id() + 1
+        seller_id_2 = generate_unique_seller_id()
         
         # Создаём объявления для разных продавцов
         item1 = {"sellerID": seller_id_1, "name": "Товар 1", "price": 100, "likes": 0, "viewCount": 0, "contacts": 0}
@@ -119,9 +113,11 @@ class TestIntegration:
         id1 = r1.json()["id"]
         id2 = r2.json()["id"]
         
-        # Проверяем изоляцию
-        seller1_items = {item["id"] for item in api_client.get_seller_items(seller_id_1).json()}
-        seller2_items = {item["id"] for item in api_client.get_seller_items(seller_id_2).json()}
+        # Проверяем изоляцию, дождавшись появления объявлений в списках продавцов
+        api_client.wait_for_seller_items(seller_id_1, [id1])
+        api_client.wait_for_seller_items(seller_id_2, [id2])
+        seller1_items = {item["id"] for item in api_client.iter_seller_items(seller_id_1, fields=("id",))}
+        seller2_items = {item["id"] for item in api_client.iter_seller_items(seller_id_2, fields=("id",))}
         
         assert id1 in seller1_items
         assert id2 in seller2_items
@@ -0,0 +1,93 @@
+"""
+Тесты компактного реестра объявлений.
+"""
+import uuid
+
+from cleanup import CleanupQueue
+from conftest import APIClient, create_valid_item_data
+from item_registry import ItemRegistry, verify_sellers
+from local_server import LocalAPIServer, LocalItemService
+
+
+class TestItemRegistry:
+    """Поиск по ID, индекс продавца, удаление и сверка со списками API."""
+
+    def test_lookup_update_and_discard(self):
+        """ID любого формата находятся после роста индекса; удаление и повторная регистрация."""
+        registry = ItemRegistry(capacity=4)
+        ids = [str(uuid.UUID(int=i * 7919 + 1)) for i in range(1000)]
+        for i, item_id in enumerate(ids):
+            registry.register(item_id, create_valid_item_data(seller_id=111111 + i % 3, price=i), created_at=i)
+        registry.register("legacy-42", create_valid_item_data(seller_id=222222, likes=5))
+
+        assert len(registry) == 1001
+        assert registry.get(ids[500]).price == 500 and registry.get(ids[500]).created_at == 500
+        assert registry.get("legacy-42").statistics == {"likes": 5, "viewCount": 0, "contacts": 0}
+        assert [r.id for r in registry.seller_items(111112)][:2] == [ids[1], ids[4]]
+
+        assert registry.discard(ids[1]) and not registry.discard(ids[1])
+        assert ids[1] not in registry and registry.get(ids[1]) is None
+        assert registry.register(ids[1], create_valid_item_data(seller_id=222222, price=7))
+        assert [r.id for r in registry.seller_items(222222)] == ["legacy-42", ids[1]]
+        # Перенос обратно к прежнему продавцу не дублирует строку в его индексе
+        registry.register(ids[1], create_valid_item_data(seller_id=111112, price=8))
+        assert [r.id for r in registry.seller_items(111112)][:2] == [ids[1], ids[4]]
+        assert len(registry.seller_items(111112)) == 333
+        registry.register(ids[1], create_valid_item_data(seller_id=222222, price=7))
+        assert registry.discard("legacy-42")
+        assert 222222 in registry.sellers()
+        assert registry.discard(ids[1]) and 222222 not in registry.sellers()
+        registry.register("legacy-42", create_valid_item_data(seller_id=222222, likes=5))
+        registry.register(ids[1], create_valid_item_data(seller_id=222222, price=7))
+        assert len(registry) == 1001 and registry.rows == 1001
+        assert not registry.register(str(uuid.uuid4()), {"sellerID": 1, "price": "1000"})
+        assert sorted(registry.ids()) == sorted(ids + ["legacy-42"])
+
+    def test_memory_per_item(self):
+        """Столбцы и индексы занимают порядка сотни байт на объявление."""
+        registry = ItemRegistry()
+        for i in range(50000):
+            registry.register(str(uuid.uuid4()), create_valid_item_data(seller_id=111111 + i // 50))
+
+        assert registry.nbytes() / len(registry) < 128
+
+    def test_verify_sellers(self, local_api_server: LocalAPIServer):
+        """Созданное клиентом совпадает со списками продавцов; изменения в реестре видны как расхождения."""
+        registry = ItemRegistry()
+        client = APIClient(local_api_server.base_url, registry=registry)
+        created = [client.create_item(create_valid_item_data(seller_id=seller_id, price=price)).json()["id"]
+                   for seller_id in (333331, 333332) for price in (10, 20)]
+        client.delete_item(created[0])
+
+        assert len(registry) == 3 and created[0] not in registry
+        assert verify_sellers(client, registry) == {}
+
+        registry.register(created[1], create_valid_item_data(seller_id=333331, price=21, contacts=1))
+        assert verify_sellers(client, registry, timeout=0.2) == {
+            333331: [f"{created[1]}: price, statistics.contacts"]}
+
+    def test_verify_waits_for_visibility(self):
+        """Объявление, появившееся в списке с задержкой, не считается расхождением."""
+        with LocalAPIServer(service=LocalItemService(visibility_delay=0.3)) as server:
+            registry = ItemRegistry()
+            client = APIClient(server.base_url, registry=registry, poll_timeout=5)
+            client.create_item(create_valid_item_data(seller_id=333333))
+
+            assert verify_sellers(client, registry, timeout=0) == {333333: [f"{next(registry.ids())}: нет в списке"]}
+            assert verify_sellers(client, registry) == {}
+
+    def test_cleanup_from_registry(self, local_api_server: LocalAPIServer):
+        """Очередь очистки с реестром не хранит свои ID и удаляет объявления по registry.ids()."""
+        registry = ItemRegistry()
+        cleanup = CleanupQueue(registry=registry)
+        client = APIClient(local_api_server.base_url, cleanup=cleanup, registry=registry)
+        created = [client.create_item(create_valid_item_data(seller_id=333334)).json()["id"] for _ in range(5)]
+        client.delete_item(created[0])
+        cleanup.flush()
+
+        # flush не удаляет объявления реестра: они нужны для сверки до close
+        assert cleanup.pending_count == 4 and len(registry) == 4
+        assert all(client.get_item(item_id).status_code == 200 for item_id in created[1:])
+        cleanup.close()
+        assert cleanup.deleted == 4 and cleanup.pending_count == 0 and len(registry) == 0
+        assert all(client.get_item(item_id).status_code == 404 for item_id in created)
@@ -0,0 +1,75 @@
+"""
+Тесты потокового разбора списков объявлений.
+"""
+import json
+
+import pytest
+import requests
+
+import conftest
+from conftest import APIClient, create_valid_item_data
+from json_stream import iter_array
+from local_server import LocalAPIServer
+
+
+def _chunks(data: bytes, size: int):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+class TestJsonStream:
+    """Разбор JSON-массива по фрагментам и потоковый список продавца."""
+
+    def test_any_chunk_boundaries(self):
+        """Результат не зависит от границ фрагментов (включая середину UTF-8 и чисел)."""
+        values = [{"id": "a", "name": "Товар ✓", "price": 12345}, 67890, "строка", [1, 2.5], None, True]
+        data = json.dumps(values, ensure_ascii=False, indent=1).encode("utf-8")
+
+        for size in range(1, 12):
+            assert list(iter_array(_chunks(data, size))) == values
+
+    def test_numbers_split_at_every_offset(self):
+        """Число, разрезанное в любом месте (после '.', 'e', знака), разбирается целиком."""
+        numbers = ["12.5", "-3.25e+10", "7E-2", "1e5", "-0.5", "123456789"]
+        data = ("[" + ", ".join(numbers) + "]").encode("utf-8")
+        expected = [json.loads(number) for number in numbers]
+
+        for offset in range(1, len(data)):
+            assert list(iter_array([data[:offset], data[offset:]])) == expected, offset
+
+    def test_empty_and_invalid(self):
+        """Пустой массив; не массив и незавершённый массив — ValueError."""
+        assert list(iter_array([b" [ ", b"] "])) == []
+        with pytest.raises(ValueError):
+            list(iter_array([b'{"a": 1}']))
+        with pytest.raises(ValueError):
+            list(iter_array([b'[{"a": 1},', b' {"a": ']))
+
+    def test_iter_seller_items_projects_and_stops_early(self, local_api_server: LocalAPIServer,
+                                                        unique_seller_id: int, monkeypatch):
+        """Поля проецируются, поиск прекращает чтение после последнего найденного объявления."""
+        client = APIClient(local_api_server.base_url)
+        seller_id = unique_seller_id
+        item_ids = [client.create_item(create_valid_item_data(seller_id=seller_id, name=f"Поток {i}")).json()["id"]
+                    for i in range(30)]
+
+        read = []
+        iter_content = requests.Response.iter_content
+
+        def counting_iter_content(response, *args, **kwargs):
+            for chunk in iter_content(response, *args, **kwargs):
+                read.append(len(chunk))
+                yield chunk
+
+        monkeypatch.setattr(requests.Response, "iter_content", counting_iter_content)
+        monkeypatch.setattr(conftest, "STREAM_CHUNK_SIZE", 256)
+
+        items = list(client.iter_seller_items(seller_id, fields=("id", "name")))
+        total = sum(read)
+        read.clear()
+        found = client.find_seller_items(seller_id, item_ids[:2])
+
+        assert [item["id"] for item in items] == item_ids
+        assert set(items[0]) == {"id", "name"}
+        assert set(found) == set(item_ids[:2])
+        assert 0 < sum(read) < total / 2
+        assert client.get_seller_items(seller_id).status_code == 200
@@ -0,0 +1,26 @@
+"""
+Тесты генератора нагрузки.
+"""
+from cleanup import CleanupQueue
+from item_registry import ItemRegistry
+from loadgen import run_endpoint
+from local_server import LocalAPIServer
+
+
+class TestLoadgen:
+    """Нагрузка одного эндпоинта на локальной замене."""
+
+    def test_create_uses_seller_per_thread(self):
+        """Создание берёт один sellerID на поток, а не на каждый запрос; данные удаляются."""
+        registry = ItemRegistry()
+        cleanup = CleanupQueue()
+        with LocalAPIServer() as server:
+            result = run_endpoint(server.base_url, "create", duration=0.3, concurrency=3,
+                                  cleanup=cleanup, registry=registry)
+            cleanup.close()
+            remaining = len(server.service)
+
+        assert result.statuses[200] > 3
+        # Продавец начальных данных и по одному на каждый из трёх потоков
+        assert len(registry.sellers()) == 4
+        assert remaining == 0
@@ -0,0 +1,99 @@
+"""
+Тесты локальной замены API.
+"""
+import os
+import subprocess
+import sys
+import uuid
+from pathlib import Path
+
+import pytest
+import requests
+
+from conftest import LOCAL_TARGET, create_valid_item_data
+from local_server import LocalAPIServer, LocalItemService, ValidationError
+
+
+class TestLocalItemService:
+    """Валидация создания и задокументированные отличия сервиса (BUG-001 — BUG-004)."""
+
+    @pytest.mark.parametrize("change", [
+        {"sellerID": None}, {"sellerID": 0}, {"sellerID": "111111"}, {"sellerID": True},
+        {"name": ""}, {"name": 1}, {"price": -1}, {"price": 1.5}, {"likes": None}, {"contacts": 2 ** 31},
+    ])
+    def test_create_rejects_invalid(self, change):
+        """Некорректные обязательные поля отклоняются с ошибкой валидации."""
+        data = {**create_valid_item_data(), **change}
+        with pytest.raises(ValidationError):
+            LocalItemService().create_item(data)
+
+    def test_documented_deviations(self):
+        """Вложенная статистика не принимается, отрицательная — принимается, в ответе sellerId."""
+        service = LocalItemService()
+        nested = create_valid_item_data(seller_id=111111)
+        statistics = {field: nested.pop(field) for field in ("likes", "viewCount", "contacts")}
+        with pytest.raises(ValidationError):
+            service.create_item({**nested, "statistics": statistics})
+
+        item = service.create_item(create_valid_item_data(seller_id=111111, likes=-5))
+        assert item["statistics"]["likes"] == -5
+        assert item["sellerId"] == 111111 and "sellerID" not in item
+        assert service.get_seller_items(111111) == [item]
+
+
+class TestLocalAPIServer:
+    """Коды ответов HTTP: 400 и 404 по BUG-003, 405, условные запросы."""
+
+    def test_status_codes(self, local_api_server: LocalAPIServer):
+        """Некорректный ID — 400, корректный несуществующий — 404, неверный метод — 405."""
+        base = local_api_server.base_url
+        created = requests.post(f"{base}/api/1/item", json=create_valid_item_data()).json()
+        missing = str(uuid.uuid4())
+
+        assert requests.get(f"{base}/api/1/item/not-a-uuid").status_code == 400
+        assert requests.get(f"{base}/api/1/statistic/not-a-uuid").status_code == 400
+        assert requests.get(f"{base}/api/1/item/{missing}").status_code == 404
+        assert requests.delete(f"{base}/api/2/item/{missing}").status_code == 404
+        assert requests.get(f"{base}/api/1/abc/item").status_code == 400
+        assert requests.post(f"{base}/api/1/item", data=b"{").status_code == 400
+        assert requests.delete(f"{base}/api/1/item/{created['id']}").status_code == 405
+        assert requests.get(f"{base}/api/3/unknown").status_code == 404
+
+        assert requests.delete(f"{base}/api/2/item/{created['id']}").status_code == 200
+        assert requests.get(f"{base}/api/1/item/{created['id']}").status_code == 404
+
+    def test_etag_and_visibility_delay(self):
+        """GET отдаёт ETag и 304 на If-None-Match; объявление видно через visibility_delay."""
+        with LocalAPIServer(service=LocalItemService(visibility_delay=0.2)) as server:
+            created = requests.post(f"{server.base_url}/api/1/item", json=create_valid_item_data()).json()
+            url = f"{server.base_url}/api/1/item/{created['id']}"
+            assert requests.get(url).status_code == 404
+            server.service._visible_at[created["id"]] = 0.0
+            response = requests.get(url)
+            cached = requests.get(url, headers={"If-None-Match": response.headers["ETag"]})
+
+        assert response.status_code == 200 and response.json()[0]["id"] == created["id"]
+        assert cached.status_code == 304 and cached.content == b""
+
+
+class TestTargetSelection:
+    """Выбор стенда через --api-url и переменную окружения API_URL."""
+
+    def test_api_base_url(self, request, api_base_url: str):
+        """--api-url local запускает локальную замену, иначе используется переданный URL."""
+        if os.environ.get("EXPECT_API_URL"):
+            assert request.config.getoption("--api-url") == os.environ["EXPECT_API_URL"]
+        if request.config.getoption("--api-url") == LOCAL_TARGET:
+            assert api_base_url == request.getfixturevalue("local_api_server").base_url
+        else:
+            assert api_base_url == request.config.getoption("--api-url").rstrip("/")
+
+    def test_api_url_environment(self):
+        """API_URL=local без --api-url выбирает локальную замену."""
+        env = {**os.environ, "API_URL": LOCAL_TARGET, "EXPECT_API_URL": LOCAL_TARGET}
+        result = subprocess.run(
+            [sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider",
+             f"{Path(__file__).name}::TestTargetSelection::test_api_base_url"],
+            cwd=Path(__file__).parent, env=env, capture_output=True, text=True, timeout=120)
+
+        assert result.returncode == 0, result.stdout + result.stderr
@@ -0,0 +1,121 @@
+"""
+Тесты производительности (маркер perf) и проверки регрессий.
+"""
+import json
+import random
+
+import pytest
+
+from conftest import APIClient, create_valid_item_data
+from histogram import LatencyHistogram
+from loadgen import EndpointResult
+from perf import Measurement, PerfStore, compare, import_results, main, quantile_ci
+from perf_plugin import perf_selected
+
+
+def _measurement(name: str, scale: float, seed: int, n: int = 300) -> Measurement:
+    rng = random.Random(seed)
+    histogram = LatencyHistogram()
+    for _ in range(n):
+        histogram.record(0.01 * scale * rng.lognormvariate(0, 0.3))
+    return Measurement(name, histogram, elapsed=n * 0.01 * scale)
+
+
+class TestPerfGate:
+    """Статистическое сравнение с эталоном и хранилище прогонов."""
+
+    def test_detects_regression_only_when_significant(self):
+        """Рост медианы на 30% — регрессия; тот же профиль с другим шумом — нет."""
+        name = "GET /api/1/item/{id}"
+        baseline = {name: _measurement(name, 1.0, seed=1)}
+
+        same, = compare(baseline, {name: _measurement(name, 1.0, seed=2)})
+        slower, = compare(baseline, {name: _measurement(name, 1.3, seed=3)})
+        faster, = compare(baseline, {name: _measurement(name, 0.7, seed=4)})
+
+        assert not same.regression and not same.improvement
+        assert slower.regression
+        assert 1.2 < slower.ratio < 1.4
+        assert slower.ratio_low <= slower.ratio <= slower.ratio_high
+        assert faster.improvement and not faster.regression
+
+    def test_quantile_interval_contains_point(self):
+        """Доверительный интервал медианы по гистограмме охватывает точечную оценку."""
+        point, low, high = quantile_ci(_measurement("x", 1.0, seed=5).histogram, 0.5)
+        assert low <= point <= high
+
+    def test_perf_tests_are_opt_in(self, request):
+        """Замеры выбираются только -m perf (не «not perf») или опциями сохранения и сравнения."""
+        assert perf_selected("perf") and perf_selected("smoke or perf")
+        assert not perf_selected("") and not perf_selected("not perf")
+        plugin = request.config.pluginmanager.get_plugin("perf")
+        assert plugin.enabled == (plugin.save or perf_selected(request.config.getoption("markexpr")))
+
+    def test_store_and_cli_compare(self, tmp_path, capsys):
+        """Прогоны сохраняются с коммитом и стендом; compare возвращает 1 при регрессии."""
+        db = tmp_path / "perf.sqlite"
+        name = "GET /api/1/item/{id}"
+        with PerfStore(db) as store:
+            first = store.save_run([_measurement(name, 1.0, seed=1)], "local", commit="aaa", baseline=True)
+            store.save_run([_measurement(name, 1.0, seed=2)], "other", commit="bbb")
+            store.save_run([_measurement(name, 1.02, seed=3)], "local", commit="ccc")
+            assert store.baseline_run("local") == first
+            restored = store.measurements(first)[name]
+            assert restored.histogram.percentiles() == _measurement(name, 1.0, seed=1).histogram.percentiles()
+
+        assert main(["--db", str(db), "compare"]) == 0
+        with PerfStore(db) as store:
+            store.save_run([_measurement(name, 1.3, seed=4)], "local", commit="ddd")
+        assert main(["--db", str(db), "compare"]) == 1
+        assert "РЕГРЕССИЯ" in capsys.readouterr().out
+
+    def test_import_loadgen_results(self, tmp_path):
+        """Результаты loadgen --json импортируются в измерения без потерь."""
+        result = EndpointResult("get_item", "GET /api/1/item/{id}")
+        for value in (0.001, 0.002, 0.003):
+            result.histogram.record(value)
+            result.statuses[200] += 1
+        result.statuses[500] += 1
+        result.elapsed = 2.0
+        path = tmp_path / "load.json"
+        path.write_text(json.dumps([result.to_dict()]), encoding="utf-8")
+
+        measurement, = import_results(str(path))
+
+        assert measurement.name == "GET /api/1/item/{id}"
+        assert (measurement.requests, measurement.errors) == (4, 1)
+        assert measurement.histogram.percentiles() == result.histogram.percentiles()
+
+
+@pytest.fixture
+def uncached_client(api_client: APIClient):
+    """api_client без кэша ответов: замеряется сервис, а не кэш."""
+    cache, api_client.cache = api_client.cache, None
+    yield api_client
+    api_client.cache = cache
+
+
+@pytest.mark.perf
+@pytest.mark.http_budget(requests=None, ms=None)
+class TestPerfBenchmarks:
+    """Задержки основных эндпоинтов для сравнения с эталоном (--perf-compare)."""
+
+    def test_perf_get_item(self, uncached_client: APIClient, created_item, perf_benchmark):
+        measurement = perf_benchmark("GET /api/1/item/{id}", lambda: uncached_client.get_item(created_item["id"]))
+        assert measurement.errors == 0
+
+    def test_perf_get_seller_items(self, uncached_client: APIClient, multiple_items, perf_benchmark):
+        seller_id = multiple_items[0]["sellerId"]
+        measurement = perf_benchmark("GET /api/1/{sellerID}/item",
+                                     lambda: uncached_client.get_seller_items(seller_id))
+        assert measurement.errors == 0
+
+    def test_perf_get_statistic(self, uncached_client: APIClient, created_item, perf_benchmark):
+        measurement = perf_benchmark("GET /api/1/statistic/{id}",
+                                     lambda: uncached_client.get_statistic(created_item["id"]))
+        assert measurement.errors == 0
+
+    def test_perf_create_item(self, api_client: APIClient, unique_seller_id: int, perf_benchmark):
+        data = create_valid_item_data(seller_id=unique_seller_id, name="Замер")
+        measurement = perf_benchmark("POST /api/1/item", lambda: api_client.create_item(data), rounds=50)
+        assert measurement.errors == 0
@@ -0,0 +1,89 @@
+"""
+Тесты ожидания согласованности чтения после записи.
+"""
+import random
+
+import pytest
+
+from conftest import APIClient, create_valid_item_data
+from local_server import LocalAPIServer, LocalItemService
+from polling import Backoff, LagStats, PollTimeout, eventually
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestEventually:
+    """Повторение проверки с экспоненциальной паузой."""
+
+    def test_first_check_without_delay(self):
+        """Выполненное условие возвращается без пауз."""
+        clock = _FakeClock()
+        assert eventually(lambda: "ok", clock=clock, sleep=clock.sleep) == "ok"
+        assert clock.sleeps == []
+
+    def test_backoff_grows_with_jitter(self):
+        """Паузы растут экспоненциально до максимума, jitter только уменьшает их."""
+        clock = _FakeClock()
+        results = iter([None, False, None, None, None, None, 42])
+        backoff = Backoff(initial=0.1, factor=2.0, maximum=0.5, jitter=0.5, rng=random.Random(1))
+
+        assert eventually(lambda: next(results), backoff=backoff, clock=clock, sleep=clock.sleep) == 42
+
+        for delay, interval in zip(clock.sleeps, [0.1, 0.2, 0.4, 0.5, 0.5, 0.5]):
+            assert interval / 2 <= delay <= interval
+
+    def test_timeout_reports_last_error(self):
+        """По истечении времени — PollTimeout с последней ошибкой проверки."""
+        clock = _FakeClock()
+
+        def probe():
+            assert False, "ещё не видно"
+
+        with pytest.raises(PollTimeout, match="ещё не видно"):
+            eventually(probe, timeout=1.0, clock=clock, sleep=clock.sleep)
+        assert clock.now == pytest.approx(1.0)
+
+
+class TestWaitForVisibility:
+    """APIClient.wait_* на сервисе с задержкой распространения записи."""
+
+    @pytest.fixture
+    def lagging_server(self):
+        with LocalAPIServer(service=LocalItemService(visibility_delay=0.2)) as server:
+            yield server
+
+    def test_waits_for_lagging_items_and_records_lag(self, lagging_server: LocalAPIServer):
+        """Объявления дожидаются одним запросом списка; задержка попадает в гистограмму."""
+        lag_stats = LagStats()
+        client = APIClient(lagging_server.base_url, poll_timeout=5.0, lag_stats=lag_stats)
+        seller_id = 123456
+        item_ids = [client.create_item(create_valid_item_data(seller_id=seller_id)).json()["id"]
+                    for _ in range(3)]
+        assert client.get_item(item_ids[0]).status_code == 404
+
+        found = client.wait_for_seller_items(seller_id, item_ids)
+
+        assert set(found) == set(item_ids)
+        histogram = lag_stats.histograms["GET /api/1/{sellerID}/item"]
+        assert len(histogram) == 3
+        assert histogram.max_value >= 150_000
+        assert client.wait_for_item(item_ids[0]).status_code == 200
+
+    def test_timeout(self, lagging_server: LocalAPIServer):
+        """Если объявление не появилось за poll_timeout, тест падает с PollTimeout."""
+        client = APIClient(lagging_server.base_url, lag_stats=LagStats())
+        item_id = client.create_item(create_valid_item_data()).json()["id"]
+
+        with pytest.raises(PollTimeout):
+            client.wait_for_item(item_id, timeout=0.05)
@@ -0,0 +1,97 @@
+"""
+Тесты кэша GET-ответов APIClient.
+"""
+import pytest
+import requests
+
+from conftest import APIClient, create_valid_item_data
+from local_server import LocalAPIServer
+from response_cache import ITEM, SELLER_ITEMS, STATISTIC, ResponseCache
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock() -> _FakeClock:
+    return _FakeClock()
+
+
+@pytest.fixture
+def cached_client(local_api_server: LocalAPIServer, clock: _FakeClock) -> APIClient:
+    return APIClient(local_api_server.base_url, cache=ResponseCache(clock=clock))
+
+
+class TestResponseCache:
+    """TTL, LRU, условные запросы и инвалидация при записи."""
+
+    def test_hits_and_ttl_revalidation(self, cached_client: APIClient, clock: _FakeClock):
+        """Повтор в пределах TTL — из кэша; после TTL — условный запрос с ответом 304."""
+        cache = cached_client.cache
+        item_id = cached_client.create_item(create_valid_item_data()).json()["id"]
+
+        first = cached_client.get_item(item_id)
+        assert cached_client.get_item(item_id) is first
+        clock.now += cache.ttls[ITEM] + 1
+        assert cached_client.get_item(item_id) is first
+
+        assert cache.counters[ITEM] == {"hits": 1, "misses": 1, "revalidated": 1}
+        assert "ETag" in first.headers
+
+    def test_errors_are_not_cached(self, cached_client: APIClient):
+        """Ответы с ошибкой каждый раз запрашиваются заново."""
+        cached_client.get_item("not-a-uuid")
+        cached_client.get_item("not-a-uuid")
+
+        assert cached_client.cache.counters[ITEM]["misses"] == 2
+        assert len(cached_client.cache) == 0
+
+    def test_lru_bounds(self, local_api_server: LocalAPIServer):
+        """Вытесняются давно не использованные записи; размер ограничен."""
+        client = APIClient(local_api_server.base_url)
+        item_ids = [client.create_item(create_valid_item_data()).json()["id"] for _ in range(3)]
+        cache = ResponseCache(max_entries=2)
+        session = requests.Session()
+        urls = [f"{local_api_server.base_url}/api/1/item/{item_id}" for item_id in item_ids]
+
+        cache.fetch(session, urls[0])
+        cache.fetch(session, urls[1])
+        cache.fetch(session, urls[0])
+        cache.fetch(session, urls[2])
+        cache.fetch(session, urls[0])
+        cache.fetch(session, urls[1])
+
+        assert cache.counters[ITEM] == {"hits": 2, "misses": 4, "revalidated": 0}
+        assert len(cache) == 2
+
+        tiny = ResponseCache(max_bytes=100)
+        tiny.fetch(session, urls[0])
+        assert len(tiny) == 0 and tiny.size_bytes == 0
+
+    def test_writes_invalidate_precisely(self, cached_client: APIClient):
+        """Создание сбрасывает список продавца; удаление — объявление, статистику и список."""
+        cache = cached_client.cache
+        seller_id = 345678
+        other_seller_id = 345679
+        first_id = cached_client.create_item(create_valid_item_data(seller_id=seller_id)).json()["id"]
+        cached_client.get_seller_items(other_seller_id)
+        assert len(cached_client.get_seller_items(seller_id).json()) == 1
+
+        second_id = cached_client.create_item(create_valid_item_data(seller_id=seller_id)).json()["id"]
+        assert len(cached_client.get_seller_items(seller_id).json()) == 2
+
+        cached_client.get_item(second_id)
+        cached_client.get_statistic(second_id)
+        cached_client.delete_item(second_id)
+
+        assert cached_client.get_item(second_id).status_code == 404
+        assert cached_client.get_statistic(second_id).status_code == 404
+        assert [item["id"] for item in cached_client.get_seller_items(seller_id).json()] == [first_id]
+        cached_client.get_seller_items(other_seller_id)
+        assert cache.counters[SELLER_ITEMS]["hits"] == 1
+        assert cache.counters[STATISTIC]["misses"] == 2
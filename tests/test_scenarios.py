@@ -0,0 +1,109 @@
+"""
+Тесты сценарной нагрузки.
+"""
+import json
+import random
+from collections import Counter
+
+import pytest
+
+from local_server import LocalAPIServer
+import scenarios
+from scenarios import DEFAULT_WORKLOAD, END, Scenario, Workload, run_workload
+
+
+class TestScenarioSpec:
+    """Разбор спецификации и обход сценариев."""
+
+    def test_markov_walk_follows_transitions(self):
+        """Частоты переходов соответствуют вероятностям; недостающая до 1 — завершение."""
+        scenario = Scenario("browse", markov={
+            "start": "seller_items",
+            "transitions": {"seller_items": {"get_item": 0.75}, "get_item": {"seller_items": 0.5}},
+        })
+        rng = random.Random(1)
+        first_steps = Counter()
+        for _ in range(4000):
+            walk = list(scenario.walk(rng))
+            assert walk[0] == "seller_items"
+            first_steps[walk[1] if len(walk) > 1 else END] += 1
+
+        assert first_steps["get_item"] / 4000 == pytest.approx(0.75, abs=0.03)
+        assert scenario.operations() == ["get_item", "seller_items"]
+
+    def test_invalid_specs(self):
+        """Ошибки спецификации обнаруживаются при загрузке, а не во время нагрузки."""
+        with pytest.raises(ValueError, match="больше 1"):
+            Scenario("x", markov={"start": "get_item", "transitions": {"get_item": {"statistic": 0.8,
+                                                                                  "delete": 0.3}}})
+        with pytest.raises(ValueError, match="неизвестная операция"):
+            Scenario("x", steps=["create", "buy"])
+        with pytest.raises(ValueError, match="ровно одно"):
+            Scenario("x")
+        with pytest.raises(ValueError, match="распределение"):
+            Workload.from_dict({**DEFAULT_WORKLOAD, "think_time": {"distribution": "zipf"}})
+
+    def test_load_json_and_yaml(self, tmp_path):
+        """Спецификация читается из JSON и YAML."""
+        json_path = tmp_path / "workload.json"
+        json_path.write_text(json.dumps(DEFAULT_WORKLOAD), encoding="utf-8")
+        assert [s.name for s in Workload.load(str(json_path)).scenarios] == list(DEFAULT_WORKLOAD["scenarios"])
+
+        yaml = pytest.importorskip("yaml")
+        yaml_path = tmp_path / "workload.yaml"
+        yaml_path.write_text(yaml.safe_dump(DEFAULT_WORKLOAD, allow_unicode=True), encoding="utf-8")
+        workload = Workload.load(str(yaml_path))
+        assert workload.users == DEFAULT_WORKLOAD["users"]
+
+
+class TestScenarioRun:
+    """Прогон на локальной замене сервиса."""
+
+    @pytest.mark.asyncio
+    async def test_lifecycle_and_browse(self):
+        """Сценарии завершаются без ошибок, созданные объявления удаляются."""
+        workload = Workload.from_dict({
+            "users": 50,
+            "duration": 1.5,
+            "ramp_up": 0.2,
+            "think_time": 0.01,
+            "scenarios": {
+                "lifecycle": {"weight": 1, "steps": ["create", "get_item", "seller_items", "statistic", "delete"]},
+                "browse": DEFAULT_WORKLOAD["scenarios"]["browse"],
+            },
+        })
+        with LocalAPIServer() as server:
+            result = await run_workload(server.base_url, workload, seed=1)
+            remaining = len(server.service)
+
+        lifecycle = result.scenarios["lifecycle"]
+        assert lifecycle.completed > 0
+        assert lifecycle.failed == 0
+        assert result.operations["create"].statuses[200] >= result.operations["delete"].statuses[200] > 0
+        assert result.scenarios["browse"].completed > 0
+        assert remaining == 0
+
+    @pytest.mark.asyncio
+    async def test_operation_error_fails_step(self, monkeypatch):
+        """Исключение операции (например, тело 200 не JSON) — неудачный шаг, а не конец прогона."""
+        async def broken_create(ctx, user):
+            raise ValueError("тело ответа не JSON")
+
+        monkeypatch.setitem(scenarios.OPERATIONS, "create", broken_create)
+        workload = Workload.from_dict({
+            "users": 5,
+            "duration": 0.5,
+            "think_time": 0.01,
+            "scenarios": {
+                "lifecycle": {"weight": 1, "steps": ["create", "delete"]},
+                "browse": DEFAULT_WORKLOAD["scenarios"]["browse"],
+            },
+        })
+        with LocalAPIServer() as server:
+            result = await run_workload(server.base_url, workload, seed=1)
+
+        lifecycle = result.scenarios["lifecycle"]
+        assert lifecycle.completed == 0
+        assert lifecycle.failed == lifecycle.failed_steps["create"] > 0
+        assert result.operations["create"].errors["ValueError"] == lifecycle.failed
+        assert result.scenarios["browse"].completed > 0
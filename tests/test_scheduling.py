@@ -0,0 +1,133 @@
+"""
+Тесты планирования порядка тестов.
+"""
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+import requests
+
+from scheduling import (RECENT_RUNS, History, base_nodeid, history_key, lpt_schedule, makespan, prioritize,
+                        transport_error)
+
+XDIST_CONFTEST = """
+from scheduling import SchedulingPlugin
+
+
+def pytest_configure(config):
+    config.pluginmanager.register(SchedulingPlugin(config), "scheduling")
+"""
+
+XDIST_TESTS = """
+import time
+
+import pytest
+
+
+@pytest.mark.smoke
+def test_smoke_a():
+    assert False
+
+
+@pytest.mark.smoke
+def test_smoke_b():
+    assert False
+
+
+@pytest.mark.parametrize("n", range(20))
+def test_slow(n):
+    time.sleep(0.2)
+"""
+
+
+class TestScheduling:
+    """История прогонов, порядок запуска и LPT-разбиение."""
+
+    def test_smoke_then_recent_failures_then_file_order(self):
+        """Smoke от быстрых к медленным, затем недавно падавшие, остальные — в исходном порядке."""
+        history = History()
+        history.record({"a": (1.0, False), "b": (0.5, True), "s1": (2.0, False),
+                        "s2": (0.1, False), "c": (0.2, False), "d": (3.0, True)})
+        history.record({"b": (0.5, False), "d": (3.0, True)})
+
+        order = prioritize(["a", "b", "c", "d", "s1", "s2", "new"], {"s1", "s2"}, history)
+
+        assert order == ["s2", "s1", "d", "b", "a", "c", "new"]
+
+    def test_failures_are_forgotten(self):
+        """Тест перестаёт считаться недавно падавшим через RECENT_RUNS успешных прогонов."""
+        history = History()
+        history.record({"t": (1.0, True)})
+        for _ in range(RECENT_RUNS - 1):
+            history.record({"t": (1.0, False)})
+            assert history.recently_failed("t")
+        history.record({"t": (1.0, False)})
+
+        assert not history.recently_failed("t")
+        assert 0 < history.tests["t"].fail_rate < 1
+        assert History.from_dict(history.to_dict()).tests == history.tests
+
+    def test_history_key_per_target(self):
+        """История ведётся отдельно для каждого стенда; завершающий слэш не важен."""
+        remote = history_key("https://qa-internship.avito.com")
+
+        assert remote == history_key("https://qa-internship.avito.com/")
+        assert remote != history_key("local") != history_key("http://127.0.0.1:8080")
+        assert remote.startswith("scheduling/history-") and ":" not in remote
+
+    def test_base_nodeid(self):
+        """Суффикс группы xdist отбрасывается, "@" в параметрах теста сохраняется."""
+        assert base_nodeid("tests/test_a.py::TestA::test_x@lpt-1") == "tests/test_a.py::TestA::test_x"
+        assert base_nodeid("tests/test_a.py::test_x[a@b]@lpt-0") == "tests/test_a.py::test_x[a@b]"
+        assert base_nodeid("tests/test_a.py::test_x[a@b]") == "tests/test_a.py::test_x[a@b]"
+
+    def test_xdist_loadgroup(self, tmp_path: Path):
+        """Под xdist история пишется без суффиксов групп, падение всех smoke прерывает прогон."""
+        pytest.importorskip("xdist")
+        (tmp_path / "conftest.py").write_text(XDIST_CONFTEST, encoding="utf-8")
+        (tmp_path / "test_sample.py").write_text(XDIST_TESTS, encoding="utf-8")
+        (tmp_path / "pytest.ini").write_text("[pytest]\nmarkers =\n    smoke: smoke\n", encoding="utf-8")
+
+        result = subprocess.run(
+            [sys.executable, "-m", "pytest", "-n", "2", "--dist", "loadgroup"],
+            cwd=tmp_path, env={**os.environ, "PYTHONPATH": str(Path(__file__).parent)},
+            capture_output=True, text=True, timeout=120)
+
+        output = result.stdout + result.stderr
+        assert "упали все smoke-тесты (2)" in output, output
+        passed = re.search(r"(\d+) passed", output)
+        assert passed is None or int(passed.group(1)) < 20, output
+        history = json.loads((tmp_path / ".pytest_cache" / "v" / history_key("")).read_text(encoding="utf-8"))
+        assert "test_sample.py::test_smoke_a" in history["tests"]
+        assert not [nodeid for nodeid in history["tests"] if "@" in nodeid]
+
+    def test_lpt_makespan(self):
+        """LPT укладывается в 4/3 от нижней границы оптимума."""
+        rng = random.Random(7)
+        durations = {f"t{i}": rng.lognormvariate(0, 1) for i in range(200)}
+        workers = 4
+
+        bins = lpt_schedule(durations, workers)
+
+        assert sorted(n for group in bins for n in group) == sorted(durations)
+        lower_bound = max(sum(durations.values()) / workers, max(durations.values()))
+        assert makespan(bins, durations) <= 4 / 3 * lower_bound
+        # Классический худший случай: оптимум 6 (3+3 | 2+2+2), LPT даёт 7
+        small = {"a": 3, "b": 3, "c": 2, "d": 2, "e": 2}
+        assert makespan(lpt_schedule(small, 2), small) == 7
+
+    def test_transport_error_in_chain(self):
+        """Недоступность стенда распознаётся и в обёрнутых исключениях."""
+        try:
+            try:
+                raise requests.ConnectionError("refused")
+            except requests.ConnectionError as exc:
+                raise AssertionError("wrapped") from exc
+        except AssertionError as exc:
+            assert isinstance(transport_error(exc), requests.ConnectionError)
+        assert transport_error(AssertionError("assert 400 == 200")) is None
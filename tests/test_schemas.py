@@ -0,0 +1,85 @@
+"""
+Тесты валидаторов ответов, сгенерированных из postman_collection.json.
+"""
+import json
+
+import pytest
+
+from conftest import APIClient, create_valid_item_data
+from local_server import LocalAPIServer
+from schemas import DEFAULT_COLLECTION, SchemaValidationError, load_validators
+
+
+class TestResponseSchemas:
+    """Сгенерированные валидаторы и APIClient.validate."""
+
+    def test_valid_responses_pass(self, local_api_server: LocalAPIServer):
+        """Ответы всех эндпоинтов локальной замены соответствуют схемам."""
+        client = APIClient(local_api_server.base_url)
+        created = client.create_item(create_valid_item_data())
+        item = client.validate(created)
+
+        client.validate(client.get_item(item["id"]))
+        client.validate(client.get_seller_items(item["sellerId"]))
+        client.validate(client.get_statistic(item["id"]))
+        client.validate(client.get_item("not-a-uuid"))
+        assert client.validate(client.delete_item(item["id"])) is None
+        client.validate(client.get_item(item["id"]))
+
+    def test_errors_point_to_fields(self, tmp_path):
+        """Ошибки содержат путь к полю и причину."""
+        validators = load_validators(DEFAULT_COLLECTION, tmp_path)
+        content = (b'[{"id": "x", "sellerId": 1, "name": "n", "price": "1",'
+                   b' "statistics": {"likes": 1, "viewCount": true}, "createdAt": "t"}]')
+
+        errors = validators.errors("GET", "http://host/api/1/item/x", 200, content)
+
+        assert errors == [
+            "$[0].price: ожидалось целое, получено '1'",
+            "$[0].statistics.viewCount: ожидалось целое, получено True",
+            "$[0].statistics.contacts: поле отсутствует",
+        ]
+        assert validators.errors("GET", "http://host/api/1/item/x", 200, b"{") == ["$: тело ответа не JSON"]
+        assert validators.errors("GET", "http://host/unknown", 200, b"{") == []
+
+    def test_schemas_are_cached(self, tmp_path):
+        """На диск по хэшу коллекции сохраняются схемы; код из кэша не исполняется."""
+        validators = load_validators(DEFAULT_COLLECTION, tmp_path)
+
+        cached = list(tmp_path.glob("schemas-*.json"))
+        assert len(cached) == 1 and "GET /api/1/item/{id} 200" in json.loads(cached[0].read_text(encoding="utf-8"))
+        assert load_validators(DEFAULT_COLLECTION, tmp_path) is validators
+        assert len(validators) > 0
+
+        # Подменённый кэш (новый каталог — мимо кэша процесса): имена полей попадают
+        # в код только как строковые литералы
+        payload = "x'); import os; os._exit(3); ('"
+        tampered = tmp_path / "tampered" / cached[0].name
+        tampered.parent.mkdir()
+        tampered.write_text(json.dumps({"GET /api/1/item/{id} 200": {
+            "type": "object", "properties": {payload: {"type": "integer"}}}}), encoding="utf-8")
+        reloaded = load_validators(DEFAULT_COLLECTION, tampered.parent)
+        assert reloaded.errors("GET", "http://host/api/1/item/x", 200, b"{}") == [f"$.{payload}: поле отсутствует"]
+
+        # Поле неизвестного типа не проверяется, но код остаётся корректным
+        unknown = tmp_path / "unknown" / cached[0].name
+        unknown.parent.mkdir()
+        unknown.write_text(json.dumps({"GET /api/1/item/{id} 200": {
+            "type": "object", "properties": {"a": {"type": "tuple"}, "b": {"type": "integer"}}}}), encoding="utf-8")
+        reloaded = load_validators(DEFAULT_COLLECTION, unknown.parent)
+        assert reloaded.errors("GET", "http://host/api/1/item/x", 200, b'{"a": 1, "b": "x"}') == [
+            "$.b: ожидалось целое, получено 'x'"]
+
+        broken = tmp_path / "broken" / cached[0].name
+        broken.parent.mkdir()
+        broken.write_text("{broken", encoding="utf-8")
+        assert len(load_validators(DEFAULT_COLLECTION, broken.parent)) == len(validators)
+
+    def test_validate_raises_on_mismatch(self, local_api_server: LocalAPIServer):
+        """APIClient.validate выбрасывает SchemaValidationError с описанием ошибок."""
+        client = APIClient(local_api_server.base_url)
+        response = client.get_seller_items(1)
+        response._content = b'[{"id": 1}]'
+
+        with pytest.raises(SchemaValidationError, match=r"\$\[0\]\.id: ожидалась строка"):
+            client.validate(response)
@@ -0,0 +1,84 @@
+"""
+Тесты аллокатора sellerID для параллельных запусков.
+"""
+import multiprocessing
+
+import pytest
+
+from cleanup import CleanupJournal
+from conftest import create_valid_item_data, seller_ids_recyclable
+from local_server import LocalAPIServer
+from seller_ids import SellerIdAllocator, SellerIdsExhausted
+
+
+def _allocate_many(args):
+    state_path, count = args
+    allocator = SellerIdAllocator(111111, 999999, state_path, block_size=16)
+    return [allocator.allocate() for _ in range(count)]
+
+
+class TestSellerIdAllocator:
+    """Уникальность, сохранение курсора и исчерпание диапазона."""
+
+    def test_ids_disjoint_between_processes(self, tmp_path):
+        """Процессы, работающие параллельно, получают непересекающиеся ID."""
+        state_path = str(tmp_path / "state.json")
+        with multiprocessing.get_context("spawn").Pool(4) as pool:
+            chunks = pool.map(_allocate_many, [(state_path, 200)] * 4)
+
+        all_ids = [seller_id for chunk in chunks for seller_id in chunk]
+        assert len(set(all_ids)) == len(all_ids)
+        assert all(111111 <= seller_id <= 999999 for seller_id in all_ids)
+
+    def test_high_water_mark_persisted_between_runs(self, tmp_path):
+        """Следующий запуск продолжает выдачу после последнего выданного блока."""
+        state_path = tmp_path / "state.json"
+        first_run = SellerIdAllocator(100, 999, state_path, block_size=10)
+        first_ids = {first_run.allocate() for _ in range(15)}
+
+        second_run = SellerIdAllocator(100, 999, state_path, block_size=10)
+        second_ids = {second_run.allocate() for _ in range(15)}
+
+        assert not first_ids & second_ids
+        assert min(second_ids) > max(first_ids)
+
+    def test_exhaustion_detected(self, tmp_path):
+        """Пройденный диапазон не выдаётся заново ни этому процессу, ни следующему запуску — до reset()."""
+        state_path = tmp_path / "state.json"
+        allocator = SellerIdAllocator(1, 8, state_path, block_size=3)
+        ids = [allocator.allocate() for _ in range(8)]
+
+        assert sorted(ids) == list(range(1, 9))
+        with pytest.raises(SellerIdsExhausted):
+            allocator.allocate()
+        next_run = SellerIdAllocator(1, 8, state_path, block_size=3)
+        with pytest.raises(SellerIdsExhausted):
+            next_run.allocate()
+
+        next_run.reset()
+        assert next_run.allocate() == 1
+
+    def test_wrap_policy(self, tmp_path):
+        """Пройденный диапазон начинается заново, только когда это разрешает wrap()."""
+        state_path = tmp_path / "state.json"
+        SellerIdAllocator(1, 4, state_path, block_size=4).allocate()
+        allowed = []
+        next_run = SellerIdAllocator(1, 4, state_path, block_size=4, wrap=lambda: bool(allowed))
+
+        with pytest.raises(SellerIdsExhausted):
+            next_run.allocate()
+        allowed.append(True)
+        assert next_run.allocate() == 1
+
+    def test_recyclable_after_cleanup(self, tmp_path):
+        """Диапазон тестов можно пройти заново, когда объявления прежних запусков удалены."""
+        with LocalAPIServer() as server:
+            item = server.service.create_item(create_valid_item_data())
+            # Запуски завершились, не удалив объявление: журналы остались
+            CleanupJournal(tmp_path / "ok").close({item["id"]: server.base_url})
+            CleanupJournal(tmp_path / "broken").close({item["id"]: "http://127.0.0.1:9"})
+
+            assert seller_ids_recyclable(tmp_path / "ok")
+            assert len(server.service) == 0
+            assert not seller_ids_recyclable(tmp_path / "broken")
+            assert not seller_ids_recyclable(tmp_path / "broken")
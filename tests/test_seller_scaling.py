@@ -0,0 +1,45 @@
+"""
+Тесты бенчмарка масштабирования списка объявлений продавца.
+"""
+import pytest
+
+from local_server import LocalAPIServer
+from seller_scaling import SizeResult, analyze, fit_linear, fit_power_law, format_report, run
+
+
+def _result(size: int, median_ms: float) -> SizeResult:
+    result = SizeResult(size)
+    result.latency.record(median_ms / 1000)
+    return result
+
+
+class TestSellerScaling:
+    """Модели роста и прогон на локальной замене API."""
+
+    def test_fits(self):
+        """Линейные данные дают показатель 1 и R² = 1."""
+        points = [(10, 2.0), (100, 20.0), (1000, 200.0)]
+        a, b = fit_power_law(points)
+        t0, k, r2 = fit_linear(points)
+
+        assert (a, b) == (pytest.approx(0.2), pytest.approx(1.0))
+        assert (t0, k, r2) == (pytest.approx(0.0, abs=1e-9), pytest.approx(0.2), pytest.approx(1.0))
+
+    def test_detects_superlinear_growth(self):
+        """Отрезок с квадратичным ростом отмечается как точка деградации."""
+        results = [_result(10, 1.0), _result(100, 10.0), _result(1000, 1000.0)]
+
+        analysis = analyze(results)
+
+        assert analysis["superlinear_from"] == 100
+        assert [round(s["exponent"], 1) for s in analysis["segments"]] == [1.0, 2.0]
+        assert "Сверхлинейный рост начиная с 100" in format_report(results, analysis)
+
+    def test_run_on_local_server(self, local_api_server: LocalAPIServer):
+        """Продавец наполняется до каждого размера, ответ растёт вместе с ним."""
+        small, large = run(local_api_server.base_url, sizes=[5, 20], repeats=3)
+
+        assert (small.size, small.returned, large.size, large.returned) == (5, 5, 20, 20)
+        assert len(small.latency) == len(large.decode) == len(large.first_item) == 3
+        assert large.payload_bytes > 3 * small.payload_bytes
+        assert not small.errors and not large.errors
@@ -11,35 +11,23 @@ class TestGetStatisticPositive:
     
     @pytest.mark.positive
     @pytest.mark.smoke
-    def test_tc027_get_statistic_existing_item(self, api_client: APIClient, unique_seller_id: int):
+    def test_tc027_get_statistic_existing_item(self, api_client: APIClient, item_with_statistics: dict):
         """TC-027: Получение статистики существующего объявления."""
-        # Создаём объявление с заданной статистикой
-        item_data = {
-            "sellerID": unique_seller_id,
-            "name": "Товар со статистикой",
-            "price": 1500,
-            "likes": 5,
-            "viewCount": 10,
-            "contacts": 2
-        }
-        
-        create_response = api_client.create_item(item_data)
-        assert create_response.status_code == 200, f"Не удалось создать объявление: {create_response.text}"
-        
-        item_id = create_response.json().get("id")
+        item_id = item_with_statistics.get("id")
         assert item_id, "ID объявления не получен"
+        request_data = item_with_statistics["_request_data"]
         
         # Получаем статистику
         response = api_client.get_statistic(item_id)
         
         assert response.status_code == 200
         
-        data = response.json()
+        data = api_client.validate(response)
         stats = data[0] if isinstance(data, list) and data else data
         
-        assert stats.get("likes") == 5
-        assert stats.get("viewCount") == 10
-        assert stats.get("contacts") == 2
+        assert stats.get("likes") == request_data["likes"]
+        assert stats.get("viewCount") == request_data["viewCount"]
+        assert stats.get("contacts") == request_data["contacts"]
 
 
 class TestGetStatisticNegative:
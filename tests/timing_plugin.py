@@ -0,0 +1,115 @@
+"""
+Pytest-плагин хронометрии HTTP-запросов.
+
+Включается опцией --http-timings=PATH. Для каждого запроса APIClient в файл
+(JSONL или CSV — по расширению) пишется строка с шаблоном эндпоинта, методом,
+статусом, размерами, этапами DNS/connect/TTFB/total и id теста, в рамках
+которого был запрос (включая setup и teardown фикстур). В конце сессии
+выводятся самые медленные эндпоинты и тесты; замеры теста прикладываются
+к отчётам pytest-html и allure, если они установлены.
+"""
+import csv
+import json
+import threading
+from typing import Any, Dict, List, Optional
+
+import pytest
+import requests
+
+import http_timing
+from histogram import LatencyHistogram
+
+try:
+    import pytest_html
+except ImportError:
+    pytest_html = None
+
+try:
+    import allure
+except ImportError:
+    allure = None
+
+FIELDS = ["test", "start", "method", "endpoint", "status", "bytes_out", "bytes_in",
+          "dns_ms", "connect_ms", "ttfb_ms", "total_ms"]
+SUMMARY_SIZE = 5
+
+
+class HttpTimingPlugin:
+    """Сбор, запись и сводка замеров HTTP-запросов."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "w", encoding="utf-8", newline="")
+        self._csv: Optional[csv.DictWriter] = None
+        if path.endswith(".csv"):
+            self._csv = csv.DictWriter(self._file, fieldnames=FIELDS)
+            self._csv.writeheader()
+        self.current_test: Optional[str] = None
+        self._test_records: List[Dict[str, Any]] = []
+        self.endpoints: Dict[str, LatencyHistogram] = {}
+        self.tests: Dict[str, List[float]] = {}
+
+    def instrument(self, session: requests.Session) -> None:
+        http_timing.instrument(session, self.record)
+
+    def record(self, record: Dict[str, Any]) -> None:
+        record["test"] = self.current_test
+        key = f"{record['method']} {record['endpoint']}"
+        with self._lock:
+            if self._csv is not None:
+                self._csv.writerow(record)
+            else:
+                self._file.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+            self.endpoints.setdefault(key, LatencyHistogram()).record(record["total_ms"] / 1000)
+            totals = self.tests.setdefault(self.current_test or "<session>", [0, 0.0])
+            totals[0] += 1
+            totals[1] += record["total_ms"]
+            self._test_records.append(record)
+
+    def pytest_runtest_logstart(self, nodeid: str) -> None:
+        self.current_test = nodeid
+        self._test_records = []
+
+    def pytest_runtest_logfinish(self) -> None:
+        self.current_test = None
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_makereport(self, item, call):
+        outcome = yield
+        report = outcome.get_result()
+        if report.when != "call" or not self._test_records:
+            return
+        payload = json.dumps(self._test_records, ensure_ascii=False, indent=2)
+        if pytest_html is not None:
+            extras = getattr(report, "extras", [])
+            extras.append(pytest_html.extras.json(self._test_records, name="HTTP timings"))
+            report.extras = extras
+        if allure is not None:
+            allure.attach(payload, name="HTTP timings", attachment_type=allure.attachment_type.JSON)
+
+    def pytest_terminal_summary(self, terminalreporter) -> None:
+        if not self.endpoints:
+            return
+        write = terminalreporter.write_line
+        terminalreporter.section("HTTP timings")
+        write(f"Замеры: {self.path}")
+        write("")
+        slowest = sorted(self.endpoints.items(), key=lambda kv: kv[1].value_at_percentile(90),
+                         reverse=True)[:SUMMARY_SIZE]
+        width = max(len("эндпоинт"), *(len(key) for key, _ in slowest)) + 2
+        write(f"{'эндпоинт':<{width}}{'запросов':>10}{'p50 мс':>10}{'p90 мс':>10}{'max мс':>10}")
+        for key, histogram in slowest:
+            pct = histogram.percentiles([50, 90])
+            write(f"{key:<{width}}{histogram.total_count:>10}{pct[50] / 1000:>10.2f}"
+                  f"{pct[90] / 1000:>10.2f}{histogram.max_value / 1000:>10.2f}")
+        write("")
+        heaviest = sorted(self.tests.items(), key=lambda kv: kv[1][1], reverse=True)[:SUMMARY_SIZE]
+        width = max(len("тест"), *(len(nodeid) for nodeid, _ in heaviest)) + 2
+        write(f"{'тест':<{width}}{'запросов':>10}{'HTTP мс':>10}")
+        for nodeid, (count, total_ms) in heaviest:
+            write(f"{nodeid:<{width}}{count:>10}{total_ms:>10.1f}")
+
+    def pytest_unconfigure(self) -> None:
+        with self._lock:
+            self._file.close()